@@ -402,6 +402,15 @@ class QPANSOPYOASILSDockWidgetBase(QtWidgets.QDockWidget, FORM_CLASS):
        # Añadir el widget al formulario
        self.formLayout.addRow("MOC Intermediate (m):", self.mocIntermediateLineEdit)
        
+       # Glide path angle, recorded with the layers for the OCA/H
+       self.gpAngleLineEdit = QtWidgets.QLineEdit(self)
+       self.gpAngleLineEdit.setValidator(validator)
+       self.gpAngleLineEdit.setText("3.0")
+       self.gpAngleLineEdit.textChanged.connect(
+           lambda text: self.store_exact_value('GP_angle', text))
+       self.gpAngleLineEdit.setMinimumHeight(25)
+       self.formLayout.addRow("GP Angle (°):", self.gpAngleLineEdit)
+       
        # OAS Type
        self.oasTypeComboBox = QtWidgets.QComboBox(self)
        self.oasTypeComboBox.addItems(["Template Only", "Extended Only", "Both"])
@@ -519,6 +528,7 @@ class QPANSOPYOASILSDockWidgetBase(QtWidgets.QDockWidget, FORM_CLASS):
        FAP_elev = self.exact_values.get('FAP_elev', self.fapElevLineEdit.text())
        MOC_intermediate = self.exact_values.get('MOC_intermediate', self.mocIntermediateLineEdit.text())
        oas_type = self.oasTypeComboBox.currentText()
+       GP_angle = self.exact_values.get('GP_angle', self.gpAngleLineEdit.text())
        
        export_kml = self.exportKmlCheckBox.isChecked()
        output_dir = self.outputFolderLineEdit.text()
@@ -531,6 +541,7 @@ class QPANSOPYOASILSDockWidgetBase(QtWidgets.QDockWidget, FORM_CLASS):
            'FAP_elev': FAP_elev,
            'MOC_intermediate': MOC_intermediate,
            'oas_type': oas_type,
+           'GP_angle': GP_angle,
            'export_kml': export_kml,
            'output_dir': output_dir,
            # Añadir información de unidades
@@ -543,6 +554,7 @@ class QPANSOPYOASILSDockWidgetBase(QtWidgets.QDockWidget, FORM_CLASS):
        self.log(f"Threshold Elevation: {THR_elev_raw} {THR_elev_unit} = {THR_elev_meters:.4f} m (converted)")
        self.log(f"FAP Elevation: {FAP_elev} ft, MOC Intermediate: {MOC_intermediate} m")
        self.log(f"OAS Type: {oas_type}")
+       self.log(f"GP Angle: {GP_angle}°")
        
        try:
            # Run calculation for OAS ILS
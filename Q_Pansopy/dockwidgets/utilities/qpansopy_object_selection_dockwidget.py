@@ -22,9 +22,56 @@ class QPANSOPYObjectSelectionDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
         # Set default output folder
         self.outputFolderLineEdit.setText(self.get_desktop_path())
         
+        # Opciones de extracción (modo, motor, superficies separadas, lectura por lotes)
+        self.setup_extraction_options()
+        
         # Connect signals
         self.setup_connections()
 
+    def setup_extraction_options(self):
+        """Add the extraction mode and performance options to the input form"""
+        from ...modules.selection_of_objects import EXTRACTION_ENGINES
+        
+        self.modeComboBox = QtWidgets.QComboBox(self)
+        self.modeComboBox.addItems(["Extract (inside any surface)", "Attribute to every surface"])
+        self.modeComboBox.setToolTip("Attribute mode writes one row per object and surface it falls in, "
+                                     "with the surface attributes joined")
+        self.formLayout.addRow("Mode:", self.modeComboBox)
+        
+        self.engineComboBox = QtWidgets.QComboBox(self)
+        self.engineComboBox.addItems(list(EXTRACTION_ENGINES))
+        self.engineComboBox.setToolTip("prepared: GEOS prepared surface; vectorized: NumPy point in polygon; "
+                                       "simple: one intersects call per object")
+        self.formLayout.addRow("Engine:", self.engineComboBox)
+        
+        self.keepSeparateCheckBox = QtWidgets.QCheckBox("Keep surfaces separate (no union)", self)
+        self.keepSeparateCheckBox.setToolTip("Test each surface through a bounding box index instead of "
+                                             "merging them first; faster for many surfaces")
+        self.formLayout.addRow("", self.keepSeparateCheckBox)
+        
+        self.streamingCheckBox = QtWidgets.QCheckBox("Stream candidates (bounded memory)", self)
+        self.streamingCheckBox.setToolTip("Read only the objects inside the surface extent from the provider, "
+                                          "in batches, instead of indexing the whole layer")
+        self.formLayout.addRow("", self.streamingCheckBox)
+        
+        self.indexCacheCheckBox = QtWidgets.QCheckBox("Use persistent obstacle index", self)
+        self.indexCacheCheckBox.setToolTip("Keep a spatial index of file based obstacle layers on disk "
+                                           "and reuse it while the file is unchanged")
+        self.formLayout.addRow("", self.indexCacheCheckBox)
+        
+        self.modeComboBox.currentIndexChanged.connect(self.update_extraction_options)
+        self.streamingCheckBox.toggled.connect(self.update_extraction_options)
+        self.update_extraction_options()
+
+    def update_extraction_options(self):
+        """Enable only the options used by the selected mode"""
+        extract = self.modeComboBox.currentIndex() == 0
+        self.engineComboBox.setEnabled(extract)
+        self.keepSeparateCheckBox.setEnabled(extract)
+        self.streamingCheckBox.setEnabled(extract)
+        # El índice persistente no se usa al leer por lotes
+        self.indexCacheCheckBox.setEnabled(extract and not self.streamingCheckBox.isChecked())
+
     def setup_connections(self):
         """Setup signal/slot connections"""
         # Conectar el botón Extract directamente a la función extract_objects
@@ -73,20 +120,41 @@ class QPANSOPYObjectSelectionDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
             self.iface.messageBar().pushMessage("QPANSOPY", "Extracting objects...", level=Qgis.Info)
             
             # Importar directamente la función de extracción y ejecutarla
-            from ...modules.utilities.selection_of_objects import extract_objects
+            from ...modules.selection_of_objects import extract_objects, attribute_objects
             
             # IMPORTANTE: Ejecutar directamente la función sin abrir diálogos
-            result = extract_objects(
-                self.iface,
-                point_layer,
-                surface_layer,
-                export_kml=export_kml,
-                output_dir=output_dir,
-                use_selection_only=use_selection_only
-            )
+            if self.modeComboBox.currentIndex() == 1:
+                result = attribute_objects(
+                    self.iface,
+                    point_layer,
+                    surface_layer,
+                    export_kml=export_kml,
+                    output_dir=output_dir,
+                    use_selection_only=use_selection_only
+                )
+            else:
+                streaming = self.streamingCheckBox.isChecked()
+                result = extract_objects(
+                    self.iface,
+                    point_layer,
+                    surface_layer,
+                    export_kml=export_kml,
+                    output_dir=output_dir,
+                    use_selection_only=use_selection_only,
+                    streaming=streaming,
+                    engine=self.engineComboBox.currentText(),
+                    keep_separate=self.keepSeparateCheckBox.isChecked(),
+                    use_index_cache=self.indexCacheCheckBox.isChecked() and not streaming
+                )
             
             # Mostrar resultados
-            if result:
+            if result and 'object_count' in result:
+                msg = f"Attributed {result['object_count']} objects to {result['count']} object-surface pairs"
+                if export_kml and 'kml_path' in result:
+                    msg += f"\nKML exported to: {result['kml_path']}"
+                self.log(msg)
+                self.iface.messageBar().pushMessage("QPANSOPY", msg, level=Qgis.Success)
+            elif result:
                 msg = f"Extracted {result['count']} objects"
                 if export_kml and 'kml_path' in result:
                     msg += f"\nKML exported to: {result['kml_path']}"
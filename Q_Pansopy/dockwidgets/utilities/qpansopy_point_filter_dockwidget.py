@@ -26,10 +26,13 @@ from PyQt5 import QtGui, QtWidgets, uic, QtCore
 from PyQt5.QtCore import pyqtSignal, QRegExp
 from PyQt5.QtGui import QRegExpValidator, QColor
 from PyQt5.QtWidgets import QColorDialog
-from qgis.core import QgsProject, QgsVectorLayer, QgsWkbTypes, QgsCoordinateReferenceSystem
+from qgis.core import (QgsProject, QgsVectorLayer, QgsWkbTypes, QgsCoordinateReferenceSystem,
+                       QgsMapLayerProxyModel, QgsCoordinateTransform, QgsPointXY)
+from qgis.gui import QgsMapLayerComboBox
 from qgis.utils import iface
 from qgis.core import Qgis
 import datetime
+import re
 
 # Use __file__ to get the current script path
 FORM_CLASS, _ = uic.loadUiType(os.path.join(
@@ -82,6 +85,14 @@ class QPANSOPYPointFilterDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
         # Add unit combo next to threshold field
         self.setup_thr_elev_with_units()
 
+        # Optional runway used to compute x_dist / y_dist
+        self.setup_runway_combo()
+
+        # Optional elevation bands (classification mode)
+        self.classified_layer = None
+        self.classified_source_id = None
+        self.setup_bands_input()
+
         # Log initial message
         self.log("Point Filter loaded. Select a point layer with 'elev' field as active layer and set Filter Elevation.")
 
@@ -121,6 +132,75 @@ class QPANSOPYPointFilterDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
         except Exception:
             pass
 
+    def setup_runway_combo(self):
+        """Add an optional runway line layer combo used for the x_dist/y_dist reference"""
+        if not hasattr(self, 'parametersLayout'):
+            return
+        self.runwayLayerComboBox = QgsMapLayerComboBox(self)
+        self.runwayLayerComboBox.setFilters(QgsMapLayerProxyModel.LineLayer)
+        self.runwayLayerComboBox.setAllowEmptyLayer(True)
+        self.runwayLayerComboBox.setLayer(None)
+        self.runwayLayerComboBox.setToolTip(
+            "Runway line drawn from the threshold in the landing direction. "
+            "When set, x_dist/y_dist are the along-track/cross-track distances from the threshold.")
+        self.parametersLayout.addRow("Runway (optional):", self.runwayLayerComboBox)
+
+    def setup_bands_input(self):
+        """Add an optional breakpoints field that switches the tool to classification mode"""
+        if not hasattr(self, 'parametersLayout'):
+            return
+        self.bandsLineEdit = QtWidgets.QLineEdit(self)
+        self.bandsLineEdit.setPlaceholderText("e.g. 100, 120, 150 (optional)")
+        self.bandsLineEdit.setValidator(QRegExpValidator(QRegExp(r"^[-+0-9.,; ]*$")))
+        self.bandsLineEdit.setToolTip(
+            "Elevation breakpoints in the Filter Elevation unit. When set, points are classified "
+            "into bands in a single layer; changing the breakpoints reclassifies that layer.")
+        self.parametersLayout.addRow("Bands:", self.bandsLineEdit)
+
+    def get_breakpoints(self):
+        """Parse the breakpoints field into meters, or None if empty"""
+        if not hasattr(self, 'bandsLineEdit'):
+            return None
+        tokens = [t for t in re.split(r"[,; ]+", self.bandsLineEdit.text().strip()) if t]
+        if not tokens:
+            return None
+        factor = 0.3048 if self.units.get('thrElev', 'm') == 'ft' else 1.0
+        return [float(t) * factor for t in tokens]
+
+    def get_runway_reference(self, point_layer):
+        """
+        Get the threshold point and landing azimuth from the selected runway
+
+        The threshold is the first vertex of the runway line and the landing
+        direction goes from the first to the last vertex, both expressed in
+        the CRS of the point layer.
+        """
+        runway_layer = self.runwayLayerComboBox.currentLayer() if hasattr(self, 'runwayLayerComboBox') else None
+        if runway_layer is None:
+            return None, None
+
+        from ...utils import get_selected_feature
+        runway_feature = get_selected_feature(runway_layer, self.log)
+        if runway_feature is None:
+            return None, None
+
+        geom = runway_feature.geometry()
+        if geom.isMultipart():
+            line = geom.asMultiPolyline()[0]
+        else:
+            line = geom.asPolyline()
+        if len(line) < 2:
+            self.log("Runway line must have at least two vertices; distances will be 0.0")
+            return None, None
+
+        start = QgsPointXY(line[0])
+        end = QgsPointXY(line[-1])
+        if runway_layer.crs() != point_layer.crs():
+            transform = QgsCoordinateTransform(runway_layer.crs(), point_layer.crs(), QgsProject.instance())
+            start = transform.transform(start)
+            end = transform.transform(end)
+        return start, start.azimuth(end)
+
     def setup_connections(self):
         """Setup signal/slot connections"""
         if hasattr(self, 'calculateButton'):
@@ -188,7 +268,7 @@ class QPANSOPYPointFilterDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
         else:
             print(f"Point Filter: {message}")
 
-    def validate_inputs(self):
+    def validate_inputs(self, require_threshold=True):
         """Validate user inputs"""
         # Get active layer instead of selected layer
         active_layer = self.iface.activeLayer()
@@ -206,13 +286,14 @@ class QPANSOPYPointFilterDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
             return False
         
         # Check if Filter elevation is provided
-        if not self.thrElevLineEdit.text():
+        if require_threshold and not self.thrElevLineEdit.text():
             self.log("Error: Please enter Filter Elevation value")
             return False
         
         # Validate THR elevation is numeric
         try:
-            float(self.thrElevLineEdit.text())
+            if require_threshold:
+                float(self.thrElevLineEdit.text())
         except ValueError:
             self.log("Error: Filter Elevation must be a valid number")
             return False
@@ -225,8 +306,57 @@ class QPANSOPYPointFilterDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
         
         return True
 
+    def classify_points(self, breakpoints):
+        """Classify points into elevation bands, reclassifying the last layer when possible"""
+        self.log("Starting elevation band classification...")
+
+        if not self.validate_inputs(require_threshold=False):
+            return
+
+        layer = self.iface.activeLayer()
+        point_size = self.pointSizeSpinBox.value()
+
+        try:
+            from ...modules.utilities.point_filter import classify_points_by_elevation, reclassify_points
+
+            previous = self.classified_layer
+            reuse = (previous is not None and self.classified_source_id == layer.id()
+                     and QgsProject.instance().mapLayer(previous.id()) is not None)
+            if reuse:
+                result = reclassify_points(previous, breakpoints, self.lower_color,
+                                           self.higher_color, point_size)
+                self.log(f"Reclassified layer: {previous.name()}")
+            else:
+                threshold_point, runway_azimuth = self.get_runway_reference(layer)
+                result = classify_points_by_elevation(self.iface, layer, breakpoints, self.lower_color,
+                                                      self.higher_color, point_size,
+                                                      threshold_point, runway_azimuth)
+                self.classified_layer = result['layer']
+                self.classified_source_id = layer.id()
+                self.log(f"Band layer: {result['layer'].name()}")
+
+            for label, count in zip(result['labels'], result['counts']):
+                self.log(f"  {label}: {count} features")
+
+            self.iface.messageBar().pushMessage("QPANSOPY",
+                f"Elevation classification completed: {len(result['labels'])} bands",
+                level=Qgis.Success)
+        except Exception as e:
+            self.log(f"Error during elevation classification: {str(e)}")
+            import traceback
+            self.log(traceback.format_exc())
+
     def filter_points(self):
         """Filter points based on THR elevation"""
+        try:
+            breakpoints = self.get_breakpoints()
+        except ValueError:
+            self.log("Error: Bands must be a list of numbers separated by commas")
+            return
+        if breakpoints:
+            self.classify_points(breakpoints)
+            return
+
         self.log("Starting point filtering...")
         
         # Validate inputs
@@ -250,8 +380,13 @@ class QPANSOPYPointFilterDockWidget(QtWidgets.QDockWidget, FORM_CLASS):
         try:
             # Import and run the point filter module
             from ...modules.utilities.point_filter import filter_points_by_elevation
+            threshold_point, runway_azimuth = self.get_runway_reference(layer)
+            if threshold_point is not None:
+                self.log(f"Distances relative to threshold ({threshold_point.x():.2f}, {threshold_point.y():.2f}), "
+                         f"runway azimuth {runway_azimuth:.2f}°")
             result = filter_points_by_elevation(self.iface, layer, thr_elev_m, None, 
-                                               self.higher_color, self.lower_color, point_size)
+                                               self.higher_color, self.lower_color, point_size,
+                                               threshold_point, runway_azimuth)
             
             # Log results
             if result:
@@ -407,4 +407,57 @@ def copy_parameters_table(params):
         "QPANSOPY BASIC ILS PARAMETERS",
         params_dict,
         sections
-    )
\ No newline at end of file
+    )
+
+
+def evaluate_basic_ils_obstacles(iface, obstacle_layer, surface_layer, point_layer, runway_layer, params):
+    """
+    Evaluate an obstacle layer against the Basic ILS surfaces
+
+    The '[a,b,c]' constants stored by ``calculate_basic_ils`` are read once
+    together with the surface polygons. Obstacles are assigned to surfaces
+    with a vectorized point-in-polygon test and all heights and penetrations
+    are computed as NumPy arrays in a single pass.
+
+    :param iface: QGIS interface
+    :param obstacle_layer: Point layer with obstacles, obstacle file path or
+        structured obstacle array (see ``load_obstacles``)
+    :param surface_layer: Basic ILS surface layer created by calculate_basic_ils
+    :param point_layer: Point layer with the threshold point
+    :param runway_layer: Runway layer
+    :param params: Dictionary with evaluation parameters: 'thr_elev' in
+        meters (default: the one stored with the surfaces) and the
+        evaluation options of ``evaluate_obstacle_surfaces`` ('workers',
+        'prefilter', 'accuracy', 'incremental', 'top_n', ...)
+    :return: Dictionary with results
+    """
+    from .evaluation.obstacle_layers import read_surface_layer, threshold_frame, evaluate_obstacle_surfaces
+
+    if obstacle_layer is None or not surface_layer or not point_layer or not runway_layer:
+        iface.messageBar().pushMessage("Error", "Obstacle, surface, point or runway layer not provided", level=Qgis.Critical)
+        return None
+
+    surfaces = read_surface_layer(surface_layer, 'ILS_surface', 'constants')
+    if not surfaces['planes']:
+        iface.messageBar().pushMessage("Error", "No surface constants found in the Basic ILS layer", level=Qgis.Critical)
+        return None
+
+    # The threshold elevation used to build the surfaces is stored in meters
+    stored = surfaces['parameters'] or {}
+    thr_elev = float(params.get('thr_elev', stored.get('thr_elev', 0)))
+
+    # Same orientation as calculate_basic_ils: constants use x positive
+    # towards the approach (back azimuth)
+    crs = surface_layer.crs()
+    try:
+        frame = threshold_frame(point_layer, runway_layer, crs, thr_elev)
+    except ValueError as e:
+        iface.messageBar().pushMessage("Error", str(e), level=Qgis.Critical)
+        return None
+
+    surfaces['key'] = {
+        'surface': 'Basic ILS',
+        'polygons': [[[ring.round(3).tolist() for ring in part] for part in parts] for parts in surfaces['polygons']]
+    }
+    return evaluate_obstacle_surfaces(iface, obstacle_layer, surfaces, frame, crs, params,
+                                      "Basic ILS", "the Basic ILS surfaces")
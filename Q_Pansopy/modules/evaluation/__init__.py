@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""
+Obstacle evaluation modules for QPANSOPY
+
+The functions re-exported here work on plain NumPy arrays so they can be
+used (and tested) without a running QGIS instance.
+"""
+
+from .surfaces import (
+    parse_constants, runway_frame, plane_heights, evaluate_planes,
+    evaluate_polygon_surfaces
+)
+from .geometry import points_in_polygon
+from .bands import classify_elevations, band_labels
+
+__all__ = [
+    'parse_constants', 'runway_frame', 'plane_heights', 'evaluate_planes',
+    'evaluate_polygon_surfaces', 'points_in_polygon', 'classify_elevations',
+    'band_labels'
+]
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Elevation Bands
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Elevation Bands
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+Classification of elevations into bands delimited by breakpoints.
+"""
+
+import numpy as np
+
+
+def normalize_breakpoints(breakpoints):
+    """
+    Sort breakpoints and drop duplicates and non finite values
+
+    :param breakpoints: Sequence of elevation breakpoints
+    :return: Sorted float64 array of unique breakpoints
+    """
+    values = np.asarray(list(breakpoints), dtype=np.float64).ravel()
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        raise ValueError("At least one elevation breakpoint is required")
+    return np.unique(values)
+
+
+def classify_elevations(elevations, breakpoints):
+    """
+    Assign every elevation to a band
+
+    Band i holds the elevations with ``breakpoints[i-1] <= elev <
+    breakpoints[i]``, so with a single breakpoint band 1 is the same as
+    ``elev >= breakpoint``. Missing elevations (NaN) get band -1.
+
+    :param elevations: Array of elevations
+    :param breakpoints: Sequence of breakpoints (sorted internally)
+    :return: Integer array of band indices in [-1, len(breakpoints)]
+    """
+    bins = normalize_breakpoints(breakpoints)
+    elevations = np.asarray(elevations, dtype=np.float64)
+    bands = np.digitize(elevations, bins, right=False)
+    bands[np.isnan(elevations)] = -1
+    return bands
+
+
+def band_labels(breakpoints, unit='m', decimals=1):
+    """
+    Human readable labels for the bands produced by ``classify_elevations``
+
+    :param breakpoints: Sequence of breakpoints (sorted internally)
+    :param unit: Unit appended to the values
+    :param decimals: Number of decimals shown
+    :return: List of len(breakpoints) + 1 labels, band 0 first
+    """
+    bins = normalize_breakpoints(breakpoints).tolist()
+    fmt = f"{{:.{decimals}f}}"
+    labels = [f"< {fmt.format(bins[0])} {unit}"]
+    for low, high in zip(bins[:-1], bins[1:]):
+        labels.append(f"{fmt.format(low)} - {fmt.format(high)} {unit}")
+    labels.append(f">= {fmt.format(bins[-1])} {unit}")
+    return labels
+
+
+def band_counts(bands, n_bands):
+    """
+    Number of elevations in each band, band 0 first (missing values excluded)
+
+    :param bands: Array returned by ``classify_elevations``
+    :param n_bands: Number of bands, len(breakpoints) + 1
+    :return: List of counts
+    """
+    bands = np.asarray(bands)
+    return np.bincount(bands[bands >= 0], minlength=n_bands).tolist()
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Composite Surface Grid
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Composite Grid
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+Lowest height of many overlapping surfaces on one regular grid.
+
+Every surface (a polygon with an absolute plane z = a*x + b*y + c) is
+rasterized on every grid cell it may touch, with the lowest height of its
+plane over the cell, and the grid keeps the minimum and the index of the
+surface that gives it. A cell height is therefore never above any surface
+at any point of the cell: obstacles and DEM cells are checked
+conservatively with a single array lookup, at most
+|a| * pixel_x + |b| * pixel_y below the exact surface. A built grid is cached on disk as
+.npy files keyed by a hash of the surfaces and the grid, so it is rebuilt
+only when a source surface changes.
+"""
+
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .geometry import points_near_polygon, polygon_bounds
+from .terrain import grid_window, iter_blocks
+
+COMPOSITE_VERSION = 2
+
+
+def default_composite_dir():
+    """Directory used when no cache directory is given"""
+    return os.path.join(os.path.expanduser('~'), '.qpansopy', 'composite_grid')
+
+
+def composite_grid(bounds, resolution):
+    """
+    North-up grid covering a bounding box, aligned on the resolution
+
+    :param bounds: Sequence [xmin, ymin, xmax, ymax]
+    :param resolution: Cell size in map units
+    :return: Grid dictionary, see ``terrain.grid_window``
+    """
+    if resolution <= 0:
+        raise ValueError("Grid resolution must be positive")
+    xmin, ymin, xmax, ymax = bounds
+    origin_x = math.floor(xmin / resolution) * resolution
+    origin_y = math.ceil(ymax / resolution) * resolution
+    return {
+        'origin_x': float(origin_x),
+        'origin_y': float(origin_y),
+        'pixel_x': float(resolution),
+        'pixel_y': float(resolution),
+        'width': max(1, int(math.ceil((xmax - origin_x) / resolution))),
+        'height': max(1, int(math.ceil((origin_y - ymin) / resolution)))
+    }
+
+
+def surfaces_signature(surfaces, grid):
+    """
+    Hash of the surface geometry, planes and grid a composite depends on
+
+    :param surfaces: List of dictionaries with 'parts' and 'plane'
+    :param grid: Grid dictionary
+    :return: Hexadecimal key
+    """
+    digest = hashlib.sha1()
+    digest.update(json.dumps({'version': COMPOSITE_VERSION, 'grid': grid}, sort_keys=True).encode('utf-8'))
+    for surface in surfaces:
+        digest.update(np.asarray(surface['plane'], dtype=np.float64).tobytes())
+        for part in surface['parts']:
+            for ring in part:
+                digest.update(np.ascontiguousarray(ring, dtype=np.float64).tobytes())
+            digest.update(b'|')
+        digest.update(b'#')
+    return digest.hexdigest()
+
+
+def rasterize_min_surface(grid, surfaces, block_size=512):
+    """
+    Rasterize the lowest surface height over every grid cell
+
+    A surface applies to the cells whose circumscribed disc reaches its
+    polygon (every cell it overlaps, and a few more along its edges), with
+    the minimum of its plane over the cell corners.
+
+    :param grid: Grid dictionary, see ``composite_grid``
+    :param surfaces: List of dictionaries with 'parts' (rings in grid
+        coordinates) and 'plane' (a, b, c) giving absolute heights
+    :param block_size: Maximum block width and height in pixels
+    :return: Dictionary with 'grid', 'height' (float32 (rows, cols), NaN
+        where no surface applies) and 'surface' (int32, -1 where none)
+    """
+    height = np.full((grid['height'], grid['width']), np.inf, dtype=np.float64)
+    surface_id = np.full(height.shape, -1, dtype=np.int32)
+
+    for index, surface in enumerate(surfaces):
+        window = grid_window(polygon_bounds(surface['parts']), grid)
+        if window is None:
+            continue
+        a, b, c = surface['plane']
+        # Plane minimum over a cell: centre height less half the corner spread
+        drop = 0.5 * (abs(a) * grid['pixel_x'] + abs(b) * grid['pixel_y'])
+        reach = 0.5 * math.hypot(grid['pixel_x'], grid['pixel_y'])
+        for col, row, cols, rows in iter_blocks(window, block_size):
+            xs = grid['origin_x'] + (col + np.arange(cols) + 0.5) * grid['pixel_x']
+            ys = grid['origin_y'] - (row + np.arange(rows) + 0.5) * grid['pixel_y']
+            x = np.broadcast_to(xs[np.newaxis, :], (rows, cols)).ravel()
+            y = np.broadcast_to(ys[:, np.newaxis], (rows, cols)).ravel()
+            inside = points_near_polygon(x, y, surface['parts'], reach).reshape(rows, cols)
+            if not inside.any():
+                continue
+            z = (a * x + b * y + c - drop).reshape(rows, cols)
+            block = height[row:row + rows, col:col + cols]
+            lower = inside & (z < block)
+            block[lower] = z[lower]
+            surface_id[row:row + rows, col:col + cols][lower] = index
+
+    height[np.isinf(height)] = np.nan
+    return {'grid': grid, 'height': height.astype(np.float32), 'surface': surface_id}
+
+
+def lookup_composite(composite, x, y):
+    """
+    Lowest surface height and controlling surface at points
+
+    The height is the conservative cell value, see ``rasterize_min_surface``.
+
+    :param composite: Dictionary from ``rasterize_min_surface``
+    :param x: Array of X coordinates (grid CRS)
+    :param y: Array of Y coordinates (grid CRS)
+    :return: Tuple (height, surface): float64 array (NaN outside the grid
+        or the surfaces) and int64 array (-1 there)
+    """
+    grid = composite['grid']
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    col = np.floor((x - grid['origin_x']) / grid['pixel_x'])
+    row = np.floor((grid['origin_y'] - y) / grid['pixel_y'])
+    valid = (col >= 0) & (col < grid['width']) & (row >= 0) & (row < grid['height'])
+
+    height = np.full(x.shape, np.nan)
+    surface = np.full(x.shape, -1, dtype=np.int64)
+    c = col[valid].astype(np.int64)
+    r = row[valid].astype(np.int64)
+    height[valid] = composite['height'][r, c]
+    surface[valid] = composite['surface'][r, c]
+    return height, surface
+
+
+def evaluate_composite(composite, x, y, elevations):
+    """
+    Evaluate obstacles (or DEM cells) against a composite grid
+
+    :param composite: Dictionary from ``rasterize_min_surface``
+    :param x: Array of X coordinates (grid CRS)
+    :param y: Array of Y coordinates (grid CRS)
+    :param elevations: Absolute elevations
+    :return: Dictionary of arrays as the other evaluators:
+        'surface_height', 'controlling', 'penetration' and 'inside'
+    """
+    height, surface = lookup_composite(composite, x, y)
+    return {
+        'surface_height': height,
+        'controlling': surface,
+        'penetration': np.asarray(elevations, dtype=np.float64) - height,
+        'inside': surface >= 0
+    }
+
+
+def save_composite(composite, signature, names=None, cache_dir=None):
+    """
+    Write a composite grid to the cache, replacing any previous entry
+
+    :param composite: Dictionary from ``rasterize_min_surface``
+    :param signature: Key from ``surfaces_signature``
+    :param names: Optional surface names indexed by surface id
+    :param cache_dir: Cache directory (``default_composite_dir()`` if None)
+    :return: Path of the cache entry
+    """
+    cache_dir = cache_dir or default_composite_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+    entry = os.path.join(cache_dir, signature)
+
+    staging = tempfile.mkdtemp(prefix='.tmp_', dir=cache_dir)
+    try:
+        np.save(os.path.join(staging, 'height.npy'), composite['height'])
+        np.save(os.path.join(staging, 'surface.npy'), composite['surface'])
+        meta = {'signature': signature, 'grid': composite['grid'], 'names': list(names or [])}
+        with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        if os.path.isdir(entry):
+            shutil.rmtree(entry, ignore_errors=True)
+        os.replace(staging, entry)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return entry
+
+
+def load_composite(signature, cache_dir=None):
+    """
+    Open a cached composite grid with memory-mapped arrays
+
+    :param signature: Key from ``surfaces_signature``
+    :param cache_dir: Cache directory (``default_composite_dir()`` if None)
+    :return: Composite dictionary with 'names', or None when not cached
+    """
+    entry = os.path.join(cache_dir or default_composite_dir(), signature)
+    meta_path = os.path.join(entry, 'meta.json')
+    if not os.path.isfile(meta_path):
+        return None
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('signature') != signature:
+            return None
+        composite = {
+            'grid': meta['grid'],
+            'names': meta.get('names', []),
+            'height': np.load(os.path.join(entry, 'height.npy'), mmap_mode='r'),
+            'surface': np.load(os.path.join(entry, 'surface.npy'), mmap_mode='r')
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+    shape = (meta['grid']['height'], meta['grid']['width'])
+    if composite['height'].shape != shape or composite['surface'].shape != shape:
+        return None
+    return composite
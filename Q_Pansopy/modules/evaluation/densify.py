@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Line and Polygon Obstacle Densification
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Densification
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+Line and polygon obstacles (power lines, buildings, cranes) are evaluated
+as points: their geometry is densified into one flat coordinate array with
+an owner index (the feature each point belongs to), the point evaluators run
+on that array unchanged, and a group-by reduction keeps the worst point of
+every feature.
+"""
+
+import numpy as np
+
+from .geometry import points_in_rings
+
+
+def densify_lines(lines, spacing, owners=None):
+    """
+    Densify polylines so that no two consecutive points are further apart
+    than ``spacing``
+
+    All segments of all lines are processed together: every segment gets
+    ceil(length / spacing) points and their positions are interpolated in
+    one array operation. Extra columns (e.g. Z) are interpolated as well.
+
+    :param lines: List of (N, D) vertex arrays, D >= 2
+    :param spacing: Maximum distance between points (map units)
+    :param owners: Optional owner index of every line (its position if None)
+    :return: Tuple (coords, owner): (M, D) float64 array and int64 array
+    """
+    if spacing <= 0:
+        raise ValueError("Densification spacing must be positive")
+    lines = [np.asarray(line, dtype=np.float64) for line in lines]
+    lines = [line.reshape(len(line), -1) for line in lines]
+    owners = np.arange(len(lines), dtype=np.int64) if owners is None else np.asarray(owners, dtype=np.int64)
+    keep = [i for i, line in enumerate(lines) if len(line)]
+    if not keep:
+        width = lines[0].shape[1] if lines else 2
+        return np.zeros((0, width)), np.zeros(0, dtype=np.int64)
+
+    coords = np.vstack([lines[i] for i in keep])
+    lengths = np.array([len(lines[i]) for i in keep])
+    path = np.repeat(np.arange(len(keep)), lengths)
+    owners = owners[keep]
+
+    # Segments join consecutive vertices of the same line
+    starts = np.flatnonzero(path[:-1] == path[1:])
+    delta = coords[starts + 1] - coords[starts]
+    length = np.hypot(delta[:, 0], delta[:, 1])
+    steps = np.maximum(np.ceil(length / spacing), 1).astype(np.int64)
+
+    segment = np.repeat(np.arange(len(starts)), steps)
+    k = np.arange(int(steps.sum())) - np.repeat(np.cumsum(steps) - steps, steps)
+    t = (k / steps[segment])[:, np.newaxis]
+    points = coords[starts[segment]] + t * delta[segment]
+
+    # The last vertex of every line closes its final segment
+    ends = np.cumsum(lengths) - 1
+    dense = np.vstack([points, coords[ends]])
+    owner = np.concatenate([owners[path[starts[segment]]], owners])
+    order = np.argsort(owner, kind='stable')
+    return dense[order], owner[order]
+
+
+def densify_polygons(polygons, spacing, owners=None):
+    """
+    Cover polygons with points: densified rings plus an interior lattice
+
+    The boundary alone is not enough because the lowest point of a sloping
+    surface over a footprint can be inside it (the centreline for |y|
+    planes, plane intersections), so every part also gets a square lattice
+    at ``spacing`` clipped to its rings.
+
+    :param polygons: List of polygons, each a list of parts of (N, 2) rings
+    :param spacing: Maximum distance between points (map units)
+    :param owners: Optional owner index of every polygon
+    :return: Tuple (coords, owner): (M, 2) float64 array and int64 array
+    """
+    owners = np.arange(len(polygons), dtype=np.int64) if owners is None else np.asarray(owners, dtype=np.int64)
+    rings, ring_owner = [], []
+    lattice, lattice_owner = [], []
+    for parts, owner in zip(polygons, owners):
+        for part in parts:
+            part = [np.asarray(ring, dtype=np.float64)[:, :2] for ring in part]
+            rings.extend(part)
+            ring_owner.extend([owner] * len(part))
+
+            xmin, ymin = part[0].min(axis=0)
+            xmax, ymax = part[0].max(axis=0)
+            gx = np.arange(xmin + 0.5 * spacing, xmax, spacing)
+            gy = np.arange(ymin + 0.5 * spacing, ymax, spacing)
+            if gx.size == 0 or gy.size == 0:
+                continue
+            px, py = (a.ravel() for a in np.meshgrid(gx, gy))
+            inside = points_in_rings(px, py, part)
+            lattice.append(np.column_stack([px[inside], py[inside]]))
+            lattice_owner.append(np.full(int(inside.sum()), owner, dtype=np.int64))
+
+    coords, owner = densify_lines(rings, spacing, ring_owner)
+    if lattice:
+        coords = np.vstack([coords] + lattice)
+        owner = np.concatenate([owner] + lattice_owner)
+    order = np.argsort(owner, kind='stable')
+    return coords[order], owner[order]
+
+
+def group_argmax(values, owner, n_owners):
+    """
+    Index of the largest value of every owner (group-by max)
+
+    :param values: Array of M values, NaN is ignored
+    :param owner: Array of M owner indices in [0, n_owners)
+    :param n_owners: Number of owners
+    :return: Tuple (index, maximum): int64 array of n_owners positions
+        into ``values`` (-1 for owners without points) and the maxima
+        (NaN where there is no finite value)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    owner = np.asarray(owner, dtype=np.int64)
+    index = np.full(n_owners, -1, dtype=np.int64)
+    maximum = np.full(n_owners, np.nan)
+    if values.size == 0:
+        return index, maximum
+
+    filled = np.where(np.isnan(values), -np.inf, values)
+    order = np.lexsort((-filled, owner))
+    groups, first = np.unique(owner[order], return_index=True)
+    index[groups] = order[first]
+    best = values[index[groups]]
+    maximum[groups] = best
+    return index, maximum
+
+
+def worst_per_owner(evaluation, owner, n_owners):
+    """
+    Reduce a point evaluation to the worst point of every owner
+
+    The worst point is the one with the largest penetration inside the
+    surface; owners with no point inside keep their first point so they
+    still report as outside.
+
+    :param evaluation: Dictionary of per-point arrays with 'penetration'
+        and 'inside' (as returned by the evaluators)
+    :param owner: Owner index of every point
+    :param n_owners: Number of owners, each with at least one point
+    :return: Tuple (index, reduced): the selected point of every owner and
+        the evaluation with every per-point array indexed by it
+    """
+    owner = np.asarray(owner, dtype=np.int64)
+    inside = np.asarray(evaluation['inside'], dtype=bool)
+    penetration = np.where(inside, evaluation['penetration'], np.nan)
+    index, maximum = group_argmax(penetration, owner, n_owners)
+
+    missing = np.isnan(maximum)
+    if missing.any():
+        groups, first = np.unique(owner, return_index=True)
+        fallback = np.full(n_owners, -1, dtype=np.int64)
+        fallback[groups] = first
+        index = np.where(missing, fallback, index)
+
+    n_points = len(owner)
+    reduced = {}
+    for key, value in evaluation.items():
+        if isinstance(value, np.ndarray) and value.shape[:1] == (n_points,):
+            reduced[key] = value[np.maximum(index, 0)]
+        else:
+            reduced[key] = value
+    return index, reduced
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Dominance Pre-filter
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Dominance Pre-filter
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+Pruning of obstacles that can never control a sloping surface.
+
+For a surface built from planes z = A*x + B*|y| + C (their maximum, a
+floor, or a continuous patchwork of them) the height difference between two
+points is bounded by Gx*|dx| + Gy*|d|y||, with Gx and Gy the largest |A|
+and |B| of the planes. Obstacle B is dominated by obstacle A when
+
+    h_A - Gx*|x_A - x_B| - Gy*||y_A| - |y_B|| > h_B
+
+because then A penetrates the surface more than B wherever the surface is.
+Obstacles are binned by cross-track band (of |y|) and along-track distance;
+within a band the bins are swept forwards and backwards with running
+maxima, so the test costs a few array passes.
+"""
+
+import math
+import numpy as np
+
+# Largest number of (band, bin) cells; the bins are coarsened beyond it
+MAX_CELLS = 4000000
+
+
+def plane_gradients(planes):
+    """
+    Largest along-track and cross-track slopes of a set of planes
+
+    :param planes: Sequence of plane constants [A, B, C]
+    :return: Tuple (gx, gy)
+    """
+    planes = np.asarray(planes, dtype=np.float64).reshape(-1, 3)
+    if len(planes) == 0:
+        return 0.0, 0.0
+    return float(np.abs(planes[:, 0]).max()), float(np.abs(planes[:, 1]).max())
+
+
+def dominance_filter(x, y, heights, planes, band_width=50.0, bin_length=100.0, valid=None):
+    """
+    Flag the obstacles that are not dominated by a taller nearby obstacle
+
+    :param x: Array of threshold-relative x coordinates
+    :param y: Array of threshold-relative y coordinates
+    :param heights: Obstacle heights (same reference as the planes)
+    :param planes: Sequence of plane constants [A, B, C] of the surface
+    :param band_width: Width of the cross-track bands (meters of |y|)
+    :param bin_length: Length of the along-track bins (meters)
+    :param valid: Optional mask of the obstacles allowed to dominate others
+        (e.g. those known to lie inside the surface); all if None
+    :return: Boolean array, True for obstacles that must be evaluated
+    """
+    x = np.asarray(x, dtype=np.float64)
+    abs_y = np.abs(np.asarray(y, dtype=np.float64))
+    heights = np.asarray(heights, dtype=np.float64)
+    n = len(x)
+    finite = np.isfinite(x) & np.isfinite(abs_y) & np.isfinite(heights)
+    keep = np.ones(n, dtype=bool)
+    dominators = finite if valid is None else finite & np.asarray(valid, dtype=bool)
+    if n == 0 or not dominators.any():
+        return keep
+
+    gx, gy = plane_gradients(planes)
+    x0 = float(x[finite].min())
+    n_bins = int(math.floor((float(x[finite].max()) - x0) / bin_length)) + 1
+    n_bands = int(math.floor(float(abs_y[finite].max()) / band_width)) + 1
+    while n_bins * n_bands > MAX_CELLS:
+        bin_length *= 2.0
+        band_width *= 2.0
+        n_bins = int(math.floor((float(x[finite].max()) - x0) / bin_length)) + 1
+        n_bands = int(math.floor(float(abs_y[finite].max()) / band_width)) + 1
+
+    idx = np.flatnonzero(finite)
+    bins = np.minimum(((x[idx] - x0) // bin_length).astype(np.int64), n_bins - 1)
+    bands = np.minimum((abs_y[idx] // band_width).astype(np.int64), n_bands - 1)
+
+    # Highest dominator per cell
+    hmax = np.full((n_bands, n_bins), -np.inf)
+    dom = dominators[idx]
+    np.maximum.at(hmax, (bands[dom], bins[dom]), heights[idx][dom])
+
+    left = x0 + np.arange(n_bins) * bin_length
+    right = left + bin_length
+
+    # A in an earlier bin: h_A - gx*(x_B - x_A) >= (hmax + gx*left) - gx*x_B
+    forward = np.maximum.accumulate(hmax + gx * left, axis=1)
+    forward = np.concatenate([np.full((n_bands, 1), -np.inf), forward[:, :-1]], axis=1)
+    # A in a later bin: h_A - gx*(x_A - x_B) >= (hmax - gx*right) + gx*x_B
+    backward = np.maximum.accumulate((hmax - gx * right)[:, ::-1], axis=1)[:, ::-1]
+    backward = np.concatenate([backward[:, 1:], np.full((n_bands, 1), -np.inf)], axis=1)
+    # A in the same bin: at most one bin length apart
+    same = hmax - gx * bin_length
+
+    xb = x[idx]
+    bound = np.maximum.reduce([
+        forward[bands, bins] - gx * xb,
+        backward[bands, bins] + gx * xb,
+        same[bands, bins]
+    ])
+    # Within a band |y| differs by at most one band width
+    keep[idx] = ~(bound - gy * band_width > heights[idx])
+    return keep
+
+
+def evaluate_dominant(evaluate, x, y, heights, planes, band_width=50.0, bin_length=100.0):
+    """
+    Evaluate only the obstacles that can control the surface
+
+    A first pass prunes with every obstacle as a potential dominator. The
+    survivors are evaluated, and a second pass then only lets obstacles
+    found inside the surface dominate; obstacles it keeps that were pruned
+    before are evaluated too. Every obstacle left out is therefore
+    dominated by an evaluated obstacle inside the surface.
+
+    :param evaluate: Callable idx -> evaluation dictionary for the obstacles
+        ``idx`` (with 'surface_height', 'controlling', 'penetration' and
+        'inside' arrays), e.g. a closure over ``surfaces.evaluate_planes``
+    :param x: Array of threshold-relative x coordinates
+    :param y: Array of threshold-relative y coordinates
+    :param heights: Obstacle heights (same reference as the planes)
+    :param planes: Sequence of plane constants [A, B, C] of the surface
+    :param band_width: Width of the cross-track bands (meters of |y|)
+    :param bin_length: Length of the along-track bins (meters)
+    :return: Tuple (evaluation, stats): the evaluation covers all obstacles
+        with NaN heights/penetrations, controlling -1 and inside False for
+        the pruned ones; stats has 'total', 'evaluated', 'pruned' and
+        'ratio' (pruned fraction)
+    """
+    n = len(x)
+    first = dominance_filter(x, y, heights, planes, band_width, bin_length)
+    idx = np.flatnonzero(first)
+
+    evaluation = {
+        'surface_height': np.full(n, np.nan),
+        'controlling': np.full(n, -1, dtype=np.int64),
+        'penetration': np.full(n, np.nan),
+        'inside': np.zeros(n, dtype=bool)
+    }
+
+    def merge(indices):
+        if indices.size == 0:
+            return
+        partial = evaluate(indices)
+        for key in evaluation:
+            evaluation[key][indices] = partial[key]
+
+    merge(idx)
+    valid = evaluation['inside'] & np.isfinite(evaluation['penetration'])
+    second = dominance_filter(x, y, heights, planes, band_width, bin_length, valid=valid)
+    merge(np.flatnonzero(second & ~first))
+
+    evaluated = int(np.count_nonzero(first | second))
+    stats = {
+        'total': n,
+        'evaluated': evaluated,
+        'pruned': n - evaluated,
+        'ratio': (n - evaluated) / n if n else 0.0
+    }
+    return evaluation, stats
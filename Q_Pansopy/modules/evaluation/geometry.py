@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Vectorized Planar Geometry
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Vectorized Geometry
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+Point-in-polygon tests over NumPy coordinate arrays. Polygons are given as
+a list of parts, each part a list of rings (exterior first, then holes) and
+each ring an (N, 2) array of vertices.
+"""
+
+import numpy as np
+
+
+def points_in_rings(x, y, rings):
+    """
+    Even-odd point-in-polygon test for one polygon part
+
+    The loop runs over the ring edges only; every edge is tested against
+    all points at once, so the cost per point is a few array operations.
+
+    :param x: Array of point X coordinates
+    :param y: Array of point Y coordinates
+    :param rings: List of (N, 2) vertex arrays, exterior ring first
+    :return: Boolean array, True where the point is inside the part
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    inside = np.zeros(x.shape, dtype=bool)
+
+    for ring in rings:
+        ring = np.asarray(ring, dtype=np.float64)[:, :2]
+        x1 = ring[:, 0]
+        y1 = ring[:, 1]
+        x2 = np.roll(x1, -1)
+        y2 = np.roll(y1, -1)
+        for xi, yi, xj, yj in zip(x1, y1, x2, y2):
+            if yi == yj:
+                continue
+            crosses = (yi > y) != (yj > y)
+            x_cross = xi + (y - yi) * ((xj - xi) / (yj - yi))
+            inside ^= crosses & (x < x_cross)
+
+    return inside
+
+
+def polygon_bounds(parts):
+    """
+    Bounding box of a polygon given as parts of rings
+
+    :param parts: List of parts, each a list of (N, 2) ring arrays
+    :return: Tuple (xmin, ymin, xmax, ymax)
+    """
+    exteriors = np.vstack([np.asarray(part[0], dtype=np.float64)[:, :2] for part in parts])
+    xmin, ymin = exteriors.min(axis=0)
+    xmax, ymax = exteriors.max(axis=0)
+    return float(xmin), float(ymin), float(xmax), float(ymax)
+
+
+def points_in_polygon(x, y, parts):
+    """
+    Test points against a (multi)polygon with a bounding box pre-filter
+
+    :param x: Array of point X coordinates
+    :param y: Array of point Y coordinates
+    :param parts: List of parts, each a list of (N, 2) ring arrays
+    :return: Boolean array, True where the point is inside any part
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    inside = np.zeros(x.shape, dtype=bool)
+
+    for part in parts:
+        xmin, ymin, xmax, ymax = polygon_bounds([part])
+        candidates = np.flatnonzero((x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax))
+        if candidates.size == 0:
+            continue
+        hits = points_in_rings(x[candidates], y[candidates], part)
+        inside[candidates[hits]] = True
+
+    return inside
+
+
+def distance_to_boundary(x, y, parts):
+    """
+    Distance from points to the nearest ring edge of a polygon
+
+    As in ``points_in_rings`` the loop runs over the edges, each edge
+    against all points at once.
+
+    :param x: Array of point X coordinates
+    :param y: Array of point Y coordinates
+    :param parts: List of parts, each a list of (N, 2) ring arrays
+    :return: Float64 array of distances (inf for a polygon without edges)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    squared = np.full(x.shape, np.inf)
+
+    for part in parts:
+        for ring in part:
+            ring = np.asarray(ring, dtype=np.float64)[:, :2]
+            for (xi, yi), (xj, yj) in zip(ring, np.roll(ring, -1, axis=0)):
+                dx, dy = xj - xi, yj - yi
+                length = dx * dx + dy * dy
+                t = 0.0 if length == 0 else np.clip(((x - xi) * dx + (y - yi) * dy) / length, 0.0, 1.0)
+                np.minimum(squared, (x - xi - t * dx) ** 2 + (y - yi - t * dy) ** 2, out=squared)
+
+    return np.sqrt(squared)
+
+
+def points_near_polygon(x, y, parts, radius):
+    """
+    Test points against a (multi)polygon grown by a radius
+
+    A point is kept when it is inside the polygon or its disc of the given
+    radius reaches the boundary.
+
+    :param x: Array of point X coordinates
+    :param y: Array of point Y coordinates
+    :param parts: List of parts, each a list of (N, 2) ring arrays
+    :param radius: Radius, scalar or one per point
+    :return: Boolean array, True where the point or its disc touches the
+        polygon
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), x.shape)
+    near = np.zeros(x.shape, dtype=bool)
+    if x.size == 0:
+        return near
+
+    grow = float(radius.max())
+    xmin, ymin, xmax, ymax = polygon_bounds(parts)
+    candidates = np.flatnonzero((x >= xmin - grow) & (x <= xmax + grow) & (y >= ymin - grow) & (y <= ymax + grow))
+    if candidates.size == 0:
+        return near
+    cx, cy = x[candidates], y[candidates]
+    hits = points_in_rings_parts(cx, cy, parts)
+    rest = np.flatnonzero(~hits)
+    if rest.size:
+        hits[rest] = distance_to_boundary(cx[rest], cy[rest], parts) <= radius[candidates[rest]]
+    near[candidates[hits]] = True
+    return near
+
+
+def _str_order(bounds, node_capacity):
+    """Sort-Tile-Recursive order of boxes: x slices, then y within a slice"""
+    n = len(bounds)
+    cx = 0.5 * (bounds[:, 0] + bounds[:, 2])
+    cy = 0.5 * (bounds[:, 1] + bounds[:, 3])
+    n_nodes = int(np.ceil(n / node_capacity))
+    slice_size = int(np.ceil(np.sqrt(n_nodes))) * node_capacity
+
+    by_x = np.argsort(cx, kind='stable')
+    order = np.empty(n, dtype=np.int64)
+    for start in range(0, n, slice_size):
+        chunk = by_x[start:start + slice_size]
+        order[start:start + len(chunk)] = chunk[np.argsort(cy[chunk], kind='stable')]
+    return order
+
+
+def build_str_tree(bounds, node_capacity=16):
+    """
+    Build a packed STR R-tree over bounding boxes
+
+    The tree is stored as flat arrays: level 0 holds the item boxes in
+    packed order, every upper level holds the boxes of consecutive groups
+    of ``node_capacity`` children of the level below.
+
+    :param bounds: Array (N, 4) of boxes [xmin, ymin, xmax, ymax]
+    :param node_capacity: Number of children per node
+    :return: Dictionary with 'order' (item index of each level 0 entry),
+        'levels' (list of (K, 4) box arrays, leaves first) and 'capacity'
+    """
+    bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+    if len(bounds) == 0:
+        return {'order': np.zeros(0, dtype=np.int64), 'levels': [bounds], 'capacity': node_capacity}
+
+    order = _str_order(bounds, node_capacity)
+    level = bounds[order]
+    levels = [level]
+    while len(level) > node_capacity:
+        starts = np.arange(0, len(level), node_capacity)
+        level = np.column_stack([
+            np.minimum.reduceat(level[:, 0], starts),
+            np.minimum.reduceat(level[:, 1], starts),
+            np.maximum.reduceat(level[:, 2], starts),
+            np.maximum.reduceat(level[:, 3], starts)
+        ])
+        levels.append(level)
+
+    return {'order': order, 'levels': levels, 'capacity': node_capacity}
+
+
+def _boxes_contain(boxes, x, y):
+    return (x >= boxes[:, 0]) & (x <= boxes[:, 2]) & (y >= boxes[:, 1]) & (y <= boxes[:, 3])
+
+
+def query_str_tree(tree, x, y):
+    """
+    Find every (point, item) pair whose item box contains the point
+
+    All points descend the tree together: at each level the candidate
+    (point, node) pairs are expanded to the node children and filtered with
+    array operations.
+
+    :param tree: Tree returned by ``build_str_tree``
+    :param x: Array of point X coordinates
+    :param y: Array of point Y coordinates
+    :return: Tuple (point_index, item_index) of int64 arrays
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    levels = tree['levels']
+    capacity = tree['capacity']
+    if len(levels[0]) == 0 or len(x) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    # Root level: every point against every top node
+    top = levels[-1]
+    points = np.repeat(np.arange(len(x), dtype=np.int64), len(top))
+    nodes = np.tile(np.arange(len(top), dtype=np.int64), len(x))
+    keep = _boxes_contain(top[nodes], x[points], y[points])
+    points, nodes = points[keep], nodes[keep]
+
+    for level in reversed(levels[:-1]):
+        first = nodes * capacity
+        counts = np.minimum(capacity, len(level) - first)
+        total = int(counts.sum())
+        offsets = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+        points = np.repeat(points, counts)
+        nodes = np.repeat(first, counts) + offsets
+        keep = _boxes_contain(level[nodes], x[points], y[points])
+        points, nodes = points[keep], nodes[keep]
+
+    return points, tree['order'][nodes]
+
+
+def points_in_rings_parts(x, y, parts):
+    """
+    Test points against all parts of a polygon without bounding box filter
+
+    :param x: Array of point X coordinates
+    :param y: Array of point Y coordinates
+    :param parts: List of parts, each a list of (N, 2) ring arrays
+    :return: Boolean array
+    """
+    inside = np.zeros(np.shape(x), dtype=bool)
+    for part in parts:
+        inside |= points_in_rings(x, y, part)
+    return inside
+
+
+def points_in_polygons(x, y, polygons, tree=None):
+    """
+    Assign points to every polygon that contains them in one bulk query
+
+    Candidate pairs come from an STR tree over the polygon bounding boxes;
+    each polygon then tests only its own candidates.
+
+    :param x: Array of point X coordinates
+    :param y: Array of point Y coordinates
+    :param polygons: List of polygons, each a list of parts of (N, 2) rings
+    :param tree: Optional tree from ``build_str_tree`` over the polygon
+        bounds, to reuse between calls
+    :return: Tuple (point_index, polygon_index) of int64 arrays sorted by
+        point index
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if tree is None:
+        tree = build_str_tree([polygon_bounds(parts) for parts in polygons])
+
+    points, items = query_str_tree(tree, x, y)
+    if points.size == 0:
+        return points, items
+
+    by_item = np.argsort(items, kind='stable')
+    points, items = points[by_item], items[by_item]
+    boundaries = np.flatnonzero(np.diff(items)) + 1
+    keep = np.zeros(points.shape, dtype=bool)
+    for start, stop in zip(np.r_[0, boundaries], np.r_[boundaries, len(items)]):
+        candidates = points[start:stop]
+        keep[start:stop] = points_in_rings_parts(x[candidates], y[candidates], polygons[items[start]])
+
+    points, items = points[keep], items[keep]
+    by_point = np.lexsort((items, points))
+    return points[by_point], items[by_point]
+
@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Incremental Obstacle Evaluation
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Incremental Evaluation
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+Evaluation store for obstacle datasets reissued every AIRAC cycle.
+
+Every obstacle gets two 64-bit hashes computed with array operations: an
+identity hash of its id (which obstacle it is) and a content hash of its
+position, elevation and accuracies (what was evaluated). The result of an
+obstacle only depends on its content and on the surface, so the store keeps
+one file per surface parameter hash and dataset with the content hashes and
+results of the last evaluated version of that dataset. A new version reuses
+every result whose content hash is stored and evaluates the rest; the
+identity hashes give the added / removed / changed report. Different
+datasets evaluated against the same surface never share a file, so each one
+is compared with its own previous version.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+STORE_VERSION = 2
+
+# Per-obstacle evaluation arrays kept in the store
+RESULT_COLUMNS = ('surface_height', 'controlling', 'penetration', 'inside')
+
+# Content is compared at millimetre resolution
+CONTENT_RESOLUTION = 1e-3
+
+
+def _mix(h):
+    """splitmix64 finalizer on a uint64 array (wrapping arithmetic)"""
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def _combine(h, values):
+    return _mix(h ^ (values + np.uint64(0x9E3779B97F4A7C15)))
+
+
+def _quantized(values):
+    """Round to CONTENT_RESOLUTION and reinterpret as uint64, NaN stays distinct"""
+    values = np.asarray(values, dtype=np.float64)
+    q = np.round(np.where(np.isnan(values), 0.0, values) / CONTENT_RESOLUTION).astype(np.int64)
+    q = np.where(np.isnan(values), np.iinfo(np.int64).min, q)
+    return q.view(np.uint64)
+
+
+def content_hashes(x, y, elev, *extra):
+    """
+    Hash of what is evaluated for every obstacle
+
+    :param x: Array of X coordinates
+    :param y: Array of Y coordinates
+    :param elev: Array of elevations
+    :param extra: Further arrays that change the result (e.g. accuracies)
+    :return: uint64 array
+    """
+    with np.errstate(over='ignore'):
+        h = _mix(_quantized(x))
+        for values in (y, elev) + extra:
+            h = _combine(h, _quantized(values))
+    return h
+
+
+def identity_hashes(ids):
+    """
+    Hash of the identity of every obstacle
+
+    String ids are hashed code point by code point over their own length,
+    so the hash of an id does not depend on the other ids of the dataset;
+    repeated ids (e.g. the points of a densified line) are told apart by
+    their occurrence number.
+
+    :param ids: Array of string or integer ids
+    :return: uint64 array
+    """
+    ids = np.asarray(ids)
+    n = len(ids)
+    with np.errstate(over='ignore'):
+        if ids.dtype.kind in 'US':
+            text = ids.astype('U')
+            lengths = np.char.str_len(text)
+            codes = np.ascontiguousarray(text).view(np.uint32).reshape(n, -1)
+            h = np.full(n, np.uint64(0x243F6A8885A308D3))
+            for position, column in enumerate(codes.T):
+                h = np.where(position < lengths, _combine(h, column.astype(np.uint64)), h)
+            h = _combine(h, lengths.astype(np.uint64))
+        else:
+            h = _mix(ids.astype(np.int64).view(np.uint64))
+
+        order = np.argsort(h, kind='stable')
+        sorted_h = h[order]
+        starts = np.r_[0, np.flatnonzero(sorted_h[1:] != sorted_h[:-1]) + 1]
+        occurrence = np.arange(n) - np.repeat(starts, np.diff(np.r_[starts, n]))
+        if occurrence.any():
+            repeated = np.empty(n, dtype=np.uint64)
+            repeated[order] = occurrence.astype(np.uint64)
+            h = np.where(repeated > 0, _combine(h, repeated), h)
+    return h
+
+
+def surface_hash(planes, **params):
+    """
+    Key of everything besides the obstacles that the results depend on
+
+    :param planes: Sequence of plane constants [A, B, C]
+    :param params: Other inputs (threshold position and elevation, bearing,
+        CRS, top heights, accuracy settings...), JSON serializable
+    :return: Hexadecimal key
+    """
+    description = {
+        'version': STORE_VERSION,
+        'planes': np.round(np.asarray(planes, dtype=np.float64), 12).tolist(),
+        'params': params
+    }
+    text = json.dumps(description, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def store_key(surface_key, dataset_key=None):
+    """
+    Key of the stored results of one dataset against one surface
+
+    :param surface_key: Key from ``surface_hash``
+    :param dataset_key: Identity of the obstacle dataset (source URI or a
+        name kept across its versions), None for the surface key alone
+    :return: Key used as the store file name
+    """
+    if dataset_key is None:
+        return surface_key
+    dataset = hashlib.sha1(str(dataset_key).encode('utf-8')).hexdigest()[:16]
+    return f'{surface_key}_{dataset}'
+
+
+def default_store_dir():
+    """Directory used when no store directory is given"""
+    return os.path.join(os.path.expanduser('~'), '.qpansopy', 'evaluation_store')
+
+
+def load_results(surface_key, store_dir=None):
+    """
+    Read the stored results of a surface
+
+    :param surface_key: Key from ``surface_hash`` or ``store_key``
+    :param store_dir: Store directory (``default_store_dir()`` if None)
+    :return: Dictionary with 'id', 'identity', 'content' and the result
+        columns, or None when nothing is stored
+    """
+    path = os.path.join(store_dir or default_store_dir(), f'{surface_key}.npz')
+    if not os.path.isfile(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            stored = {key: data[key] for key in data.files}
+    except (OSError, ValueError):
+        return None
+    if any(key not in stored for key in ('id', 'identity', 'content') + RESULT_COLUMNS):
+        return None
+    return stored
+
+
+def save_results(surface_key, ids, identity, content, evaluation, store_dir=None):
+    """
+    Replace the stored results of a surface atomically
+
+    :param surface_key: Key from ``surface_hash`` or ``store_key``
+    :param ids: Obstacle ids (written to change reports)
+    :param identity: Identity hashes
+    :param content: Content hashes
+    :param evaluation: Dictionary with the RESULT_COLUMNS arrays
+    :param store_dir: Store directory (``default_store_dir()`` if None)
+    :return: Path of the store file
+    """
+    store_dir = store_dir or default_store_dir()
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, f'{surface_key}.npz')
+    arrays = {column: np.asarray(evaluation[column]) for column in RESULT_COLUMNS}
+
+    fd, staging = tempfile.mkstemp(prefix='.tmp_', suffix='.npz', dir=store_dir)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, id=np.asarray(ids).astype('U'), identity=identity, content=content, **arrays)
+        os.replace(staging, path)
+    except Exception:
+        if os.path.exists(staging):
+            os.remove(staging)
+        raise
+    return path
+
+
+def _lookup(keys, values):
+    """Position of every value in keys (-1 when missing)"""
+    keys = np.asarray(keys, dtype=np.uint64)
+    values = np.asarray(values, dtype=np.uint64)
+    if len(keys) == 0:
+        return np.full(len(values), -1, dtype=np.int64)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    pos = np.minimum(np.searchsorted(sorted_keys, values), len(keys) - 1)
+    return np.where(sorted_keys[pos] == values, order[pos], -1)
+
+
+def diff_obstacles(old_identity, old_content, new_identity, new_content):
+    """
+    Compare two versions of an obstacle dataset
+
+    :param old_identity: Identity hashes of the previous version
+    :param old_content: Content hashes of the previous version
+    :param new_identity: Identity hashes of the new version
+    :param new_content: Content hashes of the new version
+    :return: Dictionary with 'previous' (position of every new obstacle in
+        the old version, -1 if added) and int64 index arrays 'added',
+        'changed', 'unchanged' (into the new version) and 'removed' (into
+        the old version)
+    """
+    previous = _lookup(old_identity, new_identity)
+    known = previous >= 0
+    same = np.zeros(len(previous), dtype=bool)
+    same[known] = np.asarray(old_content)[previous[known]] == np.asarray(new_content)[known]
+    kept = np.zeros(len(old_identity), dtype=bool)
+    kept[previous[known]] = True
+    return {
+        'previous': previous,
+        'added': np.flatnonzero(~known),
+        'changed': np.flatnonzero(known & ~same),
+        'unchanged': np.flatnonzero(same),
+        'removed': np.flatnonzero(~kept)
+    }
+
+
+def evaluate_incremental(evaluate, ids, content, surface_key, store_dir=None, dataset_key=None):
+    """
+    Evaluate a dataset reusing the stored results of unchanged obstacles
+
+    :param evaluate: Callable taking an index array and returning the
+        evaluation dictionary of those obstacles
+    :param ids: Obstacle ids
+    :param content: Content hashes from ``content_hashes``
+    :param surface_key: Key from ``surface_hash``
+    :param store_dir: Store directory (``default_store_dir()`` if None)
+    :param dataset_key: Identity of the dataset, see ``store_key``; the
+        results of other datasets against the same surface are neither
+        reused nor replaced
+    :return: Tuple (evaluation, report): the full evaluation and a
+        dictionary with the ``diff_obstacles`` arrays, 'reused' and
+        'evaluated' counts and the 'stored' results of the old version
+    """
+    ids = np.asarray(ids)
+    content = np.asarray(content, dtype=np.uint64)
+    identity = identity_hashes(ids)
+    n = len(ids)
+
+    key = store_key(surface_key, dataset_key)
+    stored = load_results(key, store_dir)
+    if stored is None:
+        stored = {'id': np.zeros(0, dtype='U1'), 'identity': np.zeros(0, dtype=np.uint64),
+                  'content': np.zeros(0, dtype=np.uint64)}
+        stored.update({column: np.zeros(0) for column in RESULT_COLUMNS})
+
+    # Results depend on the content only, whatever the obstacle is called
+    source = _lookup(stored['content'], content)
+    missing = np.flatnonzero(source < 0)
+
+    evaluation = {
+        'surface_height': np.full(n, np.nan),
+        'controlling': np.full(n, -1, dtype=np.int64),
+        'penetration': np.full(n, np.nan),
+        'inside': np.zeros(n, dtype=bool)
+    }
+    hits = source >= 0
+    for column in RESULT_COLUMNS:
+        evaluation[column][hits] = stored[column][source[hits]]
+    if missing.size:
+        fresh = evaluate(missing)
+        for column in RESULT_COLUMNS:
+            evaluation[column][missing] = fresh[column]
+
+    save_results(key, ids, identity, content, evaluation, store_dir)
+
+    report = diff_obstacles(stored['identity'], stored['content'], identity, content)
+    report['reused'] = int(hits.sum())
+    report['evaluated'] = int(missing.size)
+    report['stored'] = stored
+    return evaluation, report
+
+
+def _max_penetration_by_id(keys, ids, penetration, inside):
+    """Largest penetration inside of the obstacles of every key, None if none"""
+    ids = np.asarray(ids).astype('U')
+    worst = np.full(len(keys), -np.inf)
+    if len(keys) and len(ids):
+        pos = np.minimum(np.searchsorted(keys, ids), len(keys) - 1)
+        valid = (keys[pos] == ids) & np.asarray(inside, dtype=bool) & ~np.isnan(penetration)
+        np.maximum.at(worst, pos[valid], np.asarray(penetration, dtype=np.float64)[valid])
+    return [float(value) if np.isfinite(value) else None for value in worst]
+
+
+def change_report_rows(report, ids, evaluation, by_feature=False):
+    """
+    Rows of the change report: one per added, changed or removed obstacle
+
+    With by_feature the points of densified line and polygon obstacles,
+    which share the id of their feature, are reported as one row per
+    feature: added or removed when the feature is new or gone, changed
+    otherwise, with the largest penetration of all its points.
+
+    :param report: Report from ``evaluate_incremental``
+    :param ids: Obstacle ids of the new version
+    :param evaluation: Evaluation of the new version
+    :param by_feature: Report one row per id instead of one per obstacle
+    :return: List of dictionaries with 'id', 'change', 'old_penetration',
+        'new_penetration' and 'status' (new / cleared / still / none)
+    """
+    stored = report['stored']
+    ids = np.asarray(ids)
+
+    def penetration(values, inside, i):
+        return float(values[i]) if inside[i] and not np.isnan(values[i]) else None
+
+    rows = []
+    if by_feature:
+        new_ids = ids.astype('U')
+        old_ids = np.asarray(stored['id']).astype('U')
+        touched = np.concatenate([new_ids[report['added']], new_ids[report['changed']],
+                                  old_ids[report['removed']]])
+        keys = np.unique(touched)
+        old = _max_penetration_by_id(keys, old_ids, stored['penetration'], stored['inside'])
+        new = _max_penetration_by_id(keys, new_ids, evaluation['penetration'], evaluation['inside'])
+        in_old = np.isin(keys, old_ids)
+        in_new = np.isin(keys, new_ids)
+        for k, key in enumerate(keys.tolist()):
+            change = 'changed' if in_old[k] and in_new[k] else ('added' if in_new[k] else 'removed')
+            rows.append({'id': key, 'change': change, 'old_penetration': old[k], 'new_penetration': new[k]})
+    else:
+        for change in ('added', 'changed'):
+            for i in report[change].tolist():
+                j = int(report['previous'][i])
+                rows.append({
+                    'id': str(ids[i]),
+                    'change': change,
+                    'old_penetration': penetration(stored['penetration'], stored['inside'], j) if j >= 0 else None,
+                    'new_penetration': penetration(evaluation['penetration'], evaluation['inside'], i)
+                })
+        for j in report['removed'].tolist():
+            rows.append({
+                'id': str(stored['id'][j]),
+                'change': 'removed',
+                'old_penetration': penetration(stored['penetration'], stored['inside'], j),
+                'new_penetration': None
+            })
+
+    for row in rows:
+        before = row['old_penetration'] is not None and row['old_penetration'] > 0
+        after = row['new_penetration'] is not None and row['new_penetration'] > 0
+        row['status'] = {(False, True): 'new', (True, False): 'cleared', (True, True): 'still'}.get(
+            (before, after), 'none')
+    return rows
+
+
+def write_change_report(path, rows):
+    """
+    Write change report rows to a CSV file
+
+    :param path: Output CSV path
+    :param rows: Rows from ``change_report_rows``
+    :return: The path
+    """
+    fields = ['id', 'change', 'old_penetration', 'new_penetration', 'status']
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({
+                key: (f'{value:.2f}' if isinstance(value, float) else ('' if value is None else value))
+                for key, value in row.items()
+            })
+    return path
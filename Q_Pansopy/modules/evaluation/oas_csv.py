@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+OAS CSV Constants
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - OAS CSV Constants
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+OAS constants exported by the OAS software as CSV.
+
+The file is parsed once per content: constants and template points are
+kept in memory by (SHA-256 of the file, ILS extension height, template
+height), and the hash of a path is only recomputed when its size or mtime
+changes. Both caches keep the most recently used entries only.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+
+from .oas_geometry import oas_intersections
+
+# Height of the upper template intersections (C', D', D0', E'), meters
+TEMPLATE_HEIGHT = 300
+
+REQUIRED_PLANES = ('W plane', 'X plane', 'Y plane', 'Z plane')
+
+# The template coordinates that follow this header are not parsed
+STOP_SECTION = "---OAS Template coordinates -m(meters)"
+
+# Parsed and solved constants by (content hash, extension height, template height)
+_CONSTANTS_CACHE = OrderedDict()
+MAX_CACHED_CONSTANTS = 16
+# Content hash of every CSV path, valid while its size and mtime are unchanged
+_CSV_HASHES = OrderedDict()
+MAX_CACHED_HASHES = 64
+
+
+def parse_csv_constants(lines):
+    """
+    Parse the sections and W, X, Y, Z plane constants of an OAS CSV export
+
+    :param lines: Iterable of text lines
+    :return: Dictionary by section, the planes in data["OAS constants"]
+    """
+    data = {}
+    current_section = None
+    plane_constants = {}
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        # Stop processing when we reach the template coordinates section
+        if line.startswith('---') and line.strip() == STOP_SECTION:
+            break
+
+        # Detect section headers
+        if line.startswith('---'):
+            current_section = line.strip('- \t\n')
+            data[current_section] = {}
+            continue
+
+        # Parse data lines
+        if '\t' in line:
+            parts = [p.strip().rstrip(',') for p in line.split('\t') if p.strip()]
+        else:
+            parts = [p.strip().rstrip(',') for p in re.split(r',|\s{2,}', line) if p.strip()]
+
+        if len(parts) == 2:
+            key, value = parts
+        elif len(parts) > 2:
+            key = ' '.join(parts[:-1])
+            value = parts[-1]
+        else:
+            continue
+
+        key = key.strip().rstrip(',')
+
+        # Try to convert value to float
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+
+        # Handle OAS constants section specially
+        if current_section and current_section == "OAS constants":
+            match = re.fullmatch(r'([WXYZ])([ABC])', key)
+            if match:
+                plane, coeff = match.groups()
+                plane_key = f"{plane} plane"
+                if plane_key not in plane_constants:
+                    plane_constants[plane_key] = [None, None, None]
+                index = "ABC".index(coeff)
+                plane_constants[plane_key][index] = value
+                continue
+
+        # Store in current section
+        if current_section:
+            data[current_section][key] = value
+
+    # Merge plane constants into data
+    if "OAS constants" in data:
+        data["OAS constants"].update(plane_constants)
+    else:
+        data["OAS constants"] = plane_constants
+    return data
+
+
+def csv_content_hash(csv_path):
+    """
+    SHA-256 of a CSV file, only re-read when its size or mtime changes
+
+    :param csv_path: Path to the CSV file
+    :return: Hex digest of the file content
+    """
+    stat = os.stat(csv_path)
+    cached = _CSV_HASHES.get(csv_path)
+    if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        _CSV_HASHES.move_to_end(csv_path)
+        return cached[2]
+    with open(csv_path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    _CSV_HASHES[csv_path] = (stat.st_size, stat.st_mtime_ns, digest)
+    _CSV_HASHES.move_to_end(csv_path)
+    while len(_CSV_HASHES) > MAX_CACHED_HASHES:
+        _CSV_HASHES.popitem(last=False)
+    return digest
+
+
+def export_constants_json(data, json_path):
+    """
+    Write structured OAS constants (as loaded by ``load_csv_constants``) to JSON
+
+    :param data: Dictionary with structured data
+    :param json_path: Output path
+    :return: The output path
+    """
+    with open(json_path, 'w', encoding='utf-8') as out_f:
+        json.dump(data, out_f, indent=2)
+    return json_path
+
+
+def solve_template_points(data, ILS_extension_height, template_height=TEMPLATE_HEIGHT):
+    """
+    Calculate the template and extended intersections of the W, X, Y and Z planes
+
+    C (W-X), D (X-Y) and E (Y-Z) are solved at once at the ground, the
+    template height and the ILS extension height.
+
+    :param data: Dictionary with the planes in data["OAS constants"]
+    :param ILS_extension_height: ILS extension height in meters
+    :param template_height: Height of the upper template points in meters
+    :return: ``data`` with 'OAS_template', 'OAS_extended' and
+        'individual_planes'
+    :raises ValueError: If a plane is missing or an intersection fails
+    """
+    constants = data["OAS constants"]
+    missing_planes = [p for p in REQUIRED_PLANES if p not in constants or None in constants[p]]
+    if missing_planes:
+        raise ValueError(f"Missing plane constants for: {', '.join(missing_planes)}")
+    planes = [constants[p] for p in REQUIRED_PLANES]
+
+    levels = [0, template_height, ILS_extension_height]
+    solved = oas_intersections(planes, levels, mirrored=False).reshape(3, 3)
+
+    def point(name, level):
+        row = solved["CDE".index(name), level]
+        if not row['valid']:
+            return None
+        return (round(float(row['x']), 12), round(float(row['y']), 12), levels[level])
+
+    lower = {"C": point("C", 0), "D": point("D", 0), "E": point("E", 0)}
+    template = {**lower, "C'": point("C", 1), "D'": point("D", 1), "D0'": point("D", 1), "E'": point("E", 1)}
+    # E' is always at the template height
+    extended = {**lower, "C'": point("C", 2), "D'": point("D", 2), "D0'": point("D", 1), "E'": point("E", 1)}
+    if None in template.values() or None in extended.values():
+        raise ValueError("Some plane intersections could not be calculated")
+
+    data["OAS_template"] = template
+    data["OAS_extended"] = extended
+    data["individual_planes"] = dict(zip("WXYZ", planes))
+    return data
+
+
+def load_csv_constants(csv_path, ILS_extension_height, template_height=TEMPLATE_HEIGHT, parameters=None,
+                       export_json=False):
+    """
+    Load OAS constants from a CSV file and calculate the intersections
+
+    Repeated loads of the same content with the same heights neither parse
+    nor solve again; a changed file (content, size or mtime) is read again.
+
+    :param csv_path: Path to the CSV file
+    :param ILS_extension_height: ILS extension height in meters
+    :param template_height: Height of the upper template points in meters
+    :param parameters: Dictionary recorded as data['used_parameters']
+    :param export_json: Write the structured data to <csv>_processed.json
+        for debugging
+    :return: Tuple (data, reused, json_path): a copy of the structured
+        data, whether it came from the cache and the debug file path (None
+        unless ``export_json``)
+    :raises ValueError: If a plane is missing or an intersection fails
+    """
+    key = (csv_content_hash(csv_path), float(ILS_extension_height), float(template_height))
+    cached = _CONSTANTS_CACHE.get(key)
+    reused = cached is not None
+    if reused:
+        _CONSTANTS_CACHE.move_to_end(key)
+    else:
+        with open(csv_path, 'r', encoding='utf-8-sig') as f:
+            cached = solve_template_points(parse_csv_constants(f), ILS_extension_height, template_height)
+        _CONSTANTS_CACHE[key] = cached
+        while len(_CONSTANTS_CACHE) > MAX_CACHED_CONSTANTS:
+            _CONSTANTS_CACHE.popitem(last=False)
+
+    data = copy.deepcopy(cached)
+    if parameters is not None:
+        data["used_parameters"] = parameters
+
+    json_path = None
+    if export_json:
+        json_path = export_constants_json(data, os.path.splitext(csv_path)[0] + "_processed.json")
+    return data, reused, json_path
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+OAS Geometry
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - OAS Geometry
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+Batched intersections of the OAS planes z = A*x + B*|y| + C.
+
+Two planes and a height give the 2x2 system A1*x + B1*y = h - C1,
+A2*x + B2*y = h - C2. Every (plane pair, height) system is stacked into
+one (N, 2, 2) array and solved with a single ``np.linalg.solve`` call.
+The mirrored point (y < 0) of each solution is the same point with y
+negated, since the planes only depend on |y|.
+"""
+
+import numpy as np
+
+# Adjacent OAS planes and the name of their intersection
+OAS_PAIRS = (('C', 'W', 'X'), ('D', 'X', 'Y'), ('E', 'Y', 'Z'))
+PLANE_INDEX = {'W': 0, 'X': 1, 'Y': 2, 'Z': 3}
+
+INTERSECTION_DTYPE = np.dtype([
+    ('point', 'U2'),
+    ('height', 'f8'),
+    ('side', 'i1'),
+    ('x', 'f8'),
+    ('y', 'f8'),
+    ('z', 'f8'),
+    ('valid', '?')
+])
+
+
+def solve_plane_pairs(planes1, planes2, heights):
+    """
+    Intersection points of plane pairs at heights, all in one solve
+
+    Singular systems (parallel planes or a horizontal plane) give NaN
+    coordinates and valid False instead of raising.
+
+    :param planes1: Array (..., 3) of first plane constants [A, B, C]
+    :param planes2: Array (..., 3) of second plane constants [A, B, C]
+    :param heights: Array of target heights
+    :return: Tuple (x, y, valid) arrays of the broadcast shape
+    """
+    planes1 = np.asarray(planes1, dtype=np.float64)
+    planes2 = np.asarray(planes2, dtype=np.float64)
+    heights = np.asarray(heights, dtype=np.float64)
+    shape = np.broadcast_shapes(planes1.shape[:-1], planes2.shape[:-1], heights.shape)
+    planes1 = np.broadcast_to(planes1, shape + (3,)).reshape(-1, 3)
+    planes2 = np.broadcast_to(planes2, shape + (3,)).reshape(-1, 3)
+    heights = np.broadcast_to(heights, shape).reshape(-1)
+
+    matrix = np.stack([planes1[:, :2], planes2[:, :2]], axis=1)
+    rhs = np.stack([heights - planes1[:, 2], heights - planes2[:, 2]], axis=1)
+
+    flat1 = (planes1[:, 0] == 0) & (planes1[:, 1] == 0)
+    flat2 = (planes2[:, 0] == 0) & (planes2[:, 1] == 0)
+    det = matrix[:, 0, 0] * matrix[:, 1, 1] - matrix[:, 0, 1] * matrix[:, 1, 0]
+    scale = np.abs(matrix).reshape(-1, 4).max(axis=1)
+    valid = ~flat1 & ~flat2 & (np.abs(det) > 1e-12 * np.maximum(scale, 1e-300) ** 2)
+
+    # Identity for the singular systems keeps the batched solve well defined
+    matrix[~valid] = np.eye(2)
+    solution = np.linalg.solve(matrix, rhs[:, :, np.newaxis])[:, :, 0]
+    solution[~valid] = np.nan
+    return solution[:, 0].reshape(shape), solution[:, 1].reshape(shape), valid.reshape(shape)
+
+
+def oas_intersections(planes, heights, pairs=OAS_PAIRS, mirrored=True):
+    """
+    Intersections of adjacent OAS planes at every height
+
+    :param planes: Plane constants of W, X, Y and Z, an array (4, 3) or a
+        dictionary {'W': [A, B, C], ...}
+    :param heights: Sequence of H target heights above threshold
+    :param pairs: Sequence of (point name, plane, plane) tuples
+    :param mirrored: Also return the mirrored points (side -1, y negated)
+    :return: Structured array (INTERSECTION_DTYPE) ordered by pair, height
+        and side, len(pairs) * H rows (twice that when mirrored)
+    """
+    if isinstance(planes, dict):
+        planes = [planes[name] for name in ('W', 'X', 'Y', 'Z')]
+    planes = np.asarray(planes, dtype=np.float64)
+    heights = np.atleast_1d(np.asarray(heights, dtype=np.float64))
+
+    first = planes[[PLANE_INDEX[pair[1]] for pair in pairs]][:, np.newaxis, :]
+    second = planes[[PLANE_INDEX[pair[2]] for pair in pairs]][:, np.newaxis, :]
+    x, y, valid = solve_plane_pairs(first, second, heights[np.newaxis, :])
+
+    sides = np.array([1, -1] if mirrored else [1], dtype=np.int8)
+    shape = (len(pairs), len(heights), len(sides))
+    result = np.empty(int(np.prod(shape)), dtype=INTERSECTION_DTYPE)
+    result['point'] = np.broadcast_to(np.array([pair[0] for pair in pairs])[:, None, None], shape).ravel()
+    result['height'] = np.broadcast_to(heights[None, :, None], shape).ravel()
+    result['side'] = np.broadcast_to(sides[None, None, :], shape).ravel()
+    result['x'] = np.broadcast_to(x[:, :, None], shape).ravel()
+    result['y'] = (y[:, :, None] * sides[None, None, :]).ravel()
+    result['z'] = result['height']
+    result['valid'] = np.broadcast_to(valid[:, :, None], shape).ravel()
+    return result
+
+
+# Contour segment of every plane: (plane, side, start point, end point),
+# points as (intersection, side). Each segment ends on the adjacent planes.
+CONTOUR_SEGMENTS = (
+    ('W', 0, ('C', -1), ('C', 1)),
+    ('X', 1, ('C', 1), ('D', 1)),
+    ('X', -1, ('D', -1), ('C', -1)),
+    ('Y', 1, ('D', 1), ('E', 1)),
+    ('Y', -1, ('E', -1), ('D', -1)),
+    ('Z', 0, ('E', 1), ('E', -1))
+)
+
+CONTOUR_DTYPE = np.dtype([
+    ('plane', 'U1'),
+    ('side', 'i1'),
+    ('height', 'f8'),
+    ('x0', 'f8'),
+    ('y0', 'f8'),
+    ('x1', 'f8'),
+    ('y1', 'f8')
+])
+
+
+def oas_contours(planes, heights, top_heights=300.0):
+    """
+    Height contours of the OAS, one straight segment per plane and side
+
+    At height h the contour of a plane is the line A*x + B*|y| + C = h,
+    clipped at its intersections with the adjacent planes. Segments of a
+    plane above its top height, or hidden below another plane (the OAS is
+    the highest plane at every point), are dropped.
+
+    :param planes: Plane constants of W, X, Y and Z, an array (4, 3) or a
+        dictionary {'W': [A, B, C], ...}
+    :param heights: Sequence of H contour heights above threshold
+    :param top_heights: Upper limit of W, X, Y and Z, scalar or one per plane
+    :return: Structured array (CONTOUR_DTYPE) ordered by height and plane
+    """
+    if isinstance(planes, dict):
+        planes = [planes[name] for name in ('W', 'X', 'Y', 'Z')]
+    planes = np.asarray(planes, dtype=np.float64)
+    heights = np.atleast_1d(np.asarray(heights, dtype=np.float64))
+    tops = np.broadcast_to(np.asarray(top_heights, dtype=np.float64), (4,))
+
+    points = oas_intersections(planes, heights).reshape(len(OAS_PAIRS), len(heights), 2)
+    names = [pair[0] for pair in OAS_PAIRS]
+
+    def corner(spec):
+        return points[names.index(spec[0]), :, 0 if spec[1] == 1 else 1]
+
+    starts = np.stack([corner(segment[2]) for segment in CONTOUR_SEGMENTS], axis=1)
+    ends = np.stack([corner(segment[3]) for segment in CONTOUR_SEGMENTS], axis=1)
+    plane_index = np.array([PLANE_INDEX[segment[0]] for segment in CONTOUR_SEGMENTS])
+
+    # Midpoint must lie on the OAS, i.e. its plane is the highest there
+    mid_x = 0.5 * (starts['x'] + ends['x'])
+    mid_y = np.abs(0.5 * (starts['y'] + ends['y']))
+    plane_z = (planes[:, 0, None, None] * mid_x + planes[:, 1, None, None] * mid_y + planes[:, 2, None, None])
+    tolerance = 1e-6 * np.maximum(1.0, np.abs(heights))[:, None]
+    keep = (starts['valid'] & ends['valid'] &
+            (heights[:, None] <= tops[plane_index][None, :]) &
+            (np.nanmax(plane_z, axis=0) <= heights[:, None] + tolerance))
+
+    rows, columns = np.nonzero(keep)
+    result = np.empty(len(rows), dtype=CONTOUR_DTYPE)
+    result['plane'] = np.array([segment[0] for segment in CONTOUR_SEGMENTS])[columns]
+    result['side'] = np.array([segment[1] for segment in CONTOUR_SEGMENTS], dtype=np.int8)[columns]
+    result['height'] = heights[rows]
+    result['x0'] = starts['x'][rows, columns]
+    result['y0'] = starts['y'][rows, columns]
+    result['x1'] = ends['x'][rows, columns]
+    result['y1'] = ends['y'][rows, columns]
+    return result
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Obstacle Index Cache
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Obstacle Index Cache
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+Persistent point index for obstacle datasets.
+
+The obstacles are stored column by column in packed STR order (points
+close together are close in the arrays) together with the upper levels of
+the packed R-tree. Every array is saved as a .npy file so a cached index is
+opened with mmap without parsing anything. A cache entry is keyed by the
+source file path, its modification time and size, the CRS of the stored
+coordinates and the elevation field.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .geometry import build_str_tree
+
+CACHE_VERSION = 1
+
+# Columnar arrays of an obstacle index, all in packed order
+INDEX_COLUMNS = ('fid', 'x', 'y', 'elev')
+
+
+def default_cache_dir():
+    """Directory used when no cache directory is given"""
+    return os.path.join(os.path.expanduser('~'), '.qpansopy', 'obstacle_index')
+
+
+def source_signature(source_path, crs_authid, elevation_field='elev', subset=''):
+    """
+    Describe the version of an obstacle file that an index was built from
+
+    :param source_path: Path of the obstacle file
+    :param crs_authid: Authority id of the indexed coordinates
+    :param elevation_field: Name of the elevation attribute
+    :param subset: Provider subset string (filter) of the layer
+    :return: Dictionary signature, or None when the source is not a file
+        (memory or database layers are never cached)
+    """
+    if not source_path or not os.path.isfile(source_path):
+        return None
+    stat = os.stat(source_path)
+    return {
+        'version': CACHE_VERSION,
+        'path': os.path.normcase(os.path.abspath(source_path)),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'crs': crs_authid,
+        'elevation_field': elevation_field,
+        'subset': subset or ''
+    }
+
+
+def cache_key(signature):
+    """Stable hexadecimal key of a signature"""
+    text = json.dumps(signature, sort_keys=True)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def build_obstacle_index(fid, x, y, elev, node_capacity=64):
+    """
+    Build a packed point index over obstacle arrays
+
+    :param fid: Array of feature ids
+    :param x: Array of X coordinates
+    :param y: Array of Y coordinates
+    :param elev: Array of elevations
+    :param node_capacity: Number of points per leaf node
+    :return: Dictionary with the 'fid', 'x', 'y', 'elev' arrays in packed
+        order, 'levels' (node boxes, leaf nodes first) and 'capacity'
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    tree = build_str_tree(np.column_stack([x, y, x, y]), node_capacity)
+    order = tree['order']
+    return {
+        'fid': np.asarray(fid, dtype=np.int64)[order],
+        'x': x[order],
+        'y': y[order],
+        'elev': np.asarray(elev, dtype=np.float64)[order],
+        # Level 0 would repeat the coordinates, the points themselves are the leaves
+        'levels': tree['levels'][1:],
+        'capacity': node_capacity
+    }
+
+
+def query_obstacle_index(index, xmin, ymin, xmax, ymax):
+    """
+    Find the obstacles inside a rectangle
+
+    :param index: Index from ``build_obstacle_index`` or ``load_obstacle_index``
+    :param xmin: Minimum X of the rectangle
+    :param ymin: Minimum Y of the rectangle
+    :param xmax: Maximum X of the rectangle
+    :param ymax: Maximum Y of the rectangle
+    :return: Sorted int64 array of positions in the index arrays
+    """
+    x = index['x']
+    y = index['y']
+    n = len(x)
+    capacity = index['capacity']
+    levels = index['levels']
+
+    if not levels:
+        positions = np.arange(n, dtype=np.int64)
+    else:
+        nodes = np.arange(len(levels[-1]), dtype=np.int64)
+        for depth in range(len(levels) - 1, -1, -1):
+            boxes = np.asarray(levels[depth])[nodes]
+            keep = ((boxes[:, 0] <= xmax) & (boxes[:, 2] >= xmin) &
+                    (boxes[:, 1] <= ymax) & (boxes[:, 3] >= ymin))
+            nodes = nodes[keep]
+            size = len(levels[depth - 1]) if depth > 0 else n
+            first = nodes * capacity
+            counts = np.minimum(capacity, size - first)
+            offsets = np.arange(int(counts.sum()), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+            nodes = np.repeat(first, counts) + offsets
+        positions = nodes
+
+    px = np.asarray(x[positions])
+    py = np.asarray(y[positions])
+    inside = (px >= xmin) & (px <= xmax) & (py >= ymin) & (py <= ymax)
+    return positions[inside]
+
+
+def save_obstacle_index(index, signature, cache_dir=None):
+    """
+    Write an index to the cache, replacing any previous entry atomically
+
+    :param index: Index from ``build_obstacle_index``
+    :param signature: Signature from ``source_signature``
+    :param cache_dir: Cache directory (``default_cache_dir()`` if None)
+    :return: Path of the cache entry
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+    entry = os.path.join(cache_dir, cache_key(signature))
+
+    staging = tempfile.mkdtemp(prefix='.tmp_', dir=cache_dir)
+    try:
+        for column in INDEX_COLUMNS:
+            np.save(os.path.join(staging, f'{column}.npy'), np.ascontiguousarray(index[column]))
+        for depth, level in enumerate(index['levels']):
+            np.save(os.path.join(staging, f'level_{depth}.npy'), np.ascontiguousarray(level))
+        meta = {
+            'signature': signature,
+            'capacity': index['capacity'],
+            'levels': len(index['levels']),
+            'count': int(len(index['x']))
+        }
+        with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+        if os.path.isdir(entry):
+            shutil.rmtree(entry, ignore_errors=True)
+        os.replace(staging, entry)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return entry
+
+
+def load_obstacle_index(signature, cache_dir=None):
+    """
+    Open a cached index with memory-mapped arrays
+
+    :param signature: Signature from ``source_signature``
+    :param cache_dir: Cache directory (``default_cache_dir()`` if None)
+    :return: Index dictionary, or None when there is no valid entry
+    """
+    if signature is None:
+        return None
+    entry = os.path.join(cache_dir or default_cache_dir(), cache_key(signature))
+    meta_path = os.path.join(entry, 'meta.json')
+    if not os.path.isfile(meta_path):
+        return None
+
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('signature') != signature:
+            return None
+        index = {
+            column: np.load(os.path.join(entry, f'{column}.npy'), mmap_mode='r')
+            for column in INDEX_COLUMNS
+        }
+        index['levels'] = [
+            np.load(os.path.join(entry, f'level_{depth}.npy'), mmap_mode='r')
+            for depth in range(meta['levels'])
+        ]
+        index['capacity'] = meta['capacity']
+    except (OSError, ValueError, KeyError):
+        return None
+
+    if any(len(index[column]) != meta['count'] for column in INDEX_COLUMNS):
+        return None
+    return index
+
+
+def clear_obstacle_cache(cache_dir=None):
+    """Remove every cached obstacle index"""
+    cache_dir = cache_dir or default_cache_dir()
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Obstacle File Reader
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Obstacle File Reader
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+Columnar reading of obstacle files without QGIS.
+
+CSV/eTOD text files and GeoPackage point tables are read straight into
+NumPy structured arrays of ``OBSTACLE_DTYPE``, chunk by chunk, so files
+larger than memory can be streamed. Columns are found by name using
+``COLUMN_ALIASES``; coordinates may be decimal or eTOD style DMS values
+such as ``334512.30S``.
+"""
+
+import csv
+import math
+import os
+import re
+import sqlite3
+import struct
+from contextlib import closing
+
+import numpy as np
+
+# One obstacle per row; accuracies are NaN when unknown
+OBSTACLE_DTYPE = np.dtype([
+    ('id', 'U32'),
+    ('x', 'f8'),
+    ('y', 'f8'),
+    ('elev', 'f8'),
+    ('h_acc', 'f4'),
+    ('v_acc', 'f4'),
+    ('type', 'U32')
+])
+
+# Accepted column names (normalized: lower case, non alphanumerics as '_')
+COLUMN_ALIASES = {
+    'id': ('id', 'obstacle_id', 'obstacle_identifier', 'identifier', 'ident', 'obst_id', 'name', 'fid'),
+    'x': ('x', 'lon', 'long', 'longitude', 'easting', 'east'),
+    'y': ('y', 'lat', 'latitude', 'northing', 'north'),
+    'elev': ('elev', 'elevation', 'elev_m', 'altitude', 'alt', 'z', 'top_elevation'),
+    'h_acc': ('h_acc', 'hacc', 'horizontal_accuracy', 'horizontal_accuracy_m', 'hor_acc'),
+    'v_acc': ('v_acc', 'vacc', 'vertical_accuracy', 'vertical_accuracy_m', 'ver_acc'),
+    'type': ('type', 'obstacle_type', 'obst_type', 'category', 'feature_type')
+}
+
+FEET_TO_METERS = 0.3048
+
+_DMS_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([NSEW])\s*$', re.IGNORECASE)
+
+
+def normalize_column(name):
+    """Normalize a column name for matching against ``COLUMN_ALIASES``"""
+    return re.sub(r'[^a-z0-9]+', '_', str(name).strip().lower()).strip('_')
+
+
+def match_columns(header, columns=None):
+    """
+    Map the obstacle fields to column positions of a header
+
+    :param header: List of column names
+    :param columns: Optional explicit mapping of field -> column name
+    :return: Dictionary field -> column index (missing optional fields are
+        left out)
+    """
+    normalized = [normalize_column(name) for name in header]
+    mapping = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        wanted = [normalize_column(columns[field])] if columns and field in columns else aliases
+        for alias in wanted:
+            if alias in normalized:
+                mapping[field] = normalized.index(alias)
+                break
+    for field in ('x', 'y', 'elev'):
+        if field not in mapping:
+            raise ValueError(f"No column found for '{field}' in {header}")
+    return mapping
+
+
+def parse_dms(text):
+    """
+    Parse an eTOD style coordinate ('DDMMSS.ss' + hemisphere) to degrees
+
+    Latitudes have two degree digits and longitudes three, e.g.
+    ``334512.30S`` or ``0704512.30W``; decimal degrees with a hemisphere
+    letter ('33.75S') are also accepted.
+
+    :param text: Coordinate string
+    :return: Signed decimal degrees, NaN if the text cannot be parsed
+    """
+    match = _DMS_PATTERN.match(str(text))
+    if not match:
+        return math.nan
+    value, hemisphere = match.group(1), match.group(2).upper()
+    integer = value.split('.')[0]
+    deg_digits = 2 if hemisphere in 'NS' else 3
+    if len(integer) == deg_digits + 4:
+        degrees = float(integer[:deg_digits])
+        minutes = float(integer[deg_digits:deg_digits + 2])
+        seconds = float(value[deg_digits + 2:])
+        decimal = degrees + minutes / 60.0 + seconds / 3600.0
+    else:
+        decimal = float(value)
+    return -decimal if hemisphere in 'SW' else decimal
+
+
+def _to_float(values):
+    """Convert a column of strings to floats, falling back to DMS parsing"""
+    try:
+        return np.asarray([float(v) if v not in ('', None) else math.nan for v in values], dtype=np.float64)
+    except (TypeError, ValueError):
+        out = np.empty(len(values), dtype=np.float64)
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                out[i] = parse_dms(v) if v not in ('', None) else math.nan
+        return out
+
+
+def _build_chunk(columns, mapping, n_rows, id_offset, elev_factor):
+    chunk = np.zeros(n_rows, dtype=OBSTACLE_DTYPE)
+    if 'id' in mapping:
+        chunk['id'] = [str(v) for v in columns[mapping['id']]]
+    else:
+        chunk['id'] = np.arange(id_offset, id_offset + n_rows).astype(str)
+    chunk['x'] = _to_float(columns[mapping['x']])
+    chunk['y'] = _to_float(columns[mapping['y']])
+    chunk['elev'] = _to_float(columns[mapping['elev']]) * elev_factor
+    for field in ('h_acc', 'v_acc'):
+        chunk[field] = _to_float(columns[mapping[field]]) * elev_factor if field in mapping else np.nan
+    if 'type' in mapping:
+        chunk['type'] = [str(v) if v is not None else '' for v in columns[mapping['type']]]
+    return chunk
+
+
+def _finish_chunk(chunk, transform):
+    if transform is not None and len(chunk):
+        chunk['x'], chunk['y'] = transform(chunk['x'], chunk['y'])
+    return chunk
+
+
+def iter_csv_obstacles(path, chunk_size=500000, columns=None, delimiter=None, elev_unit='m',
+                       transform=None, encoding='utf-8-sig'):
+    """
+    Stream a CSV/eTOD text file as structured obstacle arrays
+
+    :param path: Path of the text file
+    :param chunk_size: Maximum number of rows per chunk
+    :param columns: Optional explicit mapping of field -> column name
+    :param delimiter: Field delimiter (sniffed from the header if None)
+    :param elev_unit: 'm' or 'ft' for elevation and accuracy columns
+    :param transform: Optional callable (x, y) -> (x, y) applied to every
+        chunk, e.g. a bulk reprojection
+    :param encoding: File encoding
+    :return: Generator of arrays with dtype ``OBSTACLE_DTYPE``
+    """
+    elev_factor = FEET_TO_METERS if elev_unit == 'ft' else 1.0
+    with open(path, 'r', newline='', encoding=encoding) as f:
+        if delimiter is None:
+            sample = f.readline()
+            f.seek(0)
+            try:
+                delimiter = csv.Sniffer().sniff(sample, delimiters=',;\t|').delimiter
+            except csv.Error:
+                delimiter = ','
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader)
+        mapping = match_columns(header, columns)
+        width = len(header)
+
+        offset = 0
+        while True:
+            rows = []
+            for row in reader:
+                if not row or not any(cell.strip() for cell in row):
+                    continue
+                rows.append(row + [''] * (width - len(row)))
+                if len(rows) == chunk_size:
+                    break
+            if not rows:
+                return
+            cols = list(zip(*rows))
+            yield _finish_chunk(_build_chunk(cols, mapping, len(rows), offset, elev_factor), transform)
+            offset += len(rows)
+
+
+def gpkg_point_xy(blob):
+    """
+    Decode the X, Y (and Z) of a GeoPackage point geometry blob
+
+    :param blob: GeoPackage binary geometry (header + WKB)
+    :return: Tuple (x, y, z) with NaN for missing values
+    """
+    if blob is None or len(blob) < 8 or blob[:2] != b'GP':
+        return math.nan, math.nan, math.nan
+    flags = blob[3]
+    if flags & 0x10:
+        # Empty geometry
+        return math.nan, math.nan, math.nan
+    envelope = {0: 0, 1: 32, 2: 48, 3: 48, 4: 64}.get((flags >> 1) & 0x07, 0)
+    wkb = memoryview(blob)[8 + envelope:]
+    order = '<' if wkb[0] == 1 else '>'
+    geom_type = struct.unpack_from(order + 'I', wkb, 1)[0]
+    # ISO WKB encodes Z/M as thousands (1001 = Point Z), EWKB as high bits
+    code = geom_type & 0x0FFFFFFF
+    has_z = bool(geom_type & 0x80000000) or code // 1000 in (1, 3)
+    base = code % 1000
+    offset = 5
+    if base == 4:
+        # Multipoint: first point
+        offset += 4 + 5
+    elif base != 1:
+        return math.nan, math.nan, math.nan
+    if has_z:
+        return struct.unpack_from(order + 'ddd', wkb, offset)
+    x, y = struct.unpack_from(order + 'dd', wkb, offset)
+    return x, y, math.nan
+
+
+def gpkg_tables(path):
+    """
+    List the feature tables of a GeoPackage with their geometry column and CRS
+
+    :param path: Path of the GeoPackage
+    :return: Dictionary table -> (geometry column, 'AUTHORITY:CODE' or None)
+    """
+    with closing(sqlite3.connect(f'file:{path}?mode=ro', uri=True)) as con:
+        rows = con.execute(
+            "SELECT g.table_name, g.column_name, s.organization, s.organization_coordsys_id "
+            "FROM gpkg_geometry_columns g LEFT JOIN gpkg_spatial_ref_sys s ON g.srs_id = s.srs_id"
+        ).fetchall()
+    return {
+        table: (column, f"{org.upper()}:{code}" if org and code is not None and code >= 0 else None)
+        for table, column, org, code in rows
+    }
+
+
+def iter_gpkg_obstacles(path, table=None, chunk_size=500000, columns=None, elev_unit='m',
+                        transform=None):
+    """
+    Stream a GeoPackage point table as structured obstacle arrays
+
+    Coordinates come from the geometry column; when the table has no
+    elevation column the geometry Z is used.
+
+    :param path: Path of the GeoPackage
+    :param table: Feature table name (the first table if None)
+    :param chunk_size: Maximum number of rows per chunk
+    :param columns: Optional explicit mapping of field -> column name
+    :param elev_unit: 'm' or 'ft' for elevation and accuracy columns
+    :param transform: Optional callable (x, y) -> (x, y) applied per chunk
+    :return: Generator of arrays with dtype ``OBSTACLE_DTYPE``
+    """
+    tables = gpkg_tables(path)
+    if not tables:
+        raise ValueError(f"No feature tables in {path}")
+    table = table or next(iter(tables))
+    geom_column = tables[table][0]
+    elev_factor = FEET_TO_METERS if elev_unit == 'ft' else 1.0
+
+    with closing(sqlite3.connect(f'file:{path}?mode=ro', uri=True)) as con:
+        cursor = con.execute(f'SELECT * FROM "{table}"')
+        header = [d[0] for d in cursor.description]
+        geom_index = header.index(geom_column)
+
+        # x/y always come from the geometry, elevation may come from Z
+        names = header + ['__x', '__y', '__z']
+        wanted = dict(columns or {})
+        wanted.update({'x': '__x', 'y': '__y'})
+        try:
+            match_columns(header + ['__x', '__y'], wanted)
+        except ValueError:
+            wanted['elev'] = '__z'
+        mapping = match_columns(names, wanted)
+
+        offset = 0
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            cols = list(zip(*rows))
+            xyz = list(zip(*[gpkg_point_xy(blob) for blob in cols[geom_index]]))
+            cols.extend(xyz)
+            chunk = _build_chunk(cols, mapping, len(rows), offset, elev_factor)
+            if mapping['elev'] == len(header) + 2:
+                # Geometry Z is not scaled by elev_unit
+                chunk['elev'] = np.asarray(xyz[2], dtype=np.float64)
+            yield _finish_chunk(chunk, transform)
+            offset += len(rows)
+
+
+def iter_obstacles(path, chunk_size=500000, **kwargs):
+    """
+    Stream any supported obstacle file, chosen by extension
+
+    :param path: Path of a .csv/.txt/.tsv or .gpkg file
+    :param chunk_size: Maximum number of rows per chunk
+    :param kwargs: Passed to ``iter_csv_obstacles`` or ``iter_gpkg_obstacles``
+    :return: Generator of arrays with dtype ``OBSTACLE_DTYPE``
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.gpkg':
+        return iter_gpkg_obstacles(path, chunk_size=chunk_size, **kwargs)
+    if extension in ('.csv', '.txt', '.tsv', '.dat'):
+        return iter_csv_obstacles(path, chunk_size=chunk_size, **kwargs)
+    raise ValueError(f"Unsupported obstacle file: {path}")
+
+
+def read_obstacles(path, **kwargs):
+    """
+    Read a whole obstacle file into one structured array
+
+    :param path: Path of a .csv/.txt/.tsv or .gpkg file
+    :param kwargs: Passed to ``iter_obstacles``
+    :return: Array with dtype ``OBSTACLE_DTYPE``
+    """
+    chunks = list(iter_obstacles(path, **kwargs))
+    if not chunks:
+        return np.zeros(0, dtype=OBSTACLE_DTYPE)
+    return np.concatenate(chunks)
+
+
+def obstacle_arrays(obstacles):
+    """
+    Flat arrays of a structured obstacle array, as returned by
+    ``obstacle_layers.read_obstacle_layer`` (row numbers as 'fid')
+
+    :param obstacles: Array with dtype ``OBSTACLE_DTYPE``
+    :return: Dictionary with 'fid', 'x', 'y', 'elev', 'h_acc', 'v_acc',
+        'id' and 'type' arrays
+    """
+    return {
+        'fid': np.arange(len(obstacles), dtype=np.int64),
+        'x': np.ascontiguousarray(obstacles['x'], dtype=np.float64),
+        'y': np.ascontiguousarray(obstacles['y'], dtype=np.float64),
+        'elev': np.ascontiguousarray(obstacles['elev'], dtype=np.float64),
+        'h_acc': np.ascontiguousarray(obstacles['h_acc'], dtype=np.float64),
+        'v_acc': np.ascontiguousarray(obstacles['v_acc'], dtype=np.float64),
+        'id': obstacles['id'],
+        'type': obstacles['type']
+    }
@@ -0,0 +1,970 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Obstacle Layer Access
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Obstacle Layer Access
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+"""
+
+from qgis.core import (
+    QgsProject, QgsVectorLayer, QgsFeature, QgsFeatureRequest, QgsField,
+    QgsGeometry, QgsPointXY, QgsWkbTypes, QgsProviderRegistry,
+    QgsCoordinateReferenceSystem, QgsCoordinateTransform, Qgis
+)
+from qgis.PyQt.QtCore import QVariant
+import json
+import os
+import numpy as np
+
+try:
+    from pyproj import Transformer
+except ImportError:
+    Transformer = None
+
+from ...utils import get_selected_feature
+from .surfaces import parse_constants, runway_frame, evaluate_planes, evaluate_polygon_surfaces
+from .parallel import evaluate_planes_parallel, evaluate_polygon_surfaces_parallel, evaluation_pool
+from .dominance import evaluate_dominant
+from .obstacle_io import OBSTACLE_DTYPE, iter_obstacles, gpkg_tables, obstacle_arrays
+from .densify import densify_lines, densify_polygons, worst_per_owner
+from .incremental import (
+    content_hashes, surface_hash, store_key, evaluate_incremental, change_report_rows, write_change_report
+)
+from .ranking import top_n_by_surface
+from .obstacle_cache import (
+    source_signature, build_obstacle_index, save_obstacle_index, load_obstacle_index
+)
+
+
+def read_obstacle_layer(layer, elevation_field='elev', dest_crs=None, selected_only=False,
+                        extra_fields=None):
+    """
+    Read a point obstacle layer into flat NumPy arrays
+
+    Only the elevation attribute is fetched and coordinates are reprojected
+    by the provider, so the single pass over the layer stays cheap. When the
+    layer has no elevation field the Z value of the geometry is used. With
+    ``elevation_field=None`` only the coordinates are needed and elevations
+    are NaN unless the geometry has Z.
+
+    :param layer: Point layer with obstacles
+    :param elevation_field: Name of the elevation attribute (meters)
+    :param dest_crs: CRS for the returned coordinates (layer CRS if None)
+    :param selected_only: Whether to read only the selected features
+    :param extra_fields: Optional mapping key -> numeric field name of
+        additional arrays to read (missing fields are skipped, NULL is NaN)
+    :return: Dictionary with 'fid', 'x', 'y' and 'elev' arrays, plus one
+        array per extra field found
+    """
+    return next(iter_obstacle_layer(layer, elevation_field, dest_crs, selected_only, extra_fields, None))
+
+
+def _layer_request(layer, elevation_field, dest_crs, extra_fields):
+    """Feature request fetching only the elevation and extra attributes"""
+    idx_elev = layer.fields().indexFromName(elevation_field) if elevation_field else -1
+    has_z = QgsWkbTypes.hasZ(layer.wkbType())
+    if elevation_field and idx_elev == -1 and not has_z:
+        raise ValueError(f"Layer '{layer.name()}' must have an '{elevation_field}' field or Z values")
+
+    extra = {key: layer.fields().indexFromName(name) for key, name in (extra_fields or {}).items()}
+    extra = {key: idx for key, idx in extra.items() if idx != -1}
+
+    request = QgsFeatureRequest()
+    request.setSubsetOfAttributes(([idx_elev] if idx_elev != -1 else []) + list(extra.values()))
+    if dest_crs is not None and dest_crs != layer.crs():
+        request.setDestinationCrs(dest_crs, QgsProject.instance().transformContext())
+    return request, idx_elev, has_z, extra
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def iter_obstacle_layer(layer, elevation_field='elev', dest_crs=None, selected_only=False,
+                        extra_fields=None, chunk_size=500000):
+    """
+    Stream a point obstacle layer as arrays of at most chunk_size features
+
+    The features come from one feature request, so only one chunk is held
+    in memory at a time.
+
+    :param layer: Point layer with obstacles
+    :param elevation_field: Name of the elevation attribute, see
+        ``read_obstacle_layer``
+    :param dest_crs: CRS for the returned coordinates (layer CRS if None)
+    :param selected_only: Whether to read only the selected features
+    :param extra_fields: Optional mapping key -> numeric field name
+    :param chunk_size: Maximum number of features per chunk, None for one
+        chunk
+    :return: Generator of dictionaries as returned by
+        ``read_obstacle_layer`` (at least one, possibly empty)
+    """
+    if QgsWkbTypes.geometryType(layer.wkbType()) != QgsWkbTypes.PointGeometry:
+        raise ValueError(f"Layer '{layer.name()}' is not a point layer")
+    request, idx_elev, has_z, extra = _layer_request(layer, elevation_field, dest_crs, extra_fields)
+    features = layer.getSelectedFeatures(request) if selected_only else layer.getFeatures(request)
+
+    def arrays(fids, xs, ys, elevs, extra_values):
+        result = {
+            'fid': np.asarray(fids, dtype=np.int64),
+            'x': np.asarray(xs, dtype=np.float64),
+            'y': np.asarray(ys, dtype=np.float64),
+            'elev': np.asarray(elevs, dtype=np.float64)
+        }
+        for key, values in extra_values.items():
+            result[key] = np.asarray(values, dtype=np.float64)
+        return result
+
+    fids, xs, ys, elevs = [], [], [], []
+    extra_values = {key: [] for key in extra}
+    yielded = False
+    for feat in features:
+        geom = feat.geometry()
+        if geom.isNull():
+            continue
+        vertex = geom.constGet()
+        if vertex is None:
+            continue
+        # Multipoint obstacles are evaluated at their first part
+        if hasattr(vertex, 'geometryN'):
+            vertex = vertex.geometryN(0)
+        fids.append(feat.id())
+        xs.append(vertex.x())
+        ys.append(vertex.y())
+        if idx_elev != -1:
+            elevs.append(_number(feat.attribute(idx_elev)))
+        elif has_z:
+            elevs.append(vertex.z())
+        else:
+            elevs.append(np.nan)
+        for key, idx in extra.items():
+            extra_values[key].append(_number(feat.attribute(idx)))
+
+        if chunk_size and len(fids) >= chunk_size:
+            yield arrays(fids, xs, ys, elevs, extra_values)
+            yielded = True
+            fids, xs, ys, elevs = [], [], [], []
+            extra_values = {key: [] for key in extra}
+
+    if fids or not yielded:
+        yield arrays(fids, xs, ys, elevs, extra_values)
+
+
+def read_obstacle_geometries(layer, elevation_field='elev', dest_crs=None, spacing=10.0,
+                             selected_only=False, extra_fields=None):
+    """
+    Read a line or polygon obstacle layer as densified points
+
+    Lines (power lines, cranes) are densified along their vertices and
+    polygons (building footprints) along their rings plus an interior
+    lattice, see ``evaluation.densify``. Every point carries the attributes
+    of its feature; without an elevation field lines use their interpolated
+    Z values and polygons the highest Z of the feature.
+
+    :param layer: Line or polygon layer with obstacles
+    :param elevation_field: Name of the elevation attribute (meters)
+    :param dest_crs: CRS for the returned coordinates (layer CRS if None)
+    :param spacing: Densification spacing in map units of dest_crs
+    :param selected_only: Whether to read only the selected features
+    :param extra_fields: Optional mapping key -> numeric field name, see
+        ``read_obstacle_layer``
+    :return: Dictionary of per-point arrays as ``read_obstacle_layer``
+        ('fid' repeats the feature id) plus 'owner' (feature index of every
+        point) and 'feature_count'
+    """
+    return next(iter_obstacle_geometries(layer, elevation_field, dest_crs, spacing, selected_only,
+                                         extra_fields, None))
+
+
+def iter_obstacle_geometries(layer, elevation_field='elev', dest_crs=None, spacing=10.0,
+                             selected_only=False, extra_fields=None, chunk_size=500000):
+    """
+    Stream a line or polygon obstacle layer as densified points
+
+    Chunks hold at most chunk_size features, each with all of its points,
+    so no feature is split and 'owner' indexes the features of the chunk.
+
+    :param layer: Line or polygon layer with obstacles
+    :param elevation_field: Name of the elevation attribute, see
+        ``read_obstacle_geometries``
+    :param dest_crs: CRS for the returned coordinates (layer CRS if None)
+    :param spacing: Densification spacing in map units of dest_crs
+    :param selected_only: Whether to read only the selected features
+    :param extra_fields: Optional mapping key -> numeric field name
+    :param chunk_size: Maximum number of features per chunk, None for one
+        chunk
+    :return: Generator of dictionaries as returned by
+        ``read_obstacle_geometries`` (at least one, possibly empty)
+    """
+    geometry_type = QgsWkbTypes.geometryType(layer.wkbType())
+    if geometry_type not in (QgsWkbTypes.LineGeometry, QgsWkbTypes.PolygonGeometry):
+        raise ValueError(f"Layer '{layer.name()}' is not a line or polygon layer")
+    request, idx_elev, has_z, extra = _layer_request(layer, elevation_field, dest_crs, extra_fields)
+    features = layer.getSelectedFeatures(request) if selected_only else layer.getFeatures(request)
+    is_line = geometry_type == QgsWkbTypes.LineGeometry
+
+    def arrays(fids, elevs, extra_values, lines, line_owner, polygons):
+        if is_line:
+            coords, owner = densify_lines(lines, spacing, line_owner)
+        else:
+            coords, owner = densify_polygons(polygons, spacing)
+
+        fids = np.asarray(fids, dtype=np.int64)
+        elev = np.asarray(elevs, dtype=np.float64)[owner]
+        if is_line and has_z and idx_elev == -1 and len(coords):
+            elev = coords[:, 2]
+
+        result = {
+            'fid': fids[owner],
+            'x': coords[:, 0].copy(),
+            'y': coords[:, 1].copy(),
+            'elev': elev,
+            'owner': owner,
+            'feature_count': len(fids)
+        }
+        for key, values in extra_values.items():
+            result[key] = np.asarray(values, dtype=np.float64)[owner]
+        return result
+
+    fids, elevs = [], []
+    extra_values = {key: [] for key in extra}
+    lines, line_owner, polygons = [], [], []
+    yielded = False
+    for feat in features:
+        geom = feat.geometry()
+        if geom.isNull() or geom.isEmpty():
+            continue
+        owner = len(fids)
+        fids.append(feat.id())
+        elevs.append(_number(feat.attribute(idx_elev)) if idx_elev != -1 else np.nan)
+        for key, idx in extra.items():
+            extra_values[key].append(_number(feat.attribute(idx)))
+
+        z_values = [v.z() for v in geom.vertices()] if has_z and idx_elev == -1 else None
+        if is_line:
+            if z_values is not None:
+                for part in geom.constParts():
+                    lines.append([[p.x(), p.y(), p.z()] for p in part.points()])
+                    line_owner.append(owner)
+            else:
+                for part in (geom.asMultiPolyline() if geom.isMultipart() else [geom.asPolyline()]):
+                    lines.append([[p.x(), p.y()] for p in part])
+                    line_owner.append(owner)
+        else:
+            if z_values is not None:
+                elevs[owner] = max(z_values)
+            polygons.append(polygon_parts(geom))
+
+        if chunk_size and len(fids) >= chunk_size:
+            yield arrays(fids, elevs, extra_values, lines, line_owner, polygons)
+            yielded = True
+            fids, elevs = [], []
+            extra_values = {key: [] for key in extra}
+            lines, line_owner, polygons = [], [], []
+
+    if fids or not yielded:
+        yield arrays(fids, elevs, extra_values, lines, line_owner, polygons)
+
+
+def feature_evaluation(obstacles, evaluation):
+    """
+    Reduce an evaluation of densified obstacles to one row per feature
+
+    Point obstacles are returned unchanged. For line and polygon obstacles
+    (see ``read_obstacle_geometries``) the point with the largest
+    penetration of every feature is kept, so the output layers and counts
+    report features, located at their worst point.
+
+    :param obstacles: Dictionary returned by ``load_obstacles``
+    :param evaluation: Dictionary of per-point evaluation arrays
+    :return: Tuple (obstacles, evaluation) with one entry per feature
+    """
+    if 'owner' not in obstacles:
+        return obstacles, evaluation
+    index, evaluation = worst_per_owner(evaluation, obstacles['owner'], obstacles['feature_count'])
+    n_points = len(obstacles['owner'])
+    reduced = {
+        key: value[index] if isinstance(value, np.ndarray) and value.shape[:1] == (n_points,) else value
+        for key, value in obstacles.items() if key not in ('owner', 'feature_count')
+    }
+    return reduced, evaluation
+
+
+def bulk_transformer(source_crs, dest_crs):
+    """
+    Build a callable that reprojects coordinate arrays
+
+    pyproj transforms whole arrays at once when it is available (it ships
+    with most QGIS installs); otherwise every point goes through
+    QgsCoordinateTransform.
+
+    :param source_crs: QgsCoordinateReferenceSystem of the input coordinates
+    :param dest_crs: QgsCoordinateReferenceSystem of the output coordinates
+    :return: Callable (x, y) -> (x, y) of float64 arrays, or None when both
+        CRS are the same
+    """
+    if source_crs == dest_crs:
+        return None
+
+    if Transformer is not None:
+        transformer = Transformer.from_crs(source_crs.toWkt(), dest_crs.toWkt(), always_xy=True)
+
+        def transform(x, y):
+            tx, ty = transformer.transform(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+            return np.asarray(tx, dtype=np.float64), np.asarray(ty, dtype=np.float64)
+        return transform
+
+    qgs_transform = QgsCoordinateTransform(source_crs, dest_crs, QgsProject.instance())
+
+    def transform(x, y):
+        tx = np.full(len(x), np.nan)
+        ty = np.full(len(y), np.nan)
+        for i, (px, py) in enumerate(zip(np.asarray(x).tolist(), np.asarray(y).tolist())):
+            if px == px and py == py:
+                point = qgs_transform.transform(QgsPointXY(px, py))
+                tx[i], ty[i] = point.x(), point.y()
+        return tx, ty
+    return transform
+
+
+def obstacle_file_crs(path, table=None):
+    """
+    CRS of the coordinates of an obstacle file
+
+    GeoPackage tables carry their own CRS; text files (eTOD) are WGS 84.
+
+    :param path: Path of the obstacle file
+    :param table: GeoPackage table name (the first table if None)
+    :return: QgsCoordinateReferenceSystem
+    """
+    if os.path.splitext(path)[1].lower() == '.gpkg':
+        tables = gpkg_tables(path)
+        authid = tables.get(table or next(iter(tables), None), (None, None))[1]
+        if authid:
+            return QgsCoordinateReferenceSystem(authid)
+    return QgsCoordinateReferenceSystem('EPSG:4326')
+
+
+def iter_obstacle_file(path, dest_crs=None, source_crs=None, chunk_size=500000, **kwargs):
+    """
+    Stream an obstacle file as structured arrays reprojected to dest_crs
+
+    :param path: Path of a CSV/eTOD text file or a GeoPackage
+    :param dest_crs: QgsCoordinateReferenceSystem of the output (the
+        project CRS if None)
+    :param source_crs: CRS of the file coordinates (see ``obstacle_file_crs``)
+    :param chunk_size: Maximum number of rows per chunk
+    :param kwargs: Passed to ``obstacle_io.iter_obstacles``
+    :return: Generator of arrays with dtype ``obstacle_io.OBSTACLE_DTYPE``
+    """
+    dest_crs = dest_crs if dest_crs is not None else QgsProject.instance().crs()
+    source_crs = source_crs if source_crs is not None else obstacle_file_crs(path, kwargs.get('table'))
+    transform = bulk_transformer(source_crs, dest_crs)
+    return iter_obstacles(path, chunk_size=chunk_size, transform=transform, **kwargs)
+
+
+def load_obstacles(source, elevation_field='elev', dest_crs=None, extra_fields=None, spacing=10.0,
+                   **kwargs):
+    """
+    Read obstacles from a layer, an obstacle file or a structured array
+
+    :param source: QgsVectorLayer, path of a CSV/eTOD/GeoPackage file, or
+        array with dtype ``obstacle_io.OBSTACLE_DTYPE`` (already in
+        dest_crs)
+    :param elevation_field: Elevation attribute of a layer source
+    :param dest_crs: CRS for the returned coordinates
+    :param extra_fields: Additional numeric fields of a layer source, see
+        ``read_obstacle_layer``
+    :param spacing: Densification spacing of line and polygon layers, see
+        ``read_obstacle_geometries``
+    :param kwargs: Passed to ``iter_obstacle_file`` for file sources
+    :return: Dictionary with at least 'fid', 'x', 'y' and 'elev' arrays, as
+        returned by ``read_obstacle_layer`` (``read_obstacle_geometries``
+        for line and polygon layers, see ``feature_evaluation``)
+    """
+    if isinstance(source, np.ndarray):
+        if source.dtype != OBSTACLE_DTYPE:
+            raise ValueError("Obstacle arrays must use OBSTACLE_DTYPE")
+        return obstacle_arrays(source)
+    if isinstance(source, str):
+        chunks = list(iter_obstacle_file(source, dest_crs, **kwargs))
+        return obstacle_arrays(np.concatenate(chunks) if chunks else np.zeros(0, dtype=OBSTACLE_DTYPE))
+    if QgsWkbTypes.geometryType(source.wkbType()) != QgsWkbTypes.PointGeometry:
+        return read_obstacle_geometries(source, elevation_field, dest_crs, spacing, extra_fields=extra_fields)
+    return read_obstacle_layer(source, elevation_field, dest_crs, extra_fields=extra_fields)
+
+
+def iter_obstacle_chunks(source, elevation_field='elev', dest_crs=None, chunk_size=500000,
+                         extra_fields=None, spacing=10.0, **kwargs):
+    """
+    Read obstacles chunk by chunk
+
+    Obstacle files are streamed from disk and layers through one feature
+    request, chunk_size features at a time (densified line and polygon
+    features are never split, see ``iter_obstacle_geometries``); arrays
+    are sliced.
+
+    :param source: Obstacle source, see ``load_obstacles``
+    :param elevation_field: Elevation attribute of a layer source
+    :param dest_crs: CRS for the returned coordinates
+    :param chunk_size: Maximum number of obstacles (features for layers)
+        per chunk
+    :param extra_fields: Additional numeric fields of a layer source
+    :param spacing: Densification spacing of line and polygon layers
+    :param kwargs: Passed to ``iter_obstacle_file`` for file sources
+    :return: Generator of dictionaries as returned by ``load_obstacles``,
+        with 'fid' numbered across chunks for file sources
+    """
+    if isinstance(source, str):
+        offset = 0
+        for chunk in iter_obstacle_file(source, dest_crs, chunk_size=chunk_size, **kwargs):
+            obstacles = obstacle_arrays(chunk)
+            obstacles['fid'] += offset
+            offset += len(chunk)
+            yield obstacles
+        return
+
+    if not isinstance(source, np.ndarray):
+        if QgsWkbTypes.geometryType(source.wkbType()) != QgsWkbTypes.PointGeometry:
+            yield from iter_obstacle_geometries(source, elevation_field, dest_crs, spacing,
+                                                extra_fields=extra_fields, chunk_size=chunk_size)
+        else:
+            yield from iter_obstacle_layer(source, elevation_field, dest_crs, extra_fields=extra_fields,
+                                           chunk_size=chunk_size)
+        return
+
+    obstacles = load_obstacles(source)
+    n = len(obstacles['fid'])
+    if n <= chunk_size:
+        yield obstacles
+        return
+    for start in range(0, n, chunk_size):
+        yield {key: value[start:start + chunk_size] for key, value in obstacles.items()}
+
+
+def evaluate_top_n(source, evaluate_chunk, n, elevation_field='elev', dest_crs=None, chunk_size=500000,
+                   extra_fields=None, spacing=10.0, positive_only=False):
+    """
+    Find the n most penetrating obstacles of every surface in bounded memory
+
+    :param source: Obstacle source, see ``load_obstacles``
+    :param evaluate_chunk: Callable taking a chunk of obstacles (see
+        ``iter_obstacle_chunks``) and returning its evaluation dictionary
+    :param n: Number of obstacles kept per surface ('controlling' value)
+    :param elevation_field: Elevation attribute of a layer source
+    :param dest_crs: CRS for the coordinates
+    :param chunk_size: Maximum number of obstacles per chunk
+    :param extra_fields: Additional numeric fields of a layer source
+    :param spacing: Densification spacing of line and polygon layers
+    :param positive_only: Whether to rank only penetrating obstacles
+    :return: Dictionary of winner arrays usable both as obstacles and as
+        evaluation in ``create_evaluation_layer``
+    """
+    def results():
+        for chunk in iter_obstacle_chunks(source, elevation_field, dest_crs, chunk_size, extra_fields, spacing):
+            evaluation = evaluate_chunk(chunk)
+            chunk, evaluation = feature_evaluation(chunk, evaluation)
+            rows = dict(evaluation)
+            rows.update({key: chunk[key] for key in ('fid', 'x', 'y', 'elev', 'id', 'type') if key in chunk})
+            yield rows
+
+    winners = top_n_by_surface(results(), n, positive_only=positive_only)
+    if winners is None:
+        empty = {key: np.zeros(0) for key in ('x', 'y', 'elev', 'surface_height', 'penetration')}
+        empty.update({key: np.zeros(0, dtype=np.int64) for key in ('fid', 'controlling')})
+        empty['inside'] = np.zeros(0, dtype=bool)
+        return empty
+    return winners
+
+
+def obstacle_accuracies(obstacles, params):
+    """
+    Horizontal and vertical accuracy of every obstacle for buffered evaluation
+
+    Per-obstacle values ('h_acc'/'v_acc' arrays, from an obstacle file or
+    the layer fields named by params 'h_acc_field'/'v_acc_field') are used
+    where known; params 'h_accuracy'/'v_accuracy' (meters, default 0) fill
+    the gaps.
+
+    :param obstacles: Dictionary returned by ``load_obstacles``
+    :param params: Evaluation parameters
+    :return: Tuple (h_acc, v_acc) of float64 arrays
+    """
+    n = len(obstacles['x'])
+    values = []
+    for key, default_key in (('h_acc', 'h_accuracy'), ('v_acc', 'v_accuracy')):
+        default = float(params.get(default_key, 0.0) or 0.0)
+        known = obstacles.get(key)
+        if known is None:
+            values.append(np.full(n, default))
+        else:
+            values.append(np.where(np.isnan(known), default, known))
+    return values[0], values[1]
+
+
+def accuracy_fields(params):
+    """Layer fields holding per-obstacle accuracies, for ``load_obstacles``"""
+    return {
+        'h_acc': params.get('h_acc_field', 'h_acc'),
+        'v_acc': params.get('v_acc_field', 'v_acc')
+    }
+
+
+def incremental_evaluation(evaluate, obstacles, heights, radius, surface_key, params, report_name,
+                           dataset_key=None):
+    """
+    Evaluate obstacles through the incremental evaluation store
+
+    Only obstacles whose content (position, height above threshold and
+    accuracy) is not stored for ``surface_key`` and the dataset are passed
+    to ``evaluate``. With params 'output_dir' the change report is written
+    there as CSV.
+
+    :param evaluate: Callable taking an index array, as in the evaluators
+    :param obstacles: Dictionary returned by ``load_obstacles``
+    :param heights: Obstacle heights as evaluated
+    :param radius: Horizontal accuracies as evaluated, or None
+    :param surface_key: Key from ``incremental.surface_hash``
+    :param params: Evaluation parameters ('store_dir', 'output_dir' and
+        'dataset_key', which overrides ``dataset_key``)
+    :param report_name: File name prefix of the change report
+    :param dataset_key: Identity of the obstacle dataset, see
+        ``incremental.store_key``
+    :return: Tuple (evaluation, report) where the report from
+        ``evaluate_incremental`` also has 'rows' and 'path'
+    """
+    ids = obstacles.get('id', obstacles['fid'])
+    extra = (radius,) if radius is not None else ()
+    content = content_hashes(obstacles['x'], obstacles['y'], heights, *extra)
+    dataset_key = params.get('dataset_key') or dataset_key
+    evaluation, report = evaluate_incremental(evaluate, ids, content, surface_key, params.get('store_dir'),
+                                              dataset_key)
+
+    # Densified line and polygon obstacles are reported once per feature
+    report['rows'] = change_report_rows(report, ids, evaluation, by_feature='owner' in obstacles)
+    report['path'] = None
+    output_dir = params.get('output_dir')
+    if output_dir and os.path.isdir(output_dir):
+        name = f"{report_name}_changes_{surface_key[:8]}"
+        if dataset_key is not None:
+            name += f"_{store_key(surface_key, dataset_key)[-8:]}"
+        report['path'] = write_change_report(os.path.join(output_dir, f"{name}.csv"), report['rows'])
+    return evaluation, report
+
+
+def threshold_frame(point_layer, runway_layer, dest_crs, thr_elev=None):
+    """
+    Threshold frame of the stored surface constants in a destination CRS
+
+    Same orientation as the surface generators: local x is positive
+    towards the approach, opposite to the runway direction.
+
+    :param point_layer: Point layer with the threshold point
+    :param runway_layer: Runway layer
+    :param dest_crs: CRS of the frame (the obstacle, DEM or grid CRS)
+    :param thr_elev: Threshold elevation in meters, None to take it from
+        the 'parameters' of every surface layer
+    :return: Dictionary with 'thr_x', 'thr_y', 'bearing' and 'thr_elev'
+    :raises ValueError: If the threshold or runway feature is ambiguous or
+        the runway is not a line
+    """
+    errors = []
+    point_feature = get_selected_feature(point_layer, errors.append)
+    runway_feature = get_selected_feature(runway_layer, errors.append)
+    if errors:
+        raise ValueError(errors[0])
+
+    thr = QgsGeometry(point_feature.geometry())
+    runway = QgsGeometry(runway_feature.geometry())
+    for geom, layer in ((thr, point_layer), (runway, runway_layer)):
+        if layer.crs() != dest_crs:
+            geom.transform(QgsCoordinateTransform(layer.crs(), dest_crs, QgsProject.instance()))
+    vertices = list(runway.vertices())
+    if len(vertices) < 2 or thr.isEmpty():
+        raise ValueError("Invalid runway geometry")
+    thr = thr.asPoint()
+    bearing = QgsPointXY(vertices[0]).azimuth(QgsPointXY(vertices[-1])) + 180
+    return {'thr_x': thr.x(), 'thr_y': thr.y(), 'bearing': bearing, 'thr_elev': thr_elev}
+
+
+def evaluate_obstacle_surfaces(iface, source, surfaces, frame, dest_crs, params, title, label):
+    """
+    Evaluate obstacles against a set of sloping surfaces and write the result
+
+    The flow shared by the surface evaluators: the obstacles are loaded in
+    ``dest_crs``, moved to the threshold frame and evaluated against every
+    plane at once, serially or in a process pool, through the dominance
+    pre-filter or the incremental store when asked; with 'top_n' they are
+    streamed in chunks instead. The result is added to the project as a
+    point layer.
+
+    :param iface: QGIS interface
+    :param source: Obstacle source, see ``load_obstacles``
+    :param surfaces: Dictionary with 'names', 'planes' and 'key' (the
+        surface_hash arguments naming the surfaces, 'surface' also names
+        the change report), and either 'top_heights' (planes bounded by
+        their intersections, see ``surfaces.evaluate_planes``) or
+        'polygons' (plane footprints in ``dest_crs``, see
+        ``surfaces.evaluate_polygon_surfaces``)
+    :param frame: Threshold frame from ``threshold_frame``, 'thr_elev' in
+        meters
+    :param dest_crs: CRS of the obstacles and of the new layer
+    :param params: Evaluation parameters: 'elevation_field',
+        'penetrating_only', 'spacing'; 'workers' > 1 evaluates large
+        inputs in one process pool (see ``parallel.evaluation_pool``) and
+        'prefilter' skips obstacles dominated by taller ones (see
+        ``evaluation.dominance``); 'accuracy' adds the vertical
+        accuracy to every obstacle and tests the lowest point of its
+        horizontal accuracy disc (see ``obstacle_accuracies``), the
+        prefilter is not applied then; 'incremental' reuses the stored
+        results of unchanged obstacles of the same dataset, its source
+        URI or 'dataset_key' when the versions of a dataset are different
+        files (see ``incremental_evaluation``);
+        'top_n' and 'chunk_size' keep only the top_n most penetrating
+        obstacles per surface (see ``evaluate_top_n``)
+    :param title: Start of the layer name, e.g. 'Basic ILS'
+    :param label: The surfaces in the message, e.g. 'the Basic ILS surfaces'
+    :return: Dictionary with 'evaluation_layer' and either 'top_n' or
+        'obstacle_count', 'inside_count', 'penetrating_count', 'obstacles',
+        'evaluation' ('height' is the evaluated height above threshold),
+        'prefilter' and 'incremental'; with the pre-filter the counts and
+        the layer only cover the controlling candidates, the pruned
+        obstacles have NaN penetrations
+    """
+    # One pool for every chunk and pass of this evaluation; its workers
+    # only start with the first call large enough to be run in parallel
+    with evaluation_pool(int(params.get('workers', 1) or 1)) as pool:
+        return _evaluate_obstacle_surfaces(iface, source, surfaces, frame, dest_crs, params, title, label, pool)
+
+
+def _evaluate_obstacle_surfaces(iface, source, surfaces, frame, dest_crs, params, title, label, pool):
+    """``evaluate_obstacle_surfaces`` with a pool from ``evaluation_pool`` (None to run serially)"""
+    elevation_field = params.get('elevation_field', 'elev')
+    penetrating_only = params.get('penetrating_only', True)
+    accuracy = params.get('accuracy', False)
+    extra_fields = accuracy_fields(params) if accuracy else None
+    spacing = float(params.get('spacing', 10.0))
+    planes = surfaces['planes']
+    polygons = surfaces.get('polygons')
+
+    def evaluate_arrays(obstacles):
+        """Heights and evaluation function of loaded obstacles"""
+        x_local, y_local = runway_frame(obstacles['x'], obstacles['y'], frame['thr_x'], frame['thr_y'],
+                                        frame['bearing'])
+        heights = obstacles['elev'] - frame['thr_elev']
+        radius = None
+        if accuracy:
+            radius, v_acc = obstacle_accuracies(obstacles, params)
+            heights = heights + v_acc
+
+        def evaluate(idx):
+            r = None if radius is None else radius[idx]
+            if polygons is None:
+                if pool is not None:
+                    return evaluate_planes_parallel(x_local[idx], y_local[idx], heights[idx], planes,
+                                                    surfaces['top_heights'], radius=r, pool=pool)
+                return evaluate_planes(x_local[idx], y_local[idx], heights[idx], planes, surfaces['top_heights'],
+                                       radius=r)
+            arrays = (obstacles['x'][idx], obstacles['y'][idx], x_local[idx], y_local[idx], heights[idx])
+            if pool is not None:
+                return evaluate_polygon_surfaces_parallel(*arrays, polygons, planes, radius=r, pool=pool)
+            return evaluate_polygon_surfaces(*arrays, polygons, planes, radius=r)
+
+        return x_local, y_local, heights, radius, evaluate
+
+    if params.get('top_n'):
+        top_n = int(params['top_n'])
+
+        def evaluate_chunk(chunk):
+            x_chunk, y_chunk, _, _, evaluate = evaluate_arrays(chunk)
+            evaluation = evaluate(slice(None))
+            evaluation['x_local'] = x_chunk
+            evaluation['y_local'] = y_chunk
+            return evaluation
+
+        winners = evaluate_top_n(source, evaluate_chunk, top_n, elevation_field, dest_crs,
+                                 int(params.get('chunk_size', 500000)), extra_fields, spacing,
+                                 positive_only=penetrating_only)
+        out_layer = create_evaluation_layer(
+            f"{title} - {obstacle_source_name(source)} top {top_n}",
+            dest_crs.authid(), winners, winners, np.ones(len(winners['fid']), dtype=bool), surfaces['names']
+        )
+        QgsProject.instance().addMapLayer(out_layer)
+        iface.messageBar().pushMessage(
+            "QPANSOPY:", f"{len(winners['fid'])} most critical obstacles kept ({top_n} per surface)",
+            level=Qgis.Success
+        )
+        return {'evaluation_layer': out_layer, 'top_n': winners}
+
+    obstacles = load_obstacles(source, elevation_field, dest_crs, extra_fields=extra_fields, spacing=spacing)
+    x_local, y_local, heights, radius, evaluate = evaluate_arrays(obstacles)
+
+    # The dominance bound assumes one surface for all obstacles; with
+    # per-obstacle accuracy discs every obstacle is evaluated. Pruned
+    # results must not be stored, so the incremental mode evaluates fully.
+    prefilter_stats = None
+    incremental = None
+    if params.get('incremental'):
+        surface_key = surface_hash(planes, thr=[frame['thr_x'], frame['thr_y']], bearing=frame['bearing'],
+                                   crs=dest_crs.authid(), **surfaces['key'])
+        report_name = surfaces['key']['surface'].lower().replace(' ', '_')
+        evaluation, incremental = incremental_evaluation(
+            evaluate, obstacles, heights, radius, surface_key, params, report_name,
+            obstacle_source_uri(source)
+        )
+    elif params.get('prefilter') and radius is None:
+        evaluation, prefilter_stats = evaluate_dominant(
+            evaluate, x_local, y_local, heights, planes,
+            float(params.get('band_width', 50.0)), float(params.get('bin_length', 100.0))
+        )
+    else:
+        evaluation = evaluate(slice(None))
+    evaluation['x_local'] = x_local
+    evaluation['y_local'] = y_local
+    evaluation['height'] = heights
+    obstacles, evaluation = feature_evaluation(obstacles, evaluation)
+
+    mask = evaluation['inside'] & ~np.isnan(evaluation['penetration'])
+    if penetrating_only:
+        mask &= evaluation['penetration'] > 0
+
+    # Dominated obstacles are not evaluated: they may penetrate too, but
+    # never more than the obstacle dominating them
+    layer_name = f"{title} - {obstacle_source_name(source)} evaluation"
+    if prefilter_stats:
+        layer_name += " (controlling candidates only)"
+    out_layer = create_evaluation_layer(layer_name, dest_crs.authid(), obstacles, evaluation, mask,
+                                        surfaces['names'])
+    QgsProject.instance().addMapLayer(out_layer)
+
+    penetrating = evaluation['inside'] & (evaluation['penetration'] > 0)
+    message = f"Evaluated {len(obstacles['fid'])} obstacles, {int(penetrating.sum())} penetrate {label}"
+    if prefilter_stats:
+        message = (f"{len(obstacles['fid'])} obstacles, {int(penetrating.sum())} of the "
+                   f"{prefilter_stats['evaluated']} controlling candidates penetrate {label} "
+                   f"({prefilter_stats['ratio']:.1%} pruned as dominated and not reported)")
+    if incremental:
+        message += (f" ({incremental['evaluated']} evaluated, {incremental['reused']} reused; "
+                    f"{len(incremental['added'])} added, {len(incremental['changed'])} changed, "
+                    f"{len(incremental['removed'])} removed)")
+    iface.messageBar().pushMessage("QPANSOPY:", message, level=Qgis.Success)
+
+    return {
+        'evaluation_layer': out_layer,
+        'obstacle_count': len(obstacles['fid']),
+        'inside_count': int(evaluation['inside'].sum()),
+        'penetrating_count': int(penetrating.sum()),
+        'obstacles': obstacles,
+        'evaluation': evaluation,
+        'prefilter': prefilter_stats,
+        'incremental': incremental
+    }
+
+
+def obstacle_source_name(source):
+    """Display name of an obstacle source accepted by ``load_obstacles``"""
+    if isinstance(source, str):
+        return os.path.splitext(os.path.basename(source))[0]
+    if isinstance(source, np.ndarray):
+        return 'obstacles'
+    return source.name()
+
+
+def obstacle_source_uri(source):
+    """Identity of an obstacle source accepted by ``load_obstacles``: its file path or layer source"""
+    if isinstance(source, str):
+        return os.path.abspath(source)
+    if isinstance(source, np.ndarray):
+        return None
+    return source.source()
+
+
+def layer_signature(layer, elevation_field='elev', dest_crs=None):
+    """
+    Cache signature of an obstacle layer, see ``obstacle_cache.source_signature``
+
+    Layers with unsaved edits or that are not backed by a file have no
+    signature and are never cached.
+    """
+    if layer.isModified():
+        return None
+    parts = QgsProviderRegistry.instance().decodeUri(layer.providerType(), layer.source())
+    crs = dest_crs if dest_crs is not None else layer.crs()
+    subset = layer.subsetString()
+    layer_name = parts.get('layerName') or parts.get('layerId')
+    if layer_name:
+        subset = f"{layer_name}|{subset}"
+    return source_signature(parts.get('path'), crs.authid(), elevation_field, subset)
+
+
+def load_obstacle_index_for_layer(layer, elevation_field='elev', dest_crs=None, cache_dir=None):
+    """
+    Get the packed point index of an obstacle layer, from disk when possible
+
+    A cached index of the same file version and CRS is opened with mmap;
+    otherwise the layer is read once with ``read_obstacle_layer``, indexed
+    and written to the cache for the next run.
+
+    :param layer: Point layer with obstacles
+    :param elevation_field: Name of the elevation attribute (meters)
+    :param dest_crs: CRS of the indexed coordinates (layer CRS if None)
+    :param cache_dir: Cache directory (default ``~/.qpansopy/obstacle_index``)
+    :return: Index dictionary (see ``obstacle_cache.build_obstacle_index``)
+        with an extra 'cached' flag
+    """
+    signature = layer_signature(layer, elevation_field, dest_crs)
+    index = load_obstacle_index(signature, cache_dir)
+    if index is not None:
+        index['cached'] = True
+        return index
+
+    obstacles = read_obstacle_layer(layer, elevation_field, dest_crs)
+    index = build_obstacle_index(obstacles['fid'], obstacles['x'], obstacles['y'], obstacles['elev'])
+    if signature is not None:
+        try:
+            save_obstacle_index(index, signature, cache_dir)
+        except OSError:
+            # A read-only cache location only costs the next run a rebuild
+            pass
+    index['cached'] = False
+    return index
+
+
+def create_evaluation_layer(layer_name, crs_authid, obstacles, evaluation, mask, surface_names):
+    """
+    Create a memory layer with the evaluation result for the masked obstacles
+
+    :param layer_name: Name of the new layer
+    :param crs_authid: Authority id of the coordinates in ``obstacles``
+    :param obstacles: Dictionary of arrays returned by ``load_obstacles``;
+        the 'id' and 'type' of obstacle files are written as 'obst_id' and
+        'obst_type' when present
+    :param evaluation: Dictionary of arrays with 'surface_height',
+        'controlling' and 'penetration'; optional 'x_local' and 'y_local'
+    :param mask: Boolean array selecting the obstacles to write
+    :param surface_names: Names indexed by the 'controlling' values, the
+        floor (-1) is reported as 'Ground'
+    :return: The new QgsVectorLayer (not added to the project)
+    """
+    identifiers = [key for key in ('id', 'type') if key in obstacles]
+
+    out_layer = QgsVectorLayer(f"Point?crs={crs_authid}", layer_name, "memory")
+    provider = out_layer.dataProvider()
+    provider.addAttributes(
+        [QgsField('obst_fid', QVariant.LongLong)]
+        + [QgsField(f'obst_{key}', QVariant.String) for key in identifiers]
+        + [
+            QgsField('elev', QVariant.Double, 'double', 10, 2),
+            QgsField('x_local', QVariant.Double, 'double', 12, 2),
+            QgsField('y_local', QVariant.Double, 'double', 12, 2),
+            QgsField('surface', QVariant.String),
+            QgsField('surf_h', QVariant.Double, 'double', 10, 2),
+            QgsField('penetration', QVariant.Double, 'double', 10, 2)
+        ]
+    )
+    out_layer.updateFields()
+
+    indices = np.flatnonzero(mask)
+    x_local = evaluation.get('x_local')
+    y_local = evaluation.get('y_local')
+
+    features = []
+    for i in indices:
+        controlling = int(evaluation['controlling'][i])
+        feat = QgsFeature(out_layer.fields())
+        feat.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(float(obstacles['x'][i]), float(obstacles['y'][i]))))
+        feat.setAttributes(
+            [int(obstacles['fid'][i])]
+            + [str(obstacles[key][i]) for key in identifiers]
+            + [
+                round(float(obstacles['elev'][i]), 2),
+                round(float(x_local[i]), 2) if x_local is not None else None,
+                round(float(y_local[i]), 2) if y_local is not None else None,
+                surface_names[controlling] if controlling >= 0 else 'Ground',
+                round(float(evaluation['surface_height'][i]), 2),
+                round(float(evaluation['penetration'][i]), 2)
+            ]
+        )
+        features.append(feat)
+
+    provider.addFeatures(features)
+    out_layer.updateExtents()
+    return out_layer
+
+
+def polygon_parts(geom):
+    """
+    Convert a polygon geometry to a list of parts of (N, 2) ring arrays
+
+    :param geom: QgsGeometry with a polygon or multipolygon
+    :return: List of parts, each a list of rings (exterior first)
+    """
+    polygons = geom.asMultiPolygon() if geom.isMultipart() else [geom.asPolygon()]
+    return [
+        [np.array([[p.x(), p.y()] for p in ring], dtype=np.float64) for ring in polygon]
+        for polygon in polygons if polygon
+    ]
+
+
+def read_surface_layer(layer, name_field='ILS_surface', constants_field='constants',
+                       dest_crs=None, selected_only=False):
+    """
+    Read the polygons and plane constants of a QPANSOPY surface layer
+
+    Features without a valid '[a,b,c]' constants value are skipped.
+
+    :param layer: PolygonZ layer created by a QPANSOPY surface generator
+    :param name_field: Attribute with the surface name
+    :param constants_field: Attribute with the plane constants
+    :param dest_crs: CRS for the returned rings (layer CRS if None)
+    :param selected_only: Whether to read only the selected features
+    :return: Dictionary with 'fid', 'names', 'planes', 'polygons' lists and
+        'parameters' (decoded JSON of the first feature, if any)
+    """
+    fields = layer.fields()
+    idx_constants = fields.indexFromName(constants_field)
+    if idx_constants == -1:
+        raise ValueError(f"Layer '{layer.name()}' has no '{constants_field}' field")
+    idx_name = fields.indexFromName(name_field)
+    idx_params = fields.indexFromName('parameters')
+
+    request = QgsFeatureRequest()
+    if dest_crs is not None and dest_crs != layer.crs():
+        request.setDestinationCrs(dest_crs, QgsProject.instance().transformContext())
+
+    features = layer.getSelectedFeatures(request) if selected_only else layer.getFeatures(request)
+
+    surfaces = {'fid': [], 'names': [], 'planes': [], 'polygons': [], 'parameters': None}
+    for feat in features:
+        plane = parse_constants(feat.attribute(idx_constants))
+        if plane is None or feat.geometry().isNull():
+            continue
+        surfaces['fid'].append(feat.id())
+        surfaces['names'].append(str(feat.attribute(idx_name)) if idx_name != -1 else str(feat.id()))
+        surfaces['planes'].append(plane)
+        surfaces['polygons'].append(polygon_parts(feat.geometry()))
+        if surfaces['parameters'] is None and idx_params != -1:
+            try:
+                surfaces['parameters'] = json.loads(feat.attribute(idx_params))
+            except (TypeError, ValueError):
+                pass
+
+    return surfaces
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ILS OCA/H Calculation
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - ILS OCA/H
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+OCA/H of a precision approach from the obstacles penetrating the OAS
+(ICAO Doc 8168 Vol II, Part II, Section 1, Chapter 1).
+
+Obstacles are split into approach and missed approach obstacles, missed
+approach obstacles are converted to their equivalent approach height and
+the category height loss margin is added. All categories are computed at
+once: every array has shape (categories, obstacles) by broadcasting.
+
+Coordinates are threshold-relative as elsewhere in this package: x is
+positive before the threshold (towards the FAP), negative after it.
+"""
+
+import math
+
+import numpy as np
+
+# Aircraft categories and their height loss margins (meters)
+CATEGORIES = ('A', 'B', 'C', 'D', 'H')
+HL_RADIO_ALTIMETER = np.array([13.0, 18.0, 22.0, 26.0, 8.0])
+HL_PRESSURE_ALTIMETER = np.array([40.0, 43.0, 46.0, 49.0, 35.0])
+
+# Start of the missed approach surface after the threshold (X_E), meters
+MISSED_APPROACH_ORIGIN = np.array([900.0, 900.0, 900.0, 900.0, 700.0])
+
+
+def height_loss_margins(categories=CATEGORIES, altimeter='radio', aerodrome_elevation=0.0, gp_angle=3.0):
+    """
+    Height loss / altimeter margins of the categories
+
+    The margins grow by 2% of the radio altimeter margin per 300 m of
+    aerodrome elevation above 900 m and by 5% of it per 0.1 degree of
+    glide path angle above 3.2 degrees.
+
+    :param categories: Sequence of category letters
+    :param altimeter: 'radio' or 'pressure'
+    :param aerodrome_elevation: Aerodrome elevation in meters
+    :param gp_angle: Glide path angle in degrees
+    :return: Array of margins in meters, one per category
+    """
+    index = [CATEGORIES.index(category) for category in categories]
+    radio = HL_RADIO_ALTIMETER[index]
+    base = radio if altimeter == 'radio' else HL_PRESSURE_ALTIMETER[index]
+    adjustment = (0.02 * max(0.0, aerodrome_elevation - 900.0) / 300.0 +
+                  0.05 * max(0.0, gp_angle - 3.2) / 0.1)
+    return base + radio * adjustment
+
+
+def classify_missed_approach(x, heights, gp_angle, categories=CATEGORIES, method='distance'):
+    """
+    Tell missed approach obstacles from approach obstacles
+
+    :param x: Array of N threshold-relative x coordinates
+    :param heights: Array of N heights above threshold
+    :param gp_angle: Glide path angle in degrees
+    :param categories: Sequence of C category letters
+    :param method: 'distance' (after X_E) or 'gp_plane' (above the plane
+        parallel to the glide path through X_E)
+    :return: Boolean array (C, N), True for missed approach obstacles
+    """
+    x = np.asarray(x, dtype=np.float64)[np.newaxis, :]
+    heights = np.asarray(heights, dtype=np.float64)[np.newaxis, :]
+    origin = MISSED_APPROACH_ORIGIN[[CATEGORIES.index(c) for c in categories]][:, np.newaxis]
+    if method == 'gp_plane':
+        return heights > (origin + x) * math.tan(math.radians(gp_angle))
+    if method != 'distance':
+        raise ValueError(f"Unknown missed approach classification '{method}'")
+    return np.broadcast_to(x < -origin, (origin.shape[0], x.shape[1]))
+
+
+def equivalent_heights(x, heights, missed, gp_angle, categories=CATEGORIES, missed_gradient=0.025):
+    """
+    Approach height of every obstacle for every category
+
+    Missed approach obstacles of height h_ma are converted with
+    h_a = (h_ma * cot Z + (X_E + x)) / (cot Z + cot theta).
+
+    :param x: Array of N threshold-relative x coordinates
+    :param heights: Array of N heights above threshold
+    :param missed: Boolean array (C, N) from ``classify_missed_approach``
+    :param gp_angle: Glide path angle in degrees
+    :param categories: Sequence of C category letters
+    :param missed_gradient: Missed approach climb gradient (tan Z)
+    :return: Array (C, N) of approach heights
+    """
+    x = np.asarray(x, dtype=np.float64)[np.newaxis, :]
+    heights = np.asarray(heights, dtype=np.float64)[np.newaxis, :]
+    origin = MISSED_APPROACH_ORIGIN[[CATEGORIES.index(c) for c in categories]][:, np.newaxis]
+    cot_z = 1.0 / missed_gradient
+    cot_theta = 1.0 / math.tan(math.radians(gp_angle))
+    converted = (heights * cot_z + (origin + x)) / (cot_z + cot_theta)
+    return np.where(missed, converted, heights)
+
+
+def ils_oca(x, heights, thr_elev, gp_angle=3.0, categories=CATEGORIES, altimeter='radio',
+            aerodrome_elevation=None, missed_gradient=0.025, method='distance'):
+    """
+    OCA/H of every category from the obstacles penetrating the OAS
+
+    :param x: Array of N threshold-relative x coordinates
+    :param heights: Array of N obstacle heights above threshold
+    :param thr_elev: Threshold elevation in meters
+    :param gp_angle: Glide path angle in degrees
+    :param categories: Sequence of C category letters
+    :param altimeter: Height loss margin type, 'radio' or 'pressure'
+    :param aerodrome_elevation: Aerodrome elevation (threshold elevation if
+        None) for the high elevation margin adjustment
+    :param missed_gradient: Missed approach climb gradient (tan Z)
+    :param method: Missed approach classification, see
+        ``classify_missed_approach``
+    :return: Dictionary with per-category arrays 'och', 'oca', 'margin',
+        'controlling' (obstacle index, -1 without obstacles),
+        'controlling_missed' and 'equivalent_height', plus the (C, N)
+        arrays 'missed' and 'approach_height'
+    """
+    x = np.asarray(x, dtype=np.float64)
+    heights = np.asarray(heights, dtype=np.float64)
+    categories = tuple(categories)
+    elevation = thr_elev if aerodrome_elevation is None else aerodrome_elevation
+
+    margin = height_loss_margins(categories, altimeter, elevation, gp_angle)
+    missed = classify_missed_approach(x, heights, gp_angle, categories, method)
+    approach_height = equivalent_heights(x, heights, missed, gp_angle, categories, missed_gradient)
+
+    n_categories = len(categories)
+    controlling = np.full(n_categories, -1, dtype=np.int64)
+    highest = np.zeros(n_categories)
+    valid = ~np.isnan(approach_height)
+    if x.size:
+        filled = np.where(valid, approach_height, -np.inf)
+        controlling = np.argmax(filled, axis=1)
+        highest = filled[np.arange(n_categories), controlling]
+        none = np.isinf(highest)
+        controlling[none] = -1
+        highest[none] = 0.0
+    # Without obstacles the OCH is the margin itself
+    highest = np.maximum(highest, 0.0)
+
+    och = highest + margin
+    controlling_missed = np.zeros(n_categories, dtype=bool)
+    has = controlling >= 0
+    controlling_missed[has] = missed[np.flatnonzero(has), controlling[has]]
+    return {
+        'categories': categories,
+        'och': och,
+        'oca': och + thr_elev,
+        'margin': margin,
+        'equivalent_height': highest,
+        'controlling': controlling,
+        'controlling_missed': controlling_missed,
+        'missed': missed,
+        'approach_height': approach_height
+    }
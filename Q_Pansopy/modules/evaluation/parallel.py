@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Parallel Evaluation
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Parallel Evaluation
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+Process pool backend for the surface evaluators.
+
+One pool serves a whole evaluation (``evaluation_pool``): its workers are
+started once and reused by every chunk and pass of that evaluation. For
+each call the obstacle arrays are copied once into a shared memory block
+and every worker evaluates contiguous tiles of it, writing the results
+into a second block. Only the tile bounds, the plane constants and the
+surface polygons are pickled per task. The tiles are not sorted
+spatially: the evaluators cost the same per obstacle wherever it is, and
+the sort cost more than the evaluation.
+
+Workers are started with 'forkserver' (POSIX) or 'spawn' (Windows), never
+by forking the calling process: inside QGIS that process runs Qt threads
+and GDAL/PROJ state that a forked child inherits in an undefined state.
+The workers only import this package and NumPy, never QGIS. Inside QGIS
+``sys.executable`` is the QGIS application itself, so the workers run the
+Python interpreter shipped next to it; when none is found, or the pool
+cannot start, the evaluation runs serially.
+"""
+
+import math
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .surfaces import evaluate_planes, evaluate_polygon_surfaces
+
+# Tiles smaller than this are not worth a task round trip
+MIN_TILE_SIZE = 100000
+
+# Below this many obstacles a call is evaluated serially. With
+# external_testing/benchmark_parallel_evaluation.py a call through the pool
+# costs about 10 ms plus 40 ns per obstacle, against about 100 ns per
+# obstacle for the serial OAS planes: two workers break even near 0.6
+# million obstacles, four near 0.25 million
+PARALLEL_MIN_SIZE = 1000000
+
+# Interpreter names looked up next to a non-Python host executable
+PYTHON_NAMES = ('python.exe', 'python3.exe', os.path.join('bin', 'python3'), os.path.join('bin', 'python'))
+
+# Shared memory blocks attached by a worker, by name
+_WORKER_BLOCKS = {}
+
+
+def python_executable():
+    """
+    Python interpreter used to start the workers
+
+    :return: ``sys.executable`` when it is a Python interpreter, otherwise
+        the interpreter found in the Python prefix or next to the host
+        application (QGIS), or None
+    """
+    if os.path.basename(sys.executable).lower().startswith('python'):
+        return sys.executable
+    for folder in (sys.exec_prefix, os.path.dirname(sys.executable)):
+        for name in PYTHON_NAMES:
+            candidate = os.path.join(folder, name)
+            if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+                return candidate
+    return None
+
+
+def default_context():
+    """Multiprocessing context used by default, or None when only serial runs are possible"""
+    executable = python_executable()
+    if executable is None:
+        return None
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    if executable != sys.executable:
+        context.set_executable(executable)
+    return context
+
+
+def tile_bounds(n, n_tiles):
+    """
+    Cut n rows into contiguous tiles of about equal size
+
+    :param n: Number of rows
+    :param n_tiles: Requested number of tiles
+    :return: List of (start, stop) slices of the non empty tiles
+    """
+    edges = np.linspace(0, n, max(1, n_tiles) + 1).round().astype(np.int64)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def available_cpus():
+    """Number of CPUs this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+@contextmanager
+def evaluation_pool(max_workers=None, mp_context=None):
+    """
+    Process pool shared by the parallel evaluations of one run
+
+    The workers start with the first task and stop when the block exits.
+    More workers than available CPUs are never started.
+
+    :param max_workers: Number of processes (available CPUs if None)
+    :param mp_context: Multiprocessing context (``default_context()`` if None)
+    :return: Context manager yielding a dictionary with 'executor' and
+        'workers', or None when only serial evaluation is possible
+    """
+    workers = min(max_workers or available_cpus(), available_cpus())
+    mp_context = mp_context or default_context()
+    if mp_context is None or workers < 2:
+        yield None
+        return
+
+    pool = {'executor': ProcessPoolExecutor(max_workers=workers, mp_context=mp_context), 'workers': workers}
+    try:
+        yield pool
+    finally:
+        if pool['executor'] is not None:
+            pool['executor'].shutdown(cancel_futures=True)
+
+
+def _shared_block(specs, n):
+    """
+    Allocate one shared memory block for a set of arrays of n rows
+
+    :param specs: Dictionary name -> (dtype, trailing shape)
+    :param n: Number of rows
+    :return: Tuple (block, layout, views); layout is the picklable list of
+        (name, dtype, shape, offset) that ``_block_views`` maps again
+    """
+    layout = []
+    offset = 0
+    for name, (dtype, trailing) in specs.items():
+        dtype = np.dtype(dtype)
+        shape = (n,) + tuple(trailing)
+        offset = -(-offset // 8) * 8
+        layout.append((name, dtype.str, shape, offset))
+        offset += dtype.itemsize * int(np.prod(shape))
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    return block, layout, _block_views(block, layout)
+
+
+def _block_views(block, layout):
+    return {name: np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+            for name, dtype, shape, offset in layout}
+
+
+def _release(block, views):
+    """Drop the views of a block, then close and remove it"""
+    views.clear()
+    block.close()
+    block.unlink()
+
+
+def _attach(names):
+    """Attach the blocks of the running call, closing those of earlier calls"""
+    for name in list(_WORKER_BLOCKS):
+        if name not in names:
+            _WORKER_BLOCKS.pop(name).close()
+    for name in names:
+        if name not in _WORKER_BLOCKS:
+            _WORKER_BLOCKS[name] = shared_memory.SharedMemory(name=name)
+    return [_WORKER_BLOCKS[name] for name in names]
+
+
+def _evaluate_shared_tile(evaluator, options, inputs, outputs, start, stop):
+    """Evaluate rows start:stop of the input block into the output block"""
+    in_block, out_block = _attach([inputs[0], outputs[0]])
+    arrays = {name: values[start:stop] for name, values in _block_views(in_block, inputs[1]).items()}
+    result = evaluator(**arrays, **options)
+    targets = _block_views(out_block, outputs[1])
+    for key, values in result.items():
+        targets[key][start:stop] = values
+    return stop - start
+
+
+def _run_tiled(evaluator, arrays, options, max_workers=None, tile_size=MIN_TILE_SIZE, mp_context=None,
+               pool=None, min_size=PARALLEL_MIN_SIZE):
+    """
+    Evaluate arrays tile by tile in a process pool and merge the results
+
+    :param evaluator: Module level function returning a dictionary of arrays
+        aligned with its input arrays
+    :param arrays: Dictionary of per-obstacle input arrays (with 'x')
+    :param options: Keyword arguments shared by every tile (plane
+        constants, polygons, ...)
+    :param max_workers: Number of processes of a pool started for this
+        call only (available CPUs if None)
+    :param tile_size: Minimum number of obstacles per tile
+    :param mp_context: Multiprocessing context (``default_context()`` if None)
+    :param pool: Pool from ``evaluation_pool`` to reuse
+    :param min_size: Smallest number of obstacles evaluated in parallel
+    :return: Merged dictionary of arrays, evaluated serially when the pool
+        cannot start
+    """
+    arrays = {name: np.asarray(values) for name, values in arrays.items()}
+    n = len(arrays['x'])
+    if n < max(min_size, 2 * tile_size) or (pool is not None and pool['executor'] is None):
+        return evaluator(**arrays, **options)
+    if pool is None:
+        with evaluation_pool(max_workers, mp_context) as own_pool:
+            if own_pool is None:
+                return evaluator(**arrays, **options)
+            return _run_tiled(evaluator, arrays, options, tile_size=tile_size, pool=own_pool, min_size=min_size)
+
+    # A few tiles per worker keeps the pool busy when tiles take uneven time
+    bounds = tile_bounds(n, min(int(math.ceil(n / tile_size)), 4 * pool['workers']))
+
+    # The result keys and types, from one obstacle
+    probe = evaluator(**{name: values[:1] for name, values in arrays.items()}, **options)
+    in_block, in_layout, inputs = _shared_block(
+        {name: (values.dtype, values.shape[1:]) for name, values in arrays.items()}, n)
+    try:
+        out_block, out_layout, outputs = _shared_block(
+            {key: (np.asarray(values).dtype, np.shape(values)[1:]) for key, values in probe.items()}, n)
+    except OSError:
+        _release(in_block, inputs)
+        return evaluator(**arrays, **options)
+
+    try:
+        for name, values in arrays.items():
+            inputs[name][...] = values
+        futures = [pool['executor'].submit(_evaluate_shared_tile, evaluator, options,
+                                           (in_block.name, in_layout), (out_block.name, out_layout), start, stop)
+                   for start, stop in bounds]
+        for future in futures:
+            future.result()
+        merged = {key: values.copy() for key, values in outputs.items()}
+    except (BrokenProcessPool, OSError):
+        pool['executor'].shutdown(cancel_futures=True)
+        pool['executor'] = None
+        merged = evaluator(**arrays, **options)
+    finally:
+        _release(in_block, inputs)
+        _release(out_block, outputs)
+    return merged
+
+
+def evaluate_planes_parallel(x, y, obstacle_heights, planes, top_heights=300.0, floor=0.0, radius=None,
+                             max_workers=None, tile_size=MIN_TILE_SIZE, mp_context=None, pool=None,
+                             min_size=PARALLEL_MIN_SIZE):
+    """
+    Parallel version of ``surfaces.evaluate_planes``
+
+    Inputs smaller than ``min_size`` or than two tiles are evaluated in the
+    calling process. See ``surfaces.evaluate_planes`` for the arguments and
+    result.
+
+    :param max_workers: Number of processes when no pool is given
+        (available CPUs if None)
+    :param tile_size: Minimum number of obstacles per tile
+    :param mp_context: Multiprocessing context (``default_context()`` if None)
+    :param pool: Pool from ``evaluation_pool``, started for this call if None
+    :param min_size: Smallest number of obstacles evaluated in parallel
+    """
+    arrays, options = _split_radius(
+        {'x': x, 'y': y, 'obstacle_heights': obstacle_heights},
+        {'planes': np.asarray(planes, dtype=np.float64).reshape(-1, 3),
+         'top_heights': top_heights, 'floor': floor},
+        radius
+    )
+    return _run_tiled(_evaluate_planes_tile, arrays, options, max_workers, tile_size, mp_context, pool, min_size)
+
+
+def evaluate_polygon_surfaces_parallel(x, y, x_local, y_local, obstacle_heights, polygons, planes,
+                                       radius=None, max_workers=None, tile_size=MIN_TILE_SIZE,
+                                       mp_context=None, pool=None, min_size=PARALLEL_MIN_SIZE):
+    """
+    Parallel version of ``surfaces.evaluate_polygon_surfaces``
+
+    See ``surfaces.evaluate_polygon_surfaces`` for the arguments and result.
+
+    :param max_workers: Number of processes when no pool is given
+        (available CPUs if None)
+    :param tile_size: Minimum number of obstacles per tile
+    :param mp_context: Multiprocessing context (``default_context()`` if None)
+    :param pool: Pool from ``evaluation_pool``, started for this call if None
+    :param min_size: Smallest number of obstacles evaluated in parallel
+    """
+    arrays, options = _split_radius(
+        {'x': x, 'y': y, 'x_local': x_local, 'y_local': y_local,
+         'obstacle_heights': obstacle_heights},
+        {'polygons': polygons, 'planes': np.asarray(planes, dtype=np.float64).reshape(-1, 3)},
+        radius
+    )
+    return _run_tiled(_evaluate_polygon_tile, arrays, options, max_workers, tile_size, mp_context, pool, min_size)
+
+
+def _split_radius(arrays, options, radius):
+    """Tile per-obstacle accuracies with the coordinates, share scalar ones"""
+    if radius is not None and np.ndim(radius) > 0:
+        arrays['radius'] = radius
+    else:
+        options['radius'] = radius
+    return arrays, options
+
+
+def _evaluate_planes_tile(x, y, obstacle_heights, planes, top_heights, floor, radius):
+    return evaluate_planes(x, y, obstacle_heights, planes, top_heights, floor, radius)
+
+
+def _evaluate_polygon_tile(x, y, x_local, y_local, obstacle_heights, polygons, planes, radius):
+    return evaluate_polygon_surfaces(x, y, x_local, y_local, obstacle_heights, polygons, planes, radius)
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Multi-Surface Evaluation Pipeline
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Segment Summary
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+Evaluation of one obstacle set against the surfaces of every segment of a
+procedure in a single pass.
+
+All surface polygons of all segments go into one STR tree; a single bulk
+query gives every (obstacle, surface) pair, the plane heights of all pairs
+are computed at once and group-by reductions per segment give the
+controlling obstacle, the required OCA and the margin of each segment.
+
+How the required OCA follows from the obstacles depends on the segment:
+a level or MOC segment needs its highest obstacle plus the MOC, an OAS
+segment the precision OCA of the obstacles penetrating the OAS (see
+``oca.ils_oca``), and a plain protection surface (VSS, basic ILS...) does
+not define an OCA at all.
+"""
+
+import numpy as np
+
+from .geometry import build_str_tree, polygon_bounds, points_in_polygons
+from .densify import group_argmax
+from .oca import ils_oca
+
+SEGMENT_TYPES = ('moc', 'oas', 'surface')
+
+
+def surface_pairs(x, y, polygons, planes, tree=None):
+    """
+    Every (obstacle, surface) pair with the surface height at the obstacle
+
+    :param x: Array of obstacle X coordinates
+    :param y: Array of obstacle Y coordinates
+    :param polygons: List of surface polygons (parts of (N, 2) rings)
+    :param planes: Absolute planes (a, b, c) of the surfaces, z = a*x + b*y + c
+    :param tree: Optional STR tree over the polygon bounds
+    :return: Tuple (obstacle, surface, height) arrays, one entry per pair
+    """
+    if tree is None:
+        tree = build_str_tree([polygon_bounds(parts) for parts in polygons])
+    obstacle, surface = points_in_polygons(x, y, polygons, tree)
+    planes = np.asarray(planes, dtype=np.float64).reshape(-1, 3)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    height = (planes[surface, 0] * x[obstacle] + planes[surface, 1] * y[obstacle] + planes[surface, 2])
+    return obstacle, surface, height
+
+
+def _pick(values, index, fill):
+    """values[index] with fill where index is -1"""
+    picked = np.full(len(index), fill, dtype=np.result_type(values.dtype, np.asarray(fill).dtype))
+    valid = index >= 0
+    picked[valid] = values[index[valid]]
+    return picked
+
+
+def evaluate_segments(x, y, elevations, polygons, planes, surface_segment, n_segments, moc=0.0,
+                      segment_types='moc', oas=None):
+    """
+    Controlling obstacle, required OCA and margin of every segment
+
+    Within a segment an obstacle is checked against the lowest of the
+    segment surfaces that contain it. The controlling obstacle is the one
+    with the largest penetration (smallest clearance). The required OCA
+    and the obstacle that sets it depend on the segment type:
+
+    - 'moc': highest obstacle elevation plus the segment MOC
+    - 'oas': ``oca.ils_oca`` of the obstacles penetrating the segment
+      surfaces, for one aircraft category
+    - 'surface': none (NaN), the surfaces only give the penetrations
+
+    :param x: Array of obstacle X coordinates
+    :param y: Array of obstacle Y coordinates
+    :param elevations: Array of absolute obstacle elevations
+    :param polygons: List of surface polygons
+    :param planes: Absolute plane of every surface
+    :param surface_segment: Segment index of every surface
+    :param n_segments: Number of segments
+    :param moc: Minimum obstacle clearance, scalar or one per segment
+    :param segment_types: Segment type, one of ``SEGMENT_TYPES`` for all
+        segments or one per segment
+    :param oas: Dictionary {segment index: settings} for the 'oas'
+        segments, settings with 'x_local' (threshold-relative x of every
+        obstacle), 'thr_elev', 'category' (default 'A') and any other
+        ``oca.ils_oca`` keyword ('gp_angle', 'altimeter'...)
+    :return: Dictionary with per-segment arrays 'controlling' (obstacle
+        index, -1 without obstacles), 'surface' (surface index at the
+        controlling obstacle), 'surface_height', 'penetration', 'margin',
+        'required_oca', 'oca_obstacle' (obstacle setting the OCA, -1 if
+        none) and 'count', plus the per-pair arrays in 'pairs'
+    :raises ValueError: On an unknown segment type or an 'oas' segment
+        without settings
+    """
+    elevations = np.asarray(elevations, dtype=np.float64)
+    surface_segment = np.asarray(surface_segment, dtype=np.int64)
+    moc = np.broadcast_to(np.asarray(moc, dtype=np.float64), (n_segments,))
+    segment_types = np.broadcast_to(np.asarray(segment_types, dtype=str), (n_segments,))
+    unknown = set(segment_types.tolist()) - set(SEGMENT_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown segment types: {', '.join(sorted(unknown))}")
+    oas = oas or {}
+
+    obstacle, surface, height = surface_pairs(x, y, polygons, planes)
+    segment = surface_segment[surface]
+
+    # Lowest surface of each segment at each obstacle: sort pairs by
+    # (segment, obstacle, height) and keep the first of every run
+    order = np.lexsort((height, obstacle, segment))
+    obstacle, surface, height, segment = obstacle[order], surface[order], height[order], segment[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (segment[1:] != segment[:-1]) | (obstacle[1:] != obstacle[:-1])
+    obstacle, surface, height, segment = obstacle[first], surface[first], height[first], segment[first]
+
+    penetration = elevations[obstacle] - height
+    worst, max_penetration = group_argmax(penetration, segment, n_segments)
+    highest, max_elevation = group_argmax(elevations[obstacle], segment, n_segments)
+
+    is_moc = segment_types == 'moc'
+    required_oca = np.where(is_moc, max_elevation + moc, np.nan)
+    oca_obstacle = np.where(is_moc, _pick(obstacle, highest, -1), -1)
+    for index in np.flatnonzero(segment_types == 'oas'):
+        if index not in oas:
+            raise ValueError(f"Segment {index} is an OAS segment without OAS settings")
+        settings = dict(oas[index])
+        x_local = np.asarray(settings.pop('x_local'), dtype=np.float64)
+        thr_elev = float(settings.pop('thr_elev'))
+        category = settings.pop('category', 'A')
+        penetrating = obstacle[(segment == index) & (penetration > 0)]
+        result = ils_oca(x_local[penetrating], elevations[penetrating] - thr_elev, thr_elev,
+                         categories=(category,), **settings)
+        required_oca[index] = result['oca'][0]
+        controlling = int(result['controlling'][0])
+        oca_obstacle[index] = penetrating[controlling] if controlling >= 0 else -1
+
+    summary = {
+        'controlling': _pick(obstacle, worst, -1),
+        'surface': _pick(surface, worst, -1),
+        'surface_height': _pick(height, worst, np.nan),
+        'penetration': max_penetration,
+        'margin': -max_penetration,
+        'required_oca': required_oca,
+        'oca_obstacle': oca_obstacle,
+        'count': np.bincount(segment, minlength=n_segments),
+        'pairs': {'obstacle': obstacle, 'surface': surface, 'segment': segment,
+                  'surface_height': height, 'penetration': penetration}
+    }
+    return summary
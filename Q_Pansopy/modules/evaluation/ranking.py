@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Critical Obstacle Ranking
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Top-N Ranking
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+Streaming top-N of the most penetrating obstacles per surface.
+
+Evaluation results arrive in chunks; after every chunk only the N best rows
+of each surface are kept, so memory stays O(N x surfaces + chunk) whatever
+the dataset size. The bounded selection works like one fixed-size heap per
+surface, done for all surfaces at once with a sort of the (small) merged
+arrays instead of per-row heap operations.
+"""
+
+import numpy as np
+
+
+def select_top_n(rows, n, key='penetration', group='controlling'):
+    """
+    Keep the n rows with the largest key of every group
+
+    :param rows: Dictionary of equally long arrays
+    :param n: Number of rows kept per group
+    :param key: Array ranked in descending order
+    :param group: Array with the group (surface) of every row
+    :return: Dictionary of arrays, sorted by group then descending key
+    """
+    order = np.lexsort((-np.asarray(rows[key], dtype=np.float64), rows[group]))
+    groups = np.asarray(rows[group])[order]
+    starts = np.r_[0, np.flatnonzero(groups[1:] != groups[:-1]) + 1] if len(groups) else np.zeros(0, dtype=np.int64)
+    rank = np.arange(len(groups)) - np.repeat(starts, np.diff(np.r_[starts, len(groups)]))
+    keep = order[rank < n]
+    return {name: np.asarray(values)[keep] for name, values in rows.items()}
+
+
+def top_n_by_surface(chunks, n, key='penetration', group='controlling', positive_only=False):
+    """
+    Streaming top-N over chunks of evaluation rows
+
+    :param chunks: Iterable of dictionaries of equally long arrays, each
+        with the key and group arrays and 'inside'
+    :param n: Number of rows kept per surface
+    :param key: Array ranked in descending order
+    :param group: Array with the surface of every row
+    :param positive_only: Whether to rank only rows with key > 0
+    :return: Dictionary of arrays with at most n rows per surface (None if
+        there were no chunks), sorted by surface then descending key
+    """
+    if n <= 0:
+        raise ValueError("The number of obstacles per surface must be positive")
+
+    best = None
+    for chunk in chunks:
+        values = np.asarray(chunk[key], dtype=np.float64)
+        valid = np.asarray(chunk['inside'], dtype=bool) & ~np.isnan(values)
+        if positive_only:
+            valid &= values > 0
+        candidates = {name: np.asarray(array)[valid] for name, array in chunk.items()
+                      if np.ndim(array) and len(array) == len(values)}
+        if best is None:
+            merged = candidates
+        else:
+            merged = {name: np.concatenate([best[name], candidates[name]]) for name in best}
+        best = select_top_n(merged, n, key, group)
+    return best
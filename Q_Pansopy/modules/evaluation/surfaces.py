@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Surface Evaluation Core
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Surface Evaluation
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+Vectorized evaluation of sloping planes z = A*x + B*y + C.
+
+All QPANSOPY plane constants are expressed in a threshold-relative frame:
+x is the distance from the threshold, positive towards the approach (before
+the threshold) and negative in the missed approach, y is the lateral offset
+from the runway centreline. The surfaces are symmetric about the centreline,
+so planes are always evaluated with |y|. Heights are relative to the
+threshold elevation.
+"""
+
+import ast
+import numpy as np
+
+from .geometry import points_in_polygon, points_near_polygon
+
+
+def parse_constants(text):
+    """
+    Parse a plane constants attribute such as '[0.00355,.143,-36.66]'
+
+    :param text: Constants string stored in a QPANSOPY surface layer
+    :return: List [A, B, C] of floats or None if the value is not a plane
+    """
+    try:
+        values = ast.literal_eval(str(text).strip())
+        values = [float(v) for v in values]
+    except (ValueError, TypeError, SyntaxError):
+        return None
+    if len(values) != 3:
+        return None
+    return values
+
+
+def runway_frame(x, y, thr_x, thr_y, approach_bearing):
+    """
+    Convert map coordinates to threshold-relative (x, y) coordinates
+
+    This is the inverse of the rotation used by ``oas_ils.compute_geom``:
+    a point at local (x, y) was placed at bearing ``approach_bearing`` plus
+    the offset angle from the threshold.
+
+    :param x: Array of map X (easting) coordinates
+    :param y: Array of map Y (northing) coordinates
+    :param thr_x: Threshold easting
+    :param thr_y: Threshold northing
+    :param approach_bearing: Bearing in degrees from the threshold towards
+        the approach (the direction of positive local x)
+    :return: Tuple (local_x, local_y) of float64 arrays
+    """
+    d_east = np.asarray(x, dtype=np.float64) - thr_x
+    d_north = np.asarray(y, dtype=np.float64) - thr_y
+    bearing = np.radians(approach_bearing)
+    sin_b = np.sin(bearing)
+    cos_b = np.cos(bearing)
+    local_x = d_east * sin_b + d_north * cos_b
+    local_y = d_east * cos_b - d_north * sin_b
+    return local_x, local_y
+
+
+def map_frame(local_x, local_y, thr_x, thr_y, approach_bearing):
+    """
+    Convert threshold-relative (x, y) coordinates back to map coordinates
+
+    Inverse of ``runway_frame`` (the rotation is its own inverse).
+
+    :param local_x: Array of threshold-relative x coordinates
+    :param local_y: Array of threshold-relative y coordinates
+    :param thr_x: Threshold easting
+    :param thr_y: Threshold northing
+    :param approach_bearing: Bearing in degrees from the threshold towards
+        the approach (the direction of positive local x)
+    :return: Tuple (x, y) of float64 map coordinate arrays
+    """
+    local_x = np.asarray(local_x, dtype=np.float64)
+    local_y = np.asarray(local_y, dtype=np.float64)
+    bearing = np.radians(approach_bearing)
+    sin_b = np.sin(bearing)
+    cos_b = np.cos(bearing)
+    return thr_x + local_x * sin_b + local_y * cos_b, thr_y + local_x * cos_b - local_y * sin_b
+
+
+def plane_heights(x, y, planes, radius=None):
+    """
+    Evaluate every plane at every point in one broadcast operation
+
+    With ``radius`` each plane is evaluated at the lowest point of the disc
+    around the obstacle (its horizontal accuracy) instead of at the obstacle
+    itself. For z = A*x + B*|y| + C that point lies along the plane gradient:
+    the height drops by radius*sqrt(A^2 + B^2), unless the disc crosses the
+    centreline before, in which case the lowest point is on the centreline
+    at x -/+ sqrt(radius^2 - y^2).
+
+    :param x: Array of N threshold-relative x coordinates
+    :param y: Array of N threshold-relative y coordinates
+    :param planes: Sequence of P plane constants [A, B, C]
+    :param radius: Optional scalar or array of N horizontal accuracies
+    :return: Array of shape (P, N) with the height of each plane at each point
+    """
+    planes = np.asarray(planes, dtype=np.float64).reshape(-1, 3)
+    x = np.asarray(x, dtype=np.float64)
+    abs_y = np.abs(np.asarray(y, dtype=np.float64))
+    A = planes[:, 0:1]
+    B = planes[:, 1:2]
+    heights = A * x[np.newaxis, :] + B * abs_y[np.newaxis, :] + planes[:, 2:3]
+    if radius is None:
+        return heights
+
+    r = np.broadcast_to(np.nan_to_num(np.asarray(radius, dtype=np.float64)), x.shape)[np.newaxis, :]
+    norm = np.hypot(A, B)
+    drop = heights - r * norm
+
+    # For B > 0 the gradient step reaches |y| = 0 when |y| < r*B/norm; the
+    # lowest point is then on the centreline at the edge of the disc
+    with np.errstate(invalid='ignore', divide='ignore'):
+        crosses = (B > 0) & (abs_y[np.newaxis, :] * norm < r * B)
+    if crosses.any():
+        along = np.sqrt(np.maximum(r ** 2 - abs_y[np.newaxis, :] ** 2, 0.0))
+        on_centreline = A * x[np.newaxis, :] - np.abs(A) * along + planes[:, 2:3]
+        drop = np.where(crosses, on_centreline, drop)
+    return drop
+
+
+def evaluate_planes(x, y, obstacle_heights, planes, top_heights=300.0, floor=0.0, radius=None):
+    """
+    Evaluate obstacles against an assessment surface made of sloping planes
+
+    The surface height at a point is the highest of the plane heights and the
+    floor (the ground plane). A point lies inside the surface when that
+    height does not exceed the top of the controlling plane.
+
+    :param x: Array of threshold-relative x coordinates
+    :param y: Array of threshold-relative y coordinates
+    :param obstacle_heights: Obstacle heights above threshold elevation
+    :param planes: Sequence of plane constants [A, B, C]
+    :param top_heights: Upper limit of the surface, scalar or one per plane
+    :param floor: Height of the ground plane, or None to disable it
+    :param radius: Optional horizontal accuracy (scalar or per obstacle),
+        see ``plane_heights``
+    :return: Dictionary of arrays: 'surface_height', 'controlling' (plane
+        index, -1 for the floor), 'penetration' and 'inside'
+    """
+    heights = plane_heights(x, y, planes, radius)
+    n_planes = heights.shape[0]
+
+    controlling = np.argmax(heights, axis=0)
+    surface_height = np.take_along_axis(heights, controlling[np.newaxis, :], axis=0)[0]
+
+    tops = np.broadcast_to(np.asarray(top_heights, dtype=np.float64), (n_planes,))
+    inside = surface_height <= tops[controlling]
+
+    if floor is not None:
+        on_floor = surface_height < floor
+        surface_height = np.where(on_floor, floor, surface_height)
+        controlling = np.where(on_floor, -1, controlling)
+
+    penetration = np.asarray(obstacle_heights, dtype=np.float64) - surface_height
+
+    return {
+        'surface_height': surface_height,
+        'controlling': controlling,
+        'penetration': penetration,
+        'inside': inside
+    }
+
+
+def evaluate_polygon_surfaces(x, y, x_local, y_local, obstacle_heights, polygons, planes, radius=None):
+    """
+    Evaluate obstacles against planes that only apply inside their polygon
+
+    Each obstacle is assigned to the polygons that contain it (map
+    coordinates) and the plane of each polygon is evaluated only for those
+    obstacles (threshold-relative coordinates). Where polygons overlap, the
+    lowest surface controls.
+
+    :param x: Array of obstacle map X coordinates
+    :param y: Array of obstacle map Y coordinates
+    :param x_local: Array of threshold-relative x coordinates
+    :param y_local: Array of threshold-relative y coordinates
+    :param obstacle_heights: Obstacle heights above threshold elevation
+    :param polygons: List of polygons, each a list of parts of (N, 2) rings
+    :param planes: Sequence of plane constants [A, B, C], one per polygon
+    :param radius: Optional horizontal accuracy (scalar or per obstacle),
+        see ``plane_heights``; an obstacle is then assigned to every polygon
+        its accuracy disc reaches, even with its position just outside
+    :return: Dictionary of arrays: 'surface_height' (NaN outside all
+        polygons), 'controlling' (polygon index, -1 outside), 'penetration'
+        and 'inside'
+    """
+    planes = np.asarray(planes, dtype=np.float64).reshape(-1, 3)
+    x_local = np.asarray(x_local, dtype=np.float64)
+    abs_y = np.abs(np.asarray(y_local, dtype=np.float64))
+    if radius is not None:
+        radii = np.broadcast_to(np.asarray(radius, dtype=np.float64), x_local.shape)
+
+    surface_height = np.full(x_local.shape, np.inf)
+    controlling = np.full(x_local.shape, -1, dtype=np.int64)
+
+    for i, parts in enumerate(polygons):
+        if radius is None:
+            idx = np.flatnonzero(points_in_polygon(x, y, parts))
+        else:
+            idx = np.flatnonzero(points_near_polygon(x, y, parts, radii))
+        if idx.size == 0:
+            continue
+        if radius is None:
+            A, B, C = planes[i]
+            height = A * x_local[idx] + B * abs_y[idx] + C
+        else:
+            height = plane_heights(x_local[idx], abs_y[idx], planes[i], radii[idx])[0]
+        lower = height < surface_height[idx]
+        surface_height[idx[lower]] = height[lower]
+        controlling[idx[lower]] = i
+
+    inside = controlling >= 0
+    surface_height[~inside] = np.nan
+    penetration = np.asarray(obstacle_heights, dtype=np.float64) - surface_height
+
+    return {
+        'surface_height': surface_height,
+        'controlling': controlling,
+        'penetration': penetration,
+        'inside': inside
+    }
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Terrain Evaluation Core
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Terrain Evaluation
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+Blocked evaluation of a DEM against planar surfaces.
+
+The DEM is described by a north-up grid (origin at the top left corner,
+positive pixel sizes) and read through a ``read_block(col, row, cols, rows)``
+callback, so only the blocks covering a surface are ever loaded and memory
+is bounded by the block size.
+"""
+
+import math
+import numpy as np
+
+from .geometry import points_in_polygon, polygon_bounds
+
+
+def fit_plane(xyz):
+    """
+    Least squares plane z = a*x + b*y + c through 3D vertices
+
+    Coordinates are centred before solving so large projected coordinates
+    do not degrade the fit.
+
+    :param xyz: Array (N, 3) of vertices, N >= 3 and not collinear
+    :return: Tuple ((a, b, c), max_residual)
+    """
+    xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+    centre = xyz.mean(axis=0)
+    d = xyz - centre
+    design = np.column_stack([d[:, 0], d[:, 1], np.ones(len(d))])
+    (a, b, dc), *_ = np.linalg.lstsq(design, d[:, 2], rcond=None)
+    residual = float(np.abs(design @ np.array([a, b, dc]) - d[:, 2]).max()) if len(d) else 0.0
+    c = centre[2] + dc - a * centre[0] - b * centre[1]
+    return (float(a), float(b), float(c)), residual
+
+
+def plane_residual(xyz, plane):
+    """
+    Largest vertical distance of 3D vertices to a plane z = a*x + b*y + c
+
+    :param xyz: Array (N, 3) of vertices
+    :param plane: Plane (a, b, c)
+    :return: Maximum absolute residual (0 without vertices)
+    """
+    xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+    if not len(xyz):
+        return 0.0
+    a, b, c = plane
+    return float(np.abs(a * xyz[:, 0] + b * xyz[:, 1] + c - xyz[:, 2]).max())
+
+
+def stored_plane(xyz, constants, frame):
+    """
+    Map plane of a surface from its stored threshold-relative constants
+
+    The constants [A, B, C] give the height above threshold
+    z = A*x + B*|y| + C in the frame of ``surfaces.runway_frame``. On one
+    side of the centreline |y| is linear, so the surface is the exact map
+    plane a*X + b*Y + c with absolute heights.
+
+    :param xyz: Array (N, 3) of the surface vertices, map frame
+    :param constants: Stored [A, B, C]
+    :param frame: Dictionary with 'thr_x', 'thr_y', 'thr_elev' and
+        'bearing' (approach bearing, degrees) in the map frame
+    :return: Tuple ((a, b, c), max_residual) with the residual of the
+        vertices to that plane, or None if B is not 0 and the surface
+        crosses the centreline (then it is not a single plane)
+    """
+    xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+    A, B, C = (float(value) for value in constants)
+    bearing = math.radians(frame['bearing'])
+    sin_b, cos_b = math.sin(bearing), math.cos(bearing)
+
+    side = 1.0
+    if B != 0.0:
+        local_y = (xyz[:, 0] - frame['thr_x']) * cos_b - (xyz[:, 1] - frame['thr_y']) * sin_b
+        off_axis = local_y[np.abs(local_y) > 1e-3]
+        if off_axis.size and (off_axis > 0).any() and (off_axis < 0).any():
+            return None
+        side = -1.0 if off_axis.size and off_axis[0] < 0 else 1.0
+
+    a = A * sin_b + B * side * cos_b
+    b = A * cos_b - B * side * sin_b
+    c = frame['thr_elev'] + C - a * frame['thr_x'] - b * frame['thr_y']
+    plane = (a, b, c)
+    return plane, plane_residual(xyz, plane)
+
+
+def grid_window(bbox, grid):
+    """
+    Pixel window of a grid covering a bounding box
+
+    :param bbox: Array [xmin, ymin, xmax, ymax]
+    :param grid: Dictionary with 'origin_x', 'origin_y' (top left corner),
+        'pixel_x', 'pixel_y' (positive sizes), 'width' and 'height'
+    :return: Tuple (col, row, cols, rows) or None if the box misses the grid
+    """
+    xmin, ymin, xmax, ymax = bbox
+    col0 = max(0, int(math.floor((xmin - grid['origin_x']) / grid['pixel_x'])))
+    col1 = min(grid['width'], int(math.ceil((xmax - grid['origin_x']) / grid['pixel_x'])))
+    row0 = max(0, int(math.floor((grid['origin_y'] - ymax) / grid['pixel_y'])))
+    row1 = min(grid['height'], int(math.ceil((grid['origin_y'] - ymin) / grid['pixel_y'])))
+    if col1 <= col0 or row1 <= row0:
+        return None
+    return col0, row0, col1 - col0, row1 - row0
+
+
+def iter_blocks(window, block_size=512):
+    """
+    Split a pixel window into blocks of at most block_size x block_size
+
+    :param window: Tuple (col, row, cols, rows)
+    :param block_size: Maximum block width and height in pixels
+    :return: Generator of (col, row, cols, rows) tuples
+    """
+    col0, row0, cols, rows = window
+    for row in range(row0, row0 + rows, block_size):
+        for col in range(col0, col0 + cols, block_size):
+            yield (col, row,
+                   min(block_size, col0 + cols - col),
+                   min(block_size, row0 + rows - row))
+
+
+def evaluate_dem_surface(read_block, grid, parts, plane, nodata=None, block_size=512):
+    """
+    Maximum terrain penetration of one planar surface
+
+    Every DEM cell whose centre lies inside the polygon is compared with
+    the plane height at that centre.
+
+    :param read_block: Callable (col, row, cols, rows) -> 2D array of
+        elevations with shape (rows, cols)
+    :param grid: Grid description, see ``grid_window``
+    :param parts: Polygon as a list of parts of (N, 2) rings, grid CRS
+    :param plane: Plane (a, b, c) in grid coordinates, absolute heights
+    :param nodata: DEM no data value, if any (NaN is always ignored)
+    :param block_size: Maximum block width and height in pixels
+    :return: Dictionary with 'penetration' (max, NaN if no cell was
+        evaluated), 'x', 'y', 'terrain' and 'surface' at that cell, 'cells'
+        evaluated and 'penetrating' cell count
+    """
+    result = {'penetration': np.nan, 'x': np.nan, 'y': np.nan, 'terrain': np.nan,
+              'surface': np.nan, 'cells': 0, 'penetrating': 0}
+    window = grid_window(polygon_bounds(parts), grid)
+    if window is None:
+        return result
+
+    a, b, c = plane
+    for col, row, cols, rows in iter_blocks(window, block_size):
+        dem = np.asarray(read_block(col, row, cols, rows), dtype=np.float64).reshape(rows, cols)
+        xs = grid['origin_x'] + (col + np.arange(cols) + 0.5) * grid['pixel_x']
+        ys = grid['origin_y'] - (row + np.arange(rows) + 0.5) * grid['pixel_y']
+        x = np.broadcast_to(xs[np.newaxis, :], (rows, cols)).ravel()
+        y = np.broadcast_to(ys[:, np.newaxis], (rows, cols)).ravel()
+        z = dem.ravel()
+
+        valid = np.isfinite(z)
+        if nodata is not None:
+            valid &= z != nodata
+        valid &= points_in_polygon(x, y, parts)
+        idx = np.flatnonzero(valid)
+        if idx.size == 0:
+            continue
+
+        surface = a * x[idx] + b * y[idx] + c
+        penetration = z[idx] - surface
+        result['cells'] += int(idx.size)
+        result['penetrating'] += int(np.count_nonzero(penetration > 0))
+
+        best = int(np.argmax(penetration))
+        if not penetration[best] <= result['penetration']:
+            result.update({
+                'penetration': float(penetration[best]),
+                'x': float(x[idx[best]]),
+                'y': float(y[idx[best]]),
+                'terrain': float(z[idx[best]]),
+                'surface': float(surface[best])
+            })
+
+    return result
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+VSS / OCS Evaluation
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - VSS / OCS Evaluation
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+
+Bulk evaluation of the VSS and OCS trapezoids built by ``vss_straight`` and
+``vss_loc``. Coordinates are threshold-relative: x along the approach from
+the threshold, y lateral from the centreline (see ``surfaces.runway_frame``).
+"""
+
+import math
+import numpy as np
+
+# Angle subtracted from the VPA for each sloped surface (degrees)
+VSS_ANGLE_OFFSET = 1.12
+OCS_ANGLE_OFFSET = {'straight': 1.0, 'loc': 0.5}
+
+# The VSS starts 60 m before the threshold
+VSS_START = 60.0
+
+
+def vss_surfaces(OCH, RDH, VPA, rwy_width=45.0, strip_width=140.0, variant='straight'):
+    """
+    Describe the VSS and OCS trapezoids for a set of approach parameters
+
+    Every surface is described by its stations along x, the half width at
+    each station, the x where its height is zero and its slope. The LOC OCS
+    is level with the threshold up to the start of the VSS and then rises
+    to OCS_length * tan(VPA - 0.5) at its end, as drawn by ``vss_loc``;
+    its 'floor' keeps it from going below the threshold.
+
+    :param OCH: Obstacle clearance height in meters, scalar or array (the
+        stations, half widths and slopes then vary per element)
+    :param RDH: Reference datum height in meters
+    :param VPA: Vertical path angle in degrees
+    :param rwy_width: Runway width in meters
+    :param strip_width: Runway strip width in meters
+    :param variant: 'straight' (vss_straight) or 'loc' (vss_loc)
+    :return: Dictionary with 'vss' and 'ocs' surface descriptions
+    """
+    OCH = np.asarray(OCH, dtype=np.float64)
+    vss_slope = math.tan(math.radians(VPA - VSS_ANGLE_OFFSET))
+    D_VSS = OCH / vss_slope
+    OCS_length = (OCH - RDH) / math.tan(math.radians(VPA))
+    ocs_slope = math.tan(math.radians(VPA - OCS_ANGLE_OFFSET[variant]))
+
+    if variant == 'loc':
+        vss = {
+            'stations': [VSS_START, VSS_START + D_VSS],
+            'half_widths': [60.0, 60.0]
+        }
+        ocs_end = np.maximum(OCS_length, VSS_START)
+        ocs = {
+            'stations': [0.0, VSS_START, ocs_end],
+            'half_widths': [30 + rwy_width / 2, 60.0, 60.0],
+            'origin': VSS_START,
+            'slope': np.where(OCS_length > VSS_START,
+                              OCS_length * ocs_slope / np.maximum(ocs_end - VSS_START, 1e-9), ocs_slope),
+            'floor': 0.0
+        }
+    else:
+        vss = {
+            'stations': [VSS_START, VSS_START + D_VSS],
+            'half_widths': [strip_width / 2, D_VSS * 0.15 + strip_width / 2]
+        }
+        ocs = {
+            'stations': [0.0, OCS_length],
+            'half_widths': [30 + rwy_width / 2, OCS_length * math.tan(math.radians(2)) + 120],
+            'origin': 0.0,
+            'slope': ocs_slope
+        }
+
+    vss.update({'origin': VSS_START, 'slope': vss_slope})
+    return {'vss': vss, 'ocs': ocs}
+
+
+def _station_interp(x_local, stations, values):
+    """``np.interp`` with stations and values that may vary per point"""
+    result = np.broadcast_to(np.asarray(values[0], dtype=np.float64), x_local.shape)
+    for s0, s1, v0, v1 in zip(stations, stations[1:], values, values[1:]):
+        t = np.clip((x_local - s0) / np.maximum(np.subtract(s1, s0), 1e-12), 0.0, 1.0)
+        result = np.where(x_local > s0, v0 + t * np.subtract(v1, v0), result)
+    return result
+
+
+def trapezoid_contains(x_local, y_local, surface, radius=None):
+    """
+    Test which points lie inside a surface footprint
+
+    With ``radius`` the footprint is grown so that every point whose
+    accuracy disc reaches it is kept: the ends move out by the radius and
+    the sides by the radius measured across the steepest side edge.
+
+    :param x_local: Array of threshold-relative x coordinates
+    :param y_local: Array of threshold-relative y coordinates
+    :param surface: Surface description from ``vss_surfaces``
+    :param radius: Optional horizontal accuracy, scalar or per point
+    :return: Boolean array
+    """
+    stations = surface['stations']
+    x_local = np.asarray(x_local, dtype=np.float64)
+    half_width = _station_interp(x_local, stations, surface['half_widths'])
+    if radius is None:
+        return ((x_local >= stations[0]) & (x_local <= stations[-1])
+                & (np.abs(y_local) <= half_width))
+
+    r = np.broadcast_to(np.nan_to_num(np.asarray(radius, dtype=np.float64)), x_local.shape)
+    widths = surface['half_widths']
+    spread = 0.0
+    for s0, s1, w0, w1 in zip(stations, stations[1:], widths, widths[1:]):
+        spread = np.maximum(spread, np.abs(np.subtract(w1, w0)) / np.maximum(np.subtract(s1, s0), 1e-12))
+    return ((x_local >= stations[0] - r) & (x_local <= stations[-1] + r)
+            & (np.abs(y_local) <= half_width + r * np.hypot(1.0, spread)))
+
+
+def evaluate_trapezoid(x_local, y_local, obstacle_heights, surface, radius=None):
+    """
+    Evaluate obstacles against a sloped VSS or OCS surface
+
+    :param x_local: Array of threshold-relative x coordinates
+    :param y_local: Array of threshold-relative y coordinates
+    :param obstacle_heights: Obstacle heights above threshold elevation
+    :param surface: Surface description from ``vss_surfaces``
+    :param radius: Optional horizontal accuracy (scalar or per obstacle):
+        the surface is evaluated at the lowest point of the accuracy disc
+        and the footprint grown, see ``trapezoid_contains``
+    :return: Dictionary of arrays: 'surface_height', 'penetration', 'inside'
+    """
+    x_local = np.asarray(x_local, dtype=np.float64)
+    surface_height = (x_local - surface['origin']) * surface['slope']
+    if radius is not None:
+        surface_height = surface_height - np.nan_to_num(np.asarray(radius, dtype=np.float64)) * np.abs(surface['slope'])
+    if 'floor' in surface:
+        surface_height = np.maximum(surface_height, surface['floor'])
+    return {
+        'surface_height': surface_height,
+        'penetration': np.asarray(obstacle_heights, dtype=np.float64) - surface_height,
+        'inside': trapezoid_contains(x_local, y_local, surface, radius)
+    }
+
+
+def _bisect(predicate, low, high, tolerance):
+    """
+    Bisect every element until its bracket is at most ``tolerance`` wide
+
+    :param predicate: Function of an array of OCHs, False at ``low`` and
+        True at ``high``
+    :param low: Array of lower bracket ends
+    :param high: Array of upper bracket ends
+    :param tolerance: Bracket width to stop at
+    :return: Tuple (low, high, iterations)
+    """
+    iterations = 0
+    while low.size and np.max(high - low) > tolerance:
+        middle = 0.5 * (low + high)
+        hit = predicate(middle)
+        low = np.where(hit, low, middle)
+        high = np.where(hit, middle, high)
+        iterations += 1
+    return low, high, iterations
+
+
+def minimum_och(x_local, y_local, obstacle_heights, och_min, RDH, VPA, rwy_width=45.0,
+                strip_width=140.0, variant='straight', och_max=1000.0, margin=0.0, radius=None,
+                tolerance=0.01):
+    """
+    Find the minimum OCH, not below ``och_min``, that clears the OCS
+
+    An OCH clears the OCS when every obstacle penetrating the OCS built for
+    that OCH is at least ``margin`` below it. An obstacle penetrates the OCS
+    of the OCHs in one interval: the OCS reaches it once it is long enough,
+    while the straight-in OCS narrows at a given x and the LOC OCS gets
+    flatter as they lengthen. The ends of every interval are found by
+    bisection on the OCH, for all obstacles at once and on their cached
+    coordinates, and the result is the lowest OCH outside every interval in
+    which an obstacle is above OCH - margin. It clears its own OCS and is at
+    most ``tolerance`` above the lowest OCH that does.
+
+    :param x_local: Array of threshold-relative x coordinates
+    :param y_local: Array of threshold-relative y coordinates
+    :param obstacle_heights: Obstacle heights above threshold elevation
+    :param och_min: Lowest OCH to accept (e.g. the design OCH) in meters
+    :param RDH: Reference datum height in meters
+    :param VPA: Vertical path angle in degrees
+    :param rwy_width: Runway width in meters
+    :param strip_width: Runway strip width in meters
+    :param variant: 'straight' or 'loc'
+    :param och_max: Upper bound of the search
+    :param margin: Required clearance above penetrating obstacles
+    :param radius: Optional horizontal accuracy (scalar or per obstacle),
+        see ``evaluate_trapezoid``
+    :param tolerance: Bisection tolerance on the OCH in meters
+    :return: Dictionary with 'och' (None if no OCH up to ``och_max`` clears
+        the OCS), 'controlling' (index of the obstacle inside the OCS whose
+        height sets the OCH, or -1 when the OCH is ``och_min`` or the
+        point where the last obstacle leaves the OCS) and 'iterations'
+        (bisection steps)
+    """
+    x_local = np.asarray(x_local, dtype=np.float64)
+    y_local = np.asarray(y_local, dtype=np.float64)
+    obstacle_heights = np.asarray(obstacle_heights, dtype=np.float64)
+    r = None if radius is None else np.broadcast_to(
+        np.nan_to_num(np.asarray(radius, dtype=np.float64)), x_local.shape)
+    och_min = float(och_min)
+    och_max = float(och_max)
+
+    def penetrated(och, index):
+        ocs = vss_surfaces(och, RDH, VPA, rwy_width, strip_width, variant)['ocs']
+        evaluation = evaluate_trapezoid(x_local[index], y_local[index], obstacle_heights[index], ocs,
+                                        None if r is None else r[index])
+        return evaluation['inside'] & (evaluation['penetration'] > 0)
+
+    # Every obstacle is tested at the lowest and highest OCH searched and at
+    # the OCH whose OCS ends at it, where the straight-in OCS is widest
+    reach = x_local if r is None else x_local - r
+    entry = np.clip(RDH + reach * math.tan(math.radians(VPA)), och_min, och_max)
+    everyone = np.arange(x_local.size)
+    at_min = penetrated(och_min, everyone)
+    at_entry = penetrated(entry, everyone)
+    at_max = penetrated(och_max, everyone)
+    candidates = np.flatnonzero(at_min | at_entry | at_max)
+    at_min, at_max = at_min[candidates], at_max[candidates]
+    inside = np.where(at_min, och_min, np.where(at_entry[candidates], entry[candidates], och_max))
+
+    # First OCH whose OCS reaches the obstacle, on the side where it does not yet
+    start = np.full(candidates.size, och_min)
+    entering = np.flatnonzero(~at_min)
+    start[entering], _, entry_steps = _bisect(
+        lambda och: penetrated(och, candidates[entering]),
+        np.full(entering.size, och_min), inside[entering], tolerance)
+
+    # First OCH whose OCS no longer includes the obstacle
+    end = np.full(candidates.size, np.inf)
+    leaving = np.flatnonzero(~at_max)
+    _, end[leaving], exit_steps = _bisect(
+        lambda och: ~penetrated(och, candidates[leaving]),
+        inside[leaving], np.full(leaving.size, och_max), tolerance)
+
+    # Each obstacle rules out the OCHs from its start until it leaves the
+    # OCS or the OCH reaches its height plus margin
+    required = obstacle_heights[candidates] + margin
+    until = np.minimum(end, required)
+    blocking = np.flatnonzero(until > start)
+    blocking = blocking[np.argsort(start[blocking], kind='stable')]
+
+    och = och_min
+    controlling = -1
+    if blocking.size:
+        covered = np.maximum.accumulate(np.maximum(until[blocking], och_min))
+        before = np.concatenate(([och_min], covered[:-1]))
+        gaps = np.flatnonzero(start[blocking] > before)
+        last = gaps[0] if gaps.size else blocking.size
+        if last:
+            worst = blocking[np.argmax(until[blocking[:last]])]
+            och = float(until[worst])
+            if och == required[worst] <= end[worst]:
+                controlling = int(candidates[worst])
+            if och > och_max:
+                return {'och': None, 'controlling': int(candidates[worst]),
+                        'iterations': entry_steps + exit_steps}
+
+    return {'och': och, 'controlling': controlling, 'iterations': entry_steps + exit_steps}
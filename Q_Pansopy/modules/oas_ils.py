@@ -18,8 +18,10 @@ import os
 import datetime
 import json
 import numpy as np
-import re
 from ..utils import get_selected_feature, fix_kml_altitude_mode
+from .evaluation.oas_csv import (
+    TEMPLATE_HEIGHT, export_constants_json, load_csv_constants as load_cached_constants
+)
 
 # Global variables to store computed values
 OAS_template = None
@@ -29,6 +31,15 @@ OAS_X = None
 OAS_Y = None
 OAS_Z = None
 
+# Parameters that select the OAS constants (see load_oas_constants)
+CONSTANTS_PARAMS = ('csv_path',)
+
+# OAS type values of the dock; the extended OAS contains the template, so
+# 'Both' is assessed against the extended surfaces
+OAS_TYPES = ('Template Only', 'Extended Only', 'Both')
+EXTENDED_OAS_TYPES = ('Extended Only', 'Both')
+
+
 def solve_plane_intersection(plane1, plane2, target_height):
     """
     Solve the intersection of two planes at a given height
@@ -55,7 +66,8 @@ def solve_plane_intersection(plane1, plane2, target_height):
         return None
 
 
-def csv_to_structured_json(THR_elev, FAP_elev, MOC_intermediate, FAP_height, ILS_extension_height):
+def csv_to_structured_json(THR_elev, FAP_elev, MOC_intermediate, FAP_height, ILS_extension_height,
+                           export_json=False):
     """
     Read OAS constants from a CSV file and convert to structured JSON
     
@@ -64,120 +76,20 @@ def csv_to_structured_json(THR_elev, FAP_elev, MOC_intermediate, FAP_height, ILS
     :param MOC_intermediate: MOC intermediate in meters
     :param FAP_height: FAP height in meters
     :param ILS_extension_height: ILS extension height in meters
+    :param export_json: Write the structured data to <csv>_cleaned.json
     :return: Dictionary with structured data or None if file not selected
     """
-    global OAS_template, OAS_extended_to_FAP, OAS_W, OAS_X, OAS_Y, OAS_Z
-    
     csv_path, _ = QFileDialog.getOpenFileName(None, "Select CSV File", "", "CSV Files (*.csv);;All Files (*)")
     if not csv_path:
         return None
     
-    data = {}
-    current_section = None
-    stop_section = "---OAS Template coordinates -m(meters)"
-    plane_constants = {}
-    
-    with open(csv_path, 'r', encoding='utf-8-sig') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            if line.startswith('---') and line.strip() == stop_section:
-                break
-            if line.startswith('---'):
-                current_section = line.strip('- \t\n')
-                data[current_section] = {}
-                continue
-            if '\t' in line:
-                parts = [p.strip().rstrip(',') for p in line.split('\t') if p.strip()]
-            else:
-                parts = [p.strip().rstrip(',') for p in re.split(r',|\s{2,}', line) if p.strip()]
-            if len(parts)==2:
-                key, value = parts
-            elif len(parts)>2:
-                key = ' '.join(parts[:-1])
-                value = parts[-1]
-            else:
-                continue
-            key = key.strip().rstrip(',')
-            try:
-                value = float(value)
-            except ValueError:
-                pass
-            if current_section and current_section=="OAS constants":
-                match = re.fullmatch(r'([WXYZ])([ABC])', key)
-                if match:
-                    plane, coeff = match.groups()
-                    plane_key = f"{plane} plane"
-                    if plane_key not in plane_constants:
-                        plane_constants[plane_key] = [None, None, None]
-                    index = "ABC".index(coeff)
-                    plane_constants[plane_key][index] = value
-                    continue
-            if current_section:
-                data[current_section][key] = value
-    
-    if "OAS constants" in data:
-        data["OAS constants"].update(plane_constants)
-    else:
-        data["OAS constants"] = plane_constants
-    
-    required_planes = ["W plane", "X plane", "Y plane", "Z plane"]
-    missing_planes = [p for p in required_planes if p not in data["OAS constants"] or None in data["OAS constants"][p]]
-    
-    if missing_planes:
-        iface.messageBar().pushMessage("Warning", f"Missing plane constants for: {', '.join(missing_planes)}", level=Qgis.Warning)
-        return None
-    else:
-        # Extract plane constants
-        OAS_W = data["OAS constants"]["W plane"]
-        OAS_X = data["OAS constants"]["X plane"]
-        OAS_Y = data["OAS constants"]["Y plane"]
-        OAS_Z = data["OAS constants"]["Z plane"]
-        
-        # Calculate intersections for template
-        lower = {
-            "C": solve_plane_intersection(OAS_W, OAS_X, 0),
-            "D": solve_plane_intersection(OAS_X, OAS_Y, 0),
-            "E": solve_plane_intersection(OAS_Y, OAS_Z, 0)
-        }
-        upper_template = {
-            "C'": solve_plane_intersection(OAS_W, OAS_X, 300),
-            "D'": solve_plane_intersection(OAS_X, OAS_Y, 300),
-            "D0'": solve_plane_intersection(OAS_X, OAS_Y, 300),
-            "E'": solve_plane_intersection(OAS_Y, OAS_Z, 300)
-        }
-        OAS_template = {**lower, **upper_template}
-        
-        # Calculate intersections for extended
-        upper_extended = {
-            "C'": solve_plane_intersection(OAS_W, OAS_X, ILS_extension_height),
-            "D'": solve_plane_intersection(OAS_X, OAS_Y, ILS_extension_height),
-            "D0'": solve_plane_intersection(OAS_X, OAS_Y, 300),
-            "E'": solve_plane_intersection(OAS_Y, OAS_Z, 300)  # E' is always at 300m
-        }
-        OAS_extended_to_FAP = {**lower, **upper_extended}
-        
-        # Store in data dictionary
-        data["OAS_template"] = OAS_template
-        data["OAS_extended"] = OAS_extended_to_FAP
-        data["individual_planes"] = {"W": OAS_W, "X": OAS_X, "Y": OAS_Y, "Z": OAS_Z}
-    
-    data["used_parameters"] = {
-        "THR_elev": f"{THR_elev} m",
-        "FAP_elev": f"{FAP_elev} ft",
-        "MOC_intermediate": f"{MOC_intermediate} m",
-        "FAP_height": f"{FAP_height} m",
-        "ILS_extension_height": f"{ILS_extension_height} m"
-    }
-    
-    json_path = os.path.splitext(csv_path)[0] + "_cleaned.json"
-    with open(json_path, 'w', encoding='utf-8') as out_f:
-        json.dump(data, out_f, indent=2)
-    
-    iface.messageBar().pushMessage("Success", f"Cleaned JSON saved to: {json_path}", level=Qgis.Success)
+    data = load_csv_constants(csv_path, THR_elev, FAP_elev, MOC_intermediate, FAP_height, ILS_extension_height)
+    if data and export_json:
+        json_path = export_constants_json(data, os.path.splitext(csv_path)[0] + "_cleaned.json")
+        iface.messageBar().pushMessage("Success", f"Cleaned JSON saved to: {json_path}", level=Qgis.Success)
     return data
 
+
 def build_mirrors(intersect_dict):
     """
     Build mirrored points for the given intersections
@@ -273,6 +185,7 @@ def calculate_oas_ils(iface, point_layer, runway_layer, params):
         'MOC_intermediate': str(MOC_intermediate),
         'FAP_height': str(FAP_height),
         'ILS_extension_height': str(ILS_extension_height),
+        'GP_angle': str(params.get('GP_angle', 3.0)),
         'calculation_date': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         'calculation_type': 'OAS ILS CAT I'
     }
@@ -280,30 +193,24 @@ def calculate_oas_ils(iface, point_layer, runway_layer, params):
     # Convert parameters to JSON string
     parameters_json = json.dumps(parameters_dict)
     
-    # Load constants from CSV file - this is now mandatory
-    csv_path = params.get('csv_path')
-    if not csv_path:
+    # Load constants from CSV file - this is mandatory
+    if not params.get('csv_path'):
         iface.messageBar().pushMessage("Error", "CSV file path is required but not provided", level=Qgis.Critical)
         raise ValueError("CSV file path is required but not provided")
-    
-    # Load constants from the provided CSV file using the existing function
-    csv_data = load_csv_constants(csv_path, THR_elev, FAP_elev, MOC_intermediate, FAP_height, ILS_extension_height)
-    if not csv_data:
+    constants_data = load_oas_constants(params, THR_elev, FAP_elev, MOC_intermediate, FAP_height, ILS_extension_height)
+    if not constants_data:
         iface.messageBar().pushMessage("Error", "Failed to load constants from CSV file", level=Qgis.Critical)
         raise ValueError("Failed to load constants from CSV file")
     
-    # CSV constants have been loaded and applied to global variables OAS_W, OAS_X, OAS_Y, OAS_Z
-    # and OAS_template, OAS_extended_to_FAP have been calculated
-    
-    # Validate that CSV constants were loaded properly
+    # Validate that the constants were loaded properly
     if not OAS_template or not OAS_extended_to_FAP:
-        iface.messageBar().pushMessage("Error", "Failed to calculate OAS intersections from CSV constants", level=Qgis.Critical)
-        raise ValueError("Failed to calculate OAS intersections from CSV constants")
+        iface.messageBar().pushMessage("Error", "Failed to calculate OAS intersections from the OAS constants", level=Qgis.Critical)
+        raise ValueError("Failed to calculate OAS intersections from the OAS constants")
     
     # Check if any of the calculated intersections is None
     if None in OAS_template.values() or None in OAS_extended_to_FAP.values():
-        iface.messageBar().pushMessage("Error", "Invalid CSV constants resulted in failed intersection calculations", level=Qgis.Critical)
-        raise ValueError("Invalid CSV constants resulted in failed intersection calculations")
+        iface.messageBar().pushMessage("Error", "Invalid OAS constants resulted in failed intersection calculations", level=Qgis.Critical)
+        raise ValueError("Invalid OAS constants resulted in failed intersection calculations")
     
     # Log start
     iface.messageBar().pushMessage("QPANSOPY:", "Executing OAS CAT I", level=Qgis.Info)
@@ -557,16 +464,33 @@ def copy_parameters_table(params):
         sections
     )
 
-def load_csv_constants(csv_path, THR_elev, FAP_elev, MOC_intermediate, FAP_height, ILS_extension_height):
+def used_parameters(THR_elev, FAP_elev, MOC_intermediate, FAP_height, ILS_extension_height):
+    """Parameters recorded with the structured constants"""
+    return {
+        "THR_elev": f"{THR_elev} m",
+        "FAP_elev": f"{FAP_elev} ft",
+        "MOC_intermediate": f"{MOC_intermediate} m",
+        "FAP_height": f"{FAP_height} m",
+        "ILS_extension_height": f"{ILS_extension_height} m"
+    }
+
+def load_csv_constants(csv_path, THR_elev, FAP_elev, MOC_intermediate, FAP_height, ILS_extension_height,
+                       export_json=False):
     """
     Load OAS constants from a CSV file path and calculate intersections
     
+    Parsed constants and intersections are kept in memory by file content
+    and derived heights (see ``evaluation.oas_csv``), so repeated runs with
+    the same file and heights neither parse nor solve again.
+    
     :param csv_path: Path to the CSV file
     :param THR_elev: Threshold elevation in meters
     :param FAP_elev: FAP elevation in feet
     :param MOC_intermediate: MOC intermediate in meters
     :param FAP_height: FAP height in meters
     :param ILS_extension_height: ILS extension height in meters
+    :param export_json: Write the structured data to <csv>_processed.json
+        for debugging
     :return: Dictionary with structured data or None if error occurs
     """
     global OAS_template, OAS_extended_to_FAP, OAS_W, OAS_X, OAS_Y, OAS_Z
@@ -576,133 +500,289 @@ def load_csv_constants(csv_path, THR_elev, FAP_elev, MOC_intermediate, FAP_heigh
         return None
     
     try:
-        data = {}
-        current_section = None
-        stop_section = "---OAS Template coordinates -m(meters)"
-        plane_constants = {}
-        
-        with open(csv_path, 'r', encoding='utf-8-sig') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                # Stop processing when we reach the template coordinates section
-                if line.startswith('---') and line.strip() == stop_section:
-                    break
-                    
-                # Detect section headers
-                if line.startswith('---'):
-                    current_section = line.strip('- \t\n')
-                    data[current_section] = {}
-                    continue
-                
-                # Parse data lines
-                if '\t' in line:
-                    parts = [p.strip().rstrip(',') for p in line.split('\t') if p.strip()]
-                else:
-                    parts = [p.strip().rstrip(',') for p in re.split(r',|\s{2,}', line) if p.strip()]
-                
-                if len(parts) == 2:
-                    key, value = parts
-                elif len(parts) > 2:
-                    key = ' '.join(parts[:-1])
-                    value = parts[-1]
-                else:
-                    continue
-                    
-                key = key.strip().rstrip(',')
-                
-                # Try to convert value to float
-                try:
-                    value = float(value)
-                except ValueError:
-                    pass
-                
-                # Handle OAS constants section specially
-                if current_section and current_section == "OAS constants":
-                    match = re.fullmatch(r'([WXYZ])([ABC])', key)
-                    if match:
-                        plane, coeff = match.groups()
-                        plane_key = f"{plane} plane"
-                        if plane_key not in plane_constants:
-                            plane_constants[plane_key] = [None, None, None]
-                        index = "ABC".index(coeff)
-                        plane_constants[plane_key][index] = value
-                        continue
-                
-                # Store in current section
-                if current_section:
-                    data[current_section][key] = value
-        
-        # Merge plane constants into data
-        if "OAS constants" in data:
-            data["OAS constants"].update(plane_constants)
-        else:
-            data["OAS constants"] = plane_constants
-        
-        # Validate required plane constants
-        required_planes = ["W plane", "X plane", "Y plane", "Z plane"]
-        missing_planes = [p for p in required_planes if p not in data["OAS constants"] or None in data["OAS constants"][p]]
-        
-        if missing_planes:
-            iface.messageBar().pushMessage("Error", f"Missing plane constants for: {', '.join(missing_planes)}", level=Qgis.Critical)
-            return None
-        
-        # Extract plane constants to global variables
-        OAS_W = data["OAS constants"]["W plane"]
-        OAS_X = data["OAS constants"]["X plane"]
-        OAS_Y = data["OAS constants"]["Y plane"]
-        OAS_Z = data["OAS constants"]["Z plane"]
-        
-        # Calculate intersections for template (at 300m height)
-        lower = {
-            "C": solve_plane_intersection(OAS_W, OAS_X, 0),
-            "D": solve_plane_intersection(OAS_X, OAS_Y, 0),
-            "E": solve_plane_intersection(OAS_Y, OAS_Z, 0)
-        }
-        upper_template = {
-            "C'": solve_plane_intersection(OAS_W, OAS_X, 300),
-            "D'": solve_plane_intersection(OAS_X, OAS_Y, 300),
-            "D0'": solve_plane_intersection(OAS_X, OAS_Y, 300),
-            "E'": solve_plane_intersection(OAS_Y, OAS_Z, 300)
-        }
-        OAS_template = {**lower, **upper_template}
-        
-        # Calculate intersections for extended (at ILS extension height)
-        upper_extended = {
-            "C'": solve_plane_intersection(OAS_W, OAS_X, ILS_extension_height),
-            "D'": solve_plane_intersection(OAS_X, OAS_Y, ILS_extension_height),
-            "D0'": solve_plane_intersection(OAS_X, OAS_Y, 300),
-            "E'": solve_plane_intersection(OAS_Y, OAS_Z, 300)  # E' is always at 300m
-        }
-        OAS_extended_to_FAP = {**lower, **upper_extended}
-        
-        # Check if any intersections failed
-        if None in OAS_template.values() or None in OAS_extended_to_FAP.values():
-            iface.messageBar().pushMessage("Error", "Some plane intersections could not be calculated", level=Qgis.Critical)
-            return None
-        
-        # Store calculated data in dictionary
-        data["OAS_template"] = OAS_template
-        data["OAS_extended"] = OAS_extended_to_FAP
-        data["individual_planes"] = {"W": OAS_W, "X": OAS_X, "Y": OAS_Y, "Z": OAS_Z}
-        data["used_parameters"] = {
-            "THR_elev": f"{THR_elev} m",
-            "FAP_elev": f"{FAP_elev} ft",
-            "MOC_intermediate": f"{MOC_intermediate} m",
-            "FAP_height": f"{FAP_height} m",
-            "ILS_extension_height": f"{ILS_extension_height} m"
-        }
-        
-        # Save processed data as JSON for debugging
-        json_path = os.path.splitext(csv_path)[0] + "_processed.json"
-        with open(json_path, 'w', encoding='utf-8') as out_f:
-            json.dump(data, out_f, indent=2)
-        
-        iface.messageBar().pushMessage("Success", f"CSV constants loaded successfully. Debug file: {json_path}", level=Qgis.Success)
+        data, reused, json_path = load_cached_constants(
+            csv_path, ILS_extension_height, TEMPLATE_HEIGHT,
+            parameters=used_parameters(THR_elev, FAP_elev, MOC_intermediate, FAP_height, ILS_extension_height),
+            export_json=export_json
+        )
+        planes = data["individual_planes"]
+        OAS_W, OAS_X, OAS_Y, OAS_Z = planes["W"], planes["X"], planes["Y"], planes["Z"]
+        OAS_template = data["OAS_template"]
+        OAS_extended_to_FAP = data["OAS_extended"]
+        
+        message = "CSV constants reused" if reused else "CSV constants loaded successfully"
+        if json_path:
+            message += f". Debug file: {json_path}"
+        
+        iface.messageBar().pushMessage("Success", message, level=Qgis.Success)
         return data
         
+    except ValueError as e:
+        iface.messageBar().pushMessage("Error", str(e), level=Qgis.Critical)
+        return None
     except Exception as e:
         iface.messageBar().pushMessage("Error", f"Error reading CSV file: {str(e)}", level=Qgis.Critical)
-        return None
\ No newline at end of file
+        return None
+
+def load_oas_constants(params, THR_elev, FAP_elev, MOC_intermediate, FAP_height, ILS_extension_height):
+    """
+    Load the OAS constants from the CSV exported by the OAS software in
+    params 'csv_path' ('export_constants_json' writes the debug JSON)
+    
+    :return: Dictionary with structured data or None if no CSV is given or
+        an error occurs
+    """
+    csv_path = params.get('csv_path')
+    if not csv_path:
+        iface.messageBar().pushMessage("Error", "CSV file path is required but not provided", level=Qgis.Critical)
+        return None
+    return load_csv_constants(csv_path, THR_elev, FAP_elev, MOC_intermediate, FAP_height, ILS_extension_height,
+                              export_json=params.get('export_constants_json', False))
+
+def evaluate_oas_obstacles(iface, obstacle_layer, point_layer, runway_layer, params):
+    """
+    Evaluate an obstacle layer against the OAS W, X, Y and Z planes
+
+    The whole layer is converted to threshold-relative coordinates and every
+    plane is evaluated as a NumPy array, so no per-feature geometry test is
+    needed. Uses the plane constants of ``load_oas_constants``.
+
+    :param iface: QGIS interface
+    :param obstacle_layer: Point layer with obstacles, obstacle file path or
+        structured obstacle array (see ``load_obstacles``)
+    :param point_layer: Point layer with the threshold point
+    :param runway_layer: Runway layer
+    :param params: Dictionary with evaluation parameters; 'oas_type' is one
+        of ``OAS_TYPES`` (default 'Both'), 'THR_elev' in meters, the
+        evaluation options of ``evaluate_obstacle_surfaces`` ('workers',
+        'prefilter', 'accuracy', 'incremental', 'top_n', ...) and
+        'compute_oca', which adds the OCA/H of every category (see
+        ``calculate_ils_oca``) and needs every penetrating obstacle, so the
+        prefilter is not applied then
+    :return: Dictionary with results
+    """
+    from .evaluation.obstacle_layers import threshold_frame, evaluate_obstacle_surfaces
+
+    THR_elev = float(params.get('THR_elev', 0))
+    FAP_elev = float(params.get('FAP_elev', 2000))
+    MOC_intermediate = float(params.get('MOC_intermediate', 150))
+    oas_type = params.get('oas_type', 'Both')
+
+    FAP_height = FAP_elev * 0.3048 - THR_elev
+    ILS_extension_height = FAP_height - MOC_intermediate
+
+    if oas_type not in OAS_TYPES:
+        iface.messageBar().pushMessage("Error", f"Unknown OAS type '{oas_type}'", level=Qgis.Critical)
+        return None
+
+    # Reload the constants if a CSV is given or none are loaded yet
+    if any(params.get(key) is not None for key in CONSTANTS_PARAMS) or None in (OAS_W, OAS_X, OAS_Y, OAS_Z):
+        if not load_oas_constants(params, THR_elev, FAP_elev, MOC_intermediate, FAP_height, ILS_extension_height):
+            iface.messageBar().pushMessage("Error", "OAS constants are not loaded", level=Qgis.Critical)
+            return None
+
+    if obstacle_layer is None or not point_layer or not runway_layer:
+        iface.messageBar().pushMessage("Error", "Obstacle, point or runway layer not provided", level=Qgis.Critical)
+        return None
+
+    map_crs = iface.mapCanvas().mapSettings().destinationCrs()
+    try:
+        frame = threshold_frame(point_layer, runway_layer, map_crs, THR_elev)
+    except ValueError as e:
+        iface.messageBar().pushMessage("Error", str(e), level=Qgis.Critical)
+        return None
+
+    planes = [OAS_W, OAS_X, OAS_Y, OAS_Z]
+    if oas_type in EXTENDED_OAS_TYPES:
+        top_heights = [ILS_extension_height, ILS_extension_height, TEMPLATE_HEIGHT, TEMPLATE_HEIGHT]
+    else:
+        top_heights = TEMPLATE_HEIGHT
+    surfaces = {
+        'names': ['Surface W', 'Surface X', 'Surface Y', 'Surface Z'],
+        'planes': planes,
+        'top_heights': top_heights,
+        'key': {'surface': 'OAS', 'top_heights': top_heights, 'floor': 0.0}
+    }
+
+    # The OCA/H needs every penetrating obstacle
+    if params.get('compute_oca'):
+        params = dict(params, prefilter=False)
+
+    result = evaluate_obstacle_surfaces(iface, obstacle_layer, surfaces, frame, map_crs, params,
+                                        f"OAS ILS CAT I - {oas_type}", "the OAS")
+    if params.get('compute_oca') and 'top_n' not in result:
+        result['oca'] = calculate_ils_oca(iface, result, params)
+    return result
+
+
+def calculate_ils_oca(iface, evaluation_result, params):
+    """
+    OCA/H of every aircraft category from an OAS evaluation
+
+    The obstacles penetrating the OAS are classified as approach or missed
+    approach obstacles, missed approach obstacles are converted to their
+    equivalent heights and the height loss margins are added, all
+    categories at once (see ``evaluation.oca.ils_oca``).
+
+    :param iface: QGIS interface
+    :param evaluation_result: Dictionary returned by ``evaluate_oas_obstacles``
+    :param params: Dictionary with 'THR_elev' (meters), 'GP_angle'
+        (degrees, default 3.0), 'categories' (default A-D), 'altimeter'
+        ('radio' or 'pressure'), 'aerodrome_elev', 'missed_gradient'
+        (default 0.025) and 'missed_method' ('distance' or 'gp_plane')
+    :return: Dictionary with 'layer' (OCA/H table), 'rows' and 'oca'
+    """
+    from .evaluation.oca import ils_oca
+
+    obstacles = evaluation_result['obstacles']
+    evaluation = evaluation_result['evaluation']
+    THR_elev = float(params.get('THR_elev', 0))
+
+    penetrating = np.flatnonzero(evaluation['inside'] & (evaluation['penetration'] > 0))
+    aerodrome_elev = params.get('aerodrome_elev')
+    oca = ils_oca(
+        evaluation['x_local'][penetrating], evaluation['height'][penetrating], THR_elev,
+        gp_angle=float(params.get('GP_angle', 3.0)),
+        categories=params.get('categories', ('A', 'B', 'C', 'D')),
+        altimeter=params.get('altimeter', 'radio'),
+        aerodrome_elevation=float(aerodrome_elev) if aerodrome_elev is not None else None,
+        missed_gradient=float(params.get('missed_gradient', 0.025)),
+        method=params.get('missed_method', 'distance')
+    )
+
+    ids = obstacles.get('id', obstacles['fid'])
+    table = QgsVectorLayer("None", "ILS OCA/H", "memory")
+    provider = table.dataProvider()
+    provider.addAttributes([
+        QgsField('category', QVariant.String),
+        QgsField('och', QVariant.Double, 'double', 10, 2),
+        QgsField('oca', QVariant.Double, 'double', 10, 2),
+        QgsField('hl_margin', QVariant.Double, 'double', 10, 2),
+        QgsField('ctrl_obst', QVariant.String),
+        QgsField('ctrl_type', QVariant.String),
+        QgsField('ctrl_height', QVariant.Double, 'double', 10, 2),
+        QgsField('equiv_height', QVariant.Double, 'double', 10, 2)
+    ])
+    table.updateFields()
+
+    rows, features = [], []
+    for i, category in enumerate(oca['categories']):
+        controlling = int(oca['controlling'][i])
+        obstacle = int(penetrating[controlling]) if controlling >= 0 else -1
+        row = {
+            'category': category,
+            'och': round(float(oca['och'][i]), 2),
+            'oca': round(float(oca['oca'][i]), 2),
+            'hl_margin': round(float(oca['margin'][i]), 2),
+            'ctrl_obst': str(ids[obstacle]) if obstacle >= 0 else None,
+            'ctrl_type': ('missed' if oca['controlling_missed'][i] else 'approach') if obstacle >= 0 else None,
+            'ctrl_height': round(float(evaluation['height'][obstacle]), 2) if obstacle >= 0 else None,
+            'equiv_height': round(float(oca['equivalent_height'][i]), 2)
+        }
+        rows.append(row)
+        feat = QgsFeature(table.fields())
+        feat.setAttributes(list(row.values()))
+        features.append(feat)
+    provider.addFeatures(features)
+    QgsProject.instance().addMapLayer(table)
+
+    summary = ", ".join(f"{row['category']} {row['och']:.0f} m" for row in rows)
+    iface.messageBar().pushMessage("QPANSOPY:", f"ILS OCH: {summary}", level=Qgis.Success)
+    return {'layer': table, 'rows': rows, 'oca': oca}
+
+def create_oas_contours(iface, point_layer, runway_layer, params):
+    """
+    Create a LineStringZ layer with the OAS height contours
+
+    Every plane is cut at all contour heights in one vectorized operation
+    and each cut is clipped at the adjacent planes (see
+    ``evaluation.oas_geometry.oas_contours``).
+
+    :param iface: QGIS interface
+    :param point_layer: Point layer with the threshold point
+    :param runway_layer: Runway layer
+    :param params: Dictionary with 'THR_elev' (meters), 'FAP_elev',
+        'MOC_intermediate', 'oas_type' (one of ``OAS_TYPES``), either
+        'contour_heights' (list of heights above threshold) or
+        'contour_interval' (default 10 m) up to 'contour_max' (default
+        300 m, the ILS extension height for the extended OAS), and
+        'csv_path' (see ``load_oas_constants``)
+    :return: Dictionary with 'layer' and 'contours'
+    """
+    from .evaluation.oas_geometry import oas_contours
+    from .evaluation.surfaces import map_frame
+    from .evaluation.obstacle_layers import threshold_frame
+
+    THR_elev = float(params.get('THR_elev', 0))
+    FAP_elev = float(params.get('FAP_elev', 2000))
+    MOC_intermediate = float(params.get('MOC_intermediate', 150))
+    oas_type = params.get('oas_type', 'Both')
+
+    FAP_height = FAP_elev * 0.3048 - THR_elev
+    ILS_extension_height = FAP_height - MOC_intermediate
+
+    if oas_type not in OAS_TYPES:
+        iface.messageBar().pushMessage("Error", f"Unknown OAS type '{oas_type}'", level=Qgis.Critical)
+        return None
+
+    if any(params.get(key) is not None for key in CONSTANTS_PARAMS) or None in (OAS_W, OAS_X, OAS_Y, OAS_Z):
+        if not load_oas_constants(params, THR_elev, FAP_elev, MOC_intermediate, FAP_height, ILS_extension_height):
+            iface.messageBar().pushMessage("Error", "OAS constants are not loaded", level=Qgis.Critical)
+            return None
+
+    if not point_layer or not runway_layer:
+        iface.messageBar().pushMessage("Error", "Point or runway layer not provided", level=Qgis.Critical)
+        return None
+
+    map_crs = iface.mapCanvas().mapSettings().destinationCrs()
+    try:
+        frame = threshold_frame(point_layer, runway_layer, map_crs, THR_elev)
+    except ValueError as e:
+        iface.messageBar().pushMessage("Error", str(e), level=Qgis.Critical)
+        return None
+
+    if oas_type in EXTENDED_OAS_TYPES:
+        top_heights = [ILS_extension_height, ILS_extension_height, TEMPLATE_HEIGHT, TEMPLATE_HEIGHT]
+        contour_max = float(params.get('contour_max', ILS_extension_height))
+    else:
+        top_heights = TEMPLATE_HEIGHT
+        contour_max = float(params.get('contour_max', TEMPLATE_HEIGHT))
+
+    heights = params.get('contour_heights')
+    if heights is None:
+        interval = float(params.get('contour_interval', 10))
+        if interval <= 0:
+            iface.messageBar().pushMessage("Error", "Contour interval must be positive", level=Qgis.Critical)
+            return None
+        heights = np.arange(interval, contour_max + interval * 1e-6, interval)
+
+    contours = oas_contours([OAS_W, OAS_X, OAS_Y, OAS_Z], heights, top_heights)
+    x0, y0 = map_frame(contours['x0'], contours['y0'], frame['thr_x'], frame['thr_y'], frame['bearing'])
+    x1, y1 = map_frame(contours['x1'], contours['y1'], frame['thr_x'], frame['thr_y'], frame['bearing'])
+    z = contours['height'] + THR_elev
+
+    layer = QgsVectorLayer("LineStringZ?crs=" + map_crs.authid(), f"OAS ILS CAT I - {oas_type} Contours", "memory")
+    provider = layer.dataProvider()
+    provider.addAttributes([
+        QgsField('surface', QVariant.String),
+        QgsField('side', QVariant.Int),
+        QgsField('height', QVariant.Double),
+        QgsField('elevation', QVariant.Double)
+    ])
+    layer.updateFields()
+
+    features = []
+    for i in range(len(contours)):
+        feat = QgsFeature(layer.fields())
+        feat.setGeometry(QgsGeometry(QgsLineString([QgsPoint(x0[i], y0[i], z[i]), QgsPoint(x1[i], y1[i], z[i])])))
+        feat.setAttributes([f"Surface {contours['plane'][i]}", int(contours['side'][i]),
+                            round(float(contours['height'][i]), 2), round(float(z[i]), 2)])
+        features.append(feat)
+    provider.addFeatures(features)
+    layer.updateExtents()
+    QgsProject.instance().addMapLayer(layer)
+
+    iface.messageBar().pushMessage(
+        "QPANSOPY", f"Created {len(np.unique(contours['height']))} OAS contours ({len(contours)} segments)",
+        level=Qgis.Success)
+    return {'layer': layer, 'contours': contours}
@@ -1,5 +1,7 @@
 from qgis.core import (
     QgsProject,
+    QgsField,
+    QgsFields,
     QgsFeatureRequest,
     QgsSpatialIndex,
     QgsCoordinateTransform,
@@ -7,6 +9,7 @@ from qgis.core import (
     QgsWkbTypes,
     QgsFeature,
     QgsGeometry,
+    QgsRectangle,
     QgsSymbol,
     QgsSimpleMarkerSymbolLayer,
     QgsVectorFileWriter,
@@ -15,8 +18,24 @@ from qgis.core import (
 )
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QComboBox, QLabel, QPushButton
 from PyQt5.QtGui import QColor
+from PyQt5.QtCore import QVariant
 import os
 import datetime
+import numpy as np
+
+from .evaluation.geometry import points_in_polygon, polygon_bounds, build_str_tree, points_in_polygons
+from .evaluation.obstacle_layers import polygon_parts, load_obstacle_index_for_layer
+from .evaluation.obstacle_cache import query_obstacle_index
+
+# Motores de prueba punto en superficie disponibles en extract_objects
+EXTRACTION_ENGINES = ('prepared', 'vectorized', 'simple')
+
+# Superficies de extracción preparadas, por id de la capa de superficies
+_SURFACE_CACHE = {}
+
+# Capas de superficies cuyas señales de datos y de edición descartan sus superficies preparadas
+_WATCHED_SURFACES = set()
+_PROJECT_CONNECTED = False
 
 # Mantener la clase de diálogo, pero solo para compatibilidad
 class LayerSelectionDialog(QDialog):
@@ -57,7 +76,246 @@ class LayerSelectionDialog(QDialog):
             self.surface_layers[self.surface_combo.currentIndex()]
         )
 
-def extract_objects(iface, point_layer, surface_layer, export_kml=False, output_dir=None, use_selection_only=False):
+def iter_candidate_features(point_layer, rect, rect_crs, target_crs=None):
+    """
+    Yield the point features inside a rectangle without loading the layer
+    
+    The rectangle is pushed down to the data provider as a filter, so only
+    candidate features are read. It is reprojected to the layer CRS when
+    needed and the yielded geometries are reprojected to ``target_crs``.
+    
+    Args:
+        point_layer: The layer containing obstacles/points
+        rect: QgsRectangle with the search area
+        rect_crs: CRS of the rectangle
+        target_crs: CRS for the yielded geometries (layer CRS if None)
+    
+    Yields:
+        QgsFeature with its geometry in ``target_crs``
+    """
+    layer_crs = point_layer.crs()
+    
+    if rect_crs != layer_crs:
+        rect_transform = QgsCoordinateTransform(rect_crs, layer_crs, QgsProject.instance())
+        rect = rect_transform.transformBoundingBox(rect)
+    
+    transform = None
+    if target_crs is not None and target_crs != layer_crs:
+        transform = QgsCoordinateTransform(layer_crs, target_crs, QgsProject.instance())
+    
+    request = QgsFeatureRequest().setFilterRect(rect)
+    for feat in point_layer.getFeatures(request):
+        if transform:
+            geom = feat.geometry()
+            geom.transform(transform)
+            feat.setGeometry(geom)
+        yield feat
+
+def _surface_geometries(surface_layer, use_selection_only):
+    """Surface geometries by feature id"""
+    features = surface_layer.selectedFeatures() if use_selection_only else surface_layer.getFeatures()
+    geometries = {}
+    for feat in features:
+        geom = feat.geometry()
+        if geom.isNull():
+            continue
+        geometries[feat.id()] = geom
+    return geometries
+
+def _surface_state(surface_layer, project_crs, use_selection_only, keep_separate):
+    """Key of the preparation options; changes of the layer data are signalled instead"""
+    selection = tuple(sorted(surface_layer.selectedFeatureIds())) if use_selection_only else None
+    return (
+        surface_layer.crs().authid(),
+        project_crs.authid(),
+        selection,
+        keep_separate
+    )
+
+def _forget_surfaces(layer_ids):
+    """Drop the prepared surfaces of layers removed from the project"""
+    for layer_id in layer_ids:
+        _SURFACE_CACHE.pop(layer_id, None)
+        _WATCHED_SURFACES.discard(layer_id)
+
+def _watch_surface_layer(surface_layer):
+    """Drop the prepared surfaces of a layer on any data change or edit"""
+    global _PROJECT_CONNECTED
+    if not _PROJECT_CONNECTED:
+        QgsProject.instance().layersWillBeRemoved.connect(_forget_surfaces)
+        _PROJECT_CONNECTED = True
+    layer_id = surface_layer.id()
+    if layer_id in _WATCHED_SURFACES:
+        return
+    forget = lambda *args: _SURFACE_CACHE.pop(layer_id, None)
+    # dataChanged cubre los cambios confirmados y las recargas del proveedor;
+    # las demás señales, las ediciones aún sin guardar
+    for signal in (surface_layer.dataChanged, surface_layer.geometryChanged,
+                   surface_layer.featureAdded, surface_layer.featureDeleted):
+        signal.connect(forget)
+    _WATCHED_SURFACES.add(layer_id)
+
+def clear_surface_cache(surface_layer=None):
+    """Drop the prepared surfaces of one layer, or of every layer if None"""
+    if surface_layer is None:
+        _SURFACE_CACHE.clear()
+    else:
+        _SURFACE_CACHE.pop(surface_layer.id(), None)
+
+def prepare_surfaces(surface_layer, project_crs, use_selection_only=False, keep_separate=False):
+    """
+    Prepare the extraction surfaces of a layer, reusing a cached result
+    
+    All surface features are merged with a single cascaded union instead of
+    pairwise combines. With ``keep_separate`` the features are kept apart
+    and indexed by bounding box instead, which avoids the union entirely.
+    The result is cached per layer and dropped when the layer data changes
+    or is edited (committed or not) and when the layer is removed from the
+    project, so repeated extractions against unchanged surfaces read no
+    feature and skip the union.
+    
+    Args:
+        surface_layer: The layer defining the extraction area (polygon)
+        project_crs: CRS of the prepared geometries
+        use_selection_only: Whether to use only selected features
+        keep_separate: Whether to keep the surfaces separate with an index
+    
+    Returns:
+        Dictionary with 'geometry' (union or None), 'surfaces' (fid ->
+        QgsGeometry), 'index', 'bbox' and a 'testers' cache, or None if the
+        layer has no surfaces
+    """
+    _watch_surface_layer(surface_layer)
+    key = _surface_state(surface_layer, project_crs, use_selection_only, keep_separate)
+    cached = _SURFACE_CACHE.get(surface_layer.id())
+    if cached is not None and cached['key'] == key:
+        return cached
+    
+    surfaces = _surface_geometries(surface_layer, use_selection_only)
+    
+    if surface_layer.crs() != project_crs:
+        transform = QgsCoordinateTransform(surface_layer.crs(), project_crs, QgsProject.instance())
+        for geom in surfaces.values():
+            geom.transform(transform)
+    
+    if not surfaces:
+        return None
+    
+    bbox = None
+    for geom in surfaces.values():
+        if bbox is None:
+            bbox = QgsRectangle(geom.boundingBox())
+        else:
+            bbox.combineExtentWith(geom.boundingBox())
+    
+    prepared = {
+        'key': key,
+        'geometry': None,
+        'surfaces': surfaces,
+        'index': None,
+        'bbox': bbox,
+        'testers': {}
+    }
+    
+    if keep_separate:
+        index = QgsSpatialIndex()
+        for fid, geom in surfaces.items():
+            index.addFeature(fid, geom.boundingBox())
+        prepared['index'] = index
+    else:
+        prepared['geometry'] = QgsGeometry.unaryUnion(list(surfaces.values()))
+    
+    _SURFACE_CACHE[surface_layer.id()] = prepared
+    return prepared
+
+def prepared_surface_tester(prepared, engine='prepared'):
+    """
+    Batch point-in-surface test for surfaces from ``prepare_surfaces``
+    
+    Testers are cached inside ``prepared``, so a GEOS prepared geometry or
+    the ring arrays are only built once per surface state.
+    
+    Args:
+        prepared: Dictionary returned by ``prepare_surfaces``
+        engine: Point-in-surface engine, see ``surface_tester``
+    
+    Returns:
+        Function taking a list of point QgsGeometry and returning booleans
+    """
+    if engine in prepared['testers']:
+        return prepared['testers'][engine]
+    
+    if prepared['geometry'] is not None:
+        tester = surface_tester(prepared['geometry'], engine)
+    else:
+        index = prepared['index']
+        surface_testers = {fid: surface_tester(geom, engine) for fid, geom in prepared['surfaces'].items()}
+        
+        def tester(geoms):
+            hits = np.zeros(len(geoms), dtype=bool)
+            # Agrupar los puntos por superficie candidata según el índice
+            by_surface = {}
+            for i, geom in enumerate(geoms):
+                for fid in index.intersects(geom.boundingBox()):
+                    by_surface.setdefault(fid, []).append(i)
+            for fid, positions in by_surface.items():
+                positions = np.asarray(positions)
+                remaining = positions[~hits[positions]]
+                if remaining.size == 0:
+                    continue
+                inside = np.asarray(surface_testers[fid]([geoms[i] for i in remaining]), dtype=bool)
+                hits[remaining[inside]] = True
+            return hits
+    
+    prepared['testers'][engine] = tester
+    return tester
+
+def surface_tester(surface_geom, engine='prepared'):
+    """
+    Build a batch point-in-surface test for a combined surface geometry
+    
+    Args:
+        surface_geom: QgsGeometry with the extraction surface
+        engine: 'prepared' to test with a GEOS prepared geometry built once,
+            'vectorized' to test coordinate arrays with NumPy, or 'simple'
+            for an unprepared QgsGeometry.intersects per point
+    
+    Returns:
+        Function taking a list of point QgsGeometry and returning a list or
+        array of booleans
+    """
+    if engine not in EXTRACTION_ENGINES:
+        raise ValueError(f"Unknown extraction engine '{engine}'")
+    
+    if engine == 'vectorized':
+        if surface_geom.type() != QgsWkbTypes.PolygonGeometry:
+            raise ValueError("The vectorized engine requires a polygon surface layer")
+        parts = polygon_parts(surface_geom)
+        
+        def test(geoms):
+            if not geoms:
+                return np.zeros(0, dtype=bool)
+            points = [g.vertexAt(0) for g in geoms]
+            x = np.fromiter((p.x() for p in points), dtype=np.float64, count=len(points))
+            y = np.fromiter((p.y() for p in points), dtype=np.float64, count=len(points))
+            return points_in_polygon(x, y, parts)
+        return test
+    
+    if engine == 'prepared':
+        geometry_engine = QgsGeometry.createGeometryEngine(surface_geom.constGet())
+        geometry_engine.prepareGeometry()
+        
+        def test(geoms):
+            return [geometry_engine.intersects(g.constGet()) for g in geoms]
+        return test
+    
+    def test(geoms):
+        return [surface_geom.intersects(g) for g in geoms]
+    return test
+
+def extract_objects(iface, point_layer, surface_layer, export_kml=False, output_dir=None, use_selection_only=False,
+                    streaming=False, chunk_size=5000, engine='prepared', keep_separate=False,
+                    use_index_cache=False, cache_dir=None):
     """
     Extract objects that intersect with the surface
     
@@ -68,6 +326,20 @@ def extract_objects(iface, point_layer, surface_layer, export_kml=False, output_
         export_kml: Whether to export as KML
         output_dir: Directory for KML export
         use_selection_only: Whether to use only selected features
+        streaming: Whether to fetch only candidates inside the surface bounding
+            box from the provider instead of indexing the whole point layer.
+            Memory stays bounded by ``chunk_size``; result['features'] is left
+            empty in this mode
+        chunk_size: Number of candidates tested and written per batch
+        engine: Point-in-surface engine, see ``surface_tester``
+        keep_separate: Whether to test each surface feature through a
+            bounding box index instead of their union, see
+            ``prepare_surfaces``
+        use_index_cache: Whether to find candidates with the persistent
+            obstacle index (see ``load_obstacle_index_for_layer``) instead
+            of building a QgsSpatialIndex on every call
+        cache_dir: Directory of the obstacle index cache (default location
+            if None)
     
     Returns:
         Dictionary with extraction results
@@ -82,110 +354,265 @@ def extract_objects(iface, point_layer, surface_layer, export_kml=False, output_
     
     # Verificar si las capas están en el mismo CRS
     point_crs = point_layer.crs()
-    surface_crs = surface_layer.crs()
     
     # Crear transformaciones si es necesario (optimización: verificar una sola vez por capa)
     transform_point_to_project = None
-    transform_surface_to_project = None
     
     if point_crs != project_crs:
         transform_point_to_project = QgsCoordinateTransform(point_crs, project_crs, QgsProject.instance())
-    if surface_crs != project_crs:
-        transform_surface_to_project = QgsCoordinateTransform(surface_crs, project_crs, QgsProject.instance())
     
-    # Obtener las geometrías de superficie
-    if use_selection_only:
-        surface_features = surface_layer.selectedFeatures()
+    # Superficies unidas (o indexadas) y preparadas una sola vez, con caché por capa
+    prepared = prepare_surfaces(surface_layer, project_crs, use_selection_only, keep_separate)
+    if prepared is None:
+        return result
+    
+    inside_surface = prepared_surface_tester(prepared, engine)
+    surface_bbox = prepared['bbox']
+    
+    if streaming:
+        return _extract_objects_streaming(iface, point_layer, surface_layer, surface_bbox, inside_surface,
+                                          project_crs, export_kml, output_dir, chunk_size)
+    
+    if use_index_cache:
+        # Índice persistente en disco: solo se leen del proveedor los candidatos
+        candidates = _indexed_candidates(point_layer, surface_bbox, project_crs, cache_dir)
     else:
-        surface_features = surface_layer.getFeatures()
+        # Crear índice espacial para optimizar las consultas de intersección
+        spatial_index = QgsSpatialIndex()
+        point_features = {}
+        
+        # Poblar el índice espacial con los puntos (transformados si es necesario)
+        for feat in point_layer.getFeatures():
+            geom = feat.geometry()
+            # Transformar al CRS del proyecto si es necesario (sin usar clone())
+            if transform_point_to_project:
+                # Crear una copia de la geometría para transformar
+                transformed_geom = QgsGeometry(geom)
+                transformed_geom.transform(transform_point_to_project)
+                geom = transformed_geom
+                
+            spatial_index.addFeature(feat)
+            point_features[feat.id()] = (feat, geom)
         
-    surface_geom = None
+        # Usar índice espacial para encontrar candidatos, luego verificar intersección exacta
+        candidate_ids = spatial_index.intersects(surface_bbox)
+        
+        candidates = [point_features[fid] for fid in candidate_ids if fid in point_features]
     
-    # Combinar todas las geometrías de superficie, transformándolas al CRS del proyecto
-    for feat in surface_features:
-        geom = feat.geometry()
-        # Transformar al CRS del proyecto si es necesario
-        if transform_surface_to_project:
-            geom.transform(transform_surface_to_project)
-            
-        if surface_geom is None:
-            surface_geom = geom
-        else:
-            surface_geom = surface_geom.combine(geom)
+    # Crear una nueva capa para los objetos extraídos usando el CRS del proyecto
+    extracted_layer, layer_name = _create_extracted_layer(point_layer, surface_layer, project_crs)
+    provider = extracted_layer.dataProvider()
+    
+    # Verificar intersecciones exactas solo para los candidatos, por lotes
+    for start in range(0, len(candidates), chunk_size):
+        chunk = candidates[start:start + chunk_size]
+        hits = inside_surface([geom for _, geom in chunk])
+        new_features = []
+        for (feat, geom), hit in zip(chunk, hits):
+            if hit:
+                # Crear nueva característica y añadirla a la capa de resultados
+                new_feat = QgsFeature(feat)
+                new_feat.setGeometry(geom)
+                new_features.append(new_feat)
+        provider.addFeatures(new_features)
+        result['features'].extend(new_features)
+        result['count'] += len(new_features)
+    
+    # Actualizar la capa
+    extracted_layer.updateExtents()
+    
+    # Añadir al mapa
+    QgsProject.instance().addMapLayer(extracted_layer)
+    
+    # Exportar a KML si se solicita
+    if export_kml and output_dir and result['count'] > 0:
+        result['kml_path'] = _export_extracted_kml(extracted_layer, output_dir, layer_name)
+    
+    return result
+
+def _indexed_candidates(point_layer, rect, project_crs, cache_dir=None):
+    """
+    Fetch the points inside a rectangle through the persistent obstacle index
+    
+    Args:
+        point_layer: The layer containing obstacles/points
+        rect: QgsRectangle in the project CRS
+        project_crs: CRS of the rectangle and of the returned geometries
+        cache_dir: Directory of the obstacle index cache
+    
+    Returns:
+        List of (feature, geometry) tuples with geometries in the project CRS
+    """
+    elevation_field = 'elev' if point_layer.fields().indexFromName('elev') != -1 else None
+    index = load_obstacle_index_for_layer(point_layer, elevation_field, project_crs, cache_dir)
+    positions = query_obstacle_index(index, rect.xMinimum(), rect.yMinimum(),
+                                     rect.xMaximum(), rect.yMaximum())
+    if positions.size == 0:
+        return []
+    
+    request = QgsFeatureRequest()
+    request.setFilterFids(np.asarray(index['fid'][positions]).tolist())
+    if point_layer.crs() != project_crs:
+        request.setDestinationCrs(project_crs, QgsProject.instance().transformContext())
+    return [(feat, feat.geometry()) for feat in point_layer.getFeatures(request)]
+
+def attribute_objects(iface, point_layer, surface_layer, export_kml=False, output_dir=None, use_selection_only=False,
+                      chunk_size=50000):
+    """
+    Attribute every object to all the surfaces it falls in
+    
+    An STR tree is built over the individual surface features and the
+    candidate points are assigned to every surface they hit in one bulk
+    query per chunk. The result has one row per (object, surface) pair with
+    the surface attributes joined, so one run covers a whole surface layer
+    (e.g. "Surface X - Left", "Primary Area", "Area 2").
+    
+    Args:
+        iface: QGIS interface
+        point_layer: The layer containing obstacles/points
+        surface_layer: The layer with the surfaces (polygon)
+        export_kml: Whether to export as KML
+        output_dir: Directory for KML export
+        use_selection_only: Whether to use only selected surface features
+        chunk_size: Number of candidate points queried per batch
     
-    if surface_geom is None:
+    Returns:
+        Dictionary with 'count' (pairs), 'object_count' (distinct objects),
+        'per_surface' (surface fid -> count) and 'layer'
+    """
+    result = {'count': 0, 'object_count': 0, 'per_surface': {}, 'layer': None}
+    
+    if not point_layer or not surface_layer:
         return result
     
-    # Crear índice espacial para optimizar las consultas de intersección
-    spatial_index = QgsSpatialIndex()
-    point_features = {}
+    if QgsWkbTypes.geometryType(surface_layer.wkbType()) != QgsWkbTypes.PolygonGeometry:
+        raise ValueError("Surface layer must be a polygon layer")
     
-    # Poblar el índice espacial con los puntos (transformados si es necesario)
-    for feat in point_layer.getFeatures():
-        geom = feat.geometry()
-        # Transformar al CRS del proyecto si es necesario (sin usar clone())
-        if transform_point_to_project:
-            # Crear una copia de la geometría para transformar
-            transformed_geom = QgsGeometry(geom)
-            transformed_geom.transform(transform_point_to_project)
-            geom = transformed_geom
-            
-        spatial_index.addFeature(feat)
-        point_features[feat.id()] = (feat, geom)
+    project_crs = QgsProject.instance().crs()
+    prepared = prepare_surfaces(surface_layer, project_crs, use_selection_only, keep_separate=True)
+    if prepared is None:
+        return result
     
-    # Crear una nueva capa para los objetos extraídos usando el CRS del proyecto
-    current_date = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    surface_fids = list(prepared['surfaces'].keys())
+    polygons = [polygon_parts(prepared['surfaces'][fid]) for fid in surface_fids]
+    tree = build_str_tree([polygon_bounds(parts) for parts in polygons])
+    surface_attributes = {
+        feat.id(): feat.attributes()
+        for feat in surface_layer.getFeatures(QgsFeatureRequest().setFilterFids(surface_fids))
+    }
+    
+    # Campos: los del punto, los de la superficie con prefijo y su fid
+    fields = QgsFields(point_layer.fields())
+    for field in surface_layer.fields():
+        surface_field = QgsField(field)
+        surface_field.setName(f"surf_{field.name()}")
+        fields.append(surface_field)
+    fields.append(QgsField('surf_fid', QVariant.LongLong))
+    
+    point_name = point_layer.name().replace(" ", "_")
+    surface_name = surface_layer.name().replace(" ", "_")
+    layer_name = f"Attributed_{point_name}_by_{surface_name}"
+    attributed_layer = QgsVectorLayer(f"Point?crs={project_crs.authid()}", layer_name, "memory")
+    provider = attributed_layer.dataProvider()
+    provider.addAttributes(fields.toList())
+    attributed_layer.updateFields()
+    
+    def process(batch):
+        points = [feat.geometry().vertexAt(0) for feat in batch]
+        x = np.fromiter((p.x() for p in points), dtype=np.float64, count=len(points))
+        y = np.fromiter((p.y() for p in points), dtype=np.float64, count=len(points))
+        point_idx, polygon_idx = points_in_polygons(x, y, polygons, tree)
+        
+        new_features = []
+        for i, j in zip(point_idx.tolist(), polygon_idx.tolist()):
+            fid = surface_fids[j]
+            new_feat = QgsFeature(attributed_layer.fields())
+            new_feat.setGeometry(batch[i].geometry())
+            new_feat.setAttributes(batch[i].attributes() + surface_attributes[fid] + [fid])
+            new_features.append(new_feat)
+            result['per_surface'][fid] = result['per_surface'].get(fid, 0) + 1
+        provider.addFeatures(new_features)
+        result['count'] += len(new_features)
+        result['object_count'] += len(np.unique(point_idx))
+    
+    batch = []
+    for feat in iter_candidate_features(point_layer, prepared['bbox'], project_crs, project_crs):
+        batch.append(feat)
+        if len(batch) >= chunk_size:
+            process(batch)
+            batch = []
+    if batch:
+        process(batch)
+    
+    attributed_layer.updateExtents()
+    QgsProject.instance().addMapLayer(attributed_layer)
+    result['layer'] = attributed_layer
+    
+    if export_kml and output_dir and result['count'] > 0:
+        result['kml_path'] = _export_extracted_kml(attributed_layer, output_dir, layer_name)
+    
+    return result
+
+def _create_extracted_layer(point_layer, surface_layer, project_crs):
+    """Create the empty memory layer for the extracted objects"""
     point_name = point_layer.name().replace(" ", "_")
     surface_name = surface_layer.name().replace(" ", "_")
     layer_name = f"Extracted_{point_name}_from_{surface_name}"
     
     extracted_layer = QgsVectorLayer(f"Point?crs={project_crs.authid()}", layer_name, "memory")
+    extracted_layer.dataProvider().addAttributes(point_layer.fields())
+    extracted_layer.updateFields()
+    return extracted_layer, layer_name
+
+def _extract_objects_streaming(iface, point_layer, surface_layer, surface_bbox, inside_surface,
+                               project_crs, export_kml, output_dir, chunk_size):
+    """Streaming variant of extract_objects, see its documentation"""
+    result = {'count': 0, 'features': []}
     
-    # Copiar campos de la capa de puntos
+    extracted_layer, layer_name = _create_extracted_layer(point_layer, surface_layer, project_crs)
     provider = extracted_layer.dataProvider()
-    provider.addAttributes(point_layer.fields())
-    extracted_layer.updateFields()
     
-    # Usar índice espacial para encontrar candidatos, luego verificar intersección exacta
-    candidate_ids = spatial_index.intersects(surface_geom.boundingBox())
+    def write_batch(batch):
+        hits = inside_surface([feat.geometry() for feat in batch])
+        extracted = [feat for feat, hit in zip(batch, hits) if hit]
+        provider.addFeatures(extracted)
+        result['count'] += len(extracted)
     
-    # Verificar intersecciones exactas solo para los candidatos
-    for feature_id in candidate_ids:
-        if feature_id in point_features:
-            feat, geom = point_features[feature_id]
-            
-            if surface_geom.intersects(geom):
-                # Crear nueva característica y añadirla a la capa de resultados
-                new_feat = QgsFeature(feat)
-                new_feat.setGeometry(geom)
-                provider.addFeatures([new_feat])
-                result['features'].append(new_feat)
-                result['count'] += 1
+    # Solo se leen del proveedor los puntos dentro del rectángulo de la superficie
+    batch = []
+    for feat in iter_candidate_features(point_layer, surface_bbox, project_crs, project_crs):
+        batch.append(feat)
+        if len(batch) >= chunk_size:
+            write_batch(batch)
+            batch = []
     
-    # Actualizar la capa
-    extracted_layer.updateExtents()
+    if batch:
+        write_batch(batch)
     
-    # Añadir al mapa
+    extracted_layer.updateExtents()
     QgsProject.instance().addMapLayer(extracted_layer)
     
-    # Exportar a KML si se solicita
     if export_kml and output_dir and result['count'] > 0:
-        kml_path = os.path.join(output_dir, f"{layer_name}.kml")
-        # Para exportar a KML, necesitamos transformar a WGS84
-        wgs84_crs = QgsCoordinateReferenceSystem("EPSG:4326")
-        QgsVectorFileWriter.writeAsVectorFormat(
-            extracted_layer,
-            kml_path,
-            "utf-8",
-            wgs84_crs,  # Siempre usar WGS84 para KML
-            "KML",
-            layerOptions=["NameField=name"],  # Usar el campo 'name' para los nombres de objetos si existe
-            transformContext=QgsProject.instance().transformContext()
-        )
-        result['kml_path'] = kml_path
+        result['kml_path'] = _export_extracted_kml(extracted_layer, output_dir, layer_name)
     
     return result
 
+def _export_extracted_kml(extracted_layer, output_dir, layer_name):
+    """Export the extracted objects to KML and return the file path"""
+    kml_path = os.path.join(output_dir, f"{layer_name}.kml")
+    # Para exportar a KML, necesitamos transformar a WGS84
+    wgs84_crs = QgsCoordinateReferenceSystem("EPSG:4326")
+    QgsVectorFileWriter.writeAsVectorFormat(
+        extracted_layer,
+        kml_path,
+        "utf-8",
+        wgs84_crs,  # Siempre usar WGS84 para KML
+        "KML",
+        layerOptions=["NameField=name"],  # Usar el campo 'name' para los nombres de objetos si existe
+        transformContext=QgsProject.instance().transformContext()
+    )
+    return kml_path
+
 def copy_parameters_table(params):
     """Generate formatted table for Object Selection parameters"""
     from ..utils import format_parameters_table
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Airport Evaluation Module
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Airport Evaluation
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+"""
+
+from qgis.core import (QgsProject, QgsVectorLayer, QgsField, QgsFeature, QgsWkbTypes, Qgis)
+from PyQt5.QtCore import QVariant
+import csv
+import os
+import numpy as np
+
+from ..evaluation.geometry import polygon_bounds
+from ..evaluation.obstacle_cache import query_obstacle_index
+from ..evaluation.obstacle_layers import load_obstacles, load_obstacle_index_for_layer, threshold_frame
+from ..evaluation.pipeline import evaluate_segments
+from ..evaluation.surfaces import runway_frame
+from .composite_surface import read_composite_surfaces
+from .terrain_penetration import layer_parameters, layer_thr_elev
+
+# Columns of the segment summary table
+SUMMARY_FIELDS = [
+    ('segment', QVariant.String),
+    ('seg_type', QVariant.String),
+    ('surfaces', QVariant.Int),
+    ('obstacles', QVariant.LongLong),
+    ('ctrl_obst', QVariant.String),
+    ('ctrl_elev', QVariant.Double),
+    ('surf_elev', QVariant.Double),
+    ('penetration', QVariant.Double),
+    ('margin', QVariant.Double),
+    ('req_oca', QVariant.Double),
+    ('req_och', QVariant.Double),
+    ('oca_obst', QVariant.String),
+    ('oca_elev', QVariant.Double)
+]
+
+
+def segment_type(layer, params):
+    """
+    How the required OCA of a segment layer is obtained
+
+    An explicit params 'segment_types' entry wins; OAS layers are 'oas'.
+    A scalar params 'moc' makes every other layer 'moc', a 'moc'
+    dictionary only the layers it names; any other layer is a plain
+    protection 'surface' without OCA.
+
+    :param layer: Surface layer of the segment
+    :param params: Evaluation parameters
+    :return: One of ``evaluation.pipeline.SEGMENT_TYPES``
+    """
+    explicit = params.get('segment_types') or {}
+    if layer.name() in explicit:
+        return explicit[layer.name()]
+    if 'OAS' in str(layer_parameters(layer).get('calculation_type', '')):
+        return 'oas'
+    moc = params.get('moc')
+    if isinstance(moc, dict):
+        return 'moc' if layer.name() in moc else 'surface'
+    return 'moc' if moc is not None else 'surface'
+
+
+def read_segment_obstacles(obstacle_source, bounds, dest_crs, params):
+    """
+    Read the obstacles inside the bounding box of all segments once
+
+    Point layers go through the persistent obstacle index when
+    params 'use_index_cache' is set; other sources are read with
+    ``load_obstacles`` and clipped to the box.
+
+    :param obstacle_source: Point layer, obstacle file path or structured array
+    :param bounds: Sequence [xmin, ymin, xmax, ymax] in dest_crs
+    :param dest_crs: CRS of the surfaces
+    :param params: Evaluation parameters
+    :return: Dictionary with 'x', 'y', 'elev' and 'id' arrays
+    """
+    elevation_field = params.get('elevation_field', 'elev')
+    xmin, ymin, xmax, ymax = bounds
+    is_point_layer = (hasattr(obstacle_source, 'wkbType') and
+                      QgsWkbTypes.geometryType(obstacle_source.wkbType()) == QgsWkbTypes.PointGeometry)
+
+    if params.get('use_index_cache') and is_point_layer:
+        index = load_obstacle_index_for_layer(obstacle_source, elevation_field, dest_crs, params.get('cache_dir'))
+        positions = query_obstacle_index(index, xmin, ymin, xmax, ymax)
+        return {
+            'x': np.asarray(index['x'][positions]),
+            'y': np.asarray(index['y'][positions]),
+            'elev': np.asarray(index['elev'][positions]),
+            'id': np.asarray(index['fid'][positions]).astype(str)
+        }
+
+    obstacles = load_obstacles(obstacle_source, elevation_field, dest_crs,
+                               spacing=float(params.get('spacing', 10.0)))
+    inside = ((obstacles['x'] >= xmin) & (obstacles['x'] <= xmax) &
+              (obstacles['y'] >= ymin) & (obstacles['y'] <= ymax))
+    ids = obstacles.get('id', obstacles['fid'])
+    return {
+        'x': obstacles['x'][inside],
+        'y': obstacles['y'][inside],
+        'elev': obstacles['elev'][inside],
+        'id': np.asarray(ids)[inside].astype(str)
+    }
+
+
+def evaluate_airport(iface, surface_layers, obstacle_source, params=None):
+    """
+    Evaluate one obstacle source against the surfaces of every segment
+
+    Each surface layer is one segment (OAS, basic ILS, VSS, LNAV final or
+    missed approach, SID...). The surfaces are read as polygons with their
+    stored plane constants when the threshold point and runway layers are
+    given (planes fitted to the vertices otherwise), the obstacles are read
+    once and every (obstacle, surface) pair is evaluated in one pass, see
+    ``evaluation.pipeline.evaluate_segments``. The required OCA follows the
+    segment type, see ``segment_type``.
+
+    :param iface: QGIS interface
+    :param surface_layers: List of QPANSOPY PolygonZ layers, one per segment
+    :param obstacle_source: Obstacle layer, obstacle file path or array
+    :param params: Optional dictionary with 'thr_elev' (meters, for OCH),
+        'moc' (meters, a scalar for every non-OAS segment or a dict by
+        layer name, see ``segment_type``), 'segment_types' (dict by layer name), 'point_layer' and
+        'runway_layer' (threshold frame, required for OAS segments),
+        'category' and 'altimeter' (OAS OCA), 'elevation_field',
+        'selected_only', 'use_index_cache', 'cache_dir' and 'output_dir'
+        (CSV export of the table)
+    :return: Dictionary with 'layer' (summary table), 'rows' and 'summary'
+    """
+    params = params or {}
+    if not surface_layers or obstacle_source is None:
+        raise ValueError("Surface layers and an obstacle source are required")
+
+    crs = QgsProject.instance().crs()
+    segments = [layer.name() for layer in surface_layers]
+    types = [segment_type(layer, params) for layer in surface_layers]
+    frame = None
+    if params.get('point_layer') and params.get('runway_layer'):
+        frame = threshold_frame(params['point_layer'], params['runway_layer'], crs)
+    elif 'oas' in types:
+        raise ValueError("OAS segments need the threshold point and runway layers")
+
+    polygons, planes, surface_segment, surface_count = [], [], [], []
+    for index, layer in enumerate(surface_layers):
+        surfaces, _ = read_composite_surfaces([layer], crs, params.get('selected_only', False), frame)
+        polygons.extend(surface['parts'] for surface in surfaces)
+        planes.extend(surface['plane'] for surface in surfaces)
+        surface_segment.extend([index] * len(surfaces))
+        surface_count.append(len(surfaces))
+    if not polygons:
+        raise ValueError("No planar surfaces found in the selected layers")
+
+    moc = params.get('moc', 0.0)
+    if isinstance(moc, dict):
+        moc = [float(moc.get(name, 0.0)) for name in segments]
+    elif moc is None:
+        moc = 0.0
+    thr_elev = float(params.get('thr_elev', 0.0))
+
+    boxes = np.array([polygon_bounds(parts) for parts in polygons])
+    bounds = [boxes[:, 0].min(), boxes[:, 1].min(), boxes[:, 2].max(), boxes[:, 3].max()]
+    obstacles = read_segment_obstacles(obstacle_source, bounds, crs, params)
+
+    oas = {}
+    if 'oas' in types:
+        x_local, _ = runway_frame(obstacles['x'], obstacles['y'], frame['thr_x'], frame['thr_y'], frame['bearing'])
+    for index, layer in enumerate(surface_layers):
+        if types[index] != 'oas':
+            continue
+        stored = layer_parameters(layer)
+        layer_thr = layer_thr_elev(layer)
+        oas[index] = {
+            'x_local': x_local,
+            'thr_elev': layer_thr if layer_thr is not None else thr_elev,
+            'category': params.get('category', stored.get('category', 'A')),
+            'gp_angle': float(stored.get('GP_angle', 3.0)),
+            'altimeter': params.get('altimeter', 'radio')
+        }
+
+    summary = evaluate_segments(obstacles['x'], obstacles['y'], obstacles['elev'], polygons, planes,
+                                surface_segment, len(segments), moc, types, oas)
+
+    # OCH of the OAS segments is relative to their own threshold elevation
+    segment_thr = np.array([oas[i]['thr_elev'] if i in oas else thr_elev for i in range(len(segments))])
+
+    def value(array, i):
+        return None if np.isnan(array[i]) else round(float(array[i]), 2)
+
+    rows = []
+    for i, name in enumerate(segments):
+        controlling = int(summary['controlling'][i])
+        oca_obstacle = int(summary['oca_obstacle'][i])
+        rows.append({
+            'segment': name,
+            'seg_type': types[i],
+            'surfaces': surface_count[i],
+            'obstacles': int(summary['count'][i]),
+            'ctrl_obst': str(obstacles['id'][controlling]) if controlling >= 0 else None,
+            'ctrl_elev': round(float(obstacles['elev'][controlling]), 2) if controlling >= 0 else None,
+            'surf_elev': value(summary['surface_height'], i),
+            'penetration': value(summary['penetration'], i),
+            'margin': value(summary['margin'], i),
+            'req_oca': value(summary['required_oca'], i),
+            'req_och': value(summary['required_oca'] - segment_thr, i),
+            'oca_obst': str(obstacles['id'][oca_obstacle]) if oca_obstacle >= 0 else None,
+            'oca_elev': round(float(obstacles['elev'][oca_obstacle]), 2) if oca_obstacle >= 0 else None
+        })
+
+    table = QgsVectorLayer("None", "Airport segment summary", "memory")
+    provider = table.dataProvider()
+    provider.addAttributes([QgsField(name, field_type) for name, field_type in SUMMARY_FIELDS])
+    table.updateFields()
+    features = []
+    for row in rows:
+        feat = QgsFeature(table.fields())
+        feat.setAttributes([row[name] for name, _ in SUMMARY_FIELDS])
+        features.append(feat)
+    provider.addFeatures(features)
+    QgsProject.instance().addMapLayer(table)
+
+    output_dir = params.get('output_dir')
+    if output_dir and os.path.isdir(output_dir):
+        with open(os.path.join(output_dir, 'airport_segment_summary.csv'), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=[name for name, _ in SUMMARY_FIELDS])
+            writer.writeheader()
+            writer.writerows(rows)
+
+    if iface is not None:
+        penetrated = sum(1 for row in rows if row['penetration'] is not None and row['penetration'] > 0)
+        iface.messageBar().pushMessage(
+            "QPANSOPY", f"Evaluated {len(obstacles['x'])} obstacles against {len(polygons)} surfaces "
+                        f"in {len(segments)} segments, {penetrated} segments penetrated",
+            level=Qgis.Warning if penetrated else Qgis.Success)
+
+    return {'layer': table, 'rows': rows, 'summary': summary}
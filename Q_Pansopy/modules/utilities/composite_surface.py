@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Composite Surface Module
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Composite Surface
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+"""
+
+from qgis.core import QgsProject, QgsRasterLayer, Qgis
+import json
+import os
+import numpy as np
+
+try:
+    from osgeo import gdal
+except ImportError:
+    gdal = None
+
+from ..evaluation.geometry import polygon_bounds
+from ..evaluation.composite import (
+    composite_grid, surfaces_signature, rasterize_min_surface, save_composite, load_composite
+)
+from ..evaluation.obstacle_layers import threshold_frame
+from .terrain_penetration import read_surfaces_3d
+
+
+def read_composite_surfaces(surface_layers, dest_crs, selected_only=False, frame=None):
+    """
+    Read the planar surfaces of several QPANSOPY PolygonZ layers
+
+    :param surface_layers: List of PolygonZ layers
+    :param dest_crs: CRS of the composite grid
+    :param selected_only: Whether to read only the selected features
+    :param frame: Optional threshold frame to use the stored plane
+        constants, see ``terrain_penetration.read_surfaces_3d``
+    :return: Tuple (surfaces, names) with one name '<layer>: <surface>'
+        per surface, indexed like the composite surface ids
+    """
+    surfaces, names = [], []
+    for layer in surface_layers:
+        for surface in read_surfaces_3d(layer, dest_crs, selected_only, frame):
+            surfaces.append(surface)
+            names.append(f"{layer.name()}: {surface['name']}")
+    return surfaces, names
+
+
+def write_composite_geotiff(composite, path, crs):
+    """
+    Write a composite grid as a two band GeoTIFF
+
+    Band 1 holds the lowest surface height (no data -9999), band 2 the
+    controlling surface id (no data -1).
+
+    :param composite: Dictionary from ``rasterize_min_surface``
+    :param path: Output .tif path
+    :param crs: QgsCoordinateReferenceSystem of the grid
+    :return: The path
+    """
+    if gdal is None:
+        raise RuntimeError("GDAL Python bindings are required to write GeoTIFF files")
+    grid = composite['grid']
+    driver = gdal.GetDriverByName('GTiff')
+    dataset = driver.Create(path, grid['width'], grid['height'], 2, gdal.GDT_Float32,
+                            options=['COMPRESS=DEFLATE', 'TILED=YES'])
+    dataset.SetGeoTransform((grid['origin_x'], grid['pixel_x'], 0.0, grid['origin_y'], 0.0, -grid['pixel_y']))
+    dataset.SetProjection(crs.toWkt())
+    height = np.where(np.isnan(composite['height']), -9999.0, composite['height'])
+    bands = ((height, -9999.0, 'lowest surface height'), (composite['surface'], -1.0, 'controlling surface id'))
+    for number, (values, nodata, description) in enumerate(bands, 1):
+        band = dataset.GetRasterBand(number)
+        band.WriteArray(np.asarray(values, dtype=np.float32))
+        band.SetNoDataValue(nodata)
+        band.SetDescription(description)
+    dataset.FlushCache()
+    dataset = None
+    return path
+
+
+def build_composite_surface(iface, surface_layers, params=None):
+    """
+    Build (or reuse) the lowest-surface grid of several surface layers
+
+    The grid is keyed by a hash of the surfaces and the grid definition, so
+    an unchanged set of surfaces is loaded from the cache instead of being
+    rasterized again.
+
+    :param iface: QGIS interface
+    :param surface_layers: List of QPANSOPY PolygonZ layers
+    :param params: Optional dictionary with 'resolution' (map units,
+        default 10), 'selected_only', 'block_size', 'cache_dir',
+        'output_dir' and 'format' ('tif' or 'npy', default 'tif')
+    :return: Dictionary with 'composite', 'names', 'cached', 'path' and
+        'layer' (raster layer added for GeoTIFF output)
+    """
+    params = params or {}
+    resolution = float(params.get('resolution', 10.0))
+    if not surface_layers:
+        raise ValueError("At least one surface layer is required")
+
+    crs = QgsProject.instance().crs()
+    frame = None
+    if params.get('point_layer') and params.get('runway_layer'):
+        frame = threshold_frame(params['point_layer'], params['runway_layer'], crs, params.get('thr_elev'))
+    surfaces, names = read_composite_surfaces(surface_layers, crs, params.get('selected_only', False), frame)
+    if not surfaces:
+        raise ValueError("No planar surfaces found in the selected layers")
+
+    bounds = np.array([polygon_bounds(surface['parts']) for surface in surfaces])
+    grid = composite_grid([bounds[:, 0].min(), bounds[:, 1].min(), bounds[:, 2].max(), bounds[:, 3].max()],
+                          resolution)
+    signature = surfaces_signature(surfaces, dict(grid, crs=crs.authid()))
+
+    cache_dir = params.get('cache_dir')
+    composite = load_composite(signature, cache_dir)
+    cached = composite is not None
+    if not cached:
+        composite = rasterize_min_surface(grid, surfaces, int(params.get('block_size', 512)))
+        save_composite(composite, signature, names, cache_dir)
+        composite['names'] = names
+
+    result = {'composite': composite, 'names': names, 'cached': cached, 'path': None, 'layer': None}
+
+    output_dir = params.get('output_dir')
+    if output_dir:
+        base = os.path.join(output_dir, f"composite_surface_{signature[:8]}")
+        if params.get('format', 'tif') == 'npy':
+            np.save(f"{base}_height.npy", np.asarray(composite['height']))
+            np.save(f"{base}_surface.npy", np.asarray(composite['surface']))
+            with open(f"{base}.json", 'w', encoding='utf-8') as f:
+                json.dump({'grid': grid, 'crs': crs.authid(), 'names': names}, f, indent=2)
+            result['path'] = f"{base}_height.npy"
+        else:
+            result['path'] = write_composite_geotiff(composite, f"{base}.tif", crs)
+            layer = QgsRasterLayer(result['path'], "Composite lowest surface")
+            if layer.isValid():
+                QgsProject.instance().addMapLayer(layer)
+                result['layer'] = layer
+
+    if iface is not None:
+        source = "loaded from cache" if cached else "built"
+        iface.messageBar().pushMessage(
+            "QPANSOPY", f"Composite surface of {len(surfaces)} surfaces {source} "
+                        f"({grid['width']} x {grid['height']} cells)", level=Qgis.Success)
+    return result
+
@@ -22,17 +22,234 @@ Procedure Analysis and Obstacle Protection Surfaces - Point Filter Module
 """
 
 import os
+from collections import OrderedDict
 from qgis.core import (QgsVectorLayer, QgsField, QgsFeature, QgsProject, 
-                       QgsSymbol)
+                       QgsSymbol, QgsWkbTypes, QgsCategorizedSymbolRenderer,
+                       QgsRendererCategory, QgsGeometry, QgsPointXY)
 from PyQt5.QtGui import QColor
 from PyQt5.QtCore import Qt, QVariant
+import numpy as np
+
+from ..evaluation.surfaces import runway_frame
+from ..evaluation.bands import normalize_breakpoints, classify_elevations, band_labels, band_counts
+
+# Points read from source layers, keyed by layer id, least recently used first;
+# every entry holds the attribute values of its whole layer
+_ELEVATION_CACHE = OrderedDict()
+MAX_CACHED_LAYERS = 2
+
+# Classified output layers, keyed by layer id: feature ids and elevations
+_CLASSIFIED_LAYERS = {}
+
+# Source layers whose dataChanged signal drops their cached elevations
+_WATCHED_LAYERS = set()
+_PROJECT_CONNECTED = False
+
+# Output features added per provider call
+WRITE_BATCH = 50000
+
+
+def _forget_layers(layer_ids):
+    """Drop every cache entry of layers removed from the project"""
+    for layer_id in layer_ids:
+        _ELEVATION_CACHE.pop(layer_id, None)
+        _CLASSIFIED_LAYERS.pop(layer_id, None)
+        _WATCHED_LAYERS.discard(layer_id)
+
+
+def _watch_layer(point_layer):
+    """Invalidate the cached elevations of a layer on any data change"""
+    global _PROJECT_CONNECTED
+    if not _PROJECT_CONNECTED:
+        QgsProject.instance().layersWillBeRemoved.connect(_forget_layers)
+        _PROJECT_CONNECTED = True
+    layer_id = point_layer.id()
+    if layer_id not in _WATCHED_LAYERS:
+        point_layer.dataChanged.connect(lambda: _ELEVATION_CACHE.pop(layer_id, None))
+        _WATCHED_LAYERS.add(layer_id)
+
+
+def clear_elevation_cache(point_layer=None):
+    """Drop the cached elevations of one layer, or of every layer if None"""
+    if point_layer is None:
+        _ELEVATION_CACHE.clear()
+    else:
+        _ELEVATION_CACHE.pop(point_layer.id(), None)
+
+
+def read_point_elevations(point_layer):
+    """
+    Read a point layer once into NumPy arrays, reusing a cached result
+
+    The arrays and the attribute values of every feature (plain lists, no
+    QgsFeature objects) are cached for at most ``MAX_CACHED_LAYERS``
+    layers, so the output layers are written without reading the source
+    again. An entry is dropped when its layer data changes (edits, commits
+    or a provider reload) or the layer is removed from the project, so
+    trying another threshold does not re-scan an unchanged layer.
+
+    Args:
+        point_layer: Input point layer with 'elev' field
+
+    Returns:
+        Dictionary with 'fid' (int64) and 'x', 'y', 'elev' arrays (NaN where
+        the geometry or elevation is missing) and 'attributes', the list of
+        attribute values of every row
+    """
+    idx_value = point_layer.fields().indexFromName("elev")
+    if idx_value == -1:
+        raise ValueError("Input layer must have an 'elev' field")
+
+    _watch_layer(point_layer)
+    cached = _ELEVATION_CACHE.get(point_layer.id())
+    if cached is not None and cached['count'] == point_layer.featureCount():
+        _ELEVATION_CACHE.move_to_end(point_layer.id())
+        return cached
+
+    fids, xs, ys, elevs, attributes = [], [], [], [], []
+    for feature in point_layer.getFeatures():
+        geom = feature.geometry()
+        vertex = None if geom.isNull() else geom.constGet()
+        if vertex is not None and QgsWkbTypes.isMultiType(vertex.wkbType()):
+            vertex = vertex.geometryN(0) if vertex.numGeometries() else None
+        try:
+            elev = float(feature[idx_value])
+        except (TypeError, ValueError):
+            elev = np.nan
+        fids.append(feature.id())
+        xs.append(vertex.x() if vertex is not None else np.nan)
+        ys.append(vertex.y() if vertex is not None else np.nan)
+        elevs.append(elev)
+        attributes.append(feature.attributes())
+
+    cached = {
+        'count': point_layer.featureCount(),
+        'fid': np.asarray(fids, dtype=np.int64),
+        'x': np.asarray(xs, dtype=np.float64),
+        'y': np.asarray(ys, dtype=np.float64),
+        'elev': np.asarray(elevs, dtype=np.float64),
+        'attributes': attributes
+    }
+    _ELEVATION_CACHE[point_layer.id()] = cached
+    while len(_ELEVATION_CACHE) > MAX_CACHED_LAYERS:
+        _ELEVATION_CACHE.popitem(last=False)
+    return cached
+
+
+def _point_features(points, extra_values):
+    """
+    Output features of the cached points, in row order
+
+    The geometries are rebuilt from the cached coordinates (the output
+    layers are single point layers) and the attributes are the cached
+    source values followed by the extra values of the row.
+
+    :param points: Cached arrays from ``read_point_elevations``
+    :param extra_values: Lists of values appended to the attributes, one
+        list per extra field
+    :return: Generator of (row, QgsFeature)
+    """
+    rows = zip(points['x'].tolist(), points['y'].tolist(), points['attributes'], *extra_values)
+    for row, (x, y, attributes, *extra) in enumerate(rows):
+        feat = QgsFeature()
+        if x == x and y == y:
+            feat.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(x, y)))
+        feat.setAttributes(attributes + extra)
+        yield row, feat
+
+
+def _distances(points, threshold_point, runway_azimuth):
+    """Along-track and cross-track distances of the cached points (0.0 without a reference)"""
+    if threshold_point is None or runway_azimuth is None:
+        return np.zeros(points['elev'].shape), np.zeros(points['elev'].shape)
+    # Positive x towards the approach, i.e. opposite to the landing direction;
+    # the local y of that frame is positive to the left of the landing
+    # direction, so it is negated
+    x_dist, y_dist = runway_frame(points['x'], points['y'], threshold_point.x(), threshold_point.y(),
+                                  runway_azimuth + 180)
+    return np.where(np.isnan(x_dist), 0.0, x_dist), np.where(np.isnan(y_dist), 0.0, -y_dist)
+
+
+def _create_output_layer(point_layer, layer_name, color, point_size):
+    """
+    Create a memory point layer with the source fields plus x_dist, y_dist, z_height
+
+    :param point_layer: Source point layer
+    :param layer_name: Name of the new layer
+    :param color: QColor of the point symbol
+    :param point_size: Size of the point symbol
+    :return: The new QgsVectorLayer
+    """
+    crs = point_layer.crs().authid()
+    layer = QgsVectorLayer(f"Point?crs={crs}", layer_name, "memory")
+    provider = layer.dataProvider()
+
+    # Copy all fields from source layer and add the custom ones
+    provider.addAttributes(point_layer.fields().toList())
+    provider.addAttributes([
+        QgsField("x_dist", QVariant.Double, "double", 10, 3),
+        QgsField("y_dist", QVariant.Double, "double", 10, 3),
+        QgsField("z_height", QVariant.Double, "double", 10, 3)
+    ])
+    layer.updateFields()
+
+    symbol = QgsSymbol.defaultSymbol(layer.geometryType())
+    symbol.setColor(color)
+    symbol.setSize(point_size)
+    symbol.symbolLayer(0).setStrokeStyle(Qt.NoPen)
+    layer.renderer().setSymbol(symbol)
+    return layer
+
+
+def _write_split(points, higher, layers, x_dist, y_dist, z_height):
+    """
+    Copy every cached point to the higher or lower output layer
+
+    The source is not read again; the features are written in batches of
+    ``WRITE_BATCH``, so no feature list of the whole layer is kept.
+
+    :param points: Cached arrays from ``read_point_elevations``
+    :param higher: Boolean array, True for the rows of the higher layer
+    :param layers: Tuple (higher layer, lower layer)
+    :param x_dist: Array of along-track distances for all rows
+    :param y_dist: Array of cross-track distances for all rows
+    :param z_height: Array of heights above the threshold for all rows
+    :return: None
+    """
+    # tolist() converts to Python floats once instead of per attribute
+    z_values = [None if z != z else z for z in z_height.tolist()]
+    higher = higher.tolist()
+
+    batches = ([], [])
+    for row, feat in _point_features(points, (x_dist.tolist(), y_dist.tolist(), z_values)):
+        batch = batches[0 if higher[row] else 1]
+        batch.append(feat)
+        if len(batch) >= WRITE_BATCH:
+            layers[0 if higher[row] else 1].dataProvider().addFeatures(batch)
+            batch.clear()
+    for layer, batch in zip(layers, batches):
+        if batch:
+            layer.dataProvider().addFeatures(batch)
 
 
 def filter_points_by_elevation(iface, point_layer, thr_elevation, output_dir=None, 
-                              higher_color=None, lower_color=None, point_size=0.5):
+                              higher_color=None, lower_color=None, point_size=0.5,
+                              threshold_point=None, runway_azimuth=None):
     """
     Filter points based on THR elevation threshold
     
+    The layer is read once into NumPy arrays and attribute lists (cached
+    between runs, see ``read_point_elevations``), the distances and heights
+    are computed for all points in a single pass and both output layers
+    are filled from the cache in batches; another threshold on an
+    unchanged layer does not read it again.
+
+    x_dist is the along-track distance from the threshold, positive before
+    the threshold (approach side) and negative beyond it, as in the
+    QPANSOPY surface constants. y_dist is the cross-track distance from the
+    runway centreline, positive to the right of the landing direction.
+    Without a threshold point and runway azimuth both distances are 0.0.
+    
     Args:
         iface: QGIS interface
         point_layer: Input point layer with 'elev' field
@@ -41,6 +258,8 @@ def filter_points_by_elevation(iface, point_layer, thr_elevation, output_dir=Non
         higher_color: QColor for points above threshold (default: red)
         lower_color: QColor for points below threshold (default: green)
         point_size: Size of point symbols (default: 0.5)
+        threshold_point: QgsPointXY of the threshold in the layer CRS (optional)
+        runway_azimuth: Landing direction azimuth in degrees (optional)
     
     Returns:
         dict: Results with layer information and counts
@@ -54,118 +273,27 @@ def filter_points_by_elevation(iface, point_layer, thr_elevation, output_dir=Non
     if lower_color is None:
         lower_color = QColor("green")
     
-    # Get CRS from input layer
-    crs = point_layer.crs().authid()
-    
-    # Create memory layers
-    mem_layer_name = point_layer.name() + "_higher_than_THR_elev"
-    mem_layer = QgsVectorLayer(f"Point?crs={crs}", mem_layer_name, "memory")
-    mem_layer_data = mem_layer.dataProvider()
-    
-    # Copy all fields from source layer
-    fields = point_layer.fields()
-    for field in fields:
-        mem_layer_data.addAttributes([field])
-    
-    # Add custom fields x_dist, y_dist, z_height
-    mem_layer_data.addAttributes([
-        QgsField("x_dist", QVariant.Double, "double", 10, 3),
-        QgsField("y_dist", QVariant.Double, "double", 10, 3),
-        QgsField("z_height", QVariant.Double, "double", 10, 3)
-    ])
-    
-    mem_layer.updateFields()
+    if point_layer.fields().indexFromName("elev") == -1:
+        raise ValueError("Input layer must have an 'elev' field")
     
-    # Create lower layer
-    lower_layer_name = point_layer.name() + "_lower_than_THR_elev"
-    lower_layer = QgsVectorLayer(f"Point?crs={crs}", lower_layer_name, "memory")
-    lower_layer_data = lower_layer.dataProvider()
-    
-    # Copy all fields from source layer
-    fields_lower = point_layer.fields()
-    for field in fields_lower:
-        lower_layer_data.addAttributes([field])
-    
-    # Add custom fields x_dist, y_dist, z_height
-    lower_layer_data.addAttributes([
-        QgsField("x_dist", QVariant.Double, "double", 10, 3),
-        QgsField("y_dist", QVariant.Double, "double", 10, 3),
-        QgsField("z_height", QVariant.Double, "double", 10, 3)
-    ])
-    
-    lower_layer.updateFields()
-    
-    # Start editing
-    mem_layer.startEditing()
-    lower_layer.startEditing()
+    mem_layer = _create_output_layer(point_layer, point_layer.name() + "_higher_than_THR_elev",
+                                     higher_color, point_size)
+    lower_layer = _create_output_layer(point_layer, point_layer.name() + "_lower_than_THR_elev",
+                                       lower_color, point_size)
     
     try:
-        # Get field indices
-        idx_value = point_layer.fields().indexFromName("elev")
-        if idx_value == -1:
-            raise ValueError("Input layer must have an 'elev' field")
-        
-        # Setup symbology
-        # Custom symbols for points above threshold
-        sym_above = QgsSymbol.defaultSymbol(mem_layer.geometryType())
-        sym_above.setColor(higher_color)
-        sym_above.setSize(point_size)
-        sym_above.symbolLayer(0).setStrokeStyle(Qt.NoPen)
-        mem_layer.renderer().setSymbol(sym_above)
+        points = read_point_elevations(point_layer)
+        elev_array = points['elev']
+        z_height = elev_array - thr_elevation
+        x_dist, y_dist = _distances(points, threshold_point, runway_azimuth)
         
-        # Custom symbols for points below threshold
-        sym_below = QgsSymbol.defaultSymbol(lower_layer.geometryType())
-        sym_below.setColor(lower_color)
-        sym_below.setSize(point_size)
-        sym_below.symbolLayer(0).setStrokeStyle(Qt.NoPen)
-        lower_layer.renderer().setSymbol(sym_below)
+        # Points without elevation go to the lower layer
+        higher = elev_array >= thr_elevation
+        higher_count = int(np.count_nonzero(higher))
         
-        higher_count = 0
-        lower_count = 0
-        
-        # Process each feature
-        for feature in point_layer.getFeatures():
-            value = feature[idx_value]
-            
-            if value >= thr_elevation:
-                # Create new feature for higher layer
-                new_feature_higher = QgsFeature()
-                new_feature_higher.setGeometry(feature.geometry())
-                new_feature_higher.setAttributes(feature.attributes())
-                
-                # Calculate z_height
-                z_height = value - thr_elevation
-                
-                # Set custom field values before adding feature
-                attributes = new_feature_higher.attributes()
-                attributes.extend([0.0, 0.0, z_height])  # x_dist, y_dist, z_height
-                new_feature_higher.setAttributes(attributes)
-                
-                # Add feature to higher layer
-                mem_layer_data.addFeature(new_feature_higher)
-                higher_count += 1
-                
-            else:
-                # Create new feature for lower layer
-                new_feature_lower = QgsFeature()
-                new_feature_lower.setGeometry(feature.geometry())
-                new_feature_lower.setAttributes(feature.attributes())
-                
-                # Calculate z_height (will be negative)
-                z_height_lower = value - thr_elevation
-                
-                # Set custom field values before adding feature
-                attributes = new_feature_lower.attributes()
-                attributes.extend([0.0, 0.0, z_height_lower])  # x_dist, y_dist, z_height
-                new_feature_lower.setAttributes(attributes)
-                
-                # Add feature to lower layer
-                lower_layer_data.addFeature(new_feature_lower)
-                lower_count += 1
-        
-        # Commit changes
-        mem_layer.commitChanges()
-        lower_layer.commitChanges()
+        _write_split(points, higher, (mem_layer, lower_layer), x_dist, y_dist, z_height)
+        mem_layer.updateExtents()
+        lower_layer.updateExtents()
         
         # Add layers to project
         QgsProject.instance().addMapLayer(mem_layer)
@@ -176,12 +304,188 @@ def filter_points_by_elevation(iface, point_layer, thr_elevation, output_dir=Non
             'higher_layer': mem_layer,
             'lower_layer': lower_layer,
             'higher_count': higher_count,
-            'lower_count': lower_count,
+            'lower_count': int(higher.size) - higher_count,
             'threshold': thr_elevation
         }
         
     except Exception as e:
-        # Rollback changes if error occurs
-        mem_layer.rollBack()
-        lower_layer.rollBack()
-        raise e
\ No newline at end of file
+        # Discard partially filled layers if error occurs
+        mem_layer.dataProvider().truncate()
+        lower_layer.dataProvider().truncate()
+        raise e
+
+
+def _band_colors(n_bands, lower_color, higher_color):
+    """Colors interpolated from lower_color (band 0) to higher_color (last band)"""
+    colors = []
+    for i in range(n_bands):
+        t = i / (n_bands - 1) if n_bands > 1 else 1.0
+        colors.append(QColor(
+            round(lower_color.red() + (higher_color.red() - lower_color.red()) * t),
+            round(lower_color.green() + (higher_color.green() - lower_color.green()) * t),
+            round(lower_color.blue() + (higher_color.blue() - lower_color.blue()) * t)))
+    return colors
+
+
+def _band_renderer(layer, labels, colors, point_size):
+    """Categorized renderer on the 'band' field, missing elevations in grey"""
+    categories = []
+    for band, (label, color) in enumerate(zip(labels + ["No elevation"], colors + [QColor("grey")])):
+        symbol = QgsSymbol.defaultSymbol(layer.geometryType())
+        symbol.setColor(color)
+        symbol.setSize(point_size)
+        symbol.symbolLayer(0).setStrokeStyle(Qt.NoPen)
+        value = band if band < len(labels) else -1
+        categories.append(QgsRendererCategory(value, symbol, label))
+    return QgsCategorizedSymbolRenderer("band", categories)
+
+
+def _apply_bands(layer, breakpoints, lower_color, higher_color, point_size):
+    """
+    Write the band of every feature of a classified layer and update its renderer
+
+    Uses the elevations cached when the layer was created, so no feature is
+    read back from the provider.
+    """
+    state = _CLASSIFIED_LAYERS[layer.id()]
+    bands = classify_elevations(state['elev'], breakpoints)
+    labels = band_labels(breakpoints)
+    band_label = np.asarray(labels + ["No elevation"], dtype=object)[bands]
+
+    idx_band = layer.fields().indexFromName("band")
+    idx_label = layer.fields().indexFromName("band_range")
+    changes = {
+        fid: {idx_band: band, idx_label: label}
+        for fid, band, label in zip(state['fids'], bands.tolist(), band_label.tolist())
+    }
+    layer.dataProvider().changeAttributeValues(changes)
+
+    layer.setRenderer(_band_renderer(layer, labels,
+                                     _band_colors(len(labels), lower_color, higher_color),
+                                     point_size))
+    layer.triggerRepaint()
+    state['breakpoints'] = normalize_breakpoints(breakpoints).tolist()
+    return band_counts(bands, len(labels)), labels
+
+
+def classify_points_by_elevation(iface, point_layer, breakpoints, lower_color=None,
+                                 higher_color=None, point_size=0.5,
+                                 threshold_point=None, runway_azimuth=None):
+    """
+    Classify points into elevation bands delimited by breakpoints
+
+    A single output layer is written with the source fields plus x_dist,
+    y_dist, 'band' and 'band_range', and styled with a categorized renderer
+    on 'band'. Band i holds the points with breakpoints[i-1] <= elev <
+    breakpoints[i]. The output is written from the cached points of
+    ``read_point_elevations``. Use ``reclassify_points`` to try other
+    breakpoints on the same layer without writing a new one.
+
+    Args:
+        iface: QGIS interface
+        point_layer: Input point layer with 'elev' field
+        breakpoints: List of elevation breakpoints (meters), in any order
+        lower_color: QColor of the lowest band (default: green)
+        higher_color: QColor of the highest band (default: red)
+        point_size: Size of point symbols (default: 0.5)
+        threshold_point: QgsPointXY of the threshold in the layer CRS (optional)
+        runway_azimuth: Landing direction azimuth in degrees (optional)
+
+    Returns:
+        dict: Results with the layer, band labels and counts per band
+    """
+    if point_layer is None:
+        raise ValueError("No point layer provided")
+
+    if lower_color is None:
+        lower_color = QColor("green")
+    if higher_color is None:
+        higher_color = QColor("red")
+
+    # Validate before creating anything
+    normalize_breakpoints(breakpoints)
+
+    points = read_point_elevations(point_layer)
+    x_dist, y_dist = _distances(points, threshold_point, runway_azimuth)
+
+    crs = point_layer.crs().authid()
+    layer = QgsVectorLayer(f"Point?crs={crs}", point_layer.name() + "_elevation_bands", "memory")
+    provider = layer.dataProvider()
+    provider.addAttributes(point_layer.fields().toList())
+    provider.addAttributes([
+        QgsField("x_dist", QVariant.Double, "double", 10, 3),
+        QgsField("y_dist", QVariant.Double, "double", 10, 3),
+        QgsField("band", QVariant.Int),
+        QgsField("band_range", QVariant.String)
+    ])
+    layer.updateFields()
+
+    fids, batch = [], []
+
+    def flush():
+        ok, added = provider.addFeatures(batch)
+        if not ok:
+            raise RuntimeError(f"Could not write features to {layer.name()}")
+        fids.extend(feat.id() for feat in added)
+        batch.clear()
+
+    # band and band_range are filled by _apply_bands
+    empty = [None] * len(points['fid'])
+    for _, feat in _point_features(points, (x_dist.tolist(), y_dist.tolist(), empty, empty)):
+        batch.append(feat)
+        if len(batch) >= WRITE_BATCH:
+            flush()
+    if batch:
+        flush()
+    layer.updateExtents()
+
+    _CLASSIFIED_LAYERS[layer.id()] = {
+        'fids': fids,
+        'elev': points['elev']
+    }
+    counts, labels = _apply_bands(layer, breakpoints, lower_color, higher_color, point_size)
+
+    QgsProject.instance().addMapLayer(layer)
+
+    return {
+        'success': True,
+        'layer': layer,
+        'labels': labels,
+        'counts': counts,
+        'breakpoints': _CLASSIFIED_LAYERS[layer.id()]['breakpoints']
+    }
+
+
+def reclassify_points(layer, breakpoints, lower_color=None, higher_color=None, point_size=0.5):
+    """
+    Reclassify a layer created by ``classify_points_by_elevation``
+
+    Only the cached elevations are reclassified and the band attributes are
+    updated in one bulk change, the source layer is not read again.
+
+    Args:
+        layer: Layer returned by ``classify_points_by_elevation``
+        breakpoints: New list of elevation breakpoints (meters)
+        lower_color: QColor of the lowest band (default: green)
+        higher_color: QColor of the highest band (default: red)
+        point_size: Size of point symbols (default: 0.5)
+
+    Returns:
+        dict: Results with the layer, band labels and counts per band
+    """
+    if layer is None or layer.id() not in _CLASSIFIED_LAYERS:
+        raise ValueError("Layer was not created by classify_points_by_elevation")
+
+    if lower_color is None:
+        lower_color = QColor("green")
+    if higher_color is None:
+        higher_color = QColor("red")
+
+    counts, labels = _apply_bands(layer, breakpoints, lower_color, higher_color, point_size)
+    return {
+        'success': True,
+        'layer': layer,
+        'labels': labels,
+        'counts': counts,
+        'breakpoints': _CLASSIFIED_LAYERS[layer.id()]['breakpoints']
+    }
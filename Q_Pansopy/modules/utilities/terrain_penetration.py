@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+Terrain Penetration Module
+                            A QGIS plugin
+Procedure Analysis and Obstacle Protection Surfaces - Terrain Penetration
+                        -------------------
+   begin                : 2025-10-01
+   git sha              : $Format:%H$
+   copyright            : (C) 2025 by QPANSOPY Team
+   email                : support@qpansopy.com
+***************************************************************************/
+
+/***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************/
+"""
+
+from qgis.core import (QgsProject, QgsVectorLayer, QgsField, QgsFeature, QgsGeometry,
+                       QgsPointXY, QgsRectangle, QgsCoordinateTransform, QgsWkbTypes,
+                       QgsFeatureRequest, Qgis)
+from PyQt5.QtCore import QVariant
+import json
+import numpy as np
+
+from ..evaluation.obstacle_layers import polygon_parts, threshold_frame
+from ..evaluation.surfaces import parse_constants
+from ..evaluation.terrain import fit_plane, stored_plane, evaluate_dem_surface
+
+# Attributes used to name the surfaces of the different QPANSOPY layers
+SURFACE_NAME_FIELDS = ('ILS_surface', 'description', 'name', 'id')
+
+# Threshold elevation keys of the stored surface parameters
+THR_ELEV_KEYS = ('thr_elev', 'THR_elev')
+
+# Largest vertex residual (meters) of a fitted plane before it is flagged
+MAX_FIT_RESIDUAL = 0.5
+
+# Raster data types readable as NumPy arrays
+_RASTER_DTYPES = {
+    Qgis.Byte: np.uint8,
+    Qgis.UInt16: np.uint16,
+    Qgis.Int16: np.int16,
+    Qgis.UInt32: np.uint32,
+    Qgis.Int32: np.int32,
+    Qgis.Float32: np.float32,
+    Qgis.Float64: np.float64
+}
+
+
+def dem_grid(dem_layer):
+    """
+    Describe the pixel grid of a DEM layer
+
+    :param dem_layer: QgsRasterLayer
+    :return: Dictionary with 'origin_x', 'origin_y', 'pixel_x', 'pixel_y',
+        'width' and 'height', see ``evaluation.terrain.grid_window``
+    """
+    extent = dem_layer.extent()
+    return {
+        'origin_x': extent.xMinimum(),
+        'origin_y': extent.yMaximum(),
+        'pixel_x': dem_layer.rasterUnitsPerPixelX(),
+        'pixel_y': dem_layer.rasterUnitsPerPixelY(),
+        'width': dem_layer.width(),
+        'height': dem_layer.height()
+    }
+
+
+def dem_block_reader(dem_layer, band=1):
+    """
+    Build a windowed reader over a DEM band
+
+    Each call asks the provider for exactly the requested pixel window, so
+    the raster is never read as a whole.
+
+    :param dem_layer: QgsRasterLayer
+    :param band: Band number
+    :return: Callable (col, row, cols, rows) -> float64 array (rows, cols)
+        with no data cells set to NaN
+    """
+    provider = dem_layer.dataProvider()
+    dtype = _RASTER_DTYPES.get(provider.dataType(band))
+    if dtype is None:
+        raise ValueError(f"Unsupported DEM data type in band {band}")
+    grid = dem_grid(dem_layer)
+    nodata = provider.sourceNoDataValue(band) if provider.sourceHasNoDataValue(band) else None
+
+    def read_block(col, row, cols, rows):
+        x0 = grid['origin_x'] + col * grid['pixel_x']
+        y1 = grid['origin_y'] - row * grid['pixel_y']
+        rect = QgsRectangle(x0, y1 - rows * grid['pixel_y'], x0 + cols * grid['pixel_x'], y1)
+        block = provider.block(band, rect, cols, rows)
+        values = np.frombuffer(bytes(block.data()), dtype=dtype, count=rows * cols)
+        values = values.astype(np.float64).reshape(rows, cols)
+        if nodata is not None:
+            values[values == nodata] = np.nan
+        return values
+
+    return read_block
+
+
+def layer_parameters(surface_layer):
+    """
+    Decoded 'parameters' JSON stored by the generator of a surface layer
+
+    :param surface_layer: PolygonZ layer created by a QPANSOPY generator
+    :return: Dictionary (empty if nothing is stored)
+    """
+    if surface_layer.fields().indexFromName('parameters') == -1:
+        return {}
+    for feat in surface_layer.getFeatures(QgsFeatureRequest().setLimit(1)):
+        try:
+            stored = json.loads(feat.attribute('parameters'))
+        except (TypeError, ValueError):
+            return {}
+        return stored if isinstance(stored, dict) else {}
+    return {}
+
+
+def layer_thr_elev(surface_layer):
+    """
+    Threshold elevation stored in the 'parameters' of a surface layer
+
+    :param surface_layer: PolygonZ layer created by a QPANSOPY generator
+    :return: Threshold elevation in meters or None if not stored
+    """
+    stored = layer_parameters(surface_layer)
+    for key in THR_ELEV_KEYS:
+        try:
+            return float(stored[key])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+def read_surfaces_3d(surface_layer, dest_crs, selected_only=False, frame=None):
+    """
+    Read the polygons and planes of a PolygonZ surface layer
+
+    With a threshold frame the stored '[a,b,c]' constants of the surfaces
+    are used as they are. Surfaces without constants (or without a frame)
+    get a plane fitted to their vertex elevations in the destination CRS;
+    'residual' tells how far the geometry is from that plane, see
+    ``MAX_FIT_RESIDUAL``.
+
+    :param surface_layer: PolygonZ layer created by a QPANSOPY generator
+    :param dest_crs: CRS of the returned geometry (the DEM CRS)
+    :param selected_only: Whether to read only the selected features
+    :param frame: Optional threshold frame in dest_crs (see
+        ``threshold_frame``); a None 'thr_elev' is read from the layer
+    :return: List of dictionaries with 'fid', 'name', 'parts', 'plane',
+        'source' ('constants' or 'fitted') and 'residual' (largest vertex
+        distance to the plane)
+    """
+    if not QgsWkbTypes.hasZ(surface_layer.wkbType()):
+        raise ValueError(f"Layer '{surface_layer.name()}' has no Z values")
+
+    fields = surface_layer.fields()
+    idx_name = next((fields.indexFromName(name) for name in SURFACE_NAME_FIELDS
+                     if fields.indexFromName(name) != -1), -1)
+
+    transform = None
+    if surface_layer.crs() != dest_crs:
+        transform = QgsCoordinateTransform(surface_layer.crs(), dest_crs, QgsProject.instance())
+
+    idx_constants = fields.indexFromName('constants')
+    if frame is not None and frame.get('thr_elev') is None:
+        thr_elev = layer_thr_elev(surface_layer)
+        frame = dict(frame, thr_elev=thr_elev) if thr_elev is not None else None
+
+    request = QgsFeatureRequest()
+    features = surface_layer.getSelectedFeatures(request) if selected_only else surface_layer.getFeatures(request)
+
+    surfaces = []
+    for feat in features:
+        geom = QgsGeometry(feat.geometry())
+        if geom.isNull():
+            continue
+        if transform is not None:
+            geom.transform(transform)
+        xyz = np.array([[v.x(), v.y(), v.z()] for v in geom.vertices()], dtype=np.float64)
+        if len(xyz) < 3 or not np.all(np.isfinite(xyz)):
+            continue
+        stored = None
+        if frame is not None and idx_constants != -1:
+            constants = parse_constants(feat.attribute(idx_constants))
+            if constants is not None:
+                stored = stored_plane(xyz, constants, frame)
+        plane, residual = stored if stored is not None else fit_plane(xyz)
+        surfaces.append({
+            'fid': feat.id(),
+            'name': str(feat.attribute(idx_name)) if idx_name != -1 else str(feat.id()),
+            'parts': polygon_parts(geom),
+            'plane': plane,
+            'source': 'constants' if stored is not None else 'fitted',
+            'residual': residual
+        })
+    return surfaces
+
+
+def evaluate_terrain_penetration(iface, surface_layer, dem_layer, params=None):
+    """
+    Find the maximum terrain penetration of every surface of a layer
+
+    Only the DEM blocks covering each surface bounding box are read.
+
+    :param iface: QGIS interface
+    :param surface_layer: PolygonZ layer created by a QPANSOPY generator
+    :param dem_layer: QgsRasterLayer with terrain elevations (meters)
+    :param params: Optional dictionary with 'band' (default 1),
+        'block_size' (pixels, default 512), 'selected_only',
+        'penetrating_only' (only write penetrated surfaces), 'point_layer'
+        and 'runway_layer' (threshold frame, to use the stored plane
+        constants), 'thr_elev' and 'max_residual' (meters, default
+        ``MAX_FIT_RESIDUAL``)
+    :return: Dictionary with 'layer' (points at the maximum penetration of
+        each surface), 'results' (one dictionary per surface),
+        'penetrated_count' and 'poor_fits' (names of the fitted surfaces
+        above max_residual)
+    """
+    params = params or {}
+    band = int(params.get('band', 1))
+    block_size = int(params.get('block_size', 512))
+    penetrating_only = params.get('penetrating_only', False)
+
+    if surface_layer is None or dem_layer is None:
+        raise ValueError("A surface layer and a DEM layer are required")
+
+    dem_crs = dem_layer.crs()
+    grid = dem_grid(dem_layer)
+    read_block = dem_block_reader(dem_layer, band)
+    frame = None
+    if params.get('point_layer') and params.get('runway_layer'):
+        frame = threshold_frame(params['point_layer'], params['runway_layer'], dem_crs, params.get('thr_elev'))
+    surfaces = read_surfaces_3d(surface_layer, dem_crs, params.get('selected_only', False), frame)
+    max_residual = float(params.get('max_residual', MAX_FIT_RESIDUAL))
+
+    results = []
+    for surface in surfaces:
+        evaluation = evaluate_dem_surface(read_block, grid, surface['parts'], surface['plane'],
+                                          block_size=block_size)
+        evaluation.update({'fid': surface['fid'], 'name': surface['name'],
+                           'source': surface['source'], 'residual': surface['residual']})
+        results.append(evaluation)
+
+    out_layer = QgsVectorLayer(f"Point?crs={dem_crs.authid()}",
+                               f"{surface_layer.name()}_terrain_penetration", "memory")
+    provider = out_layer.dataProvider()
+    provider.addAttributes([
+        QgsField('surf_fid', QVariant.LongLong),
+        QgsField('surface', QVariant.String),
+        QgsField('terrain', QVariant.Double, 'double', 10, 2),
+        QgsField('surf_elev', QVariant.Double, 'double', 10, 2),
+        QgsField('penetration', QVariant.Double, 'double', 10, 2),
+        QgsField('cells', QVariant.LongLong),
+        QgsField('pen_cells', QVariant.LongLong),
+        QgsField('plane_src', QVariant.String),
+        QgsField('residual', QVariant.Double, 'double', 10, 3)
+    ])
+    out_layer.updateFields()
+
+    features = []
+    for result in results:
+        if result['cells'] == 0:
+            continue
+        if penetrating_only and not result['penetration'] > 0:
+            continue
+        feat = QgsFeature(out_layer.fields())
+        feat.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(result['x'], result['y'])))
+        feat.setAttributes([
+            int(result['fid']),
+            result['name'],
+            round(result['terrain'], 2),
+            round(result['surface'], 2),
+            round(result['penetration'], 2),
+            result['cells'],
+            result['penetrating'],
+            result['source'],
+            round(result['residual'], 3)
+        ])
+        features.append(feat)
+    provider.addFeatures(features)
+    out_layer.updateExtents()
+    QgsProject.instance().addMapLayer(out_layer)
+
+    penetrated = sum(1 for result in results if result['penetration'] > 0)
+    poor_fits = [result['name'] for result in results
+                 if result['source'] == 'fitted' and result['residual'] > max_residual]
+    if iface is not None:
+        iface.messageBar().pushMessage(
+            "QPANSOPY", f"Terrain check: {penetrated} of {len(results)} surfaces penetrated",
+            level=Qgis.Warning if penetrated else Qgis.Success)
+        if poor_fits:
+            iface.messageBar().pushMessage(
+                "QPANSOPY", f"{len(poor_fits)} surfaces are not planar within {max_residual:g} m, "
+                            f"their fitted heights are approximate: {', '.join(poor_fits)}",
+                level=Qgis.Warning)
+
+    return {'layer': out_layer, 'results': results, 'penetrated_count': penetrated, 'poor_fits': poor_fits}
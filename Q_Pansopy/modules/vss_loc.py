@@ -290,6 +290,20 @@ def calculate_vss_loc(iface, point_layer, runway_layer, params):
     
     return result
 
+def evaluate_vss_loc_obstacles(iface, obstacle_layer, point_layer, runway_layer, params):
+    """
+    Evaluate an obstacle layer against the LOC VSS and OCS surfaces
+
+    :param iface: QGIS interface
+    :param obstacle_layer: Point layer with obstacles
+    :param point_layer: Point layer with the reference point (projected CRS)
+    :param runway_layer: Runway layer (projected CRS, same as point layer)
+    :param params: Dictionary with calculation parameters
+    :return: Dictionary with results
+    """
+    from .vss_straight import evaluate_vss_obstacles
+    return evaluate_vss_obstacles(iface, obstacle_layer, point_layer, runway_layer, params, variant='loc')
+
 def copy_parameters_table(params):
     """Generate formatted table for VSS LOC parameters"""
     from ..utils import format_parameters_table
@@ -288,6 +288,120 @@ def calculate_vss_straight(iface, point_layer, runway_layer, params):
     
     return result
 
+def evaluate_vss_obstacles(iface, obstacle_layer, point_layer, runway_layer, params, variant='straight'):
+    """
+    Evaluate an obstacle layer against the VSS and OCS surfaces
+
+    Heights of the sloped planes (VPA-1.12 deg for the VSS, VPA-1 deg for the
+    straight-in OCS) are computed for every obstacle in bulk. Optionally the
+    minimum OCH (not below the entered OCH) that clears the OCS is solved on
+    the cached obstacle coordinates.
+
+    :param iface: QGIS interface
+    :param obstacle_layer: Point layer with obstacles, obstacle file path or
+        structured obstacle array (see ``load_obstacles``)
+    :param point_layer: Point layer with the reference point (projected CRS)
+    :param runway_layer: Runway layer (projected CRS, same as point layer)
+    :param params: Dictionary with calculation parameters; 'accuracy'
+        adds the vertical accuracy to every obstacle and evaluates the
+        surfaces at the lowest point of its horizontal accuracy disc, with
+        the footprints grown by it (see ``obstacle_accuracies``)
+    :param variant: 'straight' for Straight In NPA or 'loc' for ILS LOC APV
+    :return: Dictionary with results
+    """
+    import numpy as np
+    from .evaluation.surfaces import runway_frame
+    from .evaluation.vss import vss_surfaces, evaluate_trapezoid, minimum_och
+    from .evaluation.obstacle_layers import (
+        load_obstacles, obstacle_source_name, create_evaluation_layer, feature_evaluation,
+        obstacle_accuracies, accuracy_fields, threshold_frame
+    )
+
+    rwy_width = float(params.get('rwy_width', 45))
+    strip_width = float(params.get('strip_width', 140))
+    VPA = float(params.get('VPA', 3.0))
+    elevation_field = params.get('elevation_field', 'elev')
+    penetrating_only = params.get('penetrating_only', True)
+    accuracy = params.get('accuracy', False)
+
+    # Convert units to meters if needed
+    thr_elev_raw = float(params.get('thr_elev', 0))
+    OCH_raw = float(params.get('OCH', 100))
+    RDH_raw = float(params.get('RDH', 15))
+    thr_elev = thr_elev_raw if params.get('thr_elev_unit', 'm') == 'm' else thr_elev_raw * 0.3048
+    OCH = OCH_raw if params.get('OCH_unit', 'm') == 'm' else OCH_raw * 0.3048
+    RDH = RDH_raw if params.get('RDH_unit', 'm') == 'm' else RDH_raw * 0.3048
+
+    if obstacle_layer is None or not point_layer or not runway_layer:
+        iface.messageBar().pushMessage("Error", "Obstacle, point or runway layer not provided", level=Qgis.Critical)
+        return None
+
+    # Same orientation as the surface generators
+    crs = point_layer.crs()
+    try:
+        frame = threshold_frame(point_layer, runway_layer, crs, thr_elev)
+    except ValueError as e:
+        iface.messageBar().pushMessage("Error", str(e), level=Qgis.Critical)
+        return None
+
+    obstacles = load_obstacles(obstacle_layer, elevation_field, crs,
+                               extra_fields=accuracy_fields(params) if accuracy else None,
+                               spacing=float(params.get('spacing', 10.0)))
+    heights = obstacles['elev'] - thr_elev
+    radius = None
+    if accuracy:
+        radius, v_acc = obstacle_accuracies(obstacles, params)
+        heights = heights + v_acc
+
+    x_local, y_local = runway_frame(obstacles['x'], obstacles['y'], frame['thr_x'], frame['thr_y'], frame['bearing'])
+    surfaces = vss_surfaces(OCH, RDH, VPA, rwy_width, strip_width, variant)
+
+    prefix = "LOC" if variant == 'loc' else "Straight In"
+    result = {'obstacle_count': obstacles.get('feature_count', len(obstacles['fid'])), 'obstacles': obstacles}
+
+    for key, name in (('vss', 'VSS area'), ('ocs', 'OCS area')):
+        evaluation = evaluate_trapezoid(x_local, y_local, heights, surfaces[key], radius)
+        evaluation['controlling'] = np.zeros(len(heights), dtype=np.int64)
+        evaluation['x_local'] = x_local
+        evaluation['y_local'] = y_local
+        evaluated, evaluation = feature_evaluation(obstacles, evaluation)
+
+        penetrating = evaluation['inside'] & (evaluation['penetration'] > 0)
+        mask = penetrating if penetrating_only else evaluation['inside'] & ~np.isnan(evaluation['penetration'])
+
+        out_layer = create_evaluation_layer(
+            f"{prefix} - {name} - {obstacle_source_name(obstacle_layer)} evaluation",
+            crs.authid(), evaluated, evaluation, mask, [name]
+        )
+        QgsProject.instance().addMapLayer(out_layer)
+
+        result[f'{key}_layer'] = out_layer
+        result[f'{key}_penetrating_count'] = int(penetrating.sum())
+        result[f'{key}_evaluation'] = evaluation
+
+    iface.messageBar().pushMessage(
+        "QPANSOPY:",
+        f"{result['vss_penetrating_count']} obstacles penetrate the VSS, "
+        f"{result['ocs_penetrating_count']} penetrate the OCS",
+        level=Qgis.Info
+    )
+
+    if params.get('solve_och', True):
+        solution = minimum_och(
+            x_local, y_local, heights, OCH, RDH, VPA, rwy_width, strip_width, variant,
+            och_max=float(params.get('och_max', 1000)),
+            margin=float(params.get('och_margin', 0)), radius=radius
+        )
+        result['minimum_och'] = solution['och']
+        if solution['controlling'] >= 0:
+            result['controlling_obstacle'] = int(obstacles['fid'][solution['controlling']])
+        if solution['och'] is None:
+            iface.messageBar().pushMessage("Warning", "No OCH in the search range clears the OCS", level=Qgis.Warning)
+        else:
+            iface.messageBar().pushMessage("QPANSOPY:", f"Minimum OCH clearing the OCS: {solution['och']:.2f} m", level=Qgis.Success)
+
+    return result
+
 def copy_parameters_table(params):
     """Generate formatted table for VSS Straight parameters"""
     from ..utils import format_parameters_table
@@ -0,0 +1,179 @@
+"""
+Extraction Engine Benchmark
+
+Times the point-in-surface engines used by extract_objects on 10k, 100k and
+1M candidate points inside the bounding box of the extraction surface.
+
+With QGIS, the surface goes through selection_of_objects.prepare_surfaces
+(the combined surface that extract_objects tests, a unary union of the
+surface features), and every engine is the surface_tester used by
+extract_objects on a list of candidate point geometries:
+
+- qgis-simple: QgsGeometry.intersects per candidate, the baseline every
+  speedup is relative to
+- qgis-prepared: GEOS prepared geometry engine built once
+- vectorized: coordinate arrays tested with points_in_polygon, including
+  the extraction of the coordinates from the point geometries
+
+The surface is a polygon layer given with --surface (e.g. an OAS layer
+saved to a GeoPackage), or an irregular star-shaped surface of about
+10 x 6 km otherwise.
+
+Without QGIS only the NumPy test can be timed. It is then compared with a
+per-point ray cast in pure Python, which is NOT the extract_objects
+baseline and is reported as such.
+
+Usage:
+  python benchmark_extraction_engines.py [--sizes 10000 100000 1000000] [--surface surfaces.gpkg]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Q_Pansopy.modules.evaluation.geometry import points_in_polygon  # noqa: E402
+
+# Standalone QgsApplication, kept alive while the benchmark runs
+_QGIS_APP = None
+
+
+def surface_ring(n_vertices=64):
+    """Irregular star-shaped surface of about 10 x 6 km"""
+    angles = np.linspace(0, 2 * math.pi, n_vertices, endpoint=False)
+    radius = 1.0 + 0.25 * np.sin(5 * angles)
+    return np.column_stack([5000 * radius * np.cos(angles), 3000 * radius * np.sin(angles)])
+
+
+def python_loop(x, y, ring):
+    inside = []
+    n = len(ring)
+    for px, py in zip(x.tolist(), y.tolist()):
+        hit = False
+        j = n - 1
+        for i in range(n):
+            xi, yi = ring[i]
+            xj, yj = ring[j]
+            if (yi > py) != (yj > py) and px < xi + (py - yi) * (xj - xi) / (yj - yi):
+                hit = not hit
+            j = i
+        inside.append(hit)
+    return inside
+
+
+def qgis_surface(surface_path):
+    """
+    Combined extraction surface prepared the way extract_objects does
+
+    :param surface_path: Polygon layer path, or None for the star surface
+    :return: Tuple (bbox, engines, to_points) with the surface extent, the
+        testers by name and a function building candidate point geometries,
+        or None when QGIS is not available
+    """
+    try:
+        from qgis.core import QgsApplication, QgsFeature, QgsGeometry, QgsPointXY, QgsVectorLayer
+    except ImportError:
+        return None
+    global _QGIS_APP
+    if QgsApplication.instance() is None:
+        _QGIS_APP = QgsApplication([], False)
+        _QGIS_APP.initQgis()
+
+    from Q_Pansopy.modules.selection_of_objects import prepare_surfaces, surface_tester
+
+    if surface_path:
+        layer = QgsVectorLayer(surface_path, 'surface', 'ogr')
+        if not layer.isValid():
+            raise SystemExit(f"Cannot open surface layer {surface_path}")
+    else:
+        layer = QgsVectorLayer('Polygon?crs=EPSG:3857', 'surface', 'memory')
+        feature = QgsFeature()
+        feature.setGeometry(QgsGeometry.fromPolygonXY([[QgsPointXY(float(px), float(py))
+                                                        for px, py in surface_ring()]]))
+        layer.dataProvider().addFeatures([feature])
+
+    prepared = prepare_surfaces(layer, layer.crs())
+    engines = {name: surface_tester(prepared['geometry'], engine)
+               for name, engine in (('qgis-simple', 'simple'), ('qgis-prepared', 'prepared'),
+                                    ('vectorized', 'vectorized'))}
+    to_points = lambda x, y: [QgsGeometry.fromPointXY(QgsPointXY(px, py)) for px, py in zip(x.tolist(), y.tolist())]
+    return prepared['bbox'], engines, to_points
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def benchmark_qgis(sizes, loop_limit, bbox, engines, to_points, rng):
+    print(f"{'candidates':>12} {'engine':>15} {'seconds':>10} {'vs qgis-simple':>15}")
+    for size in sizes:
+        x = rng.uniform(bbox.xMinimum(), bbox.xMaximum(), size)
+        y = rng.uniform(bbox.yMinimum(), bbox.yMaximum(), size)
+        points = to_points(x, y)
+
+        vec_time, vec_hits = timed(engines['vectorized'], points)
+
+        loop_size = min(size, loop_limit)
+        simple_time, simple_hits = timed(engines['qgis-simple'], points[:loop_size])
+        # Points on the surface boundary may differ between engines
+        mismatches = np.count_nonzero(np.asarray(simple_hits) != np.asarray(vec_hits[:loop_size]))
+        simple_time *= size / loop_size
+        suffix = '' if loop_size == size else ' (extrapolated)'
+        print(f"{size:>12} {'qgis-simple':>15} {simple_time:>10.3f} {1.0:>14.1f}x{suffix}")
+
+        prepared_time, _ = timed(engines['qgis-prepared'], points[:loop_size])
+        prepared_time *= size / loop_size
+        print(f"{size:>12} {'qgis-prepared':>15} {prepared_time:>10.3f} "
+              f"{simple_time / prepared_time:>14.1f}x{suffix}")
+        print(f"{size:>12} {'vectorized':>15} {vec_time:>10.3f} {simple_time / vec_time:>14.1f}x"
+              f"{f' ({mismatches} boundary mismatches)' if mismatches else ''}")
+
+
+def benchmark_numpy(sizes, loop_limit, rng):
+    print("QGIS not available: the qgis-simple baseline of extract_objects cannot be timed.")
+    print("Speedups below are against a pure Python ray cast, not against QgsGeometry.intersects.")
+    print(f"{'candidates':>12} {'engine':>15} {'seconds':>10} {'vs ray cast':>12}")
+    ring = surface_ring()
+    parts = [[ring]]
+    for size in sizes:
+        x = rng.uniform(-6250, 6250, size)
+        y = rng.uniform(-3750, 3750, size)
+
+        vec_time, vec_hits = timed(points_in_polygon, x, y, parts)
+
+        loop_size = min(size, loop_limit)
+        loop_time, loop_hits = timed(python_loop, x[:loop_size], y[:loop_size], ring)
+        assert np.array_equal(np.asarray(loop_hits), vec_hits[:loop_size])
+        loop_time *= size / loop_size
+        suffix = '' if loop_size == size else ' (extrapolated)'
+
+        print(f"{size:>12} {'python-ray-cast':>15} {loop_time:>10.3f} {1.0:>11.1f}x{suffix}")
+        print(f"{size:>12} {'vectorized':>15} {vec_time:>10.3f} {loop_time / vec_time:>11.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--loop-limit', type=int, default=20000,
+                        help='Largest size timed with per-point loops (larger sizes are extrapolated)')
+    parser.add_argument('--surface', help='Polygon layer with the extraction surfaces (QGIS only)')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    surface = qgis_surface(args.surface)
+    if surface is None:
+        if args.surface:
+            raise SystemExit("--surface needs the qgis module")
+        benchmark_numpy(args.sizes, args.loop_limit, rng)
+    else:
+        benchmark_qgis(args.sizes, args.loop_limit, *surface, rng)
+
+
+if __name__ == '__main__':
+    main()
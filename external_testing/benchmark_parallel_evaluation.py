@@ -0,0 +1,107 @@
+"""
+Parallel Evaluation Benchmark
+
+Times evaluation.parallel.evaluate_planes_parallel against the serial
+evaluation.surfaces.evaluate_planes on random obstacles around an OAS-like
+set of planes, for an increasing number of worker processes.
+
+Every row reuses one pool from evaluation_pool, as an evaluation does
+across its chunks and passes: the pool start-up (forkserver or spawn, the
+workers import NumPy) is timed once per worker count and reported apart,
+and each size is timed as the best of --repeat calls. The parallel
+threshold (PARALLEL_MIN_SIZE) is lifted so that every size goes through
+the pool.
+
+Scaling is bounded by the CPUs available to this process; the overhead
+column (parallel time minus serial time divided by the CPUs in use) is
+what the tiling, the shared memory copies and the tasks cost. With
+--oversubscribe, worker counts above the available CPUs are timed too,
+which on a small machine measures that overhead.
+
+Usage:
+  python benchmark_parallel_evaluation.py [--sizes 250000 1000000 4000000] [--workers 2 4 8] [--oversubscribe]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Q_Pansopy.modules.evaluation.parallel import (  # noqa: E402
+    available_cpus, default_context, evaluation_pool, evaluate_planes_parallel
+)
+from Q_Pansopy.modules.evaluation.surfaces import evaluate_planes  # noqa: E402
+
+PLANES = [[0.0285, 0.0, -8.01], [0.027681, 0.1825, -16.72], [0.023948, 0.210054, -21.51], [-0.025, 0.0, -22.5]]
+TOP_HEIGHTS = [300.0, 300.0, 300.0, 300.0]
+
+
+def best_of(repeat, func, *args, **kwargs):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[250000, 1000000, 4000000])
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--oversubscribe', action='store_true',
+                        help='Also time more workers than available CPUs')
+    args = parser.parse_args()
+
+    context = default_context()
+    cpus = available_cpus()
+    print(f"start method: {context.get_start_method() if context else 'none (serial only)'}, CPUs: {cpus}")
+    if context is None:
+        return
+
+    rng = np.random.default_rng(42)
+    data = {}
+    for size in args.sizes:
+        x = rng.uniform(-12000.0, 15000.0, size)
+        y = rng.uniform(-6000.0, 6000.0, size)
+        h = rng.uniform(0.0, 200.0, size)
+        serial_time, serial = best_of(args.repeat, evaluate_planes, x, y, h, PLANES, TOP_HEIGHTS)
+        data[size] = (x, y, h, serial_time, serial)
+
+    print(f"{'obstacles':>12} {'workers':>8} {'seconds':>10} {'speedup':>9} {'overhead':>10}")
+    for size, (_, _, _, serial_time, _) in data.items():
+        print(f"{size:>12} {'serial':>8} {serial_time:>10.3f} {1.0:>8.2f}x {'':>10}")
+
+    for workers in args.workers:
+        if workers > cpus and not args.oversubscribe:
+            print(f"{workers} workers skipped: only {cpus} CPUs available")
+            continue
+        with evaluation_pool(workers, context) as pool:
+            if pool is None:
+                # evaluation_pool never starts more workers than CPUs
+                pool = {'executor': ProcessPoolExecutor(max_workers=workers, mp_context=context),
+                        'workers': workers}
+            warm_up = [values[:200000] for values in data[args.sizes[0]][:3]]
+            start = time.perf_counter()
+            evaluate_planes_parallel(*warm_up, PLANES, TOP_HEIGHTS, pool=pool, min_size=0)
+            print(f"{workers} workers: first call of {len(warm_up[0])} obstacles, pool start-up included, "
+                  f"{time.perf_counter() - start:.3f} s")
+            for size, (x, y, h, serial_time, serial) in data.items():
+                run_time, result = best_of(args.repeat, evaluate_planes_parallel, x, y, h, PLANES, TOP_HEIGHTS,
+                                           pool=pool, min_size=0)
+                assert np.array_equal(result['penetration'], serial['penetration'])
+                overhead = run_time - serial_time / min(workers, cpus)
+                print(f"{size:>12} {workers:>8} {run_time:>10.3f} {serial_time / run_time:>8.2f}x "
+                      f"{overhead:>10.3f}")
+            if pool['workers'] > cpus:
+                pool['executor'].shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+import importlib
+
+import numpy as np
+
+
+W = [0.0285, 0.0, -8.01]
+X = [0.027681, 0.1825, -16.72]
+Y = [0.023948, 0.210054, -21.51]
+Z = [-0.025, 0.0, -22.5]
+
+
+def _disc_minimum(x, y, plane, radius, samples=721, rings=60):
+    A, B, C = plane
+    angle = np.linspace(0.0, 2.0 * np.pi, samples)
+    r = np.linspace(0.0, radius, rings)[:, np.newaxis]
+    px = x + r * np.cos(angle)
+    py = y + r * np.sin(angle)
+    return (A * px + B * np.abs(py) + C).min()
+
+
+def test_plane_heights_radius_matches_disc_sampling():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    rng = np.random.default_rng(3)
+    x = rng.uniform(0.0, 6000.0, 40)
+    y = rng.uniform(-400.0, 400.0, 40)
+    # Include obstacles whose disc crosses the centreline
+    y[:8] = rng.uniform(-20.0, 20.0, 8)
+    radius = rng.uniform(0.0, 50.0, 40)
+
+    planes = [W, X, Y, Z]
+    analytic = mod.plane_heights(x, y, planes, radius)
+    for p, plane in enumerate(planes):
+        for i in range(len(x)):
+            sampled = _disc_minimum(x[i], y[i], plane, radius[i])
+            assert analytic[p, i] <= sampled + 1e-9
+            assert np.isclose(analytic[p, i], sampled, atol=0.02)
+
+
+def test_plane_heights_zero_radius_is_unbuffered():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    x = np.array([100.0, 2500.0, 4000.0])
+    y = np.array([0.0, -150.0, 600.0])
+    planes = [W, X, Y, Z]
+    assert np.allclose(mod.plane_heights(x, y, planes, 0.0), mod.plane_heights(x, y, planes))
+
+
+def test_evaluate_planes_with_accuracy_is_conservative():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    rng = np.random.default_rng(4)
+    x = rng.uniform(0.0, 8000.0, 5000)
+    y = rng.uniform(-1200.0, 1200.0, 5000)
+    h = rng.gamma(2.0, 10.0, 5000)
+    radius = rng.uniform(0.0, 30.0, 5000)
+    v_acc = rng.uniform(0.0, 5.0, 5000)
+    planes = [W, X, Y, Z]
+
+    plain = mod.evaluate_planes(x, y, h, planes)
+    buffered = mod.evaluate_planes(x, y, h + v_acc, planes, radius=radius)
+
+    both = plain['inside'] & buffered['inside']
+    assert np.all(buffered['surface_height'][both] <= plain['surface_height'][both] + 1e-9)
+    assert np.all(buffered['penetration'][both] >= plain['penetration'][both] + v_acc[both] - 1e-9)
+
+
+def test_polygon_surfaces_with_accuracy():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    square = [[[np.array([[0.0, -500.0], [3000.0, -500.0], [3000.0, 500.0], [0.0, 500.0], [0.0, -500.0]])]]]
+    x = np.array([1000.0, 2000.0])
+    y = np.array([10.0, 300.0])
+    h = np.array([20.0, 30.0])
+
+    plain = mod.evaluate_polygon_surfaces(x, y, x, y, h, square, [X])
+    buffered = mod.evaluate_polygon_surfaces(x, y, x, y, h, square, [X], radius=np.array([25.0, 25.0]))
+    expected = mod.plane_heights(x, y, [X], np.array([25.0, 25.0]))[0]
+
+    assert np.allclose(buffered['surface_height'], expected)
+    assert np.all(buffered['surface_height'] < plain['surface_height'])
+
+
+def test_polygon_surfaces_accuracy_disc_reaching_a_polygon():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    square = [[[np.array([[0.0, -500.0], [3000.0, -500.0], [3000.0, 500.0], [0.0, 500.0], [0.0, -500.0]])]]]
+    # Just outside the polygon: only kept when the disc reaches the boundary
+    x = np.array([1000.0, 1000.0])
+    y = np.array([520.0, 540.0])
+    h = np.array([200.0, 200.0])
+
+    plain = mod.evaluate_polygon_surfaces(x, y, x, y, h, square, [X])
+    buffered = mod.evaluate_polygon_surfaces(x, y, x, y, h, square, [X], radius=25.0)
+    assert not plain['inside'].any()
+    assert buffered['inside'].tolist() == [True, False]
+    assert np.isclose(buffered['surface_height'][0], mod.plane_heights(x[:1], y[:1], [X], 25.0)[0, 0])
+
+
+def test_vss_trapezoid_with_accuracy():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.vss')
+
+    ocs = mod.vss_surfaces(100.0, 15.0, 3.0)['ocs']
+    half_width = np.interp(1000.0, ocs['stations'], ocs['half_widths'])
+    x = np.array([1000.0, 1000.0, -10.0])
+    y = np.array([half_width + 10.0, half_width + 30.0, 0.0])
+    h = np.full(3, 50.0)
+
+    plain = mod.evaluate_trapezoid(x, y, h, ocs)
+    buffered = mod.evaluate_trapezoid(x, y, h, ocs, radius=20.0)
+    assert not plain['inside'].any()
+    assert buffered['inside'].tolist() == [True, False, True]
+    assert np.allclose(buffered['surface_height'], plain['surface_height'] - 20.0 * ocs['slope'])
+
+    solved = mod.minimum_och(x, y, h, 20.0, 15.0, 3.0, radius=20.0)
+    assert solved['och'] >= 50.0
@@ -0,0 +1,83 @@
+import importlib
+
+import numpy as np
+
+
+def _square(xmin, ymin, xmax, ymax):
+    return [[np.array([[xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax], [xmin, ymin]])]]
+
+
+def _surfaces():
+    # Two overlapping sloping surfaces: the lowest one controls each cell
+    return [
+        {'parts': _square(0.0, 0.0, 1000.0, 500.0), 'plane': (0.02, 0.0, 100.0)},
+        {'parts': _square(400.0, 0.0, 1400.0, 500.0), 'plane': (-0.02, 0.0, 125.0)}
+    ]
+
+
+def test_rasterize_min_surface_and_lookup():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.composite')
+
+    grid = mod.composite_grid([0.0, 0.0, 1400.0, 500.0], 10.0)
+    assert (grid['width'], grid['height']) == (140, 50)
+    composite = mod.rasterize_min_surface(grid, _surfaces(), block_size=32)
+
+    rng = np.random.default_rng(6)
+    x = rng.uniform(0.0, 1400.0, 2000)
+    y = rng.uniform(0.0, 500.0, 2000)
+    height, surface = mod.lookup_composite(composite, x, y)
+
+    # Never above the exact lowest surface, at most one cell of slope below
+    first = np.where(x <= 1000.0, 0.02 * x + 100.0, np.inf)
+    second = np.where(x >= 400.0, -0.02 * x + 125.0, np.inf)
+    exact = np.minimum(first, second)
+    assert np.all(height <= exact + 1e-3)
+    # Away from the edges and from the crossing of both planes at x = 625
+    interior = (np.abs(x - 400.0) > 10.0) & (np.abs(x - 625.0) > 10.0) & (np.abs(x - 1000.0) > 10.0)
+    assert np.all(height[interior] >= exact[interior] - 0.2 - 1e-3)
+    assert np.array_equal(surface[interior], np.where(first <= second, 0, 1)[interior])
+
+    outside, none = mod.lookup_composite(composite, np.array([-50.0, 2000.0]), np.array([10.0, 10.0]))
+    assert np.all(np.isnan(outside)) and np.all(none == -1)
+
+    evaluation = mod.evaluate_composite(composite, x, y, height + 5.0)
+    assert np.allclose(evaluation['penetration'], 5.0, atol=1e-3)
+    assert evaluation['inside'].all()
+
+
+def test_composite_cache_round_trip(tmp_path):
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.composite')
+
+    surfaces = _surfaces()
+    grid = mod.composite_grid([0.0, 0.0, 1400.0, 500.0], 20.0)
+    signature = mod.surfaces_signature(surfaces, grid)
+    assert mod.load_composite(signature, str(tmp_path)) is None
+
+    composite = mod.rasterize_min_surface(grid, surfaces)
+    mod.save_composite(composite, signature, ['a', 'b'], str(tmp_path))
+    cached = mod.load_composite(signature, str(tmp_path))
+    assert cached['names'] == ['a', 'b']
+    assert np.array_equal(np.asarray(cached['surface']), composite['surface'])
+    assert np.array_equal(np.asarray(cached['height']), composite['height'], equal_nan=True)
+
+    # Any change of a surface gives another key, so the grid is rebuilt
+    changed = [dict(surfaces[0], plane=(0.02, 0.0, 101.0)), surfaces[1]]
+    assert mod.surfaces_signature(changed, grid) != signature
+
+
+def test_composite_is_conservative_at_surface_edges():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.composite')
+
+    # A steep transition-like surface whose edges cut the cells
+    surfaces = [{'parts': _square(3.0, 3.0, 497.0, 197.0), 'plane': (0.0, 0.143, 10.0)}]
+    grid = mod.composite_grid([0.0, 0.0, 500.0, 200.0], 10.0)
+    composite = mod.rasterize_min_surface(grid, surfaces)
+
+    rng = np.random.default_rng(11)
+    x = rng.uniform(3.0, 497.0, 5000)
+    y = rng.uniform(3.0, 197.0, 5000)
+    height, surface = mod.lookup_composite(composite, x, y)
+    exact = 0.143 * y + 10.0
+    assert np.all(surface == 0)
+    assert np.all(height <= exact + 1e-3)
+    assert np.all(height >= exact - 0.143 * 10.0 - 1e-3)
@@ -0,0 +1,71 @@
+import importlib
+
+import numpy as np
+
+
+W = [0.0285, 0.0, -8.01]
+X = [0.027681, 0.1825, -16.72]
+Y = [0.023948, 0.210054, -21.51]
+Z = [-0.025, 0.0, -22.5]
+
+
+def _city(n, seed):
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(-3000.0, 8000.0, n)
+    y = rng.uniform(-1500.0, 1500.0, n)
+    h = rng.gamma(2.0, 8.0, n)
+    return x, y, h
+
+
+def test_dominance_filter_keeps_every_possible_controller():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.dominance')
+    surfaces = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    x, y, h = _city(50000, 1)
+    planes = [W, X, Y, Z]
+    keep = mod.dominance_filter(x, y, h, planes)
+    full = surfaces.evaluate_planes(x, y, h, planes, top_heights=1e9)
+
+    assert keep.mean() < 0.5
+    # Every pruned obstacle penetrates less than some kept obstacle
+    assert full['penetration'][~keep].max() < full['penetration'][keep].max()
+    assert keep[np.argmax(full['penetration'])]
+
+
+def test_dominance_filter_is_sound_pairwise():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.dominance')
+    surfaces = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    # A small cluster: each pruned obstacle must be beaten by one kept obstacle
+    x, y, h = _city(400, 2)
+    planes = [W, X, Y, Z]
+    keep = mod.dominance_filter(x, y, h, planes, band_width=200.0, bin_length=500.0)
+    pen = surfaces.evaluate_planes(x, y, h, planes, top_heights=1e9)['penetration']
+
+    gx, gy = mod.plane_gradients(planes)
+    for b in np.flatnonzero(~keep):
+        margin = h - gx * np.abs(x - x[b]) - gy * np.abs(np.abs(y) - np.abs(y[b])) - h[b]
+        assert (margin > 0).any()
+        assert pen[margin > 0].max() > pen[b]
+
+
+def test_evaluate_dominant_matches_full_evaluation_for_controllers():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.dominance')
+    surfaces = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    x, y, h = _city(30000, 3)
+    planes = [W, X, Y, Z]
+    tops = [120.0, 120.0, 300.0, 300.0]
+    full = surfaces.evaluate_planes(x, y, h, planes, tops)
+
+    def evaluate(idx):
+        return surfaces.evaluate_planes(x[idx], y[idx], h[idx], planes, tops)
+
+    evaluation, stats = mod.evaluate_dominant(evaluate, x, y, h, planes)
+
+    evaluated = ~np.isnan(evaluation['penetration'])
+    assert stats['pruned'] == int((~evaluated).sum()) and stats['ratio'] > 0.3
+    assert np.array_equal(evaluation['penetration'][evaluated], full['penetration'][evaluated])
+    inside_full = full['penetration'][full['inside']]
+    inside_kept = evaluation['penetration'][evaluation['inside']]
+    assert inside_kept.max() == inside_full.max()
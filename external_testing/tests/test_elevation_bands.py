@@ -0,0 +1,34 @@
+import importlib
+
+import numpy as np
+import pytest
+
+
+def test_classify_elevations_matches_single_threshold_split():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.bands')
+
+    elev = np.array([90.0, 100.0, 100.1, 150.0, np.nan])
+    bands = mod.classify_elevations(elev, [100.0])
+
+    assert bands.tolist() == [0, 1, 1, 1, -1]
+    assert np.array_equal(bands == 1, elev >= 100.0)
+
+
+def test_classify_elevations_sorts_and_deduplicates_breakpoints():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.bands')
+
+    elev = np.array([50.0, 110.0, 130.0, 200.0])
+    bands = mod.classify_elevations(elev, [150.0, 100.0, 120.0, 100.0])
+
+    assert bands.tolist() == [0, 1, 2, 3]
+    assert mod.band_counts(bands, 4) == [1, 1, 1, 1]
+    assert mod.band_labels([150.0, 100.0, 120.0]) == [
+        '< 100.0 m', '100.0 - 120.0 m', '120.0 - 150.0 m', '>= 150.0 m'
+    ]
+
+
+def test_classify_elevations_requires_a_breakpoint():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.bands')
+
+    with pytest.raises(ValueError):
+        mod.classify_elevations([1.0, 2.0], [np.nan])
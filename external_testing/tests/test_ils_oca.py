@@ -0,0 +1,61 @@
+import importlib
+import math
+
+import numpy as np
+
+
+def test_height_loss_margins_and_adjustments():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.oca')
+
+    assert np.allclose(mod.height_loss_margins(), [13.0, 18.0, 22.0, 26.0, 8.0])
+    assert np.allclose(mod.height_loss_margins(('A', 'D'), 'pressure'), [40.0, 49.0])
+
+    # 1500 m aerodrome: +4% of the radio altimeter margin; 3.5 deg: +15%
+    adjusted = mod.height_loss_margins(('C',), 'radio', aerodrome_elevation=1500.0, gp_angle=3.5)
+    assert np.allclose(adjusted, [22.0 * 1.19])
+
+
+def test_missed_approach_equivalent_height():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.oca')
+
+    # On the Z surface (2.5% from 900 m after threshold) the equivalent height is 0
+    x = np.array([-1900.0, -900.0, 2000.0])
+    h = np.array([25.0, 0.0, 40.0])
+    missed = mod.classify_missed_approach(x, h, 3.0, ('A', 'H'))
+    assert missed.tolist() == [[True, False, False], [True, True, False]]
+
+    heights = mod.equivalent_heights(x, h, missed, 3.0, ('A', 'H'))
+    assert np.isclose(heights[0, 0], 0.0)
+    assert np.isclose(heights[0, 2], 40.0)
+
+    cot_z = 40.0
+    cot_theta = 1.0 / math.tan(math.radians(3.0))
+    expected = (25.0 * cot_z + (700.0 - 1900.0)) / (cot_z + cot_theta)
+    assert np.isclose(heights[1, 0], expected)
+
+
+def test_ils_oca_broadcasts_categories():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.oca')
+
+    rng = np.random.default_rng(9)
+    x = rng.uniform(-3000.0, 8000.0, 20000)
+    h = rng.uniform(0.0, 60.0, 20000)
+    result = mod.ils_oca(x, h, thr_elev=100.0, gp_angle=3.0)
+
+    assert result['approach_height'].shape == (5, 20000)
+    for i, category in enumerate(mod.CATEGORIES):
+        # Reference: one category at a time
+        missed = mod.classify_missed_approach(x, h, 3.0, (category,))
+        heights = mod.equivalent_heights(x, h, missed, 3.0, (category,))[0]
+        assert result['controlling'][i] == np.argmax(heights)
+        assert np.isclose(result['och'][i], heights.max() + mod.HL_RADIO_ALTIMETER[i])
+        assert np.isclose(result['oca'][i], result['och'][i] + 100.0)
+
+
+def test_ils_oca_without_obstacles():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.oca')
+
+    result = mod.ils_oca(np.zeros(0), np.zeros(0), thr_elev=50.0, categories=('A', 'B'))
+    assert result['controlling'].tolist() == [-1, -1]
+    assert np.allclose(result['och'], [13.0, 18.0])
+    assert np.allclose(result['oca'], [63.0, 68.0])
@@ -0,0 +1,179 @@
+import importlib
+
+import numpy as np
+
+
+X = [0.027681, 0.1825, -16.72]
+Z = [-0.025, 0.0, -22.5]
+
+
+def _dataset(n, seed):
+    rng = np.random.default_rng(seed)
+    ids = np.array([f'OBS{i:06d}' for i in range(n)])
+    x = rng.uniform(-2000.0, 6000.0, n)
+    y = rng.uniform(-1000.0, 1000.0, n)
+    h = rng.gamma(2.0, 10.0, n)
+    return ids, x, y, h
+
+
+def test_hashes_are_stable_and_distinct():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.incremental')
+
+    ids, x, y, h = _dataset(1000, 1)
+    content = mod.content_hashes(x, y, h)
+    assert np.array_equal(content, mod.content_hashes(x.copy(), y.copy(), h.copy()))
+    assert len(np.unique(content)) == len(content)
+    assert len(np.unique(mod.identity_hashes(ids))) == len(ids)
+
+    moved = h.copy()
+    moved[5] += 0.01
+    assert np.flatnonzero(mod.content_hashes(x, y, moved) != content).tolist() == [5]
+
+    # Repeated ids (densified features) still get distinct identities
+    repeated = mod.identity_hashes(np.array([7, 7, 7, 8]))
+    assert len(np.unique(repeated)) == 4
+    assert mod.surface_hash([X, Z], thr=[0, 0]) != mod.surface_hash([X, Z], thr=[0, 1])
+
+
+def test_incremental_evaluation_reuses_unchanged_results(tmp_path):
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.incremental')
+    surfaces = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    planes = [X, Z]
+    key = mod.surface_hash(planes, top_heights=300)
+    calls = []
+
+    def runner(x, y, h):
+        def evaluate(idx):
+            calls.append(len(idx))
+            return surfaces.evaluate_planes(x[idx], y[idx], h[idx], planes)
+        return evaluate
+
+    ids, x, y, h = _dataset(2000, 2)
+    first, report = mod.evaluate_incremental(runner(x, y, h), ids, mod.content_hashes(x, y, h), key, str(tmp_path))
+    assert calls == [2000]
+    assert report['reused'] == 0 and len(report['added']) == 2000
+
+    # Next cycle: 10 changed, 5 removed, 3 added
+    h2 = h.copy()
+    h2[:10] += 50.0
+    keep = np.ones(len(ids), dtype=bool)
+    keep[100:105] = False
+    ids2 = np.r_[ids[keep], ['NEW1', 'NEW2', 'NEW3']]
+    x2 = np.r_[x[keep], [100.0, 200.0, 300.0]]
+    y2 = np.r_[y[keep], [0.0, 10.0, 20.0]]
+    h2 = np.r_[h2[keep], [80.0, 80.0, 80.0]]
+
+    calls.clear()
+    second, report = mod.evaluate_incremental(runner(x2, y2, h2), ids2, mod.content_hashes(x2, y2, h2), key, str(tmp_path))
+    assert calls == [13]
+    assert report['reused'] == len(ids2) - 13
+    assert len(report['changed']) == 10 and len(report['added']) == 3 and len(report['removed']) == 5
+
+    full = surfaces.evaluate_planes(x2, y2, h2, planes)
+    for column in mod.RESULT_COLUMNS:
+        assert np.array_equal(second[column], full[column], equal_nan=column != 'inside')
+
+    rows = mod.change_report_rows(report, ids2, second)
+    assert sorted(r['change'] for r in rows).count('removed') == 5
+    assert {r['id'] for r in rows if r['change'] == 'added'} == {'NEW1', 'NEW2', 'NEW3'}
+    path = mod.write_change_report(str(tmp_path / 'changes.csv'), rows)
+    with open(path, encoding='utf-8') as f:
+        assert len(f.read().strip().splitlines()) == len(rows) + 1
+
+
+def test_other_surface_key_does_not_reuse(tmp_path):
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.incremental')
+    surfaces = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    ids, x, y, h = _dataset(100, 3)
+    content = mod.content_hashes(x, y, h)
+
+    def evaluate(idx):
+        return surfaces.evaluate_planes(x[idx], y[idx], h[idx], [X])
+
+    mod.evaluate_incremental(evaluate, ids, content, mod.surface_hash([X]), str(tmp_path))
+    _, report = mod.evaluate_incremental(evaluate, ids, content, mod.surface_hash([Z]), str(tmp_path))
+    assert report['evaluated'] == 100
+
+
+def test_identity_does_not_depend_on_id_width(tmp_path):
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.incremental')
+    surfaces = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    short = mod.identity_hashes(np.array(['OBS1', 'OBS2', 'OBS3']))
+    wide = mod.identity_hashes(np.array(['OBS1', 'OBS2', 'OBS3', 'OBS-NEW-LONG']))
+    assert np.array_equal(short, wide[:3])
+    assert mod.identity_hashes(np.array(['AB']))[0] != mod.identity_hashes(np.array(['ABC']))[0]
+
+    def evaluate_with(x, y, h):
+        return lambda idx: surfaces.evaluate_planes(x[idx], y[idx], h[idx], [X])
+
+    x, y, h = np.array([100.0, 200.0, 300.0]), np.zeros(3), np.full(3, 10.0)
+    ids = np.array(['OBS1', 'OBS2', 'OBS3'])
+    key = mod.surface_hash([X])
+    mod.evaluate_incremental(evaluate_with(x, y, h), ids, mod.content_hashes(x, y, h), key, str(tmp_path))
+
+    x2, y2, h2 = np.r_[x, 400.0], np.zeros(4), np.full(4, 10.0)
+    ids2 = np.r_[ids, ['OBS-NEW-LONG']]
+    _, report = mod.evaluate_incremental(evaluate_with(x2, y2, h2), ids2, mod.content_hashes(x2, y2, h2),
+                                         key, str(tmp_path))
+    assert report['added'].tolist() == [3]
+    assert len(report['removed']) == 0 and len(report['changed']) == 0
+
+
+def test_change_report_by_feature(tmp_path):
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.incremental')
+    surfaces = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    def evaluate_with(x, y, h):
+        return lambda idx: surfaces.evaluate_planes(x[idx], y[idx], h[idx], [X])
+
+    # Two densified lines (ids 1 and 2) of three points each
+    ids = np.array([1, 1, 1, 2, 2, 2])
+    x = np.array([1000.0, 1010.0, 1020.0, 2000.0, 2010.0, 2020.0])
+    y = np.zeros(6)
+    h = np.array([5.0, 30.0, 5.0, 5.0, 5.0, 5.0])
+    key = mod.surface_hash([X])
+    mod.evaluate_incremental(evaluate_with(x, y, h), ids, mod.content_hashes(x, y, h), key, str(tmp_path))
+
+    # Line 1 moves one point up, line 2 is removed, line 3 is added
+    ids2 = np.array([1, 1, 1, 3, 3])
+    x2 = np.array([1000.0, 1010.0, 1020.0, 3000.0, 3010.0])
+    h2 = np.array([5.0, 30.0, 40.0, 1.0, 1.0])
+    evaluation, report = mod.evaluate_incremental(evaluate_with(x2, np.zeros(5), h2), ids2,
+                                                  mod.content_hashes(x2, np.zeros(5), h2), key, str(tmp_path))
+
+    rows = {row['id']: row for row in mod.change_report_rows(report, ids2, evaluation, by_feature=True)}
+    assert {key: row['change'] for key, row in rows.items()} == {'1': 'changed', '2': 'removed', '3': 'added'}
+    # The changed line reports the worst of all its points
+    surface = X[0] * 1010.0 + X[2]
+    assert np.isclose(rows['1']['old_penetration'], 30.0 - surface)
+    assert np.isclose(rows['1']['new_penetration'], 40.0 - (X[0] * 1020.0 + X[2]))
+
+
+def test_datasets_against_the_same_surface_keep_their_own_results(tmp_path):
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.incremental')
+    surfaces = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    planes = [X, Z]
+    key = mod.surface_hash(planes, top_heights=300)
+    buildings = _dataset(500, 3)
+    terrain = _dataset(800, 4)
+
+    def run(dataset, dataset_key):
+        ids, x, y, h = dataset
+        evaluate = lambda idx: surfaces.evaluate_planes(x[idx], y[idx], h[idx], planes)
+        return mod.evaluate_incremental(evaluate, ids, mod.content_hashes(x, y, h), key, str(tmp_path),
+                                        dataset_key)[1]
+
+    run(buildings, 'buildings.shp')
+    report = run(terrain, 'terrain.shp')
+    assert report['reused'] == 0 and len(report['removed']) == 0
+
+    # Each dataset is compared with its own previous version
+    report = run(buildings, 'buildings.shp')
+    assert report['reused'] == 500 and len(report['added']) == len(report['removed']) == 0
+    assert mod.store_key(key, 'buildings.shp') != mod.store_key(key, 'terrain.shp')
+    assert mod.store_key(key) == key
+    assert len(list(tmp_path.glob('*.npz'))) == 2
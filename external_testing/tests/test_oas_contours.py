@@ -0,0 +1,60 @@
+import importlib
+import time
+
+import numpy as np
+
+PLANES = np.array([
+    [0.0285, 0.0, -8.01],
+    [0.027681, 0.1825, -16.72],
+    [0.023948, 0.210054, -21.51],
+    [-0.025, 0.0, -22.5]
+])
+
+
+def test_contour_segments_lie_on_their_plane_and_the_surface():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.oas_geometry')
+
+    heights = np.arange(10.0, 310.0, 10.0)
+    contours = mod.oas_contours(PLANES, heights)
+    # W and Z once, X and Y on both sides, for each of the 30 heights
+    assert len(contours) == 30 * 6
+
+    for x, y in (('x0', 'y0'), ('x1', 'y1')):
+        px, py = contours[x], np.abs(contours[y])
+        own = PLANES[[mod.PLANE_INDEX[p] for p in contours['plane']]]
+        assert np.allclose(own[:, 0] * px + own[:, 1] * py + own[:, 2], contours['height'])
+        # The OAS is the highest plane: no plane rises above the contour
+        oas = (PLANES[:, 0, None] * px + PLANES[:, 1, None] * py + PLANES[:, 2, None]).max(axis=0)
+        assert np.allclose(oas, contours['height'])
+
+    # The contours of one height form a closed ring
+    ring = contours[contours['height'] == 100.0]
+    assert np.allclose(np.r_[ring['x1'][[0, 1, 3, 5, 4, 2]]], np.r_[ring['x0'][[1, 3, 5, 4, 2, 0]]])
+
+
+def test_contours_respect_top_heights():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.oas_geometry')
+
+    contours = mod.oas_contours(PLANES, [250.0, 400.0], top_heights=[450.0, 450.0, 300.0, 300.0])
+    above = contours[contours['height'] == 400.0]
+    assert sorted(set(above['plane'])) == ['W', 'X']
+    assert len(contours[contours['height'] == 250.0]) == 6
+
+
+def test_contour_generation_is_fast():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.oas_geometry')
+
+    start = time.perf_counter()
+    mod.oas_contours(PLANES, np.arange(10.0, 310.0, 10.0))
+    assert time.perf_counter() - start < 0.5
+
+
+def test_map_frame_inverts_runway_frame():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    rng = np.random.default_rng(3)
+    x = rng.uniform(-5000.0, 5000.0, 100) + 450000.0
+    y = rng.uniform(-5000.0, 5000.0, 100) + 4400000.0
+    local_x, local_y = mod.runway_frame(x, y, 450000.0, 4400000.0, 237.5)
+    back_x, back_y = mod.map_frame(local_x, local_y, 450000.0, 4400000.0, 237.5)
+    assert np.allclose(back_x, x) and np.allclose(back_y, y)
@@ -0,0 +1,136 @@
+import importlib
+import json
+import os
+from collections import OrderedDict
+
+import pytest
+
+
+CSV = """
+---OAS constants
+WA, {wa}
+WB, 0.0
+WC, -8.01
+XA, 0.027681
+XB, 0.1825
+XC, -16.72
+YA, 0.023948
+YB, 0.210054
+YC, -21.51
+ZA, -0.025
+ZB, 0.0
+ZC, -22.5
+---OAS Template coordinates -m(meters)
+C, 281.05, -49.22, 0
+"""
+
+
+@pytest.fixture
+def oas_csv(monkeypatch):
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.oas_csv')
+    monkeypatch.setattr(mod, '_CONSTANTS_CACHE', OrderedDict())
+    monkeypatch.setattr(mod, '_CSV_HASHES', OrderedDict())
+
+    calls = []
+    parse = mod.parse_csv_constants
+    monkeypatch.setattr(mod, 'parse_csv_constants', lambda lines: calls.append(1) or parse(lines))
+    monkeypatch.setattr(mod, 'parse_calls', calls, raising=False)
+    return mod
+
+
+def write_csv(path, wa='0.0285'):
+    path.write_text(CSV.format(wa=wa), encoding='utf-8')
+    return str(path)
+
+
+def test_same_content_and_heights_are_not_parsed_again(oas_csv, tmp_path):
+    csv_path = write_csv(tmp_path / 'oas.csv')
+
+    first, reused, _ = oas_csv.load_csv_constants(csv_path, 150.0)
+    assert not reused
+    assert first['individual_planes']['W'] == [0.0285, 0.0, -8.01]
+    # Callers may modify their copy without touching the cache
+    first['individual_planes']['W'][0] = 1.0
+
+    second, reused, _ = oas_csv.load_csv_constants(csv_path, 150.0)
+    assert reused and len(oas_csv.parse_calls) == 1
+    assert second['individual_planes']['W'] == [0.0285, 0.0, -8.01]
+    assert second['OAS_template']["C'"][2] == 300
+
+
+def test_changed_content_is_parsed_again(oas_csv, tmp_path):
+    csv_path = write_csv(tmp_path / 'oas.csv')
+    oas_csv.load_csv_constants(csv_path, 150.0)
+
+    # Same size, later mtime
+    write_csv(tmp_path / 'oas.csv', wa='0.0286')
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    data, reused, _ = oas_csv.load_csv_constants(csv_path, 150.0)
+    assert not reused and len(oas_csv.parse_calls) == 2
+    assert data['individual_planes']['W'][0] == 0.0286
+
+
+def test_touched_file_with_same_content_reuses_constants(oas_csv, tmp_path):
+    csv_path = write_csv(tmp_path / 'oas.csv')
+    digest = oas_csv.csv_content_hash(csv_path)
+    oas_csv.load_csv_constants(csv_path, 150.0)
+
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    _, reused, _ = oas_csv.load_csv_constants(csv_path, 150.0)
+    assert reused and len(oas_csv.parse_calls) == 1
+    # The hash was recomputed for the new mtime
+    assert oas_csv._CSV_HASHES[csv_path] == (stat.st_size, stat.st_mtime_ns + 10 ** 9, digest)
+
+
+def test_extension_height_is_part_of_the_key(oas_csv, tmp_path):
+    csv_path = write_csv(tmp_path / 'oas.csv')
+
+    low, _, _ = oas_csv.load_csv_constants(csv_path, 150.0)
+    high, reused, _ = oas_csv.load_csv_constants(csv_path, 250.0)
+
+    assert not reused and len(oas_csv.parse_calls) == 2
+    assert low['OAS_extended']["C'"][2] == 150.0
+    assert high['OAS_extended']["C'"][2] == 250.0
+    assert high['OAS_extended']["C'"][0] > low['OAS_extended']["C'"][0]
+
+
+def test_json_export_is_opt_in(oas_csv, tmp_path):
+    csv_path = write_csv(tmp_path / 'oas.csv')
+    json_path = tmp_path / 'oas_processed.json'
+
+    _, _, exported = oas_csv.load_csv_constants(csv_path, 150.0)
+    assert exported is None and not json_path.exists()
+
+    data, reused, exported = oas_csv.load_csv_constants(csv_path, 150.0, parameters={'THR_elev': '10 m'},
+                                                        export_json=True)
+    assert reused and exported == str(json_path)
+    written = json.loads(json_path.read_text(encoding='utf-8'))
+    assert written['used_parameters'] == {'THR_elev': '10 m'}
+    assert written['individual_planes'] == data['individual_planes']
+
+
+def test_caches_keep_the_most_recent_entries(oas_csv, tmp_path, monkeypatch):
+    monkeypatch.setattr(oas_csv, 'MAX_CACHED_CONSTANTS', 3)
+    monkeypatch.setattr(oas_csv, 'MAX_CACHED_HASHES', 2)
+    csv_path = write_csv(tmp_path / 'oas.csv')
+
+    for height in (100.0, 150.0, 200.0, 250.0):
+        oas_csv.load_csv_constants(csv_path, height)
+    assert [key[1] for key in oas_csv._CONSTANTS_CACHE] == [150.0, 200.0, 250.0]
+
+    for name in ('a.csv', 'b.csv', 'c.csv'):
+        oas_csv.csv_content_hash(write_csv(tmp_path / name))
+    assert list(oas_csv._CSV_HASHES) == [str(tmp_path / 'b.csv'), str(tmp_path / 'c.csv')]
+
+
+def test_missing_plane_is_refused(oas_csv, tmp_path):
+    csv_path = tmp_path / 'oas.csv'
+    csv_path.write_text(CSV.format(wa='0.0285').replace('ZC, -22.5\n', ''), encoding='utf-8')
+
+    with pytest.raises(ValueError, match='Z plane'):
+        oas_csv.load_csv_constants(str(csv_path), 150.0)
+    assert not oas_csv._CONSTANTS_CACHE
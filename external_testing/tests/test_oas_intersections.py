@@ -0,0 +1,48 @@
+import importlib
+
+import numpy as np
+
+PLANES = {
+    'W': [0.0285, 0.0, -8.01],
+    'X': [0.027681, 0.1825, -16.72],
+    'Y': [0.023948, 0.210054, -21.51],
+    'Z': [-0.025, 0.0, -22.5]
+}
+
+
+def test_oas_intersections_match_per_pair_solve():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.oas_geometry')
+
+    heights = np.linspace(0.0, 300.0, 31)
+    result = mod.oas_intersections(PLANES, heights)
+    assert result.dtype == mod.INTERSECTION_DTYPE
+    assert len(result) == 3 * 31 * 2
+    assert result['valid'].all()
+
+    for name, first, second in mod.OAS_PAIRS:
+        p1, p2 = PLANES[first], PLANES[second]
+        for h in (0.0, 150.0, 300.0):
+            expected = np.linalg.solve([p1[:2], p2[:2]], [h - p1[2], h - p2[2]])
+            rows = result[(result['point'] == name) & (result['height'] == h)]
+            assert rows['side'].tolist() == [1, -1]
+            assert np.allclose(rows['x'], expected[0])
+            assert np.allclose(rows['y'], [expected[1], -expected[1]])
+
+    # Every point lies on both planes (with |y|)
+    x, y, z = result['x'], np.abs(result['y']), result['z']
+    for name, first, second in mod.OAS_PAIRS:
+        rows = result['point'] == name
+        for plane in (PLANES[first], PLANES[second]):
+            assert np.allclose(plane[0] * x[rows] + plane[1] * y[rows] + plane[2], z[rows])
+
+
+def test_singular_pairs_are_invalid():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.oas_geometry')
+
+    # W and Z have no lateral term: parallel in y, no single intersection
+    x, y, valid = mod.solve_plane_pairs([PLANES['W'], PLANES['X']], [PLANES['Z'], [0.0, 0.0, 5.0]], [10.0, 10.0])
+    assert valid.tolist() == [False, False]
+    assert np.isnan(x).all() and np.isnan(y).all()
+
+    result = mod.oas_intersections(PLANES, [0.0, 100.0], pairs=(('C', 'W', 'X'), ('F', 'W', 'Z')), mirrored=False)
+    assert result['valid'].tolist() == [True, True, False, False]
@@ -0,0 +1,49 @@
+import importlib
+
+import numpy as np
+
+
+def _brute_force(x, y, rect):
+    xmin, ymin, xmax, ymax = rect
+    return np.flatnonzero((x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax))
+
+
+def test_query_obstacle_index_matches_brute_force():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.obstacle_cache')
+
+    rng = np.random.default_rng(7)
+    x = rng.uniform(0.0, 10000.0, 20000)
+    y = rng.uniform(0.0, 10000.0, 20000)
+    fid = np.arange(20000) + 100
+    index = mod.build_obstacle_index(fid, x, y, rng.uniform(0.0, 50.0, 20000), node_capacity=16)
+
+    for rect in [(2000.0, 3000.0, 2600.0, 5100.0), (0.0, 0.0, 10000.0, 10000.0), (-5.0, -5.0, -1.0, -1.0)]:
+        found = index['fid'][mod.query_obstacle_index(index, *rect)]
+        expected = fid[_brute_force(x, y, rect)]
+        assert sorted(found.tolist()) == expected.tolist()
+
+
+def test_obstacle_index_round_trip_through_cache(tmp_path):
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.obstacle_cache')
+
+    source = tmp_path / 'obstacles.csv'
+    source.write_text('id,x,y,elev\n')
+    signature = mod.source_signature(str(source), 'EPSG:32719')
+    cache_dir = str(tmp_path / 'cache')
+
+    x = np.array([10.0, 20.0, 30.0, 40.0])
+    y = np.array([5.0, 15.0, 25.0, 35.0])
+    index = mod.build_obstacle_index([1, 2, 3, 4], x, y, [100.0, 110.0, 120.0, 130.0], node_capacity=2)
+    mod.save_obstacle_index(index, signature, cache_dir)
+
+    loaded = mod.load_obstacle_index(signature, cache_dir)
+    assert isinstance(loaded['x'], np.memmap)
+    positions = mod.query_obstacle_index(loaded, 15.0, 0.0, 35.0, 30.0)
+    assert sorted(loaded['fid'][positions].tolist()) == [2, 3]
+    assert sorted(loaded['elev'][positions].tolist()) == [110.0, 120.0]
+
+    # Another CRS or a modified file is a different entry
+    assert mod.load_obstacle_index(mod.source_signature(str(source), 'EPSG:4326'), cache_dir) is None
+    source.write_text('id,x,y,elev\n1,0,0,0\n')
+    assert mod.load_obstacle_index(mod.source_signature(str(source), 'EPSG:32719'), cache_dir) is None
+    assert mod.source_signature(str(tmp_path / 'missing.csv'), 'EPSG:32719') is None
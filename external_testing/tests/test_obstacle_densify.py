@@ -0,0 +1,80 @@
+import importlib
+
+import numpy as np
+
+
+X = [0.027681, 0.1825, -16.72]
+
+
+def test_densify_lines_respects_spacing_and_owner():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.densify')
+
+    lines = [
+        np.array([[0.0, 0.0], [100.0, 0.0], [100.0, 35.0]]),
+        np.array([[500.0, 500.0]]),
+        np.array([[0.0, 10.0, 20.0], [0.0, 40.0, 50.0]])[:, :2]
+    ]
+    coords, owner = mod.densify_lines(lines, 10.0, owners=[4, 7, 9])
+
+    assert set(owner.tolist()) == {4, 7, 9}
+    assert np.all(np.diff(owner) >= 0)
+    first = coords[owner == 4]
+    assert len(first) == 10 + 4 + 1
+    assert np.max(np.hypot(*np.diff(first, axis=0).T)) <= 10.0 + 1e-9
+    assert np.allclose(first[-1], [100.0, 35.0])
+    assert np.allclose(coords[owner == 7], [[500.0, 500.0]])
+
+
+def test_densify_lines_interpolates_z():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.densify')
+
+    coords, owner = mod.densify_lines([np.array([[0.0, 0.0, 10.0], [40.0, 0.0, 50.0]])], 10.0)
+    assert coords.shape == (5, 3)
+    assert np.allclose(coords[:, 2], [10.0, 20.0, 30.0, 40.0, 50.0])
+
+
+def test_densify_polygons_covers_interior():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.densify')
+
+    ring = np.array([[0.0, -50.0], [100.0, -50.0], [100.0, 50.0], [0.0, 50.0], [0.0, -50.0]])
+    hole = np.array([[40.0, -10.0], [60.0, -10.0], [60.0, 10.0], [40.0, 10.0], [40.0, -10.0]])
+    coords, owner = mod.densify_polygons([[[ring, hole]]], 5.0)
+
+    assert np.all(owner == 0)
+    interior = (coords[:, 0] > 0.0) & (coords[:, 0] < 100.0) & (np.abs(coords[:, 1]) < 50.0)
+    assert interior.sum() > 300
+    in_hole = (coords[:, 0] > 40.0) & (coords[:, 0] < 60.0) & (np.abs(coords[:, 1]) < 10.0)
+    assert not in_hole.any()
+
+
+def test_group_argmax():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.densify')
+
+    values = np.array([1.0, 5.0, np.nan, 3.0, np.nan, 2.0])
+    owner = np.array([0, 0, 1, 1, 2, 0])
+    index, maximum = mod.group_argmax(values, owner, 4)
+
+    assert index.tolist()[:2] == [1, 3]
+    assert np.allclose(maximum[:2], [5.0, 3.0])
+    assert np.isnan(maximum[2]) and index[2] == 4
+    assert index[3] == -1 and np.isnan(maximum[3])
+
+
+def test_worst_point_of_a_building_crossing_the_centreline():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.densify')
+    surfaces = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    # The X surface is lowest on the centreline, inside the footprint
+    footprint = np.array([[1000.0, -60.0], [1100.0, -60.0], [1100.0, 60.0], [1000.0, 60.0], [1000.0, -60.0]])
+    far = footprint + [0.0, 400.0]
+    coords, owner = mod.densify_polygons([[[footprint]], [[far]]], 5.0)
+    heights = np.array([20.0, 20.0])[owner]
+
+    evaluation = surfaces.evaluate_planes(coords[:, 0], coords[:, 1], heights, [X], floor=None)
+    index, reduced = mod.worst_per_owner(evaluation, owner, 2)
+
+    expected = 20.0 - (X[0] * 1000.0 + X[2])
+    assert abs(coords[index[0], 1]) < 5.0
+    assert np.isclose(reduced['penetration'][0], expected, atol=0.2)
+    assert reduced['penetration'][1] < reduced['penetration'][0]
+    assert reduced['penetration'][0] == evaluation['penetration'][owner == 0].max()
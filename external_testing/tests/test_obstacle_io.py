@@ -0,0 +1,95 @@
+import importlib
+import sqlite3
+import struct
+
+import numpy as np
+
+
+def test_parse_dms_etod_coordinates():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.obstacle_io')
+
+    assert abs(mod.parse_dms('334512.30S') - -(33 + 45 / 60 + 12.3 / 3600)) < 1e-12
+    assert abs(mod.parse_dms('0704512.30W') - -(70 + 45 / 60 + 12.3 / 3600)) < 1e-12
+    assert mod.parse_dms('12.5N') == 12.5
+    assert np.isnan(mod.parse_dms('bad'))
+
+
+def test_csv_obstacles_stream_in_chunks(tmp_path):
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.obstacle_io')
+
+    path = tmp_path / 'etod.csv'
+    path.write_text(
+        'Obstacle Identifier;Latitude;Longitude;Elevation;Horizontal Accuracy;Vertical Accuracy;Obstacle Type\n'
+        'OBS1;334512.30S;0704512.30W;1000;30;10;Antenna\n'
+        'OBS2;-33.5;-70.5;500;;;Tree\n'
+        'OBS3;-33.6;-70.6;250;5;3;Building\n'
+    )
+
+    chunks = list(mod.iter_csv_obstacles(str(path), chunk_size=2, elev_unit='ft'))
+    assert [len(c) for c in chunks] == [2, 1]
+    obstacles = np.concatenate(chunks)
+
+    assert obstacles.dtype == mod.OBSTACLE_DTYPE
+    assert obstacles['id'].tolist() == ['OBS1', 'OBS2', 'OBS3']
+    assert obstacles['type'].tolist() == ['Antenna', 'Tree', 'Building']
+    assert abs(obstacles['y'][0] - -(33 + 45 / 60 + 12.3 / 3600)) < 1e-12
+    assert obstacles['x'][1] == -70.5
+    assert np.allclose(obstacles['elev'], [304.8, 152.4, 76.2])
+    assert np.isnan(obstacles['h_acc'][1]) and abs(obstacles['v_acc'][2] - 0.9144) < 1e-6
+
+    # The eTOD identifiers follow the obstacles into the evaluation layers
+    arrays = mod.obstacle_arrays(obstacles)
+    assert arrays['id'].tolist() == ['OBS1', 'OBS2', 'OBS3']
+    assert arrays['type'].tolist() == ['Antenna', 'Tree', 'Building']
+
+
+def test_csv_obstacles_apply_transform(tmp_path):
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.obstacle_io')
+
+    path = tmp_path / 'obstacles.csv'
+    path.write_text('x,y,elev\n1,2,3\n4,5,6\n')
+    obstacles = mod.read_obstacles(str(path), transform=lambda x, y: (x + 100.0, y * 2.0))
+
+    assert obstacles['x'].tolist() == [101.0, 104.0]
+    assert obstacles['y'].tolist() == [4.0, 10.0]
+    assert obstacles['id'].tolist() == ['0', '1']
+    arrays = mod.obstacle_arrays(obstacles)
+    assert arrays['fid'].tolist() == [0, 1] and arrays['elev'].tolist() == [3.0, 6.0]
+
+
+def _gpkg_point(x, y, z=None):
+    header = b'GP' + bytes([0, 1]) + struct.pack('<i', 32719)
+    if z is None:
+        return header + struct.pack('<BIdd', 1, 1, x, y)
+    return header + struct.pack('<BIddd', 1, 1001, x, y, z)
+
+
+def test_gpkg_obstacles_use_geometry_and_z(tmp_path):
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.obstacle_io')
+
+    path = str(tmp_path / 'obstacles.gpkg')
+    con = sqlite3.connect(path)
+    con.executescript(
+        'CREATE TABLE gpkg_spatial_ref_sys (srs_name TEXT, srs_id INTEGER, organization TEXT, '
+        'organization_coordsys_id INTEGER, definition TEXT);'
+        'CREATE TABLE gpkg_geometry_columns (table_name TEXT, column_name TEXT, geometry_type_name TEXT, '
+        'srs_id INTEGER, z INTEGER, m INTEGER);'
+        "INSERT INTO gpkg_spatial_ref_sys VALUES ('UTM 19S', 32719, 'EPSG', 32719, '');"
+        "INSERT INTO gpkg_geometry_columns VALUES ('obst', 'geom', 'POINT', 32719, 1, 0);"
+        'CREATE TABLE obst (fid INTEGER PRIMARY KEY, geom BLOB, kind TEXT);'
+    )
+    con.executemany('INSERT INTO obst VALUES (?, ?, ?)', [
+        (1, _gpkg_point(350000.0, 6300000.0, 520.0), 'mast'),
+        (2, _gpkg_point(350100.0, 6300100.0, 530.5), 'tree'),
+    ])
+    con.commit()
+    con.close()
+
+    assert mod.gpkg_tables(path) == {'obst': ('geom', 'EPSG:32719')}
+    obstacles = mod.read_obstacles(path, columns={'type': 'kind'})
+
+    assert obstacles['x'].tolist() == [350000.0, 350100.0]
+    assert obstacles['y'].tolist() == [6300000.0, 6300100.0]
+    assert obstacles['elev'].tolist() == [520.0, 530.5]
+    assert obstacles['id'].tolist() == ['1', '2']
+    assert obstacles['type'].tolist() == ['mast', 'tree']
@@ -0,0 +1,135 @@
+import importlib
+import os
+import sys
+
+import numpy as np
+import pytest
+
+
+W = [0.0285, 0.0, -8.01]
+X = [0.027681, 0.1825, -16.72]
+Y = [0.023948, 0.210054, -21.51]
+Z = [-0.025, 0.0, -22.5]
+
+
+def test_tile_bounds_cover_every_row_once():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.parallel')
+
+    bounds = mod.tile_bounds(10001, 7)
+    assert len(bounds) == 7
+    assert bounds[0][0] == 0 and bounds[-1][1] == 10001
+    assert all(stop == start for (_, stop), (start, _) in zip(bounds[:-1], bounds[1:]))
+    assert mod.tile_bounds(3, 8) == [(0, 1), (1, 2), (2, 3)]
+
+
+def _worker_modules():
+    return sorted(name for name in sys.modules if name.split('.')[0] in ('qgis', 'PyQt5', 'PyQt6'))
+
+
+def test_default_context_never_forks_the_caller():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.parallel')
+    context = mod.default_context()
+    if context is None:
+        pytest.skip("no Python interpreter for the worker processes")
+
+    assert context.get_start_method() in ('forkserver', 'spawn')
+    with mod.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        pool = {'executor': executor, 'workers': 1}
+        x = np.full(10, 1000.0)
+        result = mod.evaluate_planes_parallel(x, np.zeros(10), np.full(10, 50.0), [W], pool=pool,
+                                              tile_size=2, min_size=0)
+        assert np.all(result['penetration'] > 0)
+        assert executor.submit(_worker_modules).result() == []
+
+
+def test_pool_is_reused_and_blocks_released(monkeypatch):
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.parallel')
+    if mod.default_context() is None:
+        pytest.skip("no Python interpreter for the worker processes")
+
+    released = []
+    release = mod._release
+    monkeypatch.setattr(mod, '_release', lambda block, views: released.append(block.name) or release(block, views))
+    with mod.ProcessPoolExecutor(max_workers=2, mp_context=mod.default_context()) as executor:
+        pool = {'executor': executor, 'workers': 2}
+        x = np.linspace(0.0, 5000.0, 1000)
+        first = mod.evaluate_planes_parallel(x, np.zeros(1000), np.full(1000, 50.0), [W], pool=pool,
+                                             tile_size=100, min_size=0)
+        processes = set(executor._processes)
+        second = mod.evaluate_planes_parallel(x, np.zeros(1000), np.full(1000, 60.0), [W], pool=pool,
+                                              tile_size=100, min_size=0)
+        assert set(executor._processes) == processes
+    assert np.allclose(second['penetration'] - first['penetration'], 10.0)
+    # Input and output blocks of both calls
+    assert len(set(released)) == 4
+    for name in released:
+        with pytest.raises(FileNotFoundError):
+            mod.shared_memory.SharedMemory(name=name)
+
+
+def test_small_inputs_stay_in_the_calling_process():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.parallel')
+
+    pool = {'executor': None, 'workers': 4}
+    result = mod.evaluate_planes_parallel(np.array([1000.0]), np.array([0.0]), np.array([50.0]), [W], pool=pool)
+    assert result['penetration'][0] > 0
+    with mod.evaluation_pool(1) as serial:
+        assert serial is None
+
+
+def test_python_executable_next_to_host_application(tmp_path, monkeypatch):
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.parallel')
+
+    python = tmp_path / 'bin' / 'python3'
+    python.parent.mkdir()
+    python.write_text('')
+    python.chmod(0o755)
+    monkeypatch.setattr(sys, 'executable', str(tmp_path / 'QGIS'))
+    monkeypatch.setattr(sys, 'exec_prefix', str(tmp_path / 'missing'))
+    assert mod.python_executable() == str(python)
+
+    os.remove(python)
+    assert mod.python_executable() is None
+    assert mod.default_context() is None
+
+
+def test_parallel_planes_match_serial():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.parallel')
+    surfaces = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+    if mod.default_context() is None:
+        pytest.skip("no Python interpreter for the worker processes")
+
+    rng = np.random.default_rng(11)
+    x = rng.uniform(-12000.0, 15000.0, 40000)
+    y = rng.uniform(-6000.0, 6000.0, 40000)
+    h = rng.uniform(0.0, 200.0, 40000)
+    planes = [W, X, Y, Z]
+
+    serial = surfaces.evaluate_planes(x, y, h, planes, [250.0, 250.0, 300.0, 300.0])
+    parallel = mod.evaluate_planes_parallel(x, y, h, planes, [250.0, 250.0, 300.0, 300.0],
+                                            max_workers=3, tile_size=5000, min_size=0)
+
+    for key in serial:
+        assert np.array_equal(serial[key], parallel[key]), key
+
+
+def test_parallel_polygon_surfaces_match_serial():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.parallel')
+    surfaces = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+    if mod.default_context() is None:
+        pytest.skip("no Python interpreter for the worker processes")
+
+    rng = np.random.default_rng(5)
+    x = rng.uniform(0.0, 1000.0, 20000)
+    y = rng.uniform(0.0, 1000.0, 20000)
+    h = rng.uniform(0.0, 50.0, 20000)
+    square = lambda x0, y0, s: [[np.array([[x0, y0], [x0 + s, y0], [x0 + s, y0 + s], [x0, y0 + s], [x0, y0]])]]
+    polygons = [square(0.0, 0.0, 600.0), square(400.0, 400.0, 600.0)]
+    planes = [[0.02, 0.0, 0.0], [0.0, 0.01, 5.0]]
+
+    serial = surfaces.evaluate_polygon_surfaces(x, y, x, y, h, polygons, planes)
+    parallel = mod.evaluate_polygon_surfaces_parallel(x, y, x, y, h, polygons, planes,
+                                                      max_workers=2, tile_size=3000, min_size=0)
+
+    for key in serial:
+        assert np.array_equal(serial[key], parallel[key], equal_nan=key != 'inside'), key
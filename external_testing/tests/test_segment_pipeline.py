@@ -0,0 +1,90 @@
+import importlib
+
+import numpy as np
+
+
+def _square(xmin, ymin, xmax, ymax):
+    return [[np.array([[xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax], [xmin, ymin]])]]
+
+
+def test_evaluate_segments_matches_brute_force():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.pipeline')
+
+    polygons = [
+        _square(0.0, 0.0, 1000.0, 1000.0),      # segment 0
+        _square(500.0, 0.0, 1500.0, 1000.0),    # segment 0, overlaps
+        _square(2000.0, 0.0, 3000.0, 1000.0),   # segment 1
+        _square(5000.0, 5000.0, 5100.0, 5100.0)  # segment 2, no obstacles
+    ]
+    planes = [(0.02, 0.0, 50.0), (0.0, 0.01, 60.0), (-0.01, 0.0, 100.0), (0.0, 0.0, 10.0)]
+    surface_segment = [0, 0, 1, 2]
+
+    rng = np.random.default_rng(8)
+    x = rng.uniform(-200.0, 3200.0, 3000)
+    y = rng.uniform(-200.0, 1200.0, 3000)
+    elev = rng.uniform(0.0, 120.0, 3000)
+
+    summary = mod.evaluate_segments(x, y, elev, polygons, planes, surface_segment, 3, moc=[30.0, 50.0, 0.0])
+
+    # Brute force: lowest surface of the segment at every obstacle
+    lowest = np.full((3, len(x)), np.inf)
+    for (parts, plane, segment) in zip(polygons, planes, surface_segment):
+        ring = parts[0][0]
+        inside = (x >= ring[:, 0].min()) & (x <= ring[:, 0].max()) & (y >= ring[:, 1].min()) & (y <= ring[:, 1].max())
+        height = plane[0] * x + plane[1] * y + plane[2]
+        lowest[segment] = np.where(inside, np.minimum(lowest[segment], height), lowest[segment])
+
+    for segment, moc in zip(range(2), (30.0, 50.0)):
+        covered = np.isfinite(lowest[segment])
+        penetration = np.where(covered, elev - lowest[segment], -np.inf)
+        assert summary['controlling'][segment] == np.argmax(penetration)
+        assert np.isclose(summary['penetration'][segment], penetration.max())
+        assert np.isclose(summary['margin'][segment], -penetration.max())
+        assert np.isclose(summary['required_oca'][segment], elev[covered].max() + moc)
+        assert summary['count'][segment] == covered.sum()
+
+    assert summary['controlling'][2] == -1
+    assert summary['count'][2] == 0
+    assert np.isnan(summary['required_oca'][2])
+
+
+def test_required_oca_depends_on_segment_type():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.pipeline')
+    oca = importlib.import_module('Q_Pansopy.modules.evaluation.oca')
+
+    # One OAS-like sloping surface (threshold at x = 0, heights above a
+    # 100 m threshold), the same footprint as a plain surface and as a MOC area
+    polygons = [_square(-1000.0, -200.0, 5000.0, 200.0)] * 3
+    planes = [(0.025, 0.0, 100.0)] * 3
+    x = np.array([1000.0, 3000.0, -950.0, 4000.0])
+    y = np.zeros(4)
+    elev = np.array([160.0, 150.0, 130.0, 190.0])
+
+    summary = mod.evaluate_segments(
+        x, y, elev, polygons, planes, [0, 1, 2], 3, moc=[0.0, 0.0, 75.0],
+        segment_types=['oas', 'surface', 'moc'],
+        oas={0: {'x_local': x, 'thr_elev': 100.0, 'category': 'C', 'gp_angle': 3.0}}
+    )
+
+    # OAS: only the obstacles above the surface count, with their equivalent heights
+    penetrating = np.array([0, 2])
+    expected = oca.ils_oca(x[penetrating], elev[penetrating] - 100.0, 100.0, categories=('C',))
+    assert np.isclose(summary['required_oca'][0], expected['oca'][0])
+    assert summary['oca_obstacle'][0] == penetrating[expected['controlling'][0]]
+    # The most penetrating obstacle is not necessarily the one setting the OCA
+    assert summary['controlling'][0] == 2
+
+    assert np.isnan(summary['required_oca'][1]) and summary['oca_obstacle'][1] == -1
+    assert np.isclose(summary['required_oca'][2], 190.0 + 75.0) and summary['oca_obstacle'][2] == 3
+
+
+def test_surface_pairs_heights():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.pipeline')
+
+    obstacle, surface, height = mod.surface_pairs(
+        np.array([10.0, 600.0]), np.array([10.0, 10.0]),
+        [_square(0.0, 0.0, 1000.0, 100.0), _square(500.0, 0.0, 700.0, 100.0)],
+        [(0.1, 0.0, 0.0), (0.0, 0.0, 5.0)]
+    )
+    pairs = sorted(zip(obstacle.tolist(), surface.tolist(), height.tolist()))
+    assert pairs == [(0, 0, 1.0), (1, 0, 60.0), (1, 1, 5.0)]
@@ -0,0 +1,85 @@
+import importlib
+import math
+
+import numpy as np
+
+
+# Typical CAT I OAS constants (3.0 deg GP, 3000 m LLZ-THR, 15 m RDH)
+W = [0.0285, 0.0, -8.01]
+X = [0.027681, 0.1825, -16.72]
+Y = [0.023948, 0.210054, -21.51]
+Z = [-0.025, 0.0, -22.5]
+
+
+def test_runway_frame_inverts_compute_geom_rotation():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    angle0 = 37.0
+    thr_x, thr_y = 500000.0, 4000000.0
+    local = [(1200.0, 250.0), (800.0, -90.0), (3000.0, 0.0)]
+
+    xs, ys = [], []
+    for lx, ly in local:
+        # Same rotation as oas_ils.compute_geom for points before the threshold
+        offset = math.atan(ly / lx)
+        distance = math.hypot(lx, ly)
+        xs.append(thr_x - math.sin(offset + math.radians(angle0)) * distance)
+        ys.append(thr_y - math.cos(offset + math.radians(angle0)) * distance)
+
+    x_local, y_local = mod.runway_frame(xs, ys, thr_x, thr_y, angle0 + 180)
+
+    assert np.allclose(x_local, [p[0] for p in local])
+    assert np.allclose(y_local, [p[1] for p in local])
+
+
+def test_evaluate_planes_controlling_surface_and_penetration():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    x = np.array([3000.0, 3000.0, -2000.0, 100.0, 20000.0])
+    y = np.array([0.0, 400.0, 0.0, 0.0, 0.0])
+    heights = np.array([100.0, 10.0, 0.0, 5.0, 0.0])
+
+    result = mod.evaluate_planes(x, y, heights, [W, X, Y, Z], top_heights=300)
+
+    # On the centreline the W plane controls, laterally the X plane
+    assert result['controlling'][0] == 0
+    assert result['controlling'][1] == 1
+    # Far in the missed approach the Z plane controls
+    assert result['controlling'][2] == 3
+    # Close to the threshold all planes are below ground
+    assert result['controlling'][3] == -1
+    assert result['surface_height'][3] == 0.0
+
+    assert np.isclose(result['surface_height'][0], 0.0285 * 3000 - 8.01)
+    assert np.isclose(result['penetration'][0], 100.0 - (0.0285 * 3000 - 8.01))
+    assert result['inside'][:4].all()
+    # Beyond the 300 m top the point is outside the surface
+    assert not result['inside'][4]
+
+
+def test_parse_constants_accepts_stored_basic_ils_format():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    assert mod.parse_constants('[0.00355,.143,-36.66]') == [0.00355, 0.143, -36.66]
+    assert mod.parse_constants('[0,0,0]') == [0.0, 0.0, 0.0]
+    assert mod.parse_constants('not a plane') is None
+    assert mod.parse_constants(None) is None
+
+
+def test_evaluate_polygon_surfaces_assigns_lowest_containing_surface():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    square = [[np.array([[0, 0], [10, 0], [10, 10], [0, 10]], dtype=float)]]
+    right = [[np.array([[5, 0], [20, 0], [20, 10], [5, 10]], dtype=float)]]
+    planes = [[0.0, 0.0, 50.0], [0.0, 0.0, 20.0]]
+
+    x = np.array([2.0, 7.0, 15.0, 30.0])
+    y = np.array([5.0, 5.0, 5.0, 5.0])
+    heights = np.array([60.0, 10.0, 25.0, 100.0])
+
+    result = mod.evaluate_polygon_surfaces(x, y, x, y, heights, [square, right], planes)
+
+    assert result['controlling'].tolist() == [0, 1, 1, -1]
+    assert np.allclose(result['penetration'][:3], [10.0, -10.0, 5.0])
+    assert not result['inside'][3]
+    assert np.isnan(result['surface_height'][3])
@@ -0,0 +1,86 @@
+import importlib
+
+import numpy as np
+
+
+def _grid(width, height, pixel=10.0):
+    return {'origin_x': 1000.0, 'origin_y': 2000.0, 'pixel_x': pixel, 'pixel_y': pixel,
+            'width': width, 'height': height}
+
+
+def test_fit_plane_recovers_sloping_surface():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.terrain')
+
+    xyz = [(500000.0, 4000000.0, 0.0), (503000.0, 4000000.0, 60.0),
+           (503000.0, 4000500.0, 60.0), (500000.0, 4000500.0, 0.0)]
+    xyz = [(x, y, 100.0 + 0.02 * (x - 500000.0)) for x, y, _ in xyz]
+    (a, b, c), residual = mod.fit_plane(xyz)
+
+    assert abs(a - 0.02) < 1e-9
+    assert abs(b) < 1e-9
+    assert abs(a * 501000.0 + b * 4000100.0 + c - 120.0) < 1e-6
+    assert residual < 1e-6
+
+
+def test_evaluate_dem_surface_reads_only_covering_blocks():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.terrain')
+
+    grid = _grid(200, 100)
+    dem = np.full((100, 200), 50.0)
+    dem[40, 30] = 95.0  # cell centre (1305, 1595)
+    dem[5, 190] = 500.0  # outside the surface
+    dem[41, 31] = np.nan
+
+    reads = []
+
+    def read_block(col, row, cols, rows):
+        reads.append((col, row, cols, rows))
+        return dem[row:row + rows, col:col + cols]
+
+    square = [[np.array([[1200.0, 1500.0], [1500.0, 1500.0], [1500.0, 1700.0],
+                         [1200.0, 1700.0], [1200.0, 1500.0]])]]
+    result = mod.evaluate_dem_surface(read_block, grid, square, (0.0, 0.0, 60.0), block_size=16)
+
+    assert abs(result['penetration'] - 35.0) < 1e-9
+    assert (result['x'], result['y']) == (1305.0, 1595.0)
+    assert result['terrain'] == 95.0 and result['surface'] == 60.0
+    assert result['penetrating'] == 1
+    assert result['cells'] == 30 * 20 - 1
+    # Only the 30 x 20 pixel window is read, in blocks of at most 16 x 16
+    assert sum(cols * rows for _, _, cols, rows in reads) == 30 * 20
+    assert all(cols <= 16 and rows <= 16 for _, _, cols, rows in reads)
+
+
+def test_evaluate_dem_surface_outside_grid():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.terrain')
+
+    square = [[np.array([[0.0, 0.0], [10.0, 0.0], [10.0, 10.0], [0.0, 0.0]])]]
+    result = mod.evaluate_dem_surface(lambda *args: None, _grid(10, 10), square, (0.0, 0.0, 0.0))
+
+    assert result['cells'] == 0
+    assert np.isnan(result['penetration'])
+
+
+def test_stored_plane_matches_threshold_constants():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.terrain')
+    surfaces = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    frame = {'thr_x': 500000.0, 'thr_y': 4000000.0, 'thr_elev': 100.0, 'bearing': 237.0}
+    constants = [0.00355, 0.143, -36.66]
+    for side in (1.0, -1.0):
+        local = np.array([[0.0, 150.0], [3000.0, 400.0], [3000.0, 1600.0], [0.0, 1700.0]])
+        x, y = surfaces.map_frame(local[:, 0], side * local[:, 1], frame['thr_x'], frame['thr_y'], frame['bearing'])
+        z = 100.0 + constants[0] * local[:, 0] + constants[1] * local[:, 1] + constants[2]
+        (a, b, c), residual = mod.stored_plane(np.column_stack([x, y, z]), constants, frame)
+
+        assert residual < 1e-6
+        px, py = surfaces.map_frame(1000.0, side * 800.0, frame['thr_x'], frame['thr_y'], frame['bearing'])
+        assert abs(a * px + b * py + c - (100.0 + 0.00355 * 1000.0 + 0.143 * 800.0 - 36.66)) < 1e-6
+
+    # A sloping surface across the centreline is not one map plane
+    x, y = surfaces.map_frame([0.0, 100.0, 100.0], [-50.0, -50.0, 50.0],
+                              frame['thr_x'], frame['thr_y'], frame['bearing'])
+    assert mod.stored_plane(np.column_stack([x, y, [0.0, 0.0, 0.0]]), constants, frame) is None
+    # The residual reports geometry that does not follow the constants
+    plane, residual = mod.stored_plane(np.column_stack([x, y, [0.0, 0.0, 5.0]]), [0.0, 0.0, -100.0], frame)
+    assert abs(residual - 5.0) < 1e-9
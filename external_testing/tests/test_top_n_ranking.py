@@ -0,0 +1,59 @@
+import importlib
+
+import numpy as np
+
+
+W = [0.0285, 0.0, -8.01]
+X = [0.027681, 0.1825, -16.72]
+Y = [0.023948, 0.210054, -21.51]
+Z = [-0.025, 0.0, -22.5]
+
+
+def _chunks(x, y, h, planes, chunk_size):
+    surfaces = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+    for start in range(0, len(x), chunk_size):
+        part = slice(start, start + chunk_size)
+        rows = surfaces.evaluate_planes(x[part], y[part], h[part], planes)
+        rows['fid'] = np.arange(start, min(start + chunk_size, len(x)))
+        yield rows
+
+
+def test_streaming_top_n_matches_full_sort():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.ranking')
+    surfaces = importlib.import_module('Q_Pansopy.modules.evaluation.surfaces')
+
+    rng = np.random.default_rng(5)
+    n = 60000
+    x = rng.uniform(-3000.0, 9000.0, n)
+    y = rng.uniform(-1500.0, 1500.0, n)
+    h = rng.gamma(2.0, 15.0, n)
+    planes = [W, X, Y, Z]
+
+    winners = mod.top_n_by_surface(_chunks(x, y, h, planes, 7000), 50)
+    full = surfaces.evaluate_planes(x, y, h, planes)
+
+    for surface in np.unique(full['controlling'][full['inside']]):
+        selected = full['inside'] & (full['controlling'] == surface) & ~np.isnan(full['penetration'])
+        expected = np.sort(full['penetration'][selected])[::-1][:50]
+        got = winners['penetration'][winners['controlling'] == surface]
+        assert np.allclose(got, expected)
+        fids = winners['fid'][winners['controlling'] == surface]
+        assert np.allclose(full['penetration'][fids], got)
+
+    assert len(winners['fid']) <= 50 * 5
+
+
+def test_top_n_positive_only_and_small_groups():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.ranking')
+
+    chunks = [
+        {'penetration': np.array([1.0, -2.0, 3.0, np.nan]), 'controlling': np.array([0, 0, 1, 1]),
+         'inside': np.array([True, True, True, True]), 'fid': np.array([1, 2, 3, 4])},
+        {'penetration': np.array([5.0, 0.5]), 'controlling': np.array([0, 0]),
+         'inside': np.array([False, True]), 'fid': np.array([5, 6])}
+    ]
+    winners = mod.top_n_by_surface(iter(chunks), 3, positive_only=True)
+
+    assert winners['fid'].tolist() == [1, 6, 3]
+    assert winners['controlling'].tolist() == [0, 0, 1]
+    assert mod.top_n_by_surface(iter([]), 3) is None
@@ -0,0 +1,64 @@
+import importlib
+
+import numpy as np
+
+
+def test_points_in_polygon_handles_holes_and_multiparts():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.geometry')
+
+    outer = np.array([[0, 0], [10, 0], [10, 10], [0, 10]], dtype=float)
+    hole = np.array([[4, 4], [6, 4], [6, 6], [4, 6]], dtype=float)
+    other = np.array([[20, 0], [30, 0], [25, 8]], dtype=float)
+    parts = [[outer, hole], [other]]
+
+    x = np.array([1.0, 5.0, 25.0, 15.0, 29.0])
+    y = np.array([1.0, 5.0, 2.0, 5.0, 7.0])
+
+    assert mod.points_in_polygon(x, y, parts).tolist() == [True, False, True, False, False]
+
+
+def test_str_tree_query_matches_brute_force():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.geometry')
+
+    rng = np.random.default_rng(7)
+    lower = rng.uniform(0, 1000, (300, 2))
+    size = rng.uniform(1, 60, (300, 2))
+    bounds = np.column_stack([lower, lower + size])
+    x = rng.uniform(0, 1000, 2000)
+    y = rng.uniform(0, 1000, 2000)
+
+    tree = mod.build_str_tree(bounds, node_capacity=8)
+    points, items = mod.query_str_tree(tree, x, y)
+
+    contains = ((x[:, None] >= bounds[:, 0]) & (x[:, None] <= bounds[:, 2])
+                & (y[:, None] >= bounds[:, 1]) & (y[:, None] <= bounds[:, 3]))
+    expected = set(zip(*np.nonzero(contains)))
+    assert set(zip(points.tolist(), items.tolist())) == expected
+
+
+def test_points_in_polygons_reports_every_overlapping_surface():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.geometry')
+
+    left = [[np.array([[0, 0], [10, 0], [10, 10], [0, 10]], dtype=float)]]
+    right = [[np.array([[5, 0], [15, 0], [15, 10], [5, 10]], dtype=float)]]
+    x = np.array([2.0, 7.0, 12.0, 20.0])
+    y = np.array([5.0, 5.0, 5.0, 5.0])
+
+    points, polygons = mod.points_in_polygons(x, y, [left, right])
+
+    assert list(zip(points.tolist(), polygons.tolist())) == [(0, 0), (1, 0), (1, 1), (2, 1)]
+
+
+def test_points_near_polygon_uses_distance_to_boundary():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.geometry')
+
+    square = [[np.array([[0.0, 0.0], [100.0, 0.0], [100.0, 100.0], [0.0, 100.0], [0.0, 0.0]])]]
+    x = np.array([50.0, 104.0, 106.0, 103.0, 50.0])
+    y = np.array([50.0, 50.0, 50.0, 104.0, 90.0])
+    distance = mod.distance_to_boundary(x, y, square)
+    assert np.allclose(distance, [50.0, 4.0, 6.0, 5.0, 10.0])
+
+    near = mod.points_near_polygon(x, y, square, 5.0)
+    assert near.tolist() == [True, True, False, True, True]
+    near = mod.points_near_polygon(x, y, square, np.array([0.0, 3.0, 7.0, 4.0, 0.0]))
+    assert near.tolist() == [True, False, True, False, True]
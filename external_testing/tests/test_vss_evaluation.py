@@ -0,0 +1,119 @@
+import importlib
+import math
+
+import numpy as np
+
+
+def test_vss_surfaces_match_generator_geometry():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.vss')
+
+    surfaces = mod.vss_surfaces(OCH=100, RDH=15, VPA=3.0, rwy_width=45, strip_width=140)
+    D_VSS = 100 / math.tan(math.radians(3.0 - 1.12))
+    OCS_length = 85 / math.tan(math.radians(3.0))
+
+    assert np.isclose(surfaces['vss']['stations'][-1], 60 + D_VSS)
+    assert np.isclose(surfaces['vss']['half_widths'][-1], D_VSS * 0.15 + 70)
+    assert np.isclose(surfaces['ocs']['stations'][-1], OCS_length)
+    assert np.isclose(surfaces['ocs']['slope'], math.tan(math.radians(2.0)))
+
+
+def test_evaluate_trapezoid_reports_penetrations_inside_footprint():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.vss')
+
+    ocs = mod.vss_surfaces(OCH=100, RDH=15, VPA=3.0)['ocs']
+    x = np.array([1000.0, 1000.0, 1000.0, 5000.0])
+    y = np.array([0.0, 20.0, 500.0, 0.0])
+    heights = np.array([50.0, 10.0, 50.0, 50.0])
+
+    result = mod.evaluate_trapezoid(x, y, heights, ocs)
+
+    assert result['inside'].tolist() == [True, True, False, False]
+    assert np.isclose(result['surface_height'][0], 1000 * math.tan(math.radians(2.0)))
+    assert result['penetration'][0] > 0 > result['penetration'][1]
+
+
+def test_minimum_och_raises_och_above_penetrating_obstacles():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.vss')
+
+    x = np.array([800.0, 1000.0, 3000.0, 20000.0])
+    y = np.array([0.0, 0.0, 0.0, 0.0])
+    # The OCS built for OCH 60 reaches 859 m and includes the first
+    # obstacle; raising the OCH to 70 extends it to include the second one
+    heights = np.array([70.0, 90.0, 10.0, 900.0])
+
+    solution = mod.minimum_och(x, y, heights, och_min=60, RDH=15, VPA=3.0, och_max=500)
+
+    assert solution['och'] == 90.0
+    assert solution['controlling'] == 1
+
+
+def test_minimum_och_keeps_clear_design_och():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.vss')
+
+    solution = mod.minimum_och(np.array([1000.0]), np.array([0.0]), np.array([1.0]), och_min=75, RDH=15, VPA=3.0)
+
+    assert solution['och'] == 75
+    assert solution['controlling'] == -1
+
+
+def test_minimum_och_reports_no_solution_above_search_range():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.vss')
+
+    solution = mod.minimum_och(np.array([500.0]), np.array([0.0]), np.array([400.0]), och_min=60, RDH=15, VPA=3.0, och_max=300)
+
+    assert solution['och'] is None
+    assert solution['controlling'] == 0
+
+
+def test_minimum_och_tests_obstacles_outside_the_longest_footprint():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.vss')
+
+    # The straight-in OCS narrows at x = 500 m as it lengthens: the obstacle
+    # is inside the OCS of OCH 67 but outside the one of och_max
+    longest = mod.vss_surfaces(1000.0, 15, 3.0)['ocs']
+    assert not mod.trapezoid_contains([500.0], [90.0], longest)[0]
+
+    solution = mod.minimum_och(np.array([500.0]), np.array([90.0]), np.array([80.0]), och_min=67, RDH=15, VPA=3.0)
+    assert solution['controlling'] == 0
+    assert solution['och'] == 80.0
+
+
+def test_minimum_och_finds_ocs_leaving_below_obstacle_height():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.vss')
+
+    # Inside the OCS of OCH 67, the obstacle leaves it near OCH 85.6 as the
+    # straight-in OCS narrows, well below its own height
+    x, y, h = np.array([500.0]), np.array([95.0]), np.array([150.0])
+    solution = mod.minimum_och(x, y, h, och_min=67, RDH=15, VPA=3.0, tolerance=0.01)
+
+    assert 85 < solution['och'] < 86
+    assert solution['controlling'] == -1
+    cleared = mod.vss_surfaces(solution['och'], 15, 3.0)['ocs']
+    penetrated = mod.vss_surfaces(solution['och'] - 0.02, 15, 3.0)['ocs']
+    assert not mod.trapezoid_contains(x, y, cleared)[0]
+    assert mod.trapezoid_contains(x, y, penetrated)[0]
+
+
+def test_loc_ocs_matches_vss_loc_polygon():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.vss')
+
+    ocs = mod.vss_surfaces(OCH=100, RDH=15, VPA=3.0, variant='loc')['ocs']
+    OCS_length = 85 / math.tan(math.radians(3.0))
+    x = np.array([30.0, 60.0, OCS_length])
+
+    result = mod.evaluate_trapezoid(x, np.zeros(3), np.zeros(3), ocs)
+
+    # Level with the threshold up to VSS_a-VSS_d, OCS_b-OCS_c at the end
+    assert np.allclose(result['surface_height'], [0.0, 0.0, OCS_length * math.tan(math.radians(2.5))])
+    assert result['inside'].all()
+
+
+def test_minimum_och_loc_variant():
+    mod = importlib.import_module('Q_Pansopy.modules.evaluation.vss')
+
+    # The first obstacle is on the level part of the LOC OCS for every
+    # OCH, the second one stays below its rising part
+    solution = mod.minimum_och(np.array([50.0, 2000.0]), np.array([0.0, 0.0]), np.array([70.0, 1.0]),
+                               och_min=60, RDH=15, VPA=3.0, variant='loc')
+    assert solution['och'] == 70.0
+    assert solution['controlling'] == 0